@@ -1,5 +1,8 @@
 """Statistical analysis module."""
 
+from .accessibility import calculate_accessibility, process_accessibility
+from .catchment import calculate_land_catchments, process_land_catchments
+from .site_selection import process_site_selection, select_sites
 from .statistical import (
     analyze_access_disparity,
     calculate_population_metrics,
@@ -12,4 +15,10 @@ __all__ = [
     "run_manova",
     "analyze_access_disparity",
     "calculate_population_metrics",
+    "calculate_land_catchments",
+    "process_land_catchments",
+    "calculate_accessibility",
+    "process_accessibility",
+    "select_sites",
+    "process_site_selection",
 ]
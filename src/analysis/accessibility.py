@@ -0,0 +1,237 @@
+"""Two-step floating catchment area (2SFCA) and gravity accessibility scores.
+
+Both measures are computed from the sparse walk time matrix (see
+``walk_times.matrix``) using block population (P1_001N) as demand and
+conserved land acreage (CALC_AC) as supply. With W the matrix of decay
+weights f(d_ij) between center node i and land node j:
+
+    gravity:  A_i = sum_j S_j f(d_ij)                       = W @ S
+    2SFCA:    R_j = S_j / sum_i P_i f(d_ij)                 = S / (W.T @ P)
+              A_i = sum_j R_j f(d_ij)                       = W @ R
+
+Each decay function is one pass over the stored matrix entries followed by
+two sparse matrix-vector products, so statewide scores for several decay
+functions take seconds.
+"""
+
+import logging
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from analysis.catchment import population_by_node
+from utils.io import read_columns
+from walk_times.matrix import WalkTimeMatrix, load_walk_time_matrix, walk_times_to_matrix
+
+logger = logging.getLogger(__name__)
+
+DecayFunction = Callable[[np.ndarray], np.ndarray]
+
+
+def _step(minutes: np.ndarray, catchment: float) -> np.ndarray:
+    return (minutes <= catchment).astype(np.float64)
+
+
+def _linear(minutes: np.ndarray, catchment: float) -> np.ndarray:
+    return np.clip(1.0 - minutes / catchment, 0.0, 1.0)
+
+
+def _gaussian(minutes: np.ndarray, catchment: float) -> np.ndarray:
+    # Gaussian 2SFCA weight (Dai 2010): 1 at d=0, 0 at the catchment edge
+    edge = np.exp(-0.5)
+    weight = (np.exp(-0.5 * (minutes / catchment) ** 2) - edge) / (1.0 - edge)
+    return np.where(minutes <= catchment, weight, 0.0)
+
+
+def _exponential(minutes: np.ndarray, beta: float, catchment: float | None) -> np.ndarray:
+    weight = np.exp(-beta * minutes)
+    return weight if catchment is None else np.where(minutes <= catchment, weight, 0.0)
+
+
+def _power(
+    minutes: np.ndarray, beta: float, catchment: float | None, min_minutes: float
+) -> np.ndarray:
+    weight = np.maximum(minutes, min_minutes) ** -beta
+    return weight if catchment is None else np.where(minutes <= catchment, weight, 0.0)
+
+
+def step_decay(catchment: float) -> DecayFunction:
+    """Binary catchment: weight 1 within `catchment` minutes, 0 beyond (classic 2SFCA)."""
+    return partial(_step, catchment=catchment)
+
+
+def linear_decay(catchment: float) -> DecayFunction:
+    """Weight falling linearly from 1 at 0 minutes to 0 at `catchment` minutes."""
+    return partial(_linear, catchment=catchment)
+
+
+def gaussian_decay(catchment: float) -> DecayFunction:
+    """Gaussian weight truncated at `catchment` minutes (Gaussian 2SFCA)."""
+    return partial(_gaussian, catchment=catchment)
+
+
+def exponential_decay(beta: float, catchment: float | None = None) -> DecayFunction:
+    """Weight exp(-beta * minutes), optionally truncated at `catchment` minutes."""
+    return partial(_exponential, beta=beta, catchment=catchment)
+
+
+def power_decay(
+    beta: float, catchment: float | None = None, min_minutes: float = 1.0
+) -> DecayFunction:
+    """Weight minutes**-beta, with minutes floored at `min_minutes` to avoid division by zero."""
+    return partial(_power, beta=beta, catchment=catchment, min_minutes=min_minutes)
+
+
+DEFAULT_DECAY_FUNCTIONS: dict[str, DecayFunction] = {
+    "STEP_10": step_decay(10),
+    "STEP_30": step_decay(30),
+    "GAUSS_30": gaussian_decay(30),
+    "EXP_10": exponential_decay(0.1, catchment=60),
+}
+
+
+def decay_weights(wtm: WalkTimeMatrix, decay: DecayFunction) -> sparse.csr_matrix:
+    """Apply a decay function to every stored walk time.
+
+    Args:
+        wtm: WalkTimeMatrix of walk minutes
+        decay: Vectorized function mapping minutes to weights
+
+    Returns:
+        CSR matrix of weights sharing the matrix index arrays
+    """
+    return sparse.csr_matrix(
+        (decay(wtm.matrix.data.astype(np.float64)), wtm.matrix.indices, wtm.matrix.indptr),
+        shape=wtm.matrix.shape,
+    )
+
+
+def calculate_accessibility(
+    wtm: WalkTimeMatrix,
+    population: np.ndarray,
+    supply: np.ndarray,
+    decay_functions: dict[str, DecayFunction] | None = None,
+) -> pd.DataFrame:
+    """Calculate 2SFCA and gravity scores for every center node.
+
+    Adds, for each named decay function, columns SFCA_<name> (acres per
+    person reachable, adjusted for competition from other blocks) and
+    GRAV_<name> (decay-weighted acres reachable).
+
+    Args:
+        wtm: WalkTimeMatrix of walk minutes
+        population: Demand per center node (matrix row order)
+        supply: Supply per land node (matrix column order), e.g. acres
+        decay_functions: Mapping of name to decay function (default:
+            DEFAULT_DECAY_FUNCTIONS)
+
+    Returns:
+        DataFrame indexed by the center node column with one column per score
+    """
+    if decay_functions is None:
+        decay_functions = DEFAULT_DECAY_FUNCTIONS
+
+    population = np.asarray(population, dtype=np.float64)
+    supply = np.asarray(supply, dtype=np.float64)
+
+    columns = {}
+    for name, decay in decay_functions.items():
+        logger.info(f"Calculating accessibility with decay function {name}")
+        weights = decay_weights(wtm, decay)
+
+        # Step 1: supply-to-demand ratio at each land
+        demand = weights.T @ population
+        ratio = np.divide(supply, demand, out=np.zeros_like(supply), where=demand > 0)
+
+        # Step 2: sum ratios over the lands each center reaches
+        columns[f"SFCA_{name}"] = weights @ ratio
+        columns[f"GRAV_{name}"] = weights @ supply
+
+    scores = pd.DataFrame(columns, index=pd.Index(wtm.center_ids, name=wtm.center_node_col))
+    logger.info(f"Calculated accessibility for {len(scores):,} center nodes")
+    return scores
+
+
+def land_supply(
+    conserved_lands: pd.DataFrame,
+    land_ids: np.ndarray,
+    acres_col: str = "CALC_AC",
+) -> np.ndarray:
+    """Total acres per land node, aligned with the matrix columns.
+
+    Args:
+        conserved_lands: DataFrame with "osmid" and acres columns
+        land_ids: Land node IDs (matrix column order)
+        acres_col: Acres column (default: "CALC_AC")
+
+    Returns:
+        Array of acres aligned with land_ids
+    """
+    acres = (
+        conserved_lands.groupby(conserved_lands["osmid"].astype(np.int64))[acres_col]
+        .sum()
+        .reindex(land_ids, fill_value=0.0)
+    )
+    return np.asarray(acres, dtype=np.float64)
+
+
+def process_accessibility(
+    walk_times_path: str | Path,
+    blocks_path: str | Path,
+    ejblocks_path: str | Path,
+    conserved_lands_path: str | Path,
+    output_path: str | Path,
+    decay_functions: dict[str, DecayFunction] | None = None,
+    population_col: str = "P1_001N",
+    acres_col: str = "CALC_AC",
+) -> pd.DataFrame:
+    """Compute 2SFCA and gravity scores per block and save them as Parquet.
+
+    Args:
+        walk_times_path: Path to sparse walk time matrix (.npz) or walk times Parquet
+            (the long table only has trip time buckets, so the matrix is preferred)
+        blocks_path: Path to blocks file with "GEOID20" and "osmid" columns
+        ejblocks_path: Path to ejblocks file with population from ``create_ejblocks``
+        conserved_lands_path: Path to conserved lands with "osmid" and acres columns
+        output_path: Path to save per-block Parquet table
+        decay_functions: Mapping of name to decay function (default: DEFAULT_DECAY_FUNCTIONS)
+        population_col: Population column (default: "P1_001N")
+        acres_col: Acres column (default: "CALC_AC")
+
+    Returns:
+        DataFrame with "GEOID20" and one column per score
+    """
+    logger.info("Loading walk times data")
+    if str(walk_times_path).endswith(".npz"):
+        wtm = load_walk_time_matrix(walk_times_path)
+    else:
+        wtm = walk_times_to_matrix(pd.read_parquet(str(walk_times_path)), value_col="trip_time")
+
+    logger.info("Loading population and supply data")
+    blocks = read_columns(blocks_path, ["GEOID20", "osmid"])
+    ejblocks = read_columns(ejblocks_path, ["GEOID20", population_col])
+    population, _ = population_by_node(
+        wtm.center_ids, blocks, ejblocks, population_col=population_col
+    )
+    lands = read_columns(conserved_lands_path, ["osmid", acres_col])
+    supply = land_supply(lands, wtm.land_ids, acres_col)
+
+    scores = calculate_accessibility(wtm, population, supply, decay_functions)
+
+    # Blocks that share a center node share its score; unreached blocks score 0
+    blocks = blocks.assign(osmid=blocks["osmid"].astype(np.int64))
+    result = blocks.merge(scores, how="left", left_on="osmid", right_index=True)
+    score_cols = list(scores.columns)
+    result[score_cols] = result[score_cols].fillna(0.0).astype(np.float32)
+    result = result[["GEOID20"] + score_cols]
+
+    logger.info(f"Saving accessibility scores to {output_path}")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    result.to_parquet(output_path, index=False)
+
+    return result
@@ -0,0 +1,224 @@
+"""Catchment metrics: population served by each conserved land.
+
+Reuses the block→land walk times already produced by the walk time engine,
+so no additional graph searches are needed. The walk times are loaded as a
+sparse (center node × land node) matrix (see ``walk_times.matrix``) and the
+population reached by each land is a sparse matrix-vector product per trip
+time threshold.
+"""
+
+import logging
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from config.defaults import DEFAULT_TRIP_TIMES
+from exceptions import ValidationError
+from utils.io import read_columns, write_parquet
+from utils.schema import normalize_geoids
+from walk_times.matrix import WalkTimeMatrix, load_walk_time_matrix, walk_times_to_matrix
+
+logger = logging.getLogger(__name__)
+
+
+def build_reachability_matrix(
+    walk_times: pd.DataFrame,
+    center_node_col: str | None = None,
+) -> tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+    """Build a sparse center×land matrix of trip times from the long walk times table.
+
+    Args:
+        walk_times: DataFrame with center node, "land_osmid" and "trip_time" columns
+        center_node_col: Name of the center node column (default: auto-detect
+            "block_osmid" or "tract_osmid")
+
+    Returns:
+        Tuple of (matrix, center_ids, land_ids) where matrix[i, j] is the trip
+        time from center_ids[i] to land_ids[j]; missing entries are unreachable
+    """
+    wtm = walk_times_to_matrix(walk_times, value_col="trip_time", center_node_col=center_node_col)
+    return wtm.matrix, wtm.center_ids, wtm.land_ids
+
+
+def population_by_node(
+    node_ids: np.ndarray,
+    blocks: pd.DataFrame,
+    ejblocks: pd.DataFrame,
+    population_col: str = "P1_001N",
+    disadvantage_col: str | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sum block population onto the center nodes used by the walk time engine.
+
+    Several blocks can snap to the same graph node, so population is summed
+    per node.
+
+    Args:
+        node_ids: Center node IDs (matrix row order)
+        blocks: DataFrame mapping "GEOID20" to center node "osmid"
+        ejblocks: DataFrame with "GEOID20" (column or index), population and
+            optional disadvantage columns, as produced by ``create_ejblocks``
+        population_col: Population column (default: "P1_001N")
+        disadvantage_col: Optional CEJST disadvantage indicator column, e.g. "TC"
+
+    Returns:
+        Tuple of (population, disadvantaged_population) arrays aligned with node_ids;
+        disadvantaged_population is all zeros without disadvantage_col
+    """
+    if "GEOID20" not in ejblocks.columns:
+        ejblocks = ejblocks.reset_index()
+
+    ejblock_cols = ["GEOID20", population_col]
+    if disadvantage_col is not None:
+        ejblock_cols.append(disadvantage_col)
+
+    # GEOIDs may be strings (TIGER files) or int64 (pipeline artifacts)
+    lookup = normalize_geoids(blocks[["GEOID20", "osmid"]].copy()).merge(
+        normalize_geoids(ejblocks[ejblock_cols].copy()),
+        on="GEOID20",
+        how="inner",
+    )
+
+    positions = pd.Index(node_ids).get_indexer(lookup["osmid"].astype(np.int64))
+    found = positions >= 0
+    population = lookup[population_col].fillna(0).to_numpy(dtype=np.float64)[found]
+
+    pop = np.bincount(positions[found], weights=population, minlength=len(node_ids))
+    if disadvantage_col is None:
+        return pop, np.zeros(len(node_ids))
+
+    disadvantaged = (lookup[disadvantage_col].fillna(0) > 0).to_numpy()[found]
+    dac_pop = np.bincount(
+        positions[found], weights=population * disadvantaged, minlength=len(node_ids)
+    )
+    return pop, dac_pop
+
+
+def calculate_land_catchments(
+    matrix: sparse.csr_matrix,
+    land_ids: np.ndarray,
+    population: np.ndarray,
+    disadvantaged_population: np.ndarray,
+    trip_times: list[int],
+) -> pd.DataFrame:
+    """Calculate population within each trip time of every conserved land.
+
+    Adds, for each threshold t, columns POP_t (population that can reach the
+    land within t minutes), DAC_t (CEJST-disadvantaged population) and
+    DAC_PER_t (disadvantaged share of POP_t).
+
+    Args:
+        matrix: Sparse center×land walk time matrix (trip times or exact minutes)
+        land_ids: Land node IDs (matrix column order)
+        population: Population per center node (matrix row order)
+        disadvantaged_population: Disadvantaged population per center node
+        trip_times: Trip time thresholds in minutes
+
+    Returns:
+        DataFrame indexed by "land_osmid" with catchment columns
+    """
+    wtm = WalkTimeMatrix(matrix=matrix, center_ids=np.arange(matrix.shape[0]), land_ids=land_ids)
+    trip_times = sorted(trip_times)
+    served = wtm.aggregate_by_land(
+        np.column_stack([population, disadvantaged_population]), trip_times
+    )
+    columns = {}
+
+    for i, trip_time in enumerate(trip_times):
+        pop, dac = served[:, 0, i], served[:, 1, i]
+        columns[f"POP_{trip_time}"] = pop
+        columns[f"DAC_{trip_time}"] = dac
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns[f"DAC_PER_{trip_time}"] = np.where(pop > 0, dac / pop, 0.0)
+
+    catchments = pd.DataFrame(columns, index=pd.Index(land_ids, name="land_osmid"))
+    logger.info(f"Calculated catchments for {len(catchments):,} land nodes")
+    return catchments
+
+
+def process_land_catchments(
+    walk_times_path: str | Path,
+    blocks_path: str | Path,
+    ejblocks_path: str | Path,
+    output_path: str | Path,
+    conserved_lands_path: str | Path | None = None,
+    layer_path: str | Path | None = None,
+    trip_times: list[int] | None = None,
+    population_col: str = "P1_001N",
+    disadvantage_col: str = "TC",
+) -> pd.DataFrame:
+    """Compute land catchment metrics and save them.
+
+    Writes a per-land Parquet table and, optionally, a conserved lands
+    GeoParquet layer carrying the same metrics that ``convert_to_pmtiles.py``
+    can turn into map tiles.
+
+    Args:
+        walk_times_path: Path to walk times Parquet/CSV or sparse matrix (.npz) from
+            ``process_walk_times``
+        blocks_path: Path to blocks file with "GEOID20" and "osmid" columns
+        ejblocks_path: Path to ejblocks file from ``create_ejblocks``
+        output_path: Path to save per-land Parquet table
+        conserved_lands_path: Path to conserved lands with "osmid" (required for layer_path)
+        layer_path: Optional path to save conserved lands GeoParquet with metrics
+        trip_times: Trip time thresholds (default: thresholds present in walk times, or
+            DEFAULT_TRIP_TIMES for a matrix)
+        population_col: Population column (default: "P1_001N")
+        disadvantage_col: CEJST disadvantage indicator column (default: "TC")
+
+    Returns:
+        DataFrame with one row per land node
+    """
+    logger.info("Loading walk times data")
+    if str(walk_times_path).endswith(".npz"):
+        wtm = load_walk_time_matrix(walk_times_path)
+        if trip_times is None:
+            trip_times = DEFAULT_TRIP_TIMES
+    else:
+        if str(walk_times_path).endswith(".parquet"):
+            walk_times = pd.read_parquet(str(walk_times_path))
+        else:
+            walk_times = pd.read_csv(str(walk_times_path))
+        if walk_times.index.name in ["tract_osmid", "block_osmid"]:
+            walk_times = walk_times.reset_index()
+        wtm = walk_times_to_matrix(walk_times, value_col="trip_time")
+        if trip_times is None:
+            trip_times = sorted(walk_times["trip_time"].dropna().unique().astype(int).tolist())
+    matrix, center_ids, land_ids = wtm.matrix, wtm.center_ids, wtm.land_ids
+
+    logger.info("Loading block population data")
+    blocks = read_columns(blocks_path, ["GEOID20", "osmid"])
+    ejblocks = read_columns(ejblocks_path, ["GEOID20", population_col, disadvantage_col])
+    pop, dac_pop = population_by_node(
+        center_ids, blocks, ejblocks, population_col, disadvantage_col
+    )
+
+    catchments = calculate_land_catchments(matrix, land_ids, pop, dac_pop, trip_times)
+    catchments = catchments.reset_index()
+
+    logger.info(f"Saving land catchments to {output_path}")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    catchments.to_parquet(output_path, index=False)
+
+    if layer_path:
+        if conserved_lands_path is None:
+            raise ValidationError("conserved_lands_path is required to write a catchment layer")
+        logger.info("Loading conserved lands data")
+        if str(conserved_lands_path).endswith(".parquet"):
+            lands = gpd.read_parquet(str(conserved_lands_path))
+        else:
+            lands = gpd.read_file(str(conserved_lands_path))
+        lands["osmid"] = lands["osmid"].astype(np.int64)
+        layer = lands.merge(catchments, how="left", left_on="osmid", right_on="land_osmid")
+        metric_cols = [col for col in catchments.columns if col != "land_osmid"]
+        layer[metric_cols] = layer[metric_cols].fillna(0)
+
+        logger.info(f"Saving catchment layer to {layer_path}")
+        layer_path = Path(layer_path)
+        layer_path.parent.mkdir(parents=True, exist_ok=True)
+        write_parquet(layer.drop(columns="land_osmid"), layer_path, index=False)
+
+    return catchments
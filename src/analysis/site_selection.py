@@ -0,0 +1,480 @@
+"""Site selection for proposed conserved lands.
+
+Answers questions like "which of these candidate parcels would most increase
+disadvantaged access within 10 minutes?". Each candidate is snapped to the
+walk network and evaluated with a single reverse bounded search, giving the
+set of blocks that could walk to it. The evaluations are cached on disk, so
+choosing sites under different weights or trip times up to the evaluated
+radius needs no new searches. Sites are then chosen with a lazy-greedy
+maximum coverage optimization: each pick maximizes the weighted population of
+blocks newly covered.
+"""
+
+import hashlib
+import heapq
+import logging
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+from analysis.catchment import population_by_node
+from config.defaults import DEFAULT_TRAVEL_SPEED
+from exceptions import ValidationError
+from utils.io import read_columns, write_parquet
+from walk_times.algorithms import reverse_bounded_searches
+from walk_times.matrix import (
+    WalkTimeMatrix,
+    load_walk_time_matrix,
+    save_walk_time_matrix,
+    walk_times_to_matrix,
+)
+from walk_times.routing_cache import RoutingCache, get_routing_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITE_TRIP_TIME = 10
+
+
+def snap_candidates(candidates: gpd.GeoDataFrame, cache: RoutingCache) -> np.ndarray:
+    """Snap candidate polygons to their nearest walk network node.
+
+    Uses the candidate centroid, matching ``find_centroids.py``.
+
+    Args:
+        candidates: GeoDataFrame of candidate parcels
+        cache: RoutingCache of the walk network
+
+    Returns:
+        Array of node IDs aligned with candidates
+    """
+    if cache.crs and candidates.crs is not None:
+        candidates = candidates.to_crs(cache.crs)
+    centroids = candidates.geometry.centroid
+    _, nearest = cKDTree(cache.node_xy).query(np.column_stack([centroids.x, centroids.y]))
+    return np.asarray(cache.node_ids[nearest])
+
+
+def _get_evaluation_cache_path(
+    candidate_nodes: np.ndarray,
+    max_trip_time: float,
+    travel_speed: float,
+    cache: RoutingCache,
+    cache_dir: str | Path | None = None,
+) -> Path:
+    """Get the cache file path for a set of candidate evaluations.
+
+    The key covers the candidate nodes, speed and network edges (endpoints and
+    lengths), so a refreshed network or a different candidate set gets a new
+    file. The search radius is the last part of the file name, so
+    ``_find_cached_evaluation`` can reuse a file searched at a larger radius.
+    """
+    if cache_dir is None:
+        project_root = Path(__file__).parent.parent.parent
+        cache_dir = project_root / "data" / "cache" / "site_selection"
+    else:
+        cache_dir = Path(cache_dir)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    key = hashlib.md5(usedforsecurity=False)  # noqa: S324
+    key.update(np.ascontiguousarray(candidate_nodes, dtype=np.int64).tobytes())
+    key.update(f"{travel_speed}_{len(cache.node_ids)}".encode())
+    key.update(np.ascontiguousarray(cache.edge_u, dtype=np.int64).tobytes())
+    key.update(np.ascontiguousarray(cache.edge_v, dtype=np.int64).tobytes())
+    key.update(np.ascontiguousarray(cache.edge_length, dtype=np.float64).tobytes())
+    return cache_dir / f"candidates_{key.hexdigest()}_{float(max_trip_time)}.npz"
+
+
+def _find_cached_evaluation(cache_path: Path, max_trip_time: float) -> Path | None:
+    """Find the cached evaluation with the smallest radius of at least max_trip_time."""
+    key = cache_path.name.rsplit("_", 1)[0]
+    radii: dict[Path, float] = {}
+    for path in cache_path.parent.glob(f"{key}_*.npz"):
+        try:
+            radius = float(path.name.removesuffix(".npz").rsplit("_", 1)[1])
+        except ValueError:
+            continue
+        if radius >= max_trip_time:
+            radii[path] = radius
+    return min(radii, key=lambda path: radii[path]) if radii else None
+
+
+def evaluate_candidates(
+    candidate_nodes: np.ndarray,
+    cache: RoutingCache,
+    center_nodes: np.ndarray,
+    max_trip_time: float = DEFAULT_SITE_TRIP_TIME,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    n_jobs: int = 1,
+    progress_bar: bool = True,
+    cache_dir: str | Path | None = None,
+    refresh_cache: bool = False,
+) -> WalkTimeMatrix:
+    """Find the blocks within max_trip_time of each candidate.
+
+    Runs one reverse bounded search per unique candidate node. Results are
+    cached under data/cache/site_selection/; a cached evaluation at a larger
+    radius is reused (and trimmed), so evaluating once at the largest trip
+    time of interest serves every smaller one without new searches.
+
+    Args:
+        candidate_nodes: Node ID of each candidate
+        cache: RoutingCache of the walk network
+        center_nodes: Center node IDs of the blocks
+        max_trip_time: Search radius in minutes (default: 10)
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        n_jobs: Number of parallel workers (1 = serial, -1 = all CPUs)
+        progress_bar: Whether to show progress bar (default: True)
+        cache_dir: Optional cache directory (default: data/cache/site_selection)
+        refresh_cache: If True, ignore cached evaluations
+
+    Returns:
+        WalkTimeMatrix of centers × candidates, where land_ids are candidate
+        positions (0..n_candidates-1)
+    """
+    candidate_nodes = np.asarray(candidate_nodes, dtype=np.int64)
+    cache_path = _get_evaluation_cache_path(
+        candidate_nodes, max_trip_time, travel_speed, cache, cache_dir
+    )
+
+    cached_path = None if refresh_cache else _find_cached_evaluation(cache_path, max_trip_time)
+    if cached_path is not None:
+        logger.info(f"Loading candidate evaluations from cache: {cached_path}")
+        try:
+            evaluations = _within_radius(load_walk_time_matrix(cached_path), max_trip_time)
+            center_nodes = np.asarray(center_nodes, dtype=np.int64)
+            return _restrict_centers(evaluations, center_nodes)
+        except Exception as e:
+            logger.warning(f"Failed to load cache: {e}. Re-running searches...")
+
+    unique_nodes, candidate_pos = np.unique(candidate_nodes, return_inverse=True)
+    logger.info(
+        f"Evaluating {len(candidate_nodes)} candidates ({len(unique_nodes)} unique nodes) "
+        f"within {max_trip_time} minutes"
+    )
+    rx_graph, nx_to_rx, rx_to_nx = cache.to_rustworkx(travel_speed)
+    results = reverse_bounded_searches(
+        rx_graph, nx_to_rx, rx_to_nx, unique_nodes, max_trip_time, n_jobs, progress_bar
+    )
+
+    # Expand per-node results to one column per candidate
+    frames = []
+    for node_pos, (_, reached, minutes) in enumerate(results):
+        for candidate in np.flatnonzero(candidate_pos == node_pos):
+            frames.append(
+                pd.DataFrame({"block_osmid": reached, "land_osmid": candidate, "minutes": minutes})
+            )
+    long = pd.concat(frames, ignore_index=True)
+    evaluations = walk_times_to_matrix(long)
+
+    # Keep every candidate as a column, even if it reaches no node
+    evaluations = _reindex_candidates(evaluations, len(candidate_nodes))
+    save_walk_time_matrix(evaluations, cache_path)
+    logger.info(f"Cached candidate evaluations to {cache_path}")
+
+    return _restrict_centers(evaluations, np.asarray(center_nodes, dtype=np.int64))
+
+
+def _reindex_candidates(wtm: WalkTimeMatrix, n_candidates: int) -> WalkTimeMatrix:
+    coo = wtm.matrix.tocoo()
+    matrix = sparse.coo_matrix(
+        (coo.data, (coo.row, wtm.land_ids[coo.col])), shape=(len(wtm.center_ids), n_candidates)
+    ).tocsr()
+    return WalkTimeMatrix(
+        matrix=matrix,
+        center_ids=wtm.center_ids,
+        land_ids=np.arange(n_candidates, dtype=np.int64),
+        center_node_col=wtm.center_node_col,
+    )
+
+
+def _within_radius(wtm: WalkTimeMatrix, max_trip_time: float) -> WalkTimeMatrix:
+    # Drop pairs beyond the radius; explicit zeros (same node) are kept
+    coo = wtm.matrix.tocoo()
+    keep = coo.data <= max_trip_time
+    if keep.all():
+        return wtm
+    matrix = sparse.coo_matrix(
+        (coo.data[keep], (coo.row[keep], coo.col[keep])), shape=wtm.matrix.shape
+    ).tocsr()
+    return WalkTimeMatrix(
+        matrix=matrix,
+        center_ids=wtm.center_ids,
+        land_ids=wtm.land_ids,
+        center_node_col=wtm.center_node_col,
+    )
+
+
+def _restrict_centers(wtm: WalkTimeMatrix, center_nodes: np.ndarray) -> WalkTimeMatrix:
+    keep = np.isin(wtm.center_ids, center_nodes)
+    return WalkTimeMatrix(
+        matrix=wtm.matrix[keep],
+        center_ids=wtm.center_ids[keep],
+        land_ids=wtm.land_ids,
+        center_node_col=wtm.center_node_col,
+    )
+
+
+def select_sites(
+    evaluations: WalkTimeMatrix,
+    weights: np.ndarray,
+    n_sites: int,
+    trip_time: float = DEFAULT_SITE_TRIP_TIME,
+    already_covered: np.ndarray | None = None,
+    lazy: bool = True,
+) -> pd.DataFrame:
+    """Choose sites by greedy weighted maximum coverage.
+
+    Each step picks the candidate whose catchment adds the most weight from
+    blocks that are not yet covered. With lazy=True, marginal gains are kept
+    in a priority queue and only re-evaluated when a candidate reaches the
+    top; coverage gains only shrink as sites are added, so this returns the
+    same picks as plain greedy with far fewer evaluations.
+
+    Args:
+        evaluations: WalkTimeMatrix from ``evaluate_candidates``
+        weights: Weight per center node (matrix row order)
+        n_sites: Number of sites to choose
+        trip_time: Coverage threshold in minutes (default: 10); must not exceed
+            the evaluated radius
+        already_covered: Optional boolean mask of centers already covered by
+            existing conserved lands
+        lazy: Use lazy-greedy evaluation (default: True)
+
+    Returns:
+        DataFrame with columns ["rank", "candidate", "gain", "cumulative_gain"]
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    covers = evaluations.within(trip_time).tocsc()
+    covers.eliminate_zeros()  # 0/1 indicator, so zeros here mean "not within"
+    covered = (
+        np.zeros(covers.shape[0], dtype=bool)
+        if already_covered is None
+        else np.asarray(already_covered, dtype=bool).copy()
+    )
+
+    def gain(candidate: int) -> float:
+        rows = covers.indices[covers.indptr[candidate] : covers.indptr[candidate + 1]]
+        return float(weights[rows][~covered[rows]].sum())
+
+    def cover(candidate: int) -> None:
+        covered[covers.indices[covers.indptr[candidate] : covers.indptr[candidate + 1]]] = True
+
+    n_sites = min(n_sites, covers.shape[1])
+    picks: list[tuple[int, float]] = []
+
+    if lazy:
+        # Max-heap of (-upper_bound, candidate, round_evaluated)
+        heap = [(-gain(j), j, 0) for j in range(covers.shape[1])]
+        heapq.heapify(heap)
+        evaluations_run = len(heap)
+        while heap and len(picks) < n_sites:
+            neg_gain, candidate, evaluated_round = heapq.heappop(heap)
+            if evaluated_round == len(picks):
+                picks.append((candidate, -neg_gain))
+                cover(candidate)
+            else:
+                heapq.heappush(heap, (-gain(candidate), candidate, len(picks)))
+                evaluations_run += 1
+    else:
+        available = np.ones(covers.shape[1], dtype=bool)
+        evaluations_run = 0
+        for _ in range(n_sites):
+            gains = covers.T @ (weights * ~covered)
+            gains[~available] = -np.inf
+            candidate = int(np.argmax(gains))
+            picks.append((candidate, float(gains[candidate])))
+            available[candidate] = False
+            cover(candidate)
+            evaluations_run += covers.shape[1]
+
+    logger.info(
+        f"Selected {len(picks)} sites with {evaluations_run:,} gain evaluations "
+        f"({'lazy' if lazy else 'plain'} greedy)"
+    )
+    result = pd.DataFrame(picks, columns=["candidate", "gain"])
+    result.insert(0, "rank", np.arange(1, len(result) + 1))
+    result["cumulative_gain"] = result["gain"].cumsum()
+    return result
+
+
+def newly_covered_values(
+    evaluations: WalkTimeMatrix,
+    picks: np.ndarray,
+    values: np.ndarray,
+    trip_time: float = DEFAULT_SITE_TRIP_TIME,
+    already_covered: np.ndarray | None = None,
+) -> np.ndarray:
+    """Sum per-center values over the centers each pick newly covers, in pick order.
+
+    Args:
+        evaluations: WalkTimeMatrix from ``evaluate_candidates``
+        picks: Candidate positions in pick order
+        values: Values per center node, shape (n_centers,) or (n_centers, k)
+        trip_time: Coverage threshold in minutes (default: 10)
+        already_covered: Optional boolean mask of centers already covered
+
+    Returns:
+        Array of shape (n_picks,) or (n_picks, k)
+    """
+    covers = evaluations.within(trip_time).tocsc()
+    covers.eliminate_zeros()
+    covered = (
+        np.zeros(covers.shape[0], dtype=bool)
+        if already_covered is None
+        else np.asarray(already_covered, dtype=bool).copy()
+    )
+    values = np.asarray(values, dtype=np.float64)
+
+    sums = []
+    for candidate in picks:
+        rows = covers.indices[covers.indptr[candidate] : covers.indptr[candidate + 1]]
+        new_rows = rows[~covered[rows]]
+        sums.append(values[new_rows].sum(axis=0))
+        covered[new_rows] = True
+    return np.array(sums).reshape((len(picks),) + values.shape[1:])
+
+
+def site_weights(
+    population: np.ndarray,
+    disadvantaged_population: np.ndarray,
+    population_weight: float = 0.0,
+    disadvantaged_weight: float = 1.0,
+) -> np.ndarray:
+    """Combine total and CEJST-disadvantaged population into coverage weights.
+
+    Args:
+        population: P1_001N per center node
+        disadvantaged_population: P1_001N of TC-flagged blocks per center node
+        population_weight: Weight on total population (default: 0)
+        disadvantaged_weight: Weight on disadvantaged population (default: 1)
+
+    Returns:
+        Weight per center node
+    """
+    return population_weight * np.asarray(population) + disadvantaged_weight * np.asarray(
+        disadvantaged_population
+    )
+
+
+def process_site_selection(
+    candidates_path: str | Path,
+    graph_path: str | Path,
+    blocks_path: str | Path,
+    ejblocks_path: str | Path,
+    output_path: str | Path,
+    n_sites: int = 10,
+    trip_time: float = DEFAULT_SITE_TRIP_TIME,
+    population_weight: float = 0.0,
+    disadvantaged_weight: float = 1.0,
+    walk_times_path: str | Path | None = None,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    n_jobs: int = 1,
+    cache_dir: str | Path | None = None,
+    max_trip_time: float | None = None,
+) -> gpd.GeoDataFrame:
+    """Choose the candidate parcels that most increase weighted access.
+
+    Args:
+        candidates_path: Path to candidate parcel polygons
+        graph_path: Path to OSMnx GraphML file (its routing cache is reused)
+        blocks_path: Path to blocks file with "GEOID20" and "osmid" columns
+        ejblocks_path: Path to ejblocks file with P1_001N and TC from ``create_ejblocks``
+        output_path: Path to save the selected candidates as GeoParquet
+        n_sites: Number of sites to choose (default: 10)
+        trip_time: Coverage threshold in minutes (default: 10)
+        population_weight: Weight on total population (default: 0)
+        disadvantaged_weight: Weight on disadvantaged population (default: 1)
+        walk_times_path: Optional walk time matrix (.npz); blocks that already
+            reach existing conserved land within trip_time count as covered
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        n_jobs: Number of parallel workers (default: 1 for serial, -1 for all CPUs)
+        cache_dir: Optional cache directory for candidate evaluations
+        max_trip_time: Search radius in minutes (default: trip_time); evaluating
+            at the largest trip time of interest lets runs at smaller trip
+            times reuse the cached searches
+
+    Returns:
+        GeoDataFrame of selected candidates with rank, gain and newly covered population
+
+    Raises:
+        ValidationError: If there are no candidates, or max_trip_time is below trip_time
+    """
+    if max_trip_time is None:
+        max_trip_time = trip_time
+    elif max_trip_time < trip_time:
+        raise ValidationError(
+            f"max_trip_time ({max_trip_time}) must be at least trip_time ({trip_time})"
+        )
+
+    logger.info("Loading candidate parcels")
+    if str(candidates_path).endswith(".parquet"):
+        candidates = gpd.read_parquet(str(candidates_path))
+    else:
+        candidates = gpd.read_file(str(candidates_path))
+    if candidates.empty:
+        raise ValidationError(f"No candidate parcels in {candidates_path}")
+
+    cache = get_routing_cache(graph_path)
+    candidate_nodes = snap_candidates(candidates, cache)
+
+    logger.info("Loading block population data")
+    blocks = read_columns(blocks_path, ["GEOID20", "osmid"])
+    ejblocks = read_columns(ejblocks_path, ["GEOID20", "P1_001N", "TC"])
+    center_nodes = pd.unique(blocks["osmid"].astype(np.int64))
+
+    evaluations = evaluate_candidates(
+        candidate_nodes,
+        cache,
+        center_nodes,
+        max_trip_time=max_trip_time,
+        travel_speed=travel_speed,
+        n_jobs=n_jobs,
+        cache_dir=cache_dir,
+    )
+    pop, dac_pop = population_by_node(
+        evaluations.center_ids, blocks, ejblocks, disadvantage_col="TC"
+    )
+
+    already_covered = None
+    if walk_times_path:
+        existing = load_walk_time_matrix(walk_times_path)
+        reached = existing.within(trip_time)
+        reached.eliminate_zeros()
+        has_access = existing.center_ids[np.diff(reached.indptr) > 0]
+        already_covered = np.isin(evaluations.center_ids, has_access)
+        logger.info(f"{already_covered.sum():,} block nodes already have access")
+
+    selected = select_sites(
+        evaluations,
+        site_weights(pop, dac_pop, population_weight, disadvantaged_weight),
+        n_sites,
+        trip_time=trip_time,
+        already_covered=already_covered,
+    )
+
+    newly_covered = newly_covered_values(
+        evaluations,
+        selected["candidate"].to_numpy(),
+        np.column_stack([pop, dac_pop]),
+        trip_time=trip_time,
+        already_covered=already_covered,
+    )
+    result = candidates.iloc[selected["candidate"]].copy()
+    result["osmid"] = candidate_nodes[selected["candidate"]]
+    for col in ["rank", "gain", "cumulative_gain"]:
+        result[col] = selected[col].to_numpy()
+    result["NEW_POP"] = newly_covered[:, 0]
+    result["NEW_DAC"] = newly_covered[:, 1]
+
+    logger.info(f"Saving selected sites to {output_path}")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Keep the greedy order on disk, so rows stay sorted by rank
+    write_parquet(result, output_path, index=False, sort=False)
+
+    return result
@@ -16,3 +16,16 @@ DEFAULT_CRS = "EPSG:3857"  # Web Mercator
 # Census API defaults
 DEFAULT_CENSUS_FIELDS = ["P1_001N", "P1_003N", "P2_001N", "P2_002N"]
 DEFAULT_CENSUS_YEAR = 2020
+DEFAULT_CENSUS_DATASET = "dec/pl"  # 2020 redistricting (P.L. 94-171) data
+DEFAULT_CENSUS_API_URL = "https://api.census.gov/data"
+DEFAULT_CENSUS_MAX_WORKERS = 8  # concurrent per-county requests
+
+# CEJST indicator columns mapped from 2010 tracts to 2020 blocks
+DEFAULT_CEJST_COLUMNS = ["TC", "CC"]
+
+# Parquet artifact layout: small row groups let bbox/GEOID filters skip most of a file
+DEFAULT_PARQUET_COMPRESSION = "zstd"
+DEFAULT_ROW_GROUP_SIZE = 8192  # rows
+
+# Optional DuckDB engine for the census/CEJST stage: spills to disk past this limit
+DEFAULT_DUCKDB_MEMORY_LIMIT = "4GB"
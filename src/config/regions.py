@@ -16,6 +16,8 @@ class RegionConfig:
         blocks_pattern: Pattern for block shapefile names
         tracts_pattern: Pattern for tract shapefile names
         relationship_file_pattern: Pattern for Census relationship files
+        graph_pattern: Pattern for OSMnx walk network GraphML files
+        conserved_lands_pattern: Pattern for conserved lands shapefile names
     """
 
     state_fips: str
@@ -25,6 +27,8 @@ class RegionConfig:
     blocks_pattern: str = "tl_2020_{state_fips}_tabblock20.zip"
     tracts_pattern: str = "tl_2022_{state_fips}_tract.zip"
     relationship_file_pattern: str = "tab2010_tab2020_st{state_fips}_{state_abbrev_lower}.txt"
+    graph_pattern: str = "{state_name_lower}_walk.graphml"
+    conserved_lands_pattern: str = "{state_name_title}_Conserved_Lands.shp.zip"
 
     def get_blocks_path(self, with_nodes: bool = False) -> Path:
         """Get path to blocks shapefile.
@@ -65,6 +69,35 @@ class RegionConfig:
         )
         return self.data_root / filename
 
+    def get_graph_path(self) -> Path:
+        """Get path to the walk network GraphML file.
+
+        Matches the names written by ``update_data_sources.update_osmnx_graphs``.
+
+        Returns:
+            Path to GraphML file (e.g., data/graphs/new_hampshire_walk.graphml)
+        """
+        filename = self.graph_pattern.format(
+            state_name_lower=self.state_name.lower().replace(" ", "_")
+        )
+        return self.data_root / "graphs" / filename
+
+    def get_conserved_lands_path(self, with_nodes: bool = True) -> Path:
+        """Get path to conserved lands shapefile.
+
+        Args:
+            with_nodes: If True, append '_with_nodes' to filename (default: True)
+
+        Returns:
+            Path to conserved lands shapefile
+        """
+        filename = self.conserved_lands_pattern.format(
+            state_name_title=self.state_name.replace(" ", "_")
+        )
+        if with_nodes:
+            filename = filename.replace(".shp.zip", "_with_nodes.shp.zip")
+        return self.data_root / "conserved_lands" / filename
+
 
 # New England states configuration
 NEW_ENGLAND_STATES: dict[str, RegionConfig] = {
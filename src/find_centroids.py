@@ -4,6 +4,8 @@ import pathlib
 import geopandas as gpd
 import osmnx as ox
 
+from utils.io import write_parquet
+
 parser = argparse.ArgumentParser()
 parser.add_argument(
     "-g", "--graph", help="graph to use for search", default="data/maine.graphml", type=pathlib.Path
@@ -47,7 +49,7 @@ if __name__ == "__main__":
     if str(args.input).endswith(".parquet"):
         outfile = str(args.input).rsplit(".", 1)[0] + args.suffix + ".parquet"
         print("Saving", outfile)
-        polys.to_parquet(outfile)
+        write_parquet(polys, outfile, index=False)
     else:
         outfile = str(args.input).rsplit(".", 1)[0] + args.suffix + ".shp.zip"
         print("Saving", outfile)
@@ -8,6 +8,8 @@ import pandas as pd
 
 from config.defaults import DEFAULT_H3_RESOLUTION
 from config.regions import RegionConfig
+from utils.io import read_table
+from utils.schema import normalize_geoids
 
 logger = logging.getLogger(__name__)
 
@@ -32,12 +34,11 @@ def h3_join(
     logger.info(f"Loading data from {data_path}")
 
     # Load data
-    if str(data_path).endswith(".parquet"):
-        df = gpd.read_parquet(str(data_path))
-    elif str(data_path).endswith(".shp") or str(data_path).endswith(".zip"):
-        df = gpd.read_file(str(data_path))  # Fallback for existing shapefiles
-    else:
+    if str(data_path).endswith(".csv"):
         df = pd.read_csv(str(data_path))
+    else:
+        # The join never uses geometry
+        df = read_table(data_path, geometry=False, cache=False)
 
     # Load relationship file
     if relationship_path is None:
@@ -55,10 +56,8 @@ def h3_join(
 
     logger.info(f"Loading relationship file from {reln_file}")
     if str(reln_file).endswith(".parquet"):
-        reln = pd.read_parquet(str(reln_file))
+        reln = read_table(reln_file)
         # Ensure correct types
-        if "GEOID20" in reln.columns:
-            reln["GEOID20"] = reln["GEOID20"].astype(str)
         if "h3id" in reln.columns:
             reln["h3id"] = reln["h3id"].astype(str)
         if "h3_fraction" in reln.columns:
@@ -68,9 +67,13 @@ def h3_join(
             str(reln_file), converters={"GEOID20": str, "h3_fraction": float, "h3id": str}
         )  # Fallback for CSV input
 
-    # Merge
+    # Merge on int64 GEOIDs (data may come from text or from compact Parquet artifacts)
     logger.info("Merging data with H3 relationship file")
-    result = reln.merge(df, "left", "GEOID20").set_index(["GEOID20", "h3id"])
+    result = (
+        normalize_geoids(reln)
+        .merge(normalize_geoids(df), "left", "GEOID20")
+        .set_index(["GEOID20", "h3id"])
+    )
 
     return result
 
@@ -11,10 +11,12 @@ logger = logging.getLogger(__name__)
 try:
     from .config.defaults import DEFAULT_H3_RESOLUTION
     from .config.regions import RegionConfig
+    from .utils.schema import normalize_geoids
 except ImportError:
     # Fallback for when imported as standalone module
     DEFAULT_H3_RESOLUTION = 6
     RegionConfig = None
+    from utils.schema import normalize_geoids
 
 
 # Merge a dataframe with a relationship file. If no relationship file is provided,
@@ -28,6 +30,9 @@ def h3_merge(df, reln=None, inplace=False, resolution=None, region_config=None):
         inplace: If True, modify df in place
         resolution: H3 resolution (default: 6)
         region_config: Optional RegionConfig for constructing default path
+
+    GEOIDs are merged as int64, so df may come from text files or from the
+    compact Parquet artifacts (e.g. ejblocks).
     """
     if reln is None:
         if region_config:
@@ -43,10 +48,13 @@ def h3_merge(df, reln=None, inplace=False, resolution=None, region_config=None):
         reln = pd.read_csv(
             str(reln_path), converters={"GEOID20": str, "h3_fraction": float, "h3id": str}
         )
+    reln = normalize_geoids(reln.copy())
     if inplace:
-        df = reln.merge(df, "left", "GEOID20").set_index(["GEOID20", "h3id"])
+        df = reln.merge(normalize_geoids(df), "left", "GEOID20").set_index(["GEOID20", "h3id"])
     else:
-        return reln.merge(df, "left", "GEOID20").set_index(["GEOID20", "h3id"])
+        return reln.merge(normalize_geoids(df.copy()), "left", "GEOID20").set_index(
+            ["GEOID20", "h3id"]
+        )
 
 
 # Summarize a given column by h3 fraction
@@ -1,14 +1,35 @@
 """Data merging module for blocks and analysis."""
 
-from .analysis import calculate_demographics, create_ejblocks, fetch_census_data, process_cejst_data
-from .blocks import create_trip_time_columns, dissolve_blocks, merge_walk_times
+from .analysis import (
+    calculate_demographics,
+    create_ejblocks,
+    crosswalk_cejst,
+    demographic_thresholds,
+    fetch_census_data,
+    process_cejst_data,
+)
+from .blocks import (
+    create_trip_time_columns,
+    cumulative_acres,
+    dissolve_blocks,
+    dissolve_by_key,
+    merge_walk_times,
+    save_dissolved_blocks,
+)
+from .relationships import load_block_relationships
 
 __all__ = [
     "merge_walk_times",
     "create_trip_time_columns",
+    "cumulative_acres",
     "dissolve_blocks",
+    "dissolve_by_key",
+    "save_dissolved_blocks",
     "fetch_census_data",
     "process_cejst_data",
+    "crosswalk_cejst",
+    "load_block_relationships",
     "calculate_demographics",
+    "demographic_thresholds",
     "create_ejblocks",
 ]
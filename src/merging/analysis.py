@@ -7,51 +7,27 @@ from pathlib import Path
 import geopandas as gpd
 import numpy as np
 import pandas as pd
-from census import Census
 
-from config.defaults import DEFAULT_CENSUS_FIELDS, DEFAULT_CENSUS_YEAR
+from config.defaults import (
+    DEFAULT_CEJST_COLUMNS,
+    DEFAULT_CENSUS_API_URL,
+    DEFAULT_CENSUS_FIELDS,
+    DEFAULT_CENSUS_MAX_WORKERS,
+    DEFAULT_CENSUS_YEAR,
+)
 from config.regions import RegionConfig
-from exceptions import CensusAPIError, ConfigurationError
-from utils.retry import retry_on_rate_limit
+from exceptions import ConfigurationError
+from merging import duckdb_engine
+from merging.blocks import dissolve_by_key, read_unique_key
+from merging.census_store import load_block_data
+from merging.relationships import get_block_relationships_path, load_block_relationships
+from utils.geometry import attach_geometry
+from utils.io import county_filters, is_dataset, read_table, write_parquet, write_partitioned
+from utils.schema import apply_schema, geoid_prefix, normalize_geoids, restore_geoid_strings
 
 logger = logging.getLogger(__name__)
 
 
-def _get_cache_path(
-    state_fips: str,
-    fields: list[str],
-    year: int,
-    cache_dir: str | Path | None = None,
-) -> Path:
-    """Get cache file path for census data.
-
-    Args:
-        state_fips: State FIPS code
-        fields: List of census field names
-        year: Census year
-        cache_dir: Optional cache directory (default: data/cache/census)
-
-    Returns:
-        Path to cache file
-    """
-    if cache_dir is None:
-        # Default to data/cache/census relative to project root
-        project_root = Path(__file__).parent.parent.parent
-        cache_dir = project_root / "data" / "cache" / "census"
-    else:
-        cache_dir = Path(cache_dir)
-
-    cache_dir.mkdir(parents=True, exist_ok=True)
-
-    # Create cache key from parameters
-    fields_str = "_".join(sorted(fields))
-    cache_key = f"{state_fips}_{year}_{fields_str}"
-    # Use hash to avoid filesystem issues with long filenames
-    cache_hash = hashlib.md5(cache_key.encode(), usedforsecurity=False).hexdigest()  # noqa: S324
-
-    return cache_dir / f"census_{cache_hash}.parquet"
-
-
 def fetch_census_data(
     api_key: str | None = None,
     state_fips: str | int | None = None,
@@ -60,12 +36,16 @@ def fetch_census_data(
     region_config: RegionConfig | None = None,
     cache_dir: str | Path | None = None,
     refresh_cache: bool = False,
+    max_workers: int = DEFAULT_CENSUS_MAX_WORKERS,
+    base_url: str = DEFAULT_CENSUS_API_URL,
 ) -> pd.DataFrame:
     """Retrieve census data for blocks.
 
-    This function uses caching to reduce API key dependency. On first run with
-    an API key, data is fetched and cached. Subsequent runs can use cached data
-    without an API key.
+    Fields are cached one column per (year, dataset, state, field) in a store
+    shared by all runs (see ``merging.census_store``), so any subset of cached
+    fields loads without an API key and adding a field only fetches that
+    field. Missing fields are requested per county, concurrently (see
+    ``merging.census_api``).
 
     Args:
         api_key: Census API key (optional if cached data exists)
@@ -75,12 +55,15 @@ def fetch_census_data(
         region_config: Optional region configuration (used to get state_fips if provided)
         cache_dir: Optional cache directory (default: data/cache/census)
         refresh_cache: If True, force refresh from API even if cache exists
+        max_workers: Maximum concurrent county requests (default: 8)
+        base_url: Census API base URL (default: https://api.census.gov/data)
 
     Returns:
-        DataFrame with census data and GEOID20 column
+        DataFrame with GEO_ID, census fields and GEOID20 column
 
     Raises:
-        ValueError: If neither api_key nor cached data is available
+        ConfigurationError: If neither api_key nor cached data is available
+        CensusAPIError: If a county request still fails after retries
     """
     if fields is None:
         fields = DEFAULT_CENSUS_FIELDS
@@ -94,81 +77,115 @@ def fetch_census_data(
     # Ensure state_fips is string with leading zero
     state_fips = str(state_fips).zfill(2)
 
-    # Get cache path
-    cache_path = _get_cache_path(state_fips, fields, year, cache_dir)
-
-    # Try to load from cache if not refreshing
-    if not refresh_cache and cache_path.exists():
-        logger.info(f"Loading census data from cache: {cache_path}")
-        try:
-            cached_data = pd.read_parquet(cache_path)
-            logger.info(f"Loaded {len(cached_data)} census records from cache")
-            return cached_data
-        except Exception as e:
-            logger.warning(f"Failed to load cache: {e}. Fetching from API...")
-
-    # Need to fetch from API
-    if not api_key:
-        raise ConfigurationError(
-            "No API key provided and no cached data found. "
-            "Either provide an API key or ensure cached data exists. "
-            f"Cache location: {cache_path}"
-        )
-
-    logger.info(f"Fetching census data for state FIPS: {state_fips}")
+    logger.info(f"Getting census data for state FIPS: {state_fips}")
     logger.info(f"Fields: {fields}")
+    census = load_block_data(
+        state_fips,
+        fields,
+        year=year,
+        api_key=api_key,
+        max_workers=max_workers,
+        cache_dir=cache_dir,
+        refresh_cache=refresh_cache,
+        base_url=base_url,
+    )
+    logger.info(f"Retrieved {len(census)} census records")
+    return census
+
 
-    c = Census(api_key)
-
-    # Build field list with GEO_ID
-    census_fields = ["GEO_ID"] + fields
-
-    # Use get method for block-level data (state_county_block method doesn't exist)
-    # The get method automatically calls _switch_endpoints to set the correct URL
-    # Query format: for=block:*&in=state:XX county:*
-    # Wrap API call with retry logic for rate limiting and transient failures
-    @retry_on_rate_limit
-    def _fetch_census_api():
-        """Fetch census data from API with retry logic."""
-        try:
-            return c.pl.get(
-                fields=census_fields,
-                geo={"for": "block:*", "in": f"state:{state_fips} county:*"},
-                year=year,
-            )
-        except Exception as e:
-            error_msg = str(e).lower()
-            if "rate limit" in error_msg or "429" in error_msg:
-                raise CensusAPIError(f"Census API rate limit exceeded: {e}") from e
-            elif "timeout" in error_msg or "connection" in error_msg:
-                raise CensusAPIError(f"Census API connection error: {e}") from e
-            elif "invalid" in error_msg or "400" in error_msg or "401" in error_msg:
-                raise CensusAPIError(f"Census API request error: {e}") from e
-            else:
-                raise CensusAPIError(f"Unexpected Census API error: {e}") from e
+def _file_digest(path: str | Path) -> str:
+    """Get the MD5 digest of a file's contents."""
+    digest = hashlib.md5(usedforsecurity=False)  # noqa: S324
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
+
+def _get_cejst_cache_path(
+    cejst_path: str | Path,
+    relationship_file_path: str | Path,
+    columns: list[str],
+    cache_dir: str | Path | None = None,
+) -> Path | None:
+    """Get cache file path for block-level CEJST data.
+
+    The key is built from the contents of both input files, so replacing
+    either file invalidates the cache.
+
+    Args:
+        cejst_path: Path to CEJST file
+        relationship_file_path: Path to Census relationship file
+        columns: CEJST indicator columns
+        cache_dir: Optional cache directory (default: data/cache/cejst)
+
+    Returns:
+        Path to cache file, or None if an input file cannot be read
+    """
     try:
-        api_data = _fetch_census_api()
-        me_census = pd.DataFrame.from_records(api_data)
-    except CensusAPIError:
-        # Re-raise our custom exceptions
-        raise
-    except Exception as e:
-        # Catch any other unexpected errors
-        raise CensusAPIError(f"Failed to fetch census data: {e}") from e
+        file_hashes = [_file_digest(cejst_path), _file_digest(relationship_file_path)]
+    except OSError as e:
+        logger.debug(f"Not caching CEJST data: {e}")
+        return None
+
+    if cache_dir is None:
+        project_root = Path(__file__).parent.parent.parent
+        cache_dir = project_root / "data" / "cache" / "cejst"
+    else:
+        cache_dir = Path(cache_dir)
+
+    cache_key = "_".join([*file_hashes, *columns])
+    cache_hash = hashlib.md5(cache_key.encode(), usedforsecurity=False).hexdigest()  # noqa: S324
+    return cache_dir / f"cejst_{cache_hash}.parquet"
+
+
+def crosswalk_cejst(
+    relationships: pd.DataFrame,
+    cejst: pd.DataFrame,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Map CEJST tract indicators to 2020 blocks by area-weighted average.
 
-    # Extract GEOID20 from GEO_ID (format: 1000000US230110205001020)
-    me_census["GEOID20"] = me_census["GEO_ID"].apply(lambda s: s[9:])
+    Each 2020 block gets ``ceil(sum(value * weight) / sum(weight))`` over its
+    relationship rows, where the weight is the share of the block's area
+    intersecting the 2010 block. Computed as grouped sums for all columns at
+    once. Rows whose tract has no CEJST value are left out of the average;
+    blocks with no value at all get <NA>.
 
-    logger.info(f"Retrieved {len(me_census)} census records")
+    Args:
+        relationships: Relationship rows with GEOID10, GEOID20 and area columns
+        cejst: CEJST data with GEOID10 and indicator columns
+        columns: Indicator columns (default: ["TC", "CC"])
 
-    # Save to cache
-    logger.info(f"Caching census data to: {cache_path}")
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    me_census.to_parquet(cache_path)
-    logger.info("Census data cached successfully")
+    Returns:
+        DataFrame indexed by GEOID20 with one integer column per indicator
+    """
+    if columns is None:
+        columns = DEFAULT_CEJST_COLUMNS
 
-    return me_census
+    weight = (relationships["AREALAND_INT"] + relationships["AREAWATER_INT"]) / (
+        relationships["AREALAND_2020"] + relationships["AREAWATER_2020"]
+    )
+    cejst20 = normalize_geoids(relationships[["GEOID10", "GEOID20"]].assign(WEIGHT=weight)).merge(
+        normalize_geoids(cejst[["GEOID10", *columns]].copy()), how="left", on="GEOID10"
+    )
+
+    values = cejst20[columns].to_numpy(dtype=np.float64)
+    weights = np.broadcast_to(cejst20[["WEIGHT"]].to_numpy(dtype=np.float64), values.shape)
+    valid = ~np.isnan(values) & np.isfinite(weights)
+    groups = cejst20["GEOID20"].to_numpy()
+
+    weighted_sums = pd.DataFrame(np.where(valid, values * weights, 0.0), columns=columns)
+    weight_sums = pd.DataFrame(np.where(valid, weights, 0.0), columns=columns)
+    numerator = weighted_sums.groupby(groups).sum()
+    denominator = weight_sums.groupby(groups).sum()
+
+    cejst_block = np.ceil(numerator / denominator.where(denominator > 0))
+    cejst_block.index.name = "GEOID20"
+    if cejst_block.isna().any().any():
+        logger.warning("Some blocks have no CEJST values; leaving them missing")
+        return cejst_block.astype("Int64")
+    return cejst_block.astype(np.int64)
 
 
 def process_cejst_data(
@@ -176,21 +193,45 @@ def process_cejst_data(
     relationship_file_path: str | Path,
     output_path: str | Path | None = None,
     region_config: RegionConfig | None = None,  # noqa: ARG001
+    columns: list[str] | None = None,
+    cache_dir: str | Path | None = None,
+    refresh_cache: bool = False,
+    engine: str = "pandas",
 ) -> pd.DataFrame:
     """Process CEJST data by mapping from 2010 to 2020 blocks.
 
     Uses Census relationship file to map CEJST tract-level data (2010 geography)
-    to 2020 block-level data using area-weighted aggregation.
+    to 2020 block-level data using area-weighted aggregation (see
+    ``crosswalk_cejst``). The result is cached, keyed by the contents of both
+    input files.
 
     Args:
         cejst_path: Path to CEJST shapefile (2010 geography)
         relationship_file_path: Path to Census relationship file (tab2010_tab2020_st*_*.txt)
         output_path: Optional path to save processed CEJST data
         region_config: Optional region configuration (currently unused but reserved for future)
+        columns: CEJST indicator columns (default: ["TC", "CC"])
+        cache_dir: Optional cache directory (default: data/cache/cejst); the parsed
+            relationship file is cached in its sibling "relationships" directory
+        refresh_cache: If True, recompute (and reparse the relationship file) even if
+            cached results exist
+        engine: "pandas", or "duckdb" to scan the relationship rows from disk
+            (see ``merging.duckdb_engine``)
 
     Returns:
         DataFrame with CEJST data at block level (2020 geography)
     """
+    if columns is None:
+        columns = DEFAULT_CEJST_COLUMNS
+    duckdb_engine.check_engine(engine)
+
+    cache_path = _get_cejst_cache_path(cejst_path, relationship_file_path, columns, cache_dir)
+    if not refresh_cache and cache_path is not None and cache_path.exists():
+        logger.info(f"Loading block-level CEJST data from cache: {cache_path}")
+        cejst_block = pd.read_parquet(cache_path)
+        _save_cejst_block(cejst_block, output_path)
+        return cejst_block
+
     logger.info("Loading CEJST data")
     if str(cejst_path).endswith(".parquet"):
         cejst = gpd.read_parquet(str(cejst_path))
@@ -203,67 +244,33 @@ def process_cejst_data(
         )  # Fallback for existing shapefiles
 
     logger.info("Loading relationship file")
-    relationships = pd.read_csv(
-        str(relationship_file_path),
-        delimiter="|",
-        converters={
-            "STATE_2010": str,
-            "COUNTY_2010": str,
-            "TRACT_2010": str,
-            "BLK_2010": str,
-            "BLKSF_2010": str,
-            "AREALAND_2010": float,
-            "AREAWATER_2010": float,
-            "BLOCK_PART_FLAG_O": str,
-            "STATE_2020": str,
-            "COUNTY_2020": str,
-            "TRACT_2020": str,
-            "BLK_2020": str,
-            "BLKSF_2020": str,
-            "AREALAND_2020": float,
-            "AREAWATER_2020": float,
-            "BLOCK_PART_FLAG_R": str,
-            "AREALAND_INT": float,
-            "AREAWATER_INT": float,
-        },
-    )
-
-    # Create GEOID columns
-    relationships["GEOID10"] = (
-        relationships["STATE_2010"] + relationships["COUNTY_2010"] + relationships["TRACT_2010"]
-    )
-    relationships["GEOID10_blk"] = (
-        relationships["STATE_2010"]
-        + relationships["COUNTY_2010"]
-        + relationships["TRACT_2010"]
-        + relationships["BLK_2010"]
-    )
-    relationships["GEOID20"] = (
-        relationships["STATE_2020"]
-        + relationships["COUNTY_2020"]
-        + relationships["TRACT_2020"]
-        + relationships["BLK_2020"]
-    )
-
-    logger.info("Merging CEJST with relationship file")
-    cejst20 = relationships.merge(cejst, how="left", on="GEOID10")
-
-    # Calculate weight based on area intersection
-    cejst20["WEIGHT"] = (cejst20["AREALAND_INT"] + cejst20["AREAWATER_INT"]) / (
-        cejst20["AREALAND_2020"] + cejst20["AREAWATER_2020"]
-    )
+    relationships_cache_dir = Path(cache_dir).parent / "relationships" if cache_dir else None
+    if engine == "duckdb":
+        relationships_path = get_block_relationships_path(
+            relationship_file_path, cache_dir=relationships_cache_dir, refresh_cache=refresh_cache
+        )
+        logger.info("Aggregating to block level using weighted average (DuckDB)")
+        cejst_block = duckdb_engine.crosswalk_cejst(relationships_path, cejst, columns)
+    else:
+        relationships = load_block_relationships(
+            relationship_file_path, cache_dir=relationships_cache_dir, refresh_cache=refresh_cache
+        )
+        logger.info("Aggregating to block level using weighted average")
+        cejst_block = crosswalk_cejst(relationships, cejst, columns)
 
-    logger.info("Aggregating to block level using weighted average")
+    logger.info(f"Processed {len(cejst_block)} blocks")
 
-    def w_avg(x):
-        """Weighted average function."""
-        return int(np.ceil(np.average(x, weights=cejst20.loc[x.index, "WEIGHT"])))
+    if cache_path is not None:
+        logger.info(f"Caching block-level CEJST data to: {cache_path}")
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cejst_block.to_parquet(cache_path)
 
-    # Aggregate TC and CC columns using weighted average
-    cejst_block = cejst20.groupby("GEOID20").agg({"TC": w_avg, "CC": w_avg})
+    _save_cejst_block(cejst_block, output_path)
+    return cejst_block
 
-    logger.info(f"Processed {len(cejst_block)} blocks")
 
+def _save_cejst_block(cejst_block: pd.DataFrame, output_path: str | Path | None) -> None:
+    """Save block-level CEJST data if an output path is given."""
     if output_path:
         logger.info(f"Saving processed CEJST data to {output_path}")
         if str(output_path).endswith(".parquet"):
@@ -271,10 +278,37 @@ def process_cejst_data(
         else:
             cejst_block.to_csv(output_path)  # Fallback for CSV output
 
-    return cejst_block
+
+def _demographic_percentages(blocks_df: pd.DataFrame) -> pd.DataFrame:
+    """Add white_per and hisp_per columns (in place) and return blocks_df."""
+    blocks_df["white_per"] = blocks_df["P1_003N"] / blocks_df["P1_001N"]
+    blocks_df["hisp_per"] = blocks_df["P2_002N"] / blocks_df["P2_001N"]
+    return blocks_df
+
+
+def demographic_thresholds(blocks_df: pd.DataFrame) -> dict[str, float]:
+    """Get the percentile cutoffs of the white_50 and hisp_75 flags.
+
+    Args:
+        blocks_df: DataFrame with P1_001N, P1_003N, P2_001N, P2_002N columns
+
+    Returns:
+        Dict with the "white_50" (median white_per) and "hisp_75" (75th
+        percentile hisp_per) cutoffs
+    """
+    blocks_df = _demographic_percentages(
+        blocks_df[["P1_001N", "P1_003N", "P2_001N", "P2_002N"]].copy()
+    )
+    return {
+        "white_50": blocks_df["white_per"].describe()["50%"],
+        "hisp_75": blocks_df["hisp_per"].describe()["75%"],
+    }
 
 
-def calculate_demographics(blocks_df: pd.DataFrame) -> pd.DataFrame:
+def calculate_demographics(
+    blocks_df: pd.DataFrame,
+    thresholds: dict[str, float] | None = None,
+) -> pd.DataFrame:
     """Calculate demographic percentages and percentiles.
 
     Adds columns for:
@@ -285,6 +319,8 @@ def calculate_demographics(blocks_df: pd.DataFrame) -> pd.DataFrame:
 
     Args:
         blocks_df: DataFrame with P1_001N, P1_003N, P2_001N, P2_002N columns
+        thresholds: Optional cutoffs from ``demographic_thresholds`` (default:
+            computed over blocks_df); county reruns pass the statewide ones
 
     Returns:
         DataFrame with demographic columns added
@@ -292,16 +328,39 @@ def calculate_demographics(blocks_df: pd.DataFrame) -> pd.DataFrame:
     blocks_df = blocks_df.copy()
 
     logger.info("Calculating demographic percentages")
-    blocks_df["white_per"] = blocks_df["P1_003N"] / blocks_df["P1_001N"]
-    blocks_df["hisp_per"] = blocks_df["P2_002N"] / blocks_df["P2_001N"]
+    _demographic_percentages(blocks_df)
 
     logger.info("Calculating demographic percentiles")
-    blocks_df["white_50"] = blocks_df["white_per"] > blocks_df["white_per"].describe()["50%"]
-    blocks_df["hisp_75"] = blocks_df["hisp_per"] > blocks_df["hisp_per"].describe()["75%"]
+    if thresholds is None:
+        thresholds = demographic_thresholds(blocks_df)
+    blocks_df["white_50"] = blocks_df["white_per"] > thresholds["white_50"]
+    blocks_df["hisp_75"] = blocks_df["hisp_per"] > thresholds["hisp_75"]
 
     return blocks_df
 
 
+def _statewide_demographic_thresholds(
+    blocks_path: str | Path,
+    census_api_key: str | None,
+    state_fips: str,
+    region_config: RegionConfig | None,
+) -> dict[str, float]:
+    """Get demographic cutoffs over every block, as a full run computes them.
+
+    Only GEOID20 is read from the blocks. Duplicated blocks are dissolved by
+    summing their census counts, which leaves the percentages unchanged, so
+    one census row per unique GEOID20 gives the same distribution.
+    """
+    geoids = read_table(blocks_path, columns=["GEOID20"], geometry=False, cache=False)
+    census_data = fetch_census_data(
+        api_key=census_api_key, state_fips=state_fips, region_config=region_config
+    )
+    blocks = normalize_geoids(geoids).drop_duplicates("GEOID20")
+    return demographic_thresholds(
+        blocks.merge(normalize_geoids(census_data.copy()), how="left", on="GEOID20")
+    )
+
+
 def create_ejblocks(
     blocks_path: str | Path,
     census_api_key: str | None = None,
@@ -311,24 +370,38 @@ def create_ejblocks(
     state_fips: str | int | None = None,
     region_config: RegionConfig | None = None,
     refresh_cache: bool = False,
-) -> gpd.GeoDataFrame:
+    counties: list[str] | None = None,
+    engine: str = "pandas",
+) -> gpd.GeoDataFrame | pd.DataFrame:
     """Create ejblocks dataset with all merged data.
 
     Full workflow: merges blocks with census data, CEJST data, and calculates
-    demographics to create the final ejblocks dataset.
+    demographics to create the final ejblocks dataset. Attribute-only blocks
+    stay attribute-only; geometry is attached only for shapefile output.
+    Blocks and output may be partitioned datasets (see ``merge_walk_times``);
+    with ``counties``, only those partitions are read and rewritten, with the
+    white_50/hisp_75 cutoffs still computed over all blocks so the rewritten
+    rows match a full run.
+
+    With ``engine="duckdb"``, the joins, CEJST crosswalk and aggregation run
+    out of core in DuckDB (see ``merging.duckdb_engine``) and produce the same
+    output; blocks must then be attribute-only Parquet.
 
     Args:
         blocks_path: Path to blocks shapefile (with walk times merged)
         census_api_key: Census API key (optional if cached data exists)
         cejst_path: Path to CEJST shapefile (2010 geography)
         relationship_file_path: Path to Census relationship file
-        output_path: Path to save final ejblocks shapefile
+        output_path: Optional path to save final ejblocks (not saved if None)
         state_fips: State FIPS code (required if region_config not provided)
         region_config: Optional region configuration (used to get state_fips if provided)
         refresh_cache: If True, force refresh census data from API even if cache exists
+        counties: Optional 5-digit county FIPS codes to restrict a partitioned
+            run to (default: all)
+        engine: "pandas" (default) or "duckdb"
 
     Returns:
-        GeoDataFrame with all merged data
+        GeoDataFrame with all merged data (DataFrame for attribute-only blocks)
     """
     # Get state FIPS from region_config if provided
     if region_config:
@@ -337,16 +410,104 @@ def create_ejblocks(
         raise ValueError("Either state_fips or region_config must be provided")
 
     state_fips = str(state_fips).zfill(2)
+    duckdb_engine.check_engine(engine)
+
+    if engine == "duckdb":
+        ejblocks = _merge_ejblocks_duckdb(
+            blocks_path,
+            census_api_key,
+            cejst_path,
+            relationship_file_path,
+            state_fips,
+            region_config,
+            refresh_cache,
+            counties,
+        )
+    else:
+        ejblocks = _merge_ejblocks_pandas(
+            blocks_path,
+            census_api_key,
+            cejst_path,
+            relationship_file_path,
+            state_fips,
+            region_config,
+            refresh_cache,
+            counties,
+        )
+
+    # Calculate demographics, with statewide cutoffs on county reruns
+    logger.info("Calculating demographics")
+    thresholds = None
+    if counties:
+        thresholds = _statewide_demographic_thresholds(
+            blocks_path, census_api_key, state_fips, region_config
+        )
+    ejblocks = calculate_demographics(ejblocks, thresholds)
 
+    # Save results
+    if output_path is not None:
+        logger.info(f"Saving ejblocks to {output_path}")
+        if is_dataset(output_path):
+            write_partitioned(apply_schema(ejblocks), output_path)
+        elif str(output_path).endswith(".parquet"):
+            write_parquet(apply_schema(ejblocks), output_path)
+        else:
+            restore_geoid_strings(attach_geometry(ejblocks)).to_file(
+                str(output_path)
+            )  # Fallback for shapefile output
+
+    return ejblocks
+
+
+def _merge_ejblocks_duckdb(
+    blocks_path: str | Path,
+    census_api_key: str | None,
+    cejst_path: str | Path | None,
+    relationship_file_path: str | Path | None,
+    state_fips: str,
+    region_config: RegionConfig | None,
+    refresh_cache: bool,
+    counties: list[str] | None,
+) -> pd.DataFrame:
+    """Merge blocks with census and CEJST data using the DuckDB engine."""
+    if cejst_path is None or relationship_file_path is None:
+        raise ConfigurationError("cejst_path and relationship_file_path must be provided")
+
+    logger.info("Fetching census data")
+    census_data = fetch_census_data(
+        api_key=census_api_key,
+        state_fips=state_fips,
+        region_config=region_config,
+        refresh_cache=refresh_cache,
+    )
+
+    logger.info("Processing CEJST data")
+    cejst_block = process_cejst_data(cejst_path, relationship_file_path, engine="duckdb")
+
+    return duckdb_engine.merge_ejblocks(blocks_path, census_data, cejst_block, counties)
+
+
+def _merge_ejblocks_pandas(
+    blocks_path: str | Path,
+    census_api_key: str | None,
+    cejst_path: str | Path | None,
+    relationship_file_path: str | Path | None,
+    state_fips: str,
+    region_config: RegionConfig | None,
+    refresh_cache: bool,
+    counties: list[str] | None,
+) -> gpd.GeoDataFrame | pd.DataFrame:
+    """Merge blocks with census and CEJST data in memory."""
     logger.info("Loading blocks data")
-    if str(blocks_path).endswith(".parquet"):
-        blocks = gpd.read_parquet(str(blocks_path))
-    else:
-        blocks = gpd.read_file(str(blocks_path))  # Fallback for existing shapefiles
+    blocks = read_table(
+        blocks_path, filters=county_filters(counties) if counties else None, cache=False
+    )
+    unique_key = read_unique_key(blocks_path)
 
-    # Add GEOID grouping columns
-    blocks["GEOID_grp"] = blocks["GEOID20"].apply(lambda s: s[:-3])
-    blocks["GEOID_tract"] = blocks["GEOID20"].apply(lambda s: s[:-4])
+    # Add GEOID grouping columns (int64 GEOIDs, so prefixes are integer divisions)
+    normalize_geoids(blocks)
+    blocks["GEOID_grp"] = geoid_prefix(blocks["GEOID20"], "block_group")
+    blocks["GEOID_tract"] = geoid_prefix(blocks["GEOID20"], "tract")
 
     # Fetch census data (will use cache if available)
     logger.info("Fetching census data")
@@ -359,16 +520,22 @@ def create_ejblocks(
 
     # Merge census data
     logger.info("Merging census data")
-    merge = blocks.merge(census_data, how="left", on="GEOID20")
+    merge = blocks.merge(normalize_geoids(census_data.copy()), how="left", on="GEOID20")
 
     # Calculate population density
     logger.info("Calculating population density")
     merge["POPDENSE"] = merge["P1_001N"].astype(np.float64) / merge["ALAND20"].astype(np.float64)
     merge["POPDENSE"].replace(np.inf, np.nan, inplace=True)
 
-    # Dissolve blocks (aggregate by GEOID20)
+    # Aggregate by GEOID20; dissolved blocks from the merging stage are already
+    # unique, so this only unions geometry for genuinely duplicated blocks
     logger.info("Dissolving blocks")
-    dissolve = merge.dissolve(by="GEOID20", aggfunc="sum")
+    if unique_key == "GEOID20" and merge["GEOID20"].duplicated().any():
+        logger.warning(
+            f"{blocks_path} is recorded as unique by GEOID20 but has duplicates "
+            "after the census merge; dissolving them"
+        )
+    dissolve = dissolve_by_key(merge, "GEOID20")
 
     # Process CEJST data
     logger.info("Processing CEJST data")
@@ -378,17 +545,4 @@ def create_ejblocks(
 
     # Merge CEJST data
     logger.info("Merging CEJST data")
-    ejblocks = dissolve.merge(cejst_block, on="GEOID20", how="left")
-
-    # Calculate demographics
-    logger.info("Calculating demographics")
-    ejblocks = calculate_demographics(ejblocks)
-
-    # Save results
-    logger.info(f"Saving ejblocks to {output_path}")
-    if str(output_path).endswith(".parquet"):
-        ejblocks.to_parquet(str(output_path))
-    else:
-        ejblocks.to_file(str(output_path))  # Fallback for shapefile output
-
-    return ejblocks
+    return dissolve.join(normalize_geoids(cejst_block.copy()), how="left")
@@ -6,11 +6,31 @@ from pathlib import Path
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
+from config.defaults import DEFAULT_TRIP_TIMES
 from config.regions import RegionConfig
+from exceptions import DataError
+from utils.geometry import attach_geometry
+from utils.io import (
+    ARROW_SUFFIXES,
+    county_filters,
+    is_dataset,
+    list_partition_files,
+    partition_keys,
+    read_table,
+    write_parquet,
+    write_partitioned,
+)
+from utils.schema import apply_schema, is_id_column
+from walk_times.matrix import load_walk_time_matrix
 
 logger = logging.getLogger(__name__)
 
+# Parquet schema metadata key naming a column known to be unique per row
+UNIQUE_KEY_METADATA = b"access:unique_key"
+
 
 def merge_walk_times(
     blocks_path: str | Path,
@@ -19,100 +39,285 @@ def merge_walk_times(
     output_path: str | Path | None = None,
     trip_times: list[int] | None = None,
     region_config: RegionConfig | None = None,  # noqa: ARG001
-) -> gpd.GeoDataFrame:
+    acres_col: str = "CALC_AC",
+    with_geometry: bool = True,
+    counties: list[str] | None = None,
+) -> gpd.GeoDataFrame | pd.DataFrame:
     """Merge walk times with blocks and conserved lands data.
 
+    AC_* columns are aggregated per center node without touching geometry:
+    conserved lands are read as a two-column osmid -> acres table, acres are
+    summed per (center node, threshold) and made cumulative, and block
+    geometry is attached once at the end. The result has one row per block.
+
+    If walk_times_path points to a sparse walk time matrix (.npz, see
+    ``walk_times.matrix``), the sums are sparse matrix-vector products instead.
+
+    With ``with_geometry=False`` the blocks are read without their polygons and
+    the result (and a Parquet output) is attribute-only; geometry is joined
+    back from the geometry store when needed (see ``utils.geometry``).
+
+    Blocks, walk times and the output may be Hive-partitioned datasets by
+    state and county (see ``utils.io.write_partitioned``). With ``counties``,
+    only those partitions are read and rewritten.
+
     Args:
         blocks_path: Path to blocks shapefile with OSMnx node IDs
-        walk_times_path: Path to walk times CSV file
+        walk_times_path: Path to walk times CSV/Parquet file or sparse matrix (.npz)
         conserved_lands_path: Path to conserved lands shapefile with OSMnx node IDs
         output_path: Optional path to save merged GeoDataFrame
         trip_times: Optional list of trip times (default: from walk_times data)
         region_config: Optional region configuration (currently unused but reserved for future)
+        acres_col: Conserved lands acres column (default: "CALC_AC")
+        with_geometry: If False, skip reading block geometry (default: True)
+        counties: Optional 5-digit county FIPS codes to restrict a partitioned
+            run to (default: all)
 
     Returns:
-        GeoDataFrame with merged data
+        GeoDataFrame with merged data (DataFrame if with_geometry is False)
     """
+    filters = county_filters(counties) if counties else None
     logger.info("Loading blocks data")
-    if str(blocks_path).endswith(".parquet"):
-        blocks = gpd.read_parquet(str(blocks_path))
-    else:
-        blocks = gpd.read_file(str(blocks_path))  # Fallback for existing shapefiles
+    blocks = read_table(blocks_path, geometry=with_geometry, filters=filters, cache=False)
 
-    logger.info("Loading conserved lands data")
-    if str(conserved_lands_path).endswith(".parquet"):
-        conserved_lands = gpd.read_parquet(str(conserved_lands_path))
+    logger.info("Loading conserved lands acres")
+    land_acres = read_land_acres(conserved_lands_path, acres_col)
+
+    if str(walk_times_path).endswith(".npz"):
+        ac = _aggregate_walk_time_matrix(walk_times_path, land_acres, trip_times)
     else:
-        conserved_lands = gpd.read_file(
-            str(conserved_lands_path)
-        )  # Fallback for existing shapefiles
+        walk_times = load_walk_times_table(walk_times_path, filters=filters)
+        ac = aggregate_walk_times(walk_times, land_acres, trip_times)
+
+    merge = attach_block_geometry(blocks, ac)
+
+    if output_path:
+        logger.info(f"Saving merged data to {output_path}")
+        if is_dataset(output_path):
+            write_partitioned(apply_schema(merge), output_path)
+        elif str(output_path).endswith(".parquet"):
+            write_parquet(apply_schema(merge), output_path)
+        else:
+            # Shapefiles have a 10-digit limit for integers, but OSMnx IDs can be much larger
+            osmid_columns = [col for col in merge.columns if "osmid" in col.lower()]
+            attach_geometry(merge).astype(dict.fromkeys(osmid_columns, str)).to_file(
+                str(output_path)
+            )  # Fallback for shapefile output
+
+    return merge
+
+
+def read_land_acres(conserved_lands_path: str | Path, acres_col: str = "CALC_AC") -> pd.Series:
+    """Read total conserved acres per land node, skipping geometry.
+
+    Args:
+        conserved_lands_path: Path to conserved lands file with OSMnx node IDs
+        acres_col: Acres column (default: "CALC_AC")
+
+    Returns:
+        Series of acres indexed by land node ID ("osmid")
+    """
+    lands = read_table(conserved_lands_path, columns=["osmid", acres_col], geometry=False)
+    return lands.groupby(lands["osmid"].astype(np.int64))[acres_col].sum()
+
+
+def load_walk_times_table(
+    walk_times_path: str | Path,
+    filters: list | None = None,
+) -> pd.DataFrame:
+    """Load the long walk times table with the center node as a column.
+
+    Args:
+        walk_times_path: Path to walk times CSV, Parquet or Arrow IPC file, or a
+            partitioned dataset (see ``write_walk_times_partitioned``)
+        filters: Optional partition filters for a dataset (see ``county_filters``)
+
+    Returns:
+        DataFrame with a "tract_osmid" or "block_osmid" column, "land_osmid" and "trip_time"
 
+    Raises:
+        ValueError: If no center node column is found
+    """
     logger.info("Loading walk times data")
-    if str(walk_times_path).endswith(".parquet"):
-        df = pd.read_parquet(str(walk_times_path))
-        # Handle index if it was saved as index
-        if df.index.name in ["tract_osmid", "block_osmid"]:
-            pass  # Index is already set correctly
-        elif df.index.name is None and len(df.index) > 0 and isinstance(df.index, pd.RangeIndex):
-            # Try to reset index if it's a default integer index
-            df = df.reset_index(drop=True)
+    if Path(walk_times_path).is_dir():
+        df = read_table(walk_times_path, filters=filters, cache=False)
+    elif str(walk_times_path).endswith((".parquet", *ARROW_SUFFIXES)):
+        df = read_table(walk_times_path, cache=False)
     else:
         df = pd.read_csv(str(walk_times_path), index_col=0)  # Fallback for CSV input
 
-    # Determine the column name for center node (could be tract_osmid or block_osmid)
-    # Check if it's in the index name or columns
+    # The center node column could be saved as the index or as a column
     if df.index.name in ["tract_osmid", "block_osmid"]:
-        center_node_col = df.index.name
-        # Reset index to make it a column for merging
         df = df.reset_index()
-    elif "tract_osmid" in df.columns:
-        center_node_col = "tract_osmid"
-    elif "block_osmid" in df.columns:
-        center_node_col = "block_osmid"
-    else:
+    elif "tract_osmid" not in df.columns and "block_osmid" not in df.columns:
         raise ValueError(
             f"Walk times CSV must contain either 'tract_osmid' or 'block_osmid' as index or column. "
             f"Index name: {df.index.name}, Columns: {list(df.columns)}"
         )
 
-    logger.info(f"Using center node column: {center_node_col}")
+    if Path(walk_times_path).is_dir():
+        # Center nodes on a county line are stored in each county's partition
+        center_col = "tract_osmid" if "tract_osmid" in df.columns else "block_osmid"
+        df = df.drop_duplicates([center_col, "land_osmid"], ignore_index=True)
+    return df
+
+
+def write_walk_times_partitioned(
+    walk_times: pd.DataFrame,
+    blocks: pd.DataFrame,
+    output_path: str | Path,
+) -> list[Path]:
+    """Write a long walk times table as a dataset partitioned by state and county.
+
+    Walk times are keyed by center node, not GEOID, so each center node's rows
+    go to the partitions of the blocks snapped to it. A node serving blocks in
+    two counties is stored in both, so a county-level read is complete on its
+    own; ``load_walk_times_table`` drops the duplicates when reading several.
+
+    Args:
+        walk_times: Long walk times table (see ``load_walk_times_table``)
+        blocks: Blocks with "GEOID20" and "osmid" columns
+        output_path: Dataset directory
 
-    # Merge walk times with conserved lands
-    logger.info("Merging walk times with conserved lands")
-    df_with_lands = df.merge(
-        conserved_lands.drop(columns="geometry"), how="left", left_on="land_osmid", right_on="osmid"
+    Returns:
+        Paths of the written partition files
+    """
+    center_col = "tract_osmid" if "tract_osmid" in walk_times.columns else "block_osmid"
+    owners = pd.concat(
+        [
+            pd.DataFrame({center_col: blocks["osmid"].astype(np.int64).to_numpy()}),
+            partition_keys(blocks["GEOID20"]),
+        ],
+        axis=1,
+    ).drop_duplicates()
+    rows = walk_times.astype({center_col: np.int64}).merge(owners, on=center_col)
+    keys = rows[["state", "county"]].reset_index(drop=True)
+    return write_partitioned(
+        rows.drop(columns=["state", "county"]), output_path, keys=keys, index=False
     )
 
-    # Merge with blocks
-    logger.info("Merging with blocks")
-    # Rename the center node column to match blocks' osmid column for merging
-    # We'll keep the original column name for reference
-    merge = gpd.GeoDataFrame(
-        blocks.merge(df_with_lands, how="outer", left_on="osmid", right_on=center_node_col)
+
+def aggregate_walk_times(
+    walk_times: pd.DataFrame,
+    land_acres: pd.Series,
+    trip_times: list[int] | None = None,
+) -> pd.DataFrame:
+    """Sum reachable conserved acres per center node and trip time threshold.
+
+    Works on the long table and the land acres only, so no geometry is
+    copied per (block, land) pair.
+
+    Args:
+        walk_times: Long table with center node, "land_osmid" and "trip_time" columns
+        land_acres: Acres indexed by land node ID (see ``read_land_acres``)
+        trip_times: Trip time thresholds (default: from walk_times data)
+
+    Returns:
+        DataFrame indexed by the center node column with cumulative AC_* columns
+    """
+    center_node_col = "tract_osmid" if "tract_osmid" in walk_times.columns else "block_osmid"
+    logger.info(f"Using center node column: {center_node_col}")
+
+    if trip_times is None:
+        trip_times = walk_times["trip_time"].dropna().unique().astype(int).tolist()
+    trip_times = sorted(trip_times)
+
+    acres = land_acres.reindex(walk_times["land_osmid"].astype(np.int64)).fillna(0.0).to_numpy()
+    codes, centers = pd.factorize(walk_times[center_node_col], sort=True)
+
+    logger.info(f"Aggregating acres per center node for: {trip_times}")
+    return pd.DataFrame(
+        cumulative_acres(
+            codes,
+            len(centers),
+            walk_times["trip_time"].to_numpy(),
+            acres,
+            trip_times,
+        ),
+        index=pd.Index(centers, name=center_node_col),
+        columns=[f"AC_{t}" for t in trip_times],
     )
 
-    # Create trip time columns
+
+def cumulative_acres(
+    codes: np.ndarray,
+    n_groups: int,
+    trip_time: np.ndarray,
+    acres: np.ndarray,
+    trip_times: list[int],
+    dtype: type = np.float64,
+) -> np.ndarray:
+    """Sum acres into cumulative (group x trip time threshold) totals.
+
+    Each row is bucketed once by the first threshold it falls within, acres
+    are summed per (group, bucket) with ``np.bincount`` and the buckets are
+    accumulated along the threshold axis.
+
+    Args:
+        codes: Group position of each row, in [0, n_groups)
+        n_groups: Number of groups
+        trip_time: Trip time of each row in minutes (NaN = unreachable)
+        acres: Acres of each row
+        trip_times: Sorted trip time thresholds in minutes
+        dtype: Output dtype (default: float64)
+
+    Returns:
+        Array of shape (n_groups, len(trip_times)) where column j holds the
+        acres of rows with trip_time <= trip_times[j]
+    """
+    n_thresholds = len(trip_times)
+    bucket = np.searchsorted(trip_times, trip_time, side="left")
+    within = bucket < n_thresholds  # Also drops NaN, which sorts past the end
+    sums = np.bincount(
+        codes[within] * n_thresholds + bucket[within],
+        weights=acres[within],
+        minlength=n_groups * n_thresholds,
+    ).reshape(n_groups, n_thresholds)
+    return np.cumsum(sums, axis=1).astype(dtype, copy=False)
+
+
+def _aggregate_walk_time_matrix(
+    matrix_path: str | Path,
+    land_acres: pd.Series,
+    trip_times: list[int] | None = None,
+) -> pd.DataFrame:
+    """Sum reachable acres per center node from a sparse walk time matrix."""
+    wtm = load_walk_time_matrix(matrix_path)
     if trip_times is None:
-        trip_times = sorted(merge["trip_time"].dropna().unique().astype(int).tolist())
+        trip_times = DEFAULT_TRIP_TIMES
+    trip_times = sorted(trip_times)
 
-    logger.info(f"Creating trip time columns for: {trip_times}")
-    merge = create_trip_time_columns(merge, trip_times)
+    # Total acres per land node, aligned with the matrix columns
+    acres = land_acres.reindex(wtm.land_ids, fill_value=0.0).to_numpy()
 
-    if output_path:
-        logger.info(f"Saving merged data to {output_path}")
-        # Convert OSMnx ID columns to strings to avoid shapefile field width limitations
-        # Shapefiles have a 10-digit limit for integers, but OSMnx IDs can be much larger
-        osmid_columns = [col for col in merge.columns if "osmid" in col.lower()]
-        for col in osmid_columns:
-            if col in merge.columns:
-                merge[col] = merge[col].astype(str)
-
-        if str(output_path).endswith(".parquet"):
-            merge.to_parquet(str(output_path))
-        else:
-            merge.to_file(str(output_path))  # Fallback for shapefile output
+    logger.info(f"Aggregating acres per center node for: {trip_times}")
+    return pd.DataFrame(
+        wtm.aggregate_by_center(acres, trip_times),
+        index=pd.Index(wtm.center_ids, name=wtm.center_node_col),
+        columns=[f"AC_{t}" for t in trip_times],
+    )
 
-    return merge
+
+def attach_block_geometry(
+    blocks: gpd.GeoDataFrame | pd.DataFrame, ac: pd.DataFrame
+) -> gpd.GeoDataFrame | pd.DataFrame:
+    """Join per-center-node AC_* columns onto blocks, one row per block.
+
+    Args:
+        blocks: Blocks GeoDataFrame (or attribute-only DataFrame) with "osmid" column
+        ac: DataFrame indexed by the center node column (see ``aggregate_walk_times``)
+
+    Returns:
+        Blocks GeoDataFrame with the center node and AC_* columns; blocks that
+        reach no land get zeros
+    """
+    ac = ac.reset_index()
+    merge = blocks.merge(ac, how="left", left_on="osmid", right_on=ac.columns[0])
+    ac_cols = [col for col in ac.columns if col.startswith("AC_")]
+    merge[ac_cols] = merge[ac_cols].fillna(0.0)
+    if not isinstance(blocks, gpd.GeoDataFrame):
+        return merge
+    return gpd.GeoDataFrame(merge, geometry=blocks.geometry.name, crs=blocks.crs)
 
 
 def create_trip_time_columns(
@@ -125,7 +330,8 @@ def create_trip_time_columns(
     Creates columns like AC_5, AC_10, etc. containing acres of conserved land
     accessible within that trip time threshold. Columns are cumulative - AC_5
     includes all lands accessible within 5 minutes, AC_10 includes all within
-    10 minutes, etc.
+    10 minutes, etc. Rows beyond a threshold get 0.0. Columns are float32 and
+    the input frame (including its geometry) is not copied.
 
     Args:
         merge_df: GeoDataFrame with trip_time and acres columns
@@ -135,29 +341,35 @@ def create_trip_time_columns(
     Returns:
         GeoDataFrame with AC_* columns added
     """
-    merge_df = merge_df.copy()  # Avoid SettingWithCopyWarning
-
-    # Ensure trip_times are sorted
     trip_times = sorted(trip_times)
+    ac_cols = [f"AC_{time}" for time in trip_times]
+
+    # One "group" per row: each row keeps its own acres at and above its threshold
+    ac = pd.DataFrame(
+        cumulative_acres(
+            np.arange(len(merge_df)),
+            len(merge_df),
+            merge_df["trip_time"].to_numpy(dtype=np.float64),
+            merge_df[acres_col].to_numpy(dtype=np.float64),
+            trip_times,
+            dtype=np.float32,
+        ),
+        index=merge_df.index,
+        columns=ac_cols,
+    )
 
-    for time in trip_times:
-        col_name = f"AC_{time}"
-        # Include all conserved lands accessible within this time threshold
-        # (trip_time <= time means accessible within this threshold)
-        # Initialize column with 0.0
-        merge_df[col_name] = 0.0
-        # Set to acres value where trip_time <= time
-        mask = merge_df["trip_time"] <= time
-        merge_df.loc[mask, col_name] = merge_df.loc[mask, acres_col]
-
-    return merge_df
+    # Attach all columns at once without copying the geometry column
+    existing = [col for col in ac_cols if col in merge_df.columns]
+    if existing:
+        merge_df = merge_df.drop(columns=existing)
+    return pd.concat([merge_df, ac], axis=1, copy=False)
 
 
 def dissolve_blocks(
-    merge_df: gpd.GeoDataFrame,
+    merge_df: gpd.GeoDataFrame | pd.DataFrame,
     groupby_col: str = "GEOID20",
     aggfunc: str = "sum",
-) -> gpd.GeoDataFrame:
+) -> gpd.GeoDataFrame | pd.DataFrame:
     """Aggregate blocks by dissolving on a groupby column.
 
     Optimized to handle large datasets by:
@@ -165,29 +377,30 @@ def dissolve_blocks(
     2. Using unique geometries per group (blocks with same GEOID20 have same geometry)
     3. Aggregating numeric data separately
 
+    An attribute-only DataFrame (see ``merge_walk_times``) is aggregated
+    without any geometry step.
+
     Args:
-        merge_df: GeoDataFrame with block-level data
+        merge_df: GeoDataFrame (or attribute-only DataFrame) with block-level data
         groupby_col: Column to group by (default: "GEOID20")
         aggfunc: Aggregation function (default: "sum")
 
     Returns:
-        Dissolved GeoDataFrame
+        Dissolved GeoDataFrame (DataFrame for attribute-only input)
     """
     logger.info(f"Dissolving blocks by {groupby_col}")
     logger.info(f"Input rows: {len(merge_df):,}")
 
-    # Identify numeric columns to aggregate (exclude geometry and groupby_col)
-    numeric_cols = merge_df.select_dtypes(include=[np.number]).columns.tolist()
-    if groupby_col in numeric_cols:
-        numeric_cols.remove(groupby_col)
+    # Identify numeric columns to aggregate (exclude geometry, groupby_col and IDs)
+    numeric_cols = [
+        col
+        for col in merge_df.select_dtypes(include=[np.number]).columns
+        if col != groupby_col and not is_id_column(col)
+    ]
 
     # Identify geometry column
-    geom_col = merge_df.geometry.name
-
-    # Get unique geometries per groupby_col (blocks with same GEOID20 have same geometry)
-    logger.info("Extracting unique geometries per group...")
-    unique_geoms = merge_df[[groupby_col, geom_col]].drop_duplicates(subset=[groupby_col])
-    logger.info(f"Unique groups: {len(unique_geoms):,}")
+    has_geometry = isinstance(merge_df, gpd.GeoDataFrame)
+    geom_col = merge_df.geometry.name if has_geometry else None
 
     # Aggregate numeric data separately (much faster than dissolve with geometry)
     logger.info("Aggregating numeric data...")
@@ -211,6 +424,13 @@ def dissolve_blocks(
     # Aggregate numeric columns
     aggregated = merge_df.groupby(groupby_col, as_index=False).agg(agg_dict)
     logger.info(f"Aggregated rows: {len(aggregated):,}")
+    if not has_geometry:
+        return aggregated
+
+    # Get unique geometries per groupby_col (blocks with same GEOID20 have same geometry)
+    logger.info("Extracting unique geometries per group...")
+    unique_geoms = merge_df[[groupby_col, geom_col]].drop_duplicates(subset=[groupby_col])
+    logger.info(f"Unique groups: {len(unique_geoms):,}")
 
     # Merge with unique geometries
     logger.info("Merging aggregated data with geometries...")
@@ -221,3 +441,117 @@ def dissolve_blocks(
 
     logger.info(f"Dissolved rows: {len(dissolved):,}")
     return dissolved
+
+
+def save_dissolved_blocks(
+    dissolved: gpd.GeoDataFrame | pd.DataFrame,
+    output_path: str | Path,
+    groupby_col: str = "GEOID20",
+) -> None:
+    """Save dissolved blocks, recording that groupby_col is unique.
+
+    For Parquet output, the column name is stored in the schema metadata so
+    later stages (see ``create_ejblocks``) can skip dissolving again.
+    Shapefile output of attribute-only blocks gets its geometry from the
+    geometry store.
+
+    Args:
+        dissolved: Output of ``dissolve_blocks``
+        output_path: Path to save (Parquet, partitioned dataset directory or shapefile)
+        groupby_col: Column the blocks were dissolved by (default: "GEOID20")
+
+    Raises:
+        DataError: If groupby_col is not unique
+    """
+    if dissolved[groupby_col].duplicated().any():
+        raise DataError(f"Dissolved blocks have duplicate {groupby_col} values")
+
+    metadata = {UNIQUE_KEY_METADATA: groupby_col.encode()}
+    if is_dataset(output_path):
+        write_partitioned(
+            apply_schema(dissolved), output_path, geoid_col=groupby_col, metadata=metadata
+        )
+    elif str(output_path).endswith(".parquet"):
+        write_parquet(apply_schema(dissolved), output_path, metadata=metadata)
+    else:
+        attach_geometry(dissolved, geoid_col=groupby_col).to_file(
+            str(output_path)
+        )  # Fallback for shapefile output
+
+
+def read_unique_key(path: str | Path) -> str | None:
+    """Read the unique key recorded by ``save_dissolved_blocks``.
+
+    Args:
+        path: Path to a Parquet file or partitioned dataset
+
+    Returns:
+        Column name, or None if none is recorded (or the file is not Parquet)
+    """
+    if Path(path).is_dir():
+        files = list_partition_files(path)
+        return read_unique_key(files[0][0]) if files else None
+    if not str(path).endswith(".parquet"):
+        return None
+    try:
+        metadata = pq.read_schema(str(path)).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    key = metadata.get(UNIQUE_KEY_METADATA)
+    return key.decode() if key else None
+
+
+def dissolve_by_key(
+    gdf: gpd.GeoDataFrame | pd.DataFrame, key: str = "GEOID20"
+) -> gpd.GeoDataFrame | pd.DataFrame:
+    """Aggregate rows sharing a key, unioning geometry only where needed.
+
+    Equivalent to ``gdf.dissolve(by=key, aggfunc="sum")`` for numeric columns,
+    but attributes are aggregated with a plain groupby and GEOS unions run
+    only for keys that actually have several rows. When the key is already
+    unique, no aggregation runs at all. Non-numeric and ID columns (GEOIDs,
+    osmids) keep their first value. Attribute-only DataFrames are aggregated
+    the same way, without the geometry step.
+
+    Args:
+        gdf: GeoDataFrame (or attribute-only DataFrame) to aggregate
+        key: Column to aggregate by (default: "GEOID20")
+
+    Returns:
+        GeoDataFrame (or DataFrame) indexed by key, sorted by key
+    """
+    geom_col = gdf.geometry.name if isinstance(gdf, gpd.GeoDataFrame) else None
+    numeric_cols = [
+        col
+        for col in gdf.select_dtypes(include=[np.number]).columns
+        if col != key and not is_id_column(col)
+    ]
+    duplicated = gdf[key].duplicated(keep=False).to_numpy()
+
+    if not duplicated.any():
+        logger.info(f"{key} is unique, skipping dissolve")
+        result = gdf.set_index(key).sort_index()
+        # Match the sum aggregation, which turns missing values into 0
+        result[numeric_cols] = result[numeric_cols].fillna(0)
+        return result
+
+    n_groups = gdf.loc[duplicated, key].nunique()
+    logger.info(f"Dissolving {duplicated.sum():,} rows sharing {n_groups:,} {key} values")
+    other_cols = [col for col in gdf.columns if col not in (key, geom_col, *numeric_cols)]
+    attributes = gdf.groupby(key, sort=True).agg(
+        {**dict.fromkeys(numeric_cols, "sum"), **dict.fromkeys(other_cols, "first")}
+    )
+    attributes = attributes[[col for col in gdf.columns if col in attributes.columns]]
+    if geom_col is None:
+        return attributes
+    geometry = pd.concat(
+        [
+            gdf.loc[~duplicated].set_index(key)[geom_col],
+            gdf.loc[duplicated, [key, geom_col]].dissolve(by=key)[geom_col],
+        ]
+    )
+    return gpd.GeoDataFrame(
+        attributes,
+        geometry=gpd.GeoSeries(geometry, crs=gdf.crs).reindex(attributes.index),
+        crs=gdf.crs,
+    )
@@ -0,0 +1,302 @@
+"""Concurrent per-county Census API client with a per-county, per-field cache.
+
+Block data is requested one county at a time over a pooled HTTP session, with
+a bounded number of requests in flight. A failed county is retried on its
+own instead of refetching the whole state. Every (county, field) pair is
+cached as its own small Parquet file::
+
+    data/cache/census/counties/2020/dec_pl/23/001/P1_001N.parquet
+
+so asking for an extra field only requests that field. The API base URL is
+configurable, so tests can point the client at a local stand-in server.
+"""
+
+import contextlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import cast
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.defaults import (
+    DEFAULT_CENSUS_API_URL,
+    DEFAULT_CENSUS_DATASET,
+    DEFAULT_CENSUS_MAX_WORKERS,
+    DEFAULT_CENSUS_YEAR,
+)
+from exceptions import CensusAPIError, ConfigurationError
+from utils.retry import retry_census_request
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for one county's response
+REQUEST_TIMEOUT = 120
+# GEO_ID prefix of 2020 blocks (summary level 100); GEOID20 is the rest
+BLOCK_GEO_ID_PREFIX = "1000000US"
+
+
+def make_session(max_workers: int = DEFAULT_CENSUS_MAX_WORKERS) -> requests.Session:
+    """Create an HTTP session whose connection pool fits the worker count.
+
+    Args:
+        max_workers: Number of concurrent requests (default: 8)
+
+    Returns:
+        requests Session reusing up to max_workers connections per host
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get_county_dir(
+    state_fips: str,
+    county_fips: str,
+    year: int,
+    dataset: str,
+    cache_dir: str | Path | None = None,
+) -> Path:
+    """Get the cache directory of one county."""
+    if cache_dir is None:
+        project_root = Path(__file__).parent.parent.parent
+        cache_dir = project_root / "data" / "cache" / "census"
+    dataset_dir = dataset.replace("/", "_")
+    return Path(cache_dir) / "counties" / str(year) / dataset_dir / state_fips / county_fips
+
+
+@retry_census_request
+def _request(session: requests.Session, url: str, params: dict) -> list[list[str]]:
+    """Run one Census API query and return its rows, header row first.
+
+    Raises:
+        CensusAPIError: On rate limiting, server errors or malformed responses
+            (retried)
+        ConfigurationError: If the API rejects the query, e.g. an invalid key
+            or unknown field (not retried)
+    """
+    response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 204:
+        return []
+    if response.status_code == 429 or response.status_code >= 500:
+        raise CensusAPIError(f"Census API error {response.status_code}: {response.text[:200]}")
+    if response.status_code != 200:
+        raise ConfigurationError(
+            f"Census API rejected the request ({response.status_code}): {response.text[:200]}"
+        )
+    try:
+        return cast(list[list[str]], response.json())
+    except ValueError as e:
+        raise CensusAPIError(f"Census API returned invalid JSON: {response.text[:200]}") from e
+
+
+def _to_frame(rows: list[list[str]]) -> pd.DataFrame:
+    """Build a DataFrame from API rows, with numeric fields as float64."""
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows[1:], columns=rows[0])
+    for col in df.columns:
+        if col == "GEO_ID":
+            continue
+        # Non-numeric fields (e.g. NAME) stay strings
+        with contextlib.suppress(ValueError, TypeError):
+            df[col] = pd.to_numeric(df[col]).astype("float64")
+    return df
+
+
+def list_counties(
+    session: requests.Session,
+    state_fips: str,
+    year: int = DEFAULT_CENSUS_YEAR,
+    dataset: str = DEFAULT_CENSUS_DATASET,
+    api_key: str | None = None,
+    base_url: str = DEFAULT_CENSUS_API_URL,
+) -> list[str]:
+    """List the 3-digit county FIPS codes of a state.
+
+    Args:
+        session: HTTP session
+        state_fips: 2-digit state FIPS code
+        year: Census year (default: 2020)
+        dataset: API dataset path (default: "dec/pl")
+        api_key: Census API key
+        base_url: API base URL (default: https://api.census.gov/data)
+
+    Returns:
+        Sorted county FIPS codes
+    """
+    params = {"get": "NAME", "for": "county:*", "in": f"state:{state_fips}"}
+    if api_key:
+        params["key"] = api_key
+    rows = _request(session, f"{base_url}/{year}/{dataset}", params)
+    county_col = rows[0].index("county")
+    return sorted(row[county_col] for row in rows[1:])
+
+
+def _fetch_county(
+    session: requests.Session,
+    state_fips: str,
+    county_fips: str,
+    fields: list[str],
+    year: int,
+    dataset: str,
+    api_key: str | None,
+    base_url: str,
+    cache_dir: str | Path | None,
+    refresh_cache: bool,
+) -> pd.DataFrame:
+    """Get one county's block data, requesting only fields not yet cached."""
+    county_dir = _get_county_dir(state_fips, county_fips, year, dataset, cache_dir)
+    missing = [
+        field for field in fields if refresh_cache or not (county_dir / f"{field}.parquet").exists()
+    ]
+
+    if missing:
+        params = {
+            "get": ",".join(["GEO_ID", *missing]),
+            "for": "block:*",
+            "in": f"state:{state_fips} county:{county_fips}",
+        }
+        if api_key:
+            params["key"] = api_key
+        data = _to_frame(_request(session, f"{base_url}/{year}/{dataset}", params))
+        if data.empty:
+            data = pd.DataFrame(columns=["GEO_ID", *missing])
+        logger.debug(f"Fetched {len(data)} blocks of county {state_fips}{county_fips}: {missing}")
+
+        county_dir.mkdir(parents=True, exist_ok=True)
+        for field in missing:
+            path = county_dir / f"{field}.parquet"
+            tmp_path = path.with_suffix(".parquet.tmp")
+            data[["GEO_ID", field]].to_parquet(tmp_path, index=False)
+            tmp_path.replace(path)
+
+    columns = [
+        pd.read_parquet(county_dir / f"{field}.parquet").set_index("GEO_ID")[field]
+        for field in fields
+    ]
+    return pd.concat(columns, axis=1).reset_index()
+
+
+def fetch_block_data(
+    state_fips: str | int,
+    fields: list[str],
+    year: int = DEFAULT_CENSUS_YEAR,
+    dataset: str = DEFAULT_CENSUS_DATASET,
+    api_key: str | None = None,
+    max_workers: int = DEFAULT_CENSUS_MAX_WORKERS,
+    cache_dir: str | Path | None = None,
+    refresh_cache: bool = False,
+    base_url: str = DEFAULT_CENSUS_API_URL,
+    session: requests.Session | None = None,
+) -> pd.DataFrame:
+    """Fetch block-level Census data for a state, one county per request.
+
+    Counties are requested concurrently (at most max_workers at a time) and
+    each (county, field) pair is cached, so a rerun only requests what is
+    missing and needs no API key once everything is cached.
+
+    Args:
+        state_fips: State FIPS code
+        fields: Census field names (e.g. ["P1_001N", "P1_003N"])
+        year: Census year (default: 2020)
+        dataset: API dataset path (default: "dec/pl")
+        api_key: Census API key (optional if all requested data is cached)
+        max_workers: Maximum concurrent requests (default: 8)
+        cache_dir: Optional cache directory (default: data/cache/census)
+        refresh_cache: If True, request every county and field again
+        base_url: API base URL (default: https://api.census.gov/data)
+        session: Optional HTTP session (default: a pooled session sized to max_workers)
+
+    Returns:
+        DataFrame with GEO_ID, one column per field and GEOID20, ordered by county
+
+    Raises:
+        ConfigurationError: If data is missing from the cache and no API key is given
+        CensusAPIError: If a request still fails after retries
+    """
+    state_fips = str(state_fips).zfill(2)
+    state_dir = _get_county_dir(state_fips, "", year, dataset, cache_dir)
+    counties_path = state_dir / "counties.json"
+
+    if not refresh_cache and counties_path.exists():
+        counties = json.loads(counties_path.read_text())
+        cached = all(
+            (state_dir / county / f"{field}.parquet").exists()
+            for county in counties
+            for field in fields
+        )
+    else:
+        counties, cached = None, False
+
+    if not cached and not api_key:
+        raise ConfigurationError(
+            "No API key provided and no cached data found. "
+            "Either provide an API key or ensure cached data exists. "
+            f"Cache location: {state_dir}"
+        )
+
+    own_session = session is None
+    http_session = session or make_session(max_workers)
+    try:
+        if counties is None:
+            counties = list_counties(http_session, state_fips, year, dataset, api_key, base_url)
+            state_dir.mkdir(parents=True, exist_ok=True)
+            counties_path.write_text(json.dumps(counties))
+
+        logger.info(
+            f"Getting {len(fields)} fields for {len(counties)} counties in state {state_fips} "
+            f"({max_workers} concurrent requests)"
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(
+                pool.map(
+                    lambda county: _fetch_county(
+                        http_session,
+                        state_fips,
+                        county,
+                        fields,
+                        year,
+                        dataset,
+                        api_key,
+                        base_url,
+                        cache_dir,
+                        refresh_cache,
+                    ),
+                    counties,
+                )
+            )
+    finally:
+        if own_session:
+            http_session.close()
+
+    census = pd.concat(frames, ignore_index=True)
+    census["GEOID20"] = census["GEO_ID"].str.removeprefix(BLOCK_GEO_ID_PREFIX)
+    return census
+
+
+def clear_county_cache(
+    state_fips: str | int,
+    fields: list[str],
+    year: int = DEFAULT_CENSUS_YEAR,
+    dataset: str = DEFAULT_CENSUS_DATASET,
+    cache_dir: str | Path | None = None,
+) -> None:
+    """Delete the per-county files of some fields, e.g. once stored statewide.
+
+    Args:
+        state_fips: State FIPS code
+        fields: Census field names
+        year: Census year (default: 2020)
+        dataset: API dataset path (default: "dec/pl")
+        cache_dir: Optional cache directory (default: data/cache/census)
+    """
+    state_dir = _get_county_dir(str(state_fips).zfill(2), "", year, dataset, cache_dir)
+    for field in fields:
+        for path in state_dir.glob(f"*/{field}.parquet"):
+            path.unlink()
@@ -0,0 +1,241 @@
+"""Field-granular Census cache store shared by states and parallel runs.
+
+Block data is stored as one Parquet column per (year, dataset, state, field),
+next to the block GEO_IDs all columns are aligned to::
+
+    data/cache/census/2020/dec_pl/23/GEO_ID.parquet
+    data/cache/census/2020/dec_pl/23/P1_001N.parquet
+    data/cache/census/2020/dec_pl/33/P1_001N.parquet
+
+Any subset of fields is assembled from the cached columns, so asking for
+``P1_001N`` after caching four fields reads one column and fetches nothing.
+Missing fields are fetched per county (see ``merging.census_api``) and added
+as new columns. Each state directory is guarded by a file lock, so parallel
+runs sharing the store wait for each other instead of fetching twice.
+"""
+
+import logging
+import sys
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from config.defaults import (
+    DEFAULT_CENSUS_API_URL,
+    DEFAULT_CENSUS_DATASET,
+    DEFAULT_CENSUS_MAX_WORKERS,
+    DEFAULT_CENSUS_YEAR,
+)
+from exceptions import DataError
+from merging.census_api import BLOCK_GEO_ID_PREFIX, clear_county_cache, fetch_block_data
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+# Key column every field column is aligned to
+KEY_FIELD = "GEO_ID"
+
+
+def get_state_dir(
+    state_fips: str | int,
+    year: int = DEFAULT_CENSUS_YEAR,
+    dataset: str = DEFAULT_CENSUS_DATASET,
+    cache_dir: str | Path | None = None,
+) -> Path:
+    """Get the store directory of one state.
+
+    Args:
+        state_fips: State FIPS code
+        year: Census year (default: 2020)
+        dataset: API dataset path (default: "dec/pl")
+        cache_dir: Optional cache directory (default: data/cache/census)
+
+    Returns:
+        Directory holding one Parquet file per field
+    """
+    if cache_dir is None:
+        project_root = Path(__file__).parent.parent.parent
+        cache_dir = project_root / "data" / "cache" / "census"
+    state_fips = str(state_fips).zfill(2)
+    return Path(cache_dir) / str(year) / dataset.replace("/", "_") / state_fips
+
+
+@contextmanager
+def state_lock(state_dir: Path) -> Iterator[None]:
+    """Hold an exclusive lock on a state directory (blocks until available).
+
+    Args:
+        state_dir: Store directory of a state
+    """
+    state_dir.mkdir(parents=True, exist_ok=True)
+    with open(state_dir / ".lock", "a+b") as lock_file:
+        if sys.platform == "win32":
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if sys.platform == "win32":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def cached_fields(state_dir: Path, fields: list[str]) -> list[str]:
+    """Get the fields of a list that are stored for a state."""
+    if not (state_dir / f"{KEY_FIELD}.parquet").exists():
+        return []
+    return [field for field in fields if (state_dir / f"{field}.parquet").exists()]
+
+
+def read_fields(state_dir: Path, fields: list[str]) -> pd.DataFrame:
+    """Assemble stored field columns of a state.
+
+    Args:
+        state_dir: Store directory of a state
+        fields: Census field names
+
+    Returns:
+        DataFrame with GEO_ID and one column per field
+
+    Raises:
+        DataError: If a field is not stored
+    """
+    missing = sorted(set(fields) - set(cached_fields(state_dir, fields)))
+    if missing:
+        raise DataError(f"Census fields not cached in {state_dir}: {missing}")
+    return pd.concat(
+        [pd.read_parquet(state_dir / f"{field}.parquet") for field in [KEY_FIELD, *fields]],
+        axis=1,
+    )
+
+
+def _write_column(path: Path, column: pd.Series) -> None:
+    """Write one column atomically, so readers never see a partial file."""
+    tmp_path = path.with_suffix(".parquet.tmp")
+    column.to_frame().to_parquet(tmp_path, index=False)
+    tmp_path.replace(path)
+
+
+def write_fields(state_dir: Path, data: pd.DataFrame) -> None:
+    """Store the field columns of a state, aligned to the stored GEO_IDs.
+
+    The first write defines the GEO_ID order; later fields are reindexed to
+    it. Call under ``state_lock``.
+
+    Args:
+        state_dir: Store directory of a state
+        data: DataFrame with GEO_ID and field columns
+
+    Raises:
+        DataError: If data has blocks the stored GEO_IDs do not
+    """
+    key_path = state_dir / f"{KEY_FIELD}.parquet"
+    if key_path.exists():
+        geo_ids = pd.read_parquet(key_path)[KEY_FIELD]
+        extra = ~data[KEY_FIELD].isin(geo_ids)
+        if extra.any():
+            raise DataError(
+                f"{int(extra.sum())} fetched blocks are not in {key_path}; "
+                "refresh the state to rebuild the store"
+            )
+        data = data.set_index(KEY_FIELD).reindex(geo_ids.to_numpy()).reset_index()
+    else:
+        state_dir.mkdir(parents=True, exist_ok=True)
+
+    for field in data.columns.drop(KEY_FIELD):
+        _write_column(state_dir / f"{field}.parquet", data[field])
+    if not key_path.exists():
+        _write_column(key_path, data[KEY_FIELD])
+
+
+def load_block_data(
+    state_fips: str | int,
+    fields: list[str],
+    year: int = DEFAULT_CENSUS_YEAR,
+    dataset: str = DEFAULT_CENSUS_DATASET,
+    api_key: str | None = None,
+    max_workers: int = DEFAULT_CENSUS_MAX_WORKERS,
+    cache_dir: str | Path | None = None,
+    refresh_cache: bool = False,
+    base_url: str = DEFAULT_CENSUS_API_URL,
+) -> pd.DataFrame:
+    """Get block-level Census fields of a state, fetching only uncached fields.
+
+    Args:
+        state_fips: State FIPS code
+        fields: Census field names (e.g. ["P1_001N", "P1_003N"])
+        year: Census year (default: 2020)
+        dataset: API dataset path (default: "dec/pl")
+        api_key: Census API key (optional if all fields are cached)
+        max_workers: Maximum concurrent county requests (default: 8)
+        cache_dir: Optional cache directory (default: data/cache/census)
+        refresh_cache: If True, fetch every field again and rebuild the state
+        base_url: API base URL (default: https://api.census.gov/data)
+
+    Returns:
+        DataFrame with GEO_ID, one column per field and GEOID20
+
+    Raises:
+        ConfigurationError: If a field is not cached and no API key is given
+        CensusAPIError: If a county request still fails after retries
+    """
+    state_dir = get_state_dir(state_fips, year, dataset, cache_dir)
+    with state_lock(state_dir):
+        if refresh_cache:
+            for path in state_dir.glob("*.parquet"):
+                path.unlink()
+        missing = [field for field in fields if field not in cached_fields(state_dir, fields)]
+        if missing:
+            logger.info(f"Fetching census fields {missing} for state {state_dir.name}")
+            data = fetch_block_data(
+                state_fips,
+                missing,
+                year=year,
+                dataset=dataset,
+                api_key=api_key,
+                max_workers=max_workers,
+                cache_dir=cache_dir,
+                refresh_cache=refresh_cache,
+                base_url=base_url,
+            )
+            write_fields(state_dir, data.drop(columns="GEOID20"))
+            # The statewide columns supersede the per-county pieces
+            clear_county_cache(state_fips, missing, year, dataset, cache_dir)
+        else:
+            logger.info(f"Loading census fields {fields} from {state_dir}")
+        census = read_fields(state_dir, fields)
+
+    census["GEOID20"] = census[KEY_FIELD].str.removeprefix(BLOCK_GEO_ID_PREFIX)
+    return census
+
+
+def prefetch(
+    states: Sequence[str | int],
+    fields: list[str],
+    **kwargs,
+) -> dict[str, int]:
+    """Fill the store for several states, one state after another.
+
+    Args:
+        states: State FIPS codes
+        fields: Census field names
+        **kwargs: Passed to ``load_block_data`` (year, api_key, max_workers, ...)
+
+    Returns:
+        Number of blocks stored per state FIPS code
+    """
+    counts = {}
+    for state in states:
+        state_fips = str(state).zfill(2)
+        counts[state_fips] = len(load_block_data(state_fips, fields, **kwargs))
+        logger.info(f"State {state_fips}: {counts[state_fips]:,} blocks cached")
+    return counts
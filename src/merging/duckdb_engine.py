@@ -0,0 +1,341 @@
+"""Out-of-core DuckDB engine for the census and CEJST stage of ``create_ejblocks``.
+
+The pandas engine holds blocks, census data, relationship rows and the
+dissolved frame in memory at once. This engine runs the same joins and
+aggregations in an embedded DuckDB database instead: Parquet blocks (a single
+file or a partitioned dataset) and the relationship file cache are scanned
+from disk, and DuckDB spills to ``data/cache/duckdb`` past its memory limit.
+Only the final block table is materialized in pandas, with the dtypes the
+pandas engine produces, so both engines write identical artifacts.
+
+DuckDB is an optional dependency (``pip install duckdb``).
+"""
+
+import importlib
+import logging
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from config.defaults import DEFAULT_DUCKDB_MEMORY_LIMIT
+from exceptions import ConfigurationError, DataError, ValidationError
+from utils.io import county_filters, list_partition_files
+from utils.schema import GEOID_LENGTHS, is_id_column, normalize_geoids
+
+if TYPE_CHECKING:
+    import duckdb
+else:  # Optional dependency
+    duckdb = importlib.import_module("duckdb") if find_spec("duckdb") else None
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("pandas", "duckdb")
+
+
+def check_engine(engine: str) -> None:
+    """Check that an engine name is known and its dependency is installed.
+
+    Raises:
+        ConfigurationError: If the engine is unknown or duckdb is not installed
+    """
+    if engine not in ENGINES:
+        raise ConfigurationError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    if engine == "duckdb" and duckdb is None:
+        raise ConfigurationError(
+            "The duckdb engine requires the duckdb package (pip install duckdb)"
+        )
+
+
+def connect(
+    memory_limit: str = DEFAULT_DUCKDB_MEMORY_LIMIT,
+    temp_dir: str | Path | None = None,
+):
+    """Open an in-process DuckDB database that spills to disk.
+
+    Args:
+        memory_limit: DuckDB memory limit (default: "4GB")
+        temp_dir: Spill directory (default: data/cache/duckdb)
+
+    Returns:
+        DuckDB connection
+    """
+    check_engine("duckdb")
+    if temp_dir is None:
+        project_root = Path(__file__).parent.parent.parent
+        temp_dir = project_root / "data" / "cache" / "duckdb"
+    # DuckDB creates the spill directory itself, but only once it needs it
+    Path(temp_dir).parent.mkdir(parents=True, exist_ok=True)
+
+    con = duckdb.connect()
+    con.execute(f"SET memory_limit = {_literal(memory_limit)}")
+    con.execute(f"SET temp_directory = {_literal(temp_dir)}")
+    return con
+
+
+def _literal(value) -> str:
+    """Quote a value as a SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _ident(name: str) -> str:
+    """Quote a column name as a SQL identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _left_joined(dtypes: pd.Series, missing: bool) -> pd.Series:
+    """Dtypes of right-hand columns after a pandas left join with unmatched rows."""
+    if not missing:
+        return dtypes
+
+    def joined(dtype):
+        if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+            return np.dtype(np.float64)
+        if isinstance(dtype, np.dtype) and dtype.kind == "b":
+            return np.dtype(object)
+        return dtype
+
+    return dtypes.map(joined)
+
+
+def _block_files(blocks_path: str | Path, counties: list[str] | None) -> list[Path]:
+    """List the Parquet files holding the blocks to read."""
+    if Path(blocks_path).is_dir():
+        files = [
+            file
+            for file, _ in list_partition_files(
+                blocks_path, county_filters(counties) if counties else None
+            )
+        ]
+        if not files:
+            raise DataError(f"No partitions of {blocks_path} match counties {counties}")
+        return files
+    if counties:
+        raise ValidationError("counties require a partitioned blocks dataset")
+    if not str(blocks_path).endswith(".parquet"):
+        raise ConfigurationError(
+            f"The duckdb engine reads Parquet blocks, not {blocks_path} (use the pandas engine)"
+        )
+    return [Path(blocks_path)]
+
+
+def _blocks_query(files: list[Path]) -> tuple[str, pd.Series]:
+    """Build the block scan and the dtypes pandas would read it with.
+
+    Rows carry an ordinal (file, row), so "first" aggregations follow file
+    order as in pandas.
+
+    Raises:
+        ConfigurationError: If the blocks carry inline geometry
+    """
+    schema = pq.read_schema(str(files[0]))
+    if b"geo" in (schema.metadata or {}):
+        raise ConfigurationError(
+            "The duckdb engine needs attribute-only blocks; geometry is attached "
+            "from the geometry store (run without --inline-geometry)"
+        )
+    # Column layout as pandas reads it, without stored index columns
+    dtypes = schema.empty_table().to_pandas().dtypes
+
+    select = ", ".join(
+        (
+            f"CAST({_ident(col)} AS BIGINT) AS {_ident(col)}"
+            if str(col).startswith("GEOID")
+            else _ident(col)
+        )
+        for col in dtypes.index
+    )
+    query = " UNION ALL ".join(
+        f"SELECT {select}, ({i}::BIGINT << 40) + file_row_number AS _ord "
+        f"FROM read_parquet({_literal(file)}, file_row_number = true)"
+        for i, file in enumerate(files)
+    )
+    dtypes[[col for col in dtypes.index if str(col).startswith("GEOID")]] = np.dtype(np.int64)
+    return query, dtypes
+
+
+def _to_pandas(result: pd.DataFrame, dtypes: pd.Series, missing_cols: list[str]) -> pd.DataFrame:
+    """Cast a DuckDB result to pandas engine dtypes.
+
+    Args:
+        result: DuckDB result indexed like the pandas output
+        dtypes: Expected dtype of each column
+        missing_cols: Columns pandas fills with NaN for unmatched join rows
+    """
+    for col, dtype in dtypes.items():
+        if pd.api.types.is_object_dtype(dtype) and col in missing_cols:
+            values = result[col].astype(object)
+            result[col] = values.where(values.notna(), np.nan)
+        else:
+            result[col] = result[col].astype(dtype)
+    return result
+
+
+def crosswalk_cejst(
+    relationships_path: str | Path,
+    cejst: pd.DataFrame,
+    columns: list[str],
+    memory_limit: str = DEFAULT_DUCKDB_MEMORY_LIMIT,
+    temp_dir: str | Path | None = None,
+) -> pd.DataFrame:
+    """Map CEJST tract indicators to 2020 blocks, scanning relationships from disk.
+
+    Same result as ``merging.analysis.crosswalk_cejst``, with the relationship
+    rows read from their Parquet cache (see ``get_block_relationships_path``).
+
+    Args:
+        relationships_path: Parquet relationship cache
+        cejst: CEJST data with GEOID10 and indicator columns
+        columns: Indicator columns
+        memory_limit: DuckDB memory limit (default: "4GB")
+        temp_dir: Spill directory (default: data/cache/duckdb)
+
+    Returns:
+        DataFrame indexed by GEOID20 with one integer column per indicator
+    """
+    con = connect(memory_limit, temp_dir)
+    con.register("cejst", normalize_geoids(pd.DataFrame(cejst[["GEOID10", *columns]])))
+
+    sums = []
+    values = []
+    for i, col in enumerate(columns):
+        valid = f"c.{_ident(col)} IS NOT NULL AND isfinite(r.WEIGHT)"
+        sums.append(
+            f"fsum(CASE WHEN {valid} THEN CAST(c.{_ident(col)} AS DOUBLE) * r.WEIGHT "
+            f"ELSE 0 END) AS num_{i}, "
+            f"fsum(CASE WHEN {valid} THEN r.WEIGHT ELSE 0 END) AS den_{i}"
+        )
+        values.append(f"CASE WHEN den_{i} > 0 THEN ceil(num_{i} / den_{i}) END AS {_ident(col)}")
+
+    query = f"""
+        WITH r AS (
+            SELECT GEOID10, GEOID20,
+                (AREALAND_INT + AREAWATER_INT) / (AREALAND_2020 + AREAWATER_2020) AS WEIGHT
+            FROM read_parquet({_literal(relationships_path)})
+        ),
+        sums AS (
+            SELECT r.GEOID20, {", ".join(sums)}
+            FROM r LEFT JOIN cejst c ON r.GEOID10 = c.GEOID10
+            GROUP BY r.GEOID20
+        )
+        SELECT GEOID20, {", ".join(values)} FROM sums ORDER BY GEOID20
+    """
+    cejst_block = con.sql(query).df().set_index("GEOID20")
+    con.close()
+
+    if cejst_block.isna().any().any():
+        logger.warning("Some blocks have no CEJST values; leaving them missing")
+        return cejst_block.astype("Int64")
+    return cejst_block.astype(np.int64)
+
+
+def merge_ejblocks(
+    blocks_path: str | Path,
+    census_data: pd.DataFrame,
+    cejst_block: pd.DataFrame,
+    counties: list[str] | None = None,
+    memory_limit: str = DEFAULT_DUCKDB_MEMORY_LIMIT,
+    temp_dir: str | Path | None = None,
+) -> pd.DataFrame:
+    """Join blocks with census and CEJST data and aggregate by GEOID20 in DuckDB.
+
+    Matches the pandas engine of ``create_ejblocks`` up to demographics:
+    GEOID_grp and GEOID_tract prefixes, a left census join, POPDENSE, the
+    ``dissolve_by_key`` aggregation (numeric sums, first non-missing value
+    otherwise) and a left CEJST join.
+
+    Args:
+        blocks_path: Attribute-only Parquet blocks file or partitioned dataset
+        census_data: Census data with a GEOID20 column
+        cejst_block: Block-level CEJST data indexed by GEOID20
+        counties: Optional 5-digit county FIPS codes to read (datasets only)
+        memory_limit: DuckDB memory limit (default: "4GB")
+        temp_dir: Spill directory (default: data/cache/duckdb)
+
+    Returns:
+        DataFrame indexed by GEOID20, sorted by GEOID20
+    """
+    blocks_query, block_dtypes = _blocks_query(_block_files(blocks_path, counties))
+    census = normalize_geoids(census_data.copy())
+    cejst = normalize_geoids(cejst_block.copy()).rename_axis("GEOID20").reset_index()
+    census_cols = [col for col in census.columns if col != "GEOID20"]
+    cejst_cols = [col for col in cejst.columns if col != "GEOID20"]
+
+    con = connect(memory_limit, temp_dir)
+    con.register("census", census)
+    con.register("cejst", cejst)
+
+    grp_digits = GEOID_LENGTHS["block"] - GEOID_LENGTHS["block_group"]
+    tract_digits = GEOID_LENGTHS["block"] - GEOID_LENGTHS["tract"]
+    merged_dtypes = pd.concat(
+        [
+            block_dtypes,
+            pd.Series(np.dtype(np.int64), index=["GEOID_grp", "GEOID_tract"]),
+            census.dtypes[census_cols],
+            pd.Series(np.dtype(np.float64), index=["POPDENSE"]),
+        ]
+    )
+    numeric_cols = [
+        col
+        for col, dtype in merged_dtypes.items()
+        if col != "GEOID20" and not is_id_column(col) and pd.api.types.is_numeric_dtype(dtype)
+        if not pd.api.types.is_bool_dtype(dtype)
+    ]
+
+    aggregations = []
+    for col, dtype in merged_dtypes.items():
+        if col == "GEOID20":
+            continue
+        if col in numeric_cols:
+            sql_type = "BIGINT" if pd.api.types.is_integer_dtype(dtype) else "DOUBLE"
+            aggregations.append(f"CAST(coalesce(sum({_ident(col)}), 0) AS {sql_type})")
+        else:
+            aggregations.append(
+                f"arg_min({_ident(col)}, _ord) FILTER (WHERE {_ident(col)} IS NOT NULL)"
+            )
+        aggregations[-1] += f" AS {_ident(col)}"
+
+    census_select = ", ".join(f"c.{_ident(col)}" for col in census_cols)
+    query = f"""
+        WITH blocks AS ({blocks_query}),
+        merged AS (
+            SELECT b.*,
+                b.GEOID20 // {10**grp_digits} AS GEOID_grp,
+                b.GEOID20 // {10**tract_digits} AS GEOID_tract,
+                {census_select + "," if census_cols else ""}
+                CAST(c.P1_001N AS DOUBLE) / CAST(b.ALAND20 AS DOUBLE) AS _density,
+                c.GEOID20 IS NULL AS _no_census
+            FROM blocks b LEFT JOIN census c ON b.GEOID20 = c.GEOID20
+        ),
+        dense AS (
+            SELECT * EXCLUDE (_density),
+                CASE WHEN isnan(_density) OR _density = 'inf'::DOUBLE THEN NULL
+                    ELSE _density END AS POPDENSE
+            FROM merged
+        ),
+        dissolved AS (
+            SELECT GEOID20, {", ".join(aggregations)}, bool_or(_no_census) AS _no_census
+            FROM dense GROUP BY GEOID20
+        )
+        SELECT d.*, {", ".join(f"j.{_ident(col)}" for col in cejst_cols)},
+            j.GEOID20 IS NULL AS _no_cejst
+        FROM dissolved d LEFT JOIN cejst j ON d.GEOID20 = j.GEOID20
+        ORDER BY d.GEOID20
+    """
+    logger.info(f"Merging blocks with census and CEJST data in DuckDB ({memory_limit} limit)")
+    result = con.sql(query).df().set_index("GEOID20")
+    con.close()
+
+    no_census = bool(result.pop("_no_census").any())
+    no_cejst = bool(result.pop("_no_cejst").any())
+    merged_dtypes[census_cols] = _left_joined(census.dtypes[census_cols], no_census)
+    dtypes = pd.concat(
+        [merged_dtypes.drop("GEOID20"), _left_joined(cejst.dtypes[cejst_cols], no_cejst)]
+    )
+    missing_cols = (census_cols if no_census else []) + (cejst_cols if no_cejst else [])
+    result = _to_pandas(result, dtypes, missing_cols)
+    result.index = result.index.astype(np.int64)
+    return result
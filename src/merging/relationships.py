@@ -0,0 +1,157 @@
+"""Census 2010 to 2020 block relationship file loading."""
+
+import hashlib
+import logging
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv
+
+logger = logging.getLogger(__name__)
+
+# Code columns joined into GEOIDs, read as strings to preserve leading zeros
+_CODE_COLUMNS = [
+    "STATE_2010",
+    "COUNTY_2010",
+    "TRACT_2010",
+    "BLK_2010",
+    "STATE_2020",
+    "COUNTY_2020",
+    "TRACT_2020",
+    "BLK_2020",
+]
+# Area columns needed for area-weighted crosswalks
+_AREA_COLUMNS = ["AREALAND_2020", "AREAWATER_2020", "AREALAND_INT", "AREAWATER_INT"]
+# Bumped when the cached table layout changes
+_CACHE_VERSION = 2
+
+
+def read_block_relationships(relationship_file_path: str | Path) -> pd.DataFrame:
+    """Parse a pipe-delimited Census block relationship file.
+
+    Reads only the code and area columns with the multithreaded pyarrow CSV
+    reader and builds the GEOIDs with vectorized string joins, stored as
+    int64 (see ``utils.schema``).
+
+    Args:
+        relationship_file_path: Path to relationship file (tab2010_tab2020_st*_*.txt)
+
+    Returns:
+        DataFrame with GEOID10 (2010 tract), GEOID10_blk, GEOID20 and area columns
+    """
+    table = csv.read_csv(
+        str(relationship_file_path),
+        parse_options=csv.ParseOptions(delimiter="|"),
+        convert_options=csv.ConvertOptions(
+            include_columns=_CODE_COLUMNS + _AREA_COLUMNS,
+            column_types={
+                **dict.fromkeys(_CODE_COLUMNS, pa.string()),
+                **dict.fromkeys(_AREA_COLUMNS, pa.float64()),
+            },
+        ),
+    )
+
+    def join(*columns: str) -> pa.ChunkedArray:
+        return pc.cast(
+            pc.binary_join_element_wise(*(table[col] for col in columns), ""), pa.int64()
+        )
+
+    geoids = pa.table(
+        {
+            "GEOID10": join("STATE_2010", "COUNTY_2010", "TRACT_2010"),
+            "GEOID10_blk": join("STATE_2010", "COUNTY_2010", "TRACT_2010", "BLK_2010"),
+            "GEOID20": join("STATE_2020", "COUNTY_2020", "TRACT_2020", "BLK_2020"),
+        }
+    )
+    for col in _AREA_COLUMNS:
+        geoids = geoids.append_column(col, table[col])
+    return geoids.to_pandas()
+
+
+def _get_cache_path(
+    relationship_file_path: str | Path,
+    cache_dir: str | Path | None = None,
+) -> Path:
+    """Get cache file path for a parsed relationship file.
+
+    The key is built from the resolved path, size and modification time, so a
+    replaced file is parsed again without hashing its contents on every run.
+
+    Args:
+        relationship_file_path: Path to relationship file
+        cache_dir: Optional cache directory (default: data/cache/relationships)
+
+    Returns:
+        Path to cache file
+    """
+    if cache_dir is None:
+        project_root = Path(__file__).parent.parent.parent
+        cache_dir = project_root / "data" / "cache" / "relationships"
+    else:
+        cache_dir = Path(cache_dir)
+
+    path = Path(relationship_file_path).resolve()
+    stat = path.stat()
+    cache_key = f"{path}_{stat.st_size}_{stat.st_mtime_ns}_v{_CACHE_VERSION}"
+    cache_hash = hashlib.md5(cache_key.encode(), usedforsecurity=False).hexdigest()  # noqa: S324
+    return cache_dir / f"{path.stem}_{cache_hash}.parquet"
+
+
+def _parse_to_cache(relationship_file_path: str | Path, cache_path: Path) -> pd.DataFrame:
+    """Parse a relationship file and write its Parquet cache."""
+    logger.info(f"Parsing relationship file: {relationship_file_path}")
+    relationships = read_block_relationships(relationship_file_path)
+    logger.info(f"Parsed {len(relationships)} relationship rows")
+
+    logger.info(f"Caching relationship file to: {cache_path}")
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    relationships.to_parquet(cache_path, index=False)
+    return relationships
+
+
+def load_block_relationships(
+    relationship_file_path: str | Path,
+    cache_dir: str | Path | None = None,
+    refresh_cache: bool = False,
+) -> pd.DataFrame:
+    """Load a Census block relationship file, using a typed Parquet cache.
+
+    Args:
+        relationship_file_path: Path to relationship file (tab2010_tab2020_st*_*.txt)
+        cache_dir: Optional cache directory (default: data/cache/relationships)
+        refresh_cache: If True, parse the text file even if a cache exists
+
+    Returns:
+        DataFrame with GEOID10 (2010 tract), GEOID10_blk, GEOID20 and area columns
+    """
+    cache_path = _get_cache_path(relationship_file_path, cache_dir)
+    if not refresh_cache and cache_path.exists():
+        logger.info(f"Loading relationship file from cache: {cache_path}")
+        return pd.read_parquet(cache_path)
+    return _parse_to_cache(relationship_file_path, cache_path)
+
+
+def get_block_relationships_path(
+    relationship_file_path: str | Path,
+    cache_dir: str | Path | None = None,
+    refresh_cache: bool = False,
+) -> Path:
+    """Get the Parquet cache of a relationship file, parsing it if needed.
+
+    For readers that scan the cache directly (e.g. the DuckDB engine) instead
+    of holding the relationship rows in memory.
+
+    Args:
+        relationship_file_path: Path to relationship file (tab2010_tab2020_st*_*.txt)
+        cache_dir: Optional cache directory (default: data/cache/relationships)
+        refresh_cache: If True, parse the text file even if a cache exists
+
+    Returns:
+        Path to the Parquet cache file
+    """
+    cache_path = _get_cache_path(relationship_file_path, cache_dir)
+    if refresh_cache or not cache_path.exists():
+        _parse_to_cache(relationship_file_path, cache_path)
+    return cache_path
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Prefetch block-level Census fields into the shared cache store.
+
+Fills ``data/cache/census`` (see ``merging.census_store``) for several states
+ahead of pipeline runs, by default all New England states and the pipeline's
+census fields. Fields that are already cached are not fetched again, so the
+script can be rerun to add fields or resume an interrupted prefetch.
+
+Example:
+    python prefetch_census.py
+    python prefetch_census.py --states Maine 33 --fields P1_001N P1_003N --max-workers 4
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from config.defaults import (
+    DEFAULT_CENSUS_API_URL,
+    DEFAULT_CENSUS_DATASET,
+    DEFAULT_CENSUS_FIELDS,
+    DEFAULT_CENSUS_MAX_WORKERS,
+    DEFAULT_CENSUS_YEAR,
+)
+from config.regions import NEW_ENGLAND_STATES, get_region_config
+from exceptions import AccessError
+from merging.census_store import prefetch
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Prefetch block-level Census fields into data/cache/census"
+    )
+    parser.add_argument(
+        "--states",
+        nargs="+",
+        default=list(NEW_ENGLAND_STATES),
+        help="State names or FIPS codes (default: all New England states)",
+    )
+    parser.add_argument(
+        "--fields",
+        nargs="+",
+        default=DEFAULT_CENSUS_FIELDS,
+        help=f"Census fields (default: {' '.join(DEFAULT_CENSUS_FIELDS)})",
+    )
+    parser.add_argument(
+        "--year", type=int, default=DEFAULT_CENSUS_YEAR, help="Census year (default: 2020)"
+    )
+    parser.add_argument(
+        "--dataset",
+        default=DEFAULT_CENSUS_DATASET,
+        help=f"Census API dataset (default: {DEFAULT_CENSUS_DATASET})",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_CENSUS_MAX_WORKERS,
+        help=f"Concurrent county requests (default: {DEFAULT_CENSUS_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--api-key", help="Census API key (default: CENSUS_API_KEY environment variable)"
+    )
+    parser.add_argument("--cache-dir", help="Cache directory (default: data/cache/census)")
+    parser.add_argument("--base-url", default=DEFAULT_CENSUS_API_URL, help="Census API base URL")
+    parser.add_argument("--refresh", action="store_true", help="Fetch every field again")
+
+    args = parser.parse_args(argv)
+
+    states = []
+    for state in args.states:
+        config = get_region_config(state)
+        if config is None:
+            logger.error(f"Unknown state: {state}")
+            return 1
+        states.append(config.state_fips)
+
+    try:
+        counts = prefetch(
+            states,
+            args.fields,
+            year=args.year,
+            dataset=args.dataset,
+            api_key=args.api_key or os.getenv("CENSUS_API_KEY"),
+            max_workers=args.max_workers,
+            cache_dir=args.cache_dir,
+            refresh_cache=args.refresh,
+            base_url=args.base_url,
+        )
+    except AccessError as e:
+        logger.error(f"Prefetch failed: {e}")
+        return 1
+
+    logger.info(f"Cached {len(args.fields)} fields for {sum(counts.values()):,} blocks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
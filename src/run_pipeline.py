@@ -22,11 +22,20 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 
 from config.defaults import DEFAULT_H3_RESOLUTION_AREA, DEFAULT_TRAVEL_SPEED, DEFAULT_TRIP_TIMES
-from config.regions import get_region_config
+from config.regions import get_multi_state_config, get_region_config
 from exceptions import DataError, ProcessingError, ValidationError
 from h3_utils.relationship import generate_h3_relationship_area
 from merging.analysis import create_ejblocks
-from merging.blocks import dissolve_blocks, merge_walk_times
+from merging.blocks import (
+    dissolve_blocks,
+    load_walk_times_table,
+    merge_walk_times,
+    save_dissolved_blocks,
+    write_walk_times_partitioned,
+)
+from merging.duckdb_engine import ENGINES
+from utils.geometry import get_geometry_path, read_with_geometry, write_geometry_store
+from utils.io import read_table, write_partitioned
 from utils.validation import (
     validate_blocks_data,
     validate_file_exists,
@@ -35,6 +44,8 @@ from utils.validation import (
 )
 from visualization.figures import generate_all_figures
 from walk_times.calculate import process_walk_times
+from walk_times.regional import process_regional_walk_times
+from walk_times.scheduler import parse_memory_size
 
 # Set up logging
 logging.basicConfig(
@@ -53,9 +64,9 @@ def check_required_files(region_config) -> bool:
     logger.info("Checking required files...")
 
     required_files = [
-        ("Graph", Path("data/graphs/maine_walk.graphml")),
+        ("Graph", region_config.get_graph_path()),
         ("Blocks", region_config.get_blocks_path(with_nodes=True)),
-        ("Conserved Lands", Path("data/conserved_lands/Maine_Conserved_Lands_with_nodes.shp.zip")),
+        ("Conserved Lands", region_config.get_conserved_lands_path(with_nodes=True)),
         ("CEJST", Path("data/cejst-me.zip")),
         ("Relationship File", region_config.get_relationship_file_path()),
     ]
@@ -84,6 +95,14 @@ def run_pipeline(
     skip_visualization: bool = False,
     skip_h3: bool = False,
     n_jobs: int = -1,
+    states: list[str] | None = None,
+    regional_mode: str = "partitioned",
+    max_memory: str | None = None,
+    inline_geometry: bool = False,
+    partitioned: bool = False,
+    counties: list[str] | None = None,
+    engine: str = "pandas",
+    category_col: str | None = None,
 ) -> bool:
     """Run the complete analysis pipeline.
 
@@ -96,6 +115,22 @@ def run_pipeline(
         skip_visualization: Skip visualization step
         skip_h3: Skip H3 processing step
         n_jobs: Number of parallel workers for walk times (-1 = all CPUs, 1 = serial)
+        states: Optional list of states to route together with ``state``, so blocks
+            near a state line see lands across it (default: None, single state)
+        regional_mode: "partitioned" or "merged" (see ``walk_times.regional``)
+        max_memory: Optional memory cap for walk time workers (e.g. "8G"); the
+            worker count is fitted to it and submissions are throttled near it
+        inline_geometry: Keep block polygons in the merge, dissolve and ejblocks
+            artifacts instead of the geometry store (data/geometry)
+        partitioned: Write blocks, walk times, merge, dissolve and ejblocks as
+            datasets partitioned by state and county under data/datasets
+        counties: Optional 5-digit county FIPS codes; merging and analysis read
+            and rewrite only these partitions (implies ``partitioned``)
+        engine: "pandas" or "duckdb" for the census/CEJST stage of the analysis
+            step; duckdb runs out of core and needs attribute-only blocks
+        category_col: Optional conserved lands column; acres reachable per category
+            are saved as AC_<cat>_<t> columns in
+            data/walk_times/category_access_block.parquet (single-state runs only)
 
     Returns:
         True if pipeline completed successfully, False otherwise
@@ -116,6 +151,30 @@ def run_pipeline(
 
     logger.info(f"Processing state: {region_config.state_name} (FIPS: {region_config.state_fips})")
 
+    # Other states routed together with the primary state in regional mode
+    regional_configs = []
+    if states:
+        try:
+            regional_configs = get_multi_state_config([state, *states])
+        except ValueError as e:
+            logger.error(str(e))
+            return False
+        if category_col:
+            logger.error("Category access is not supported in regional mode")
+            return False
+        regional_configs = list({c.state_fips: c for c in regional_configs}.values())
+        for config in regional_configs:
+            config.data_root = project_root / "data"
+        logger.info(
+            f"Regional mode ({regional_mode}): "
+            f"{', '.join(c.state_name for c in regional_configs)}"
+        )
+    conserved_lands_path = (
+        Path("data/conserved_lands/regional_conserved_lands.parquet")
+        if regional_configs
+        else region_config.get_conserved_lands_path(with_nodes=True)
+    )
+
     # Check required files
     if not check_required_files(region_config):
         return False
@@ -135,6 +194,8 @@ def run_pipeline(
     Path("figs").mkdir(parents=True, exist_ok=True)
 
     success = True
+    partitioned = partitioned or bool(counties)
+    datasets_root = Path("data/datasets")
 
     # Step 1: Calculate walk times
     if not skip_walk_times:
@@ -147,26 +208,43 @@ def run_pipeline(
 
             # Validation checkpoint: Validate input files
             logger.info("Validating input files for walk time calculation...")
-            validate_file_exists(Path("data/graphs/maine_walk.graphml"), "Graph file")
+            validate_file_exists(region_config.get_graph_path(), "Graph file")
             validate_file_exists(
                 region_config.get_blocks_path(with_nodes=True), "Blocks file with nodes"
             )
             validate_file_exists(
-                Path("data/conserved_lands/Maine_Conserved_Lands_with_nodes.shp.zip"),
+                region_config.get_conserved_lands_path(with_nodes=True),
                 "Conserved lands file",
             )
 
-            process_walk_times(
-                geography_type="blocks",
-                graph_path="data/graphs/maine_walk.graphml",
-                geography_path=region_config.get_blocks_path(with_nodes=True),
-                conserved_lands_path="data/conserved_lands/Maine_Conserved_Lands_with_nodes.shp.zip",
-                output_path=walk_times_output,
-                trip_times=DEFAULT_TRIP_TIMES,
-                travel_speed=DEFAULT_TRAVEL_SPEED,
-                region_config=region_config,
-                n_jobs=n_jobs,
-            )
+            if regional_configs:
+                process_regional_walk_times(
+                    regional_configs,
+                    output_path=walk_times_output,
+                    matrix_path=Path("data/walk_times/walk_times_block_matrix.npz"),
+                    trip_times=DEFAULT_TRIP_TIMES,
+                    travel_speed=DEFAULT_TRAVEL_SPEED,
+                    mode=regional_mode,
+                    lands_output_path=conserved_lands_path,
+                    n_jobs=n_jobs,
+                    max_memory=parse_memory_size(max_memory),
+                )
+            else:
+                process_walk_times(
+                    geography_type="blocks",
+                    graph_path=region_config.get_graph_path(),
+                    geography_path=region_config.get_blocks_path(with_nodes=True),
+                    conserved_lands_path=conserved_lands_path,
+                    output_path=walk_times_output,
+                    trip_times=DEFAULT_TRIP_TIMES,
+                    travel_speed=DEFAULT_TRAVEL_SPEED,
+                    region_config=region_config,
+                    n_jobs=n_jobs,
+                    matrix_path=Path("data/walk_times/walk_times_block_matrix.npz"),
+                    max_memory=parse_memory_size(max_memory),
+                    category_col=category_col,
+                    category_output_path=Path("data/walk_times/category_access_block.parquet"),
+                )
 
             # Validation checkpoint: Validate output
             logger.info("Validating walk times output...")
@@ -195,24 +273,46 @@ def run_pipeline(
         try:
             walk_times_path = Path("data/walk_times/walk_times_block_df.parquet")
             merge_output = Path("data/joins/block_merge.parquet")
+            dissolve_output = Path("data/joins/block_dissolve.parquet")
+            blocks_path = region_config.get_blocks_path(with_nodes=True)
+
+            # Write block polygons once; the artifacts below are attribute-only
+            if not inline_geometry and not get_geometry_path(region_config.state_fips).exists():
+                import geopandas as gpd
+
+                if str(blocks_path).endswith(".parquet"):
+                    blocks = gpd.read_parquet(blocks_path, columns=["GEOID20", "geometry"])
+                else:
+                    blocks = gpd.read_file(blocks_path)  # Fallback for existing shapefiles
+                write_geometry_store(blocks, region_config.state_fips)
+                del blocks
+
+            if partitioned:
+                walk_times_path, blocks_path = _write_partitioned_inputs(
+                    datasets_root,
+                    walk_times_path,
+                    blocks_path,
+                    refresh_walk_times=not skip_walk_times,
+                    with_geometry=inline_geometry,
+                )
+                merge_output = datasets_root / "block_merge"
+                dissolve_output = datasets_root / "block_dissolve"
 
             merge = merge_walk_times(
-                blocks_path=region_config.get_blocks_path(with_nodes=True),
+                blocks_path=blocks_path,
                 walk_times_path=walk_times_path,
-                conserved_lands_path="data/conserved_lands/Maine_Conserved_Lands_with_nodes.shp.zip",
+                conserved_lands_path=conserved_lands_path,
                 output_path=merge_output,
                 trip_times=DEFAULT_TRIP_TIMES,
                 region_config=region_config,
+                with_geometry=inline_geometry,
+                counties=counties,
             )
             logger.info(f"✓ Merged walk times: {merge_output}")
 
             # Dissolve blocks
-            dissolve_output = Path("data/joins/block_dissolve.parquet")
             dissolved = dissolve_blocks(merge, groupby_col="GEOID20")
-            if str(dissolve_output).endswith(".parquet"):
-                dissolved.to_parquet(str(dissolve_output))
-            else:
-                dissolved.to_file(str(dissolve_output))  # Fallback for shapefile output
+            save_dissolved_blocks(dissolved, dissolve_output, groupby_col="GEOID20")
             logger.info(f"✓ Dissolved blocks: {dissolve_output}")
         except Exception as e:
             logger.error(f"✗ Error merging blocks: {e}")
@@ -229,6 +329,9 @@ def run_pipeline(
         try:
             blocks_path = Path("data/joins/block_dissolve.parquet")
             ejblocks_output = Path("data/joins/ejblocks.parquet")
+            if partitioned:
+                blocks_path = datasets_root / "block_dissolve"
+                ejblocks_output = datasets_root / "ejblocks"
 
             # Validation checkpoint: Validate input files
             logger.info("Validating input files for ejblocks creation...")
@@ -244,14 +347,14 @@ def run_pipeline(
                 output_path=ejblocks_output,
                 state_fips=region_config.state_fips,
                 region_config=region_config,
+                counties=counties,
+                engine=engine,
             )
 
             # Validation checkpoint: Validate ejblocks output
             logger.info("Validating ejblocks output...")
             validate_output_file(ejblocks_output)
-            import geopandas as gpd
-
-            ejblocks_gdf = gpd.read_parquet(ejblocks_output)
+            ejblocks_gdf = read_with_geometry(ejblocks_output).reset_index()
             validate_blocks_data(ejblocks_gdf)
 
             logger.info(f"✓ Created ejblocks: {ejblocks_output}")
@@ -270,7 +373,9 @@ def run_pipeline(
         logger.info("STEP 4: Generate Visualizations")
         logger.info("=" * 70)
 
-        ejblocks_path = Path("data/joins/ejblocks.parquet")
+        ejblocks_path = (
+            datasets_root / "ejblocks" if partitioned else Path("data/joins/ejblocks.parquet")
+        )
 
         # Check if ejblocks file exists
         if not ejblocks_path.exists():
@@ -337,6 +442,37 @@ def run_pipeline(
     return success
 
 
+def _write_partitioned_inputs(
+    datasets_root: Path,
+    walk_times_path: Path,
+    blocks_path: Path,
+    refresh_walk_times: bool,
+    with_geometry: bool,
+) -> tuple[Path, Path]:
+    """Write the blocks and walk times datasets partitioned by state and county.
+
+    Blocks are written once; walk times whenever they were recalculated.
+
+    Returns:
+        Tuple of (walk times dataset, blocks dataset)
+    """
+    blocks_dataset = datasets_root / "blocks"
+    walk_times_dataset = datasets_root / "walk_times"
+    if not blocks_dataset.exists():
+        logger.info(f"Partitioning blocks into {blocks_dataset}")
+        write_partitioned(
+            read_table(blocks_path, geometry=with_geometry, cache=False), blocks_dataset
+        )
+    if refresh_walk_times or not walk_times_dataset.exists():
+        logger.info(f"Partitioning walk times into {walk_times_dataset}")
+        write_walk_times_partitioned(
+            load_walk_times_table(walk_times_path),
+            read_table(blocks_path, columns=["GEOID20", "osmid"], geometry=False, cache=False),
+            walk_times_dataset,
+        )
+    return walk_times_dataset, blocks_dataset
+
+
 def main():
     """Main function."""
     import argparse
@@ -361,6 +497,47 @@ def main():
         default=-1,
         help="Number of parallel workers for walk time calculation (-1 = all CPUs, 1 = serial)",
     )
+    parser.add_argument(
+        "--states",
+        nargs="+",
+        help="Neighboring states to route together with --state (e.g. 'New Hampshire')",
+    )
+    parser.add_argument(
+        "--regional-mode",
+        choices=["partitioned", "merged"],
+        default="partitioned",
+        help="Route each state with a halo into its neighbors, or on one merged network",
+    )
+    parser.add_argument(
+        "--max-memory",
+        help="Memory cap for walk time workers, e.g. 8G (default: available memory)",
+    )
+
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="Write artifacts as datasets partitioned by state and county (data/datasets)",
+    )
+    parser.add_argument(
+        "--counties",
+        nargs="+",
+        help="5-digit county FIPS codes to rerun in a partitioned layout (e.g. 23005)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="pandas",
+        help="Engine for the census/CEJST stage; duckdb spills to disk (default: pandas)",
+    )
+    parser.add_argument(
+        "--category-col",
+        help="Conserved lands column to also split block access by (e.g. PUB_ACCESS)",
+    )
+    parser.add_argument(
+        "--inline-geometry",
+        action="store_true",
+        help="Keep block polygons in intermediate artifacts instead of data/geometry",
+    )
 
     args = parser.parse_args()
 
@@ -373,6 +550,14 @@ def main():
         skip_visualization=args.skip_visualization,
         skip_h3=args.skip_h3,
         n_jobs=args.n_jobs,
+        states=args.states,
+        regional_mode=args.regional_mode,
+        max_memory=args.max_memory,
+        inline_geometry=args.inline_geometry,
+        partitioned=args.partitioned,
+        counties=args.counties,
+        engine=args.engine,
+        category_col=args.category_col,
     )
 
     sys.exit(0 if success else 1)
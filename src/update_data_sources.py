@@ -17,6 +17,7 @@ import requests
 
 # Import from probe_data_sources
 from probe_data_sources import DATA_SOURCES, load_metadata, save_metadata
+from walk_times.routing_cache import get_routing_cache, get_routing_cache_path
 
 # Set up logging
 logging.basicConfig(
@@ -203,6 +204,15 @@ def update_osmnx_graphs(name: str, config: dict) -> bool:
         output_file = Path(f"data/graphs/{state_name}_{network_type}.graphml")
         output_file.parent.mkdir(parents=True, exist_ok=True)
 
+        # Keep a routing cache of the previous snapshot so walk times can be
+        # patched incrementally (walk_times.incremental.process_graph_update)
+        if output_file.exists():
+            get_routing_cache(output_file)  # Builds the cache if missing or stale
+            shutil.move(
+                get_routing_cache_path(output_file),
+                get_routing_cache_path(output_file, previous=True),
+            )
+
         ox.save_graphml(G, str(output_file))
 
         logging.info(f"{name}: Successfully downloaded graph with {len(G.nodes)} nodes")
@@ -0,0 +1,242 @@
+"""Geometry sidecar store so attribute tables never carry polygons.
+
+Polygons are written once per TIGER vintage, state and geography level as a
+GeoParquet file with just an int64 ``GEOID`` and the geometry, sorted along a
+Hilbert curve so nearby features share row groups::
+
+    data/geometry/block_2020_23.parquet
+    data/geometry/tract_2020_23.parquet
+
+Pipeline artifacts (merged blocks, dissolved blocks, ejblocks) can then be
+plain attribute Parquet, and ``attach_geometry`` joins the polygons back only
+when exporting or plotting.
+"""
+
+import logging
+from pathlib import Path
+
+import geopandas as gpd
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import ipc
+
+from exceptions import DataError
+from utils.io import ARROW_SUFFIXES, list_partition_files, read_table, write_parquet
+from utils.schema import geoid_prefix, geoid_to_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VINTAGE = 2020
+
+
+def _get_geometry_dir(geometry_dir: str | Path | None = None) -> Path:
+    """Get the geometry store directory (default: data/geometry)."""
+    if geometry_dir is None:
+        project_root = Path(__file__).parent.parent.parent
+        return project_root / "data" / "geometry"
+    return Path(geometry_dir)
+
+
+def get_geometry_path(
+    state_fips: str | int,
+    level: str = "block",
+    vintage: int = DEFAULT_VINTAGE,
+    geometry_dir: str | Path | None = None,
+) -> Path:
+    """Get the geometry store file of a state and geography level.
+
+    Args:
+        state_fips: State FIPS code
+        level: Geography level (default: "block")
+        vintage: TIGER vintage year (default: 2020)
+        geometry_dir: Optional store directory (default: data/geometry)
+
+    Returns:
+        Path to the GeoParquet file
+    """
+    state_fips = str(state_fips).zfill(2)
+    return _get_geometry_dir(geometry_dir) / f"{level}_{vintage}_{state_fips}.parquet"
+
+
+def has_geometry(path: str | Path) -> bool:
+    """Check whether a file carries geometry (GeoParquet or a vector file).
+
+    Args:
+        path: Path to a Parquet, Arrow IPC, shapefile or other vector file, or a
+            partitioned dataset directory
+
+    Returns:
+        False for CSV and Parquet files without GeoParquet metadata, True
+        otherwise (including unreadable files, so the regular reader reports
+        the error)
+    """
+    if Path(path).is_dir():
+        files = list_partition_files(path)
+        return has_geometry(files[0][0]) if files else True
+    name = str(path).lower()
+    if not name.endswith((".parquet", *ARROW_SUFFIXES)):
+        return not name.endswith(".csv")
+    try:
+        if name.endswith(".parquet"):
+            metadata = pq.read_schema(str(path)).metadata or {}
+        else:
+            with pa.memory_map(str(path)) as source:
+                metadata = ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return True
+    return b"geo" in metadata
+
+
+def read_attributes(path: str | Path) -> pd.DataFrame:
+    """Read a Parquet or vector file without its geometry columns.
+
+    Args:
+        path: Path to a Parquet, Arrow IPC, shapefile or other vector file
+
+    Returns:
+        DataFrame of the attribute columns (and the stored index, for Parquet)
+    """
+    return read_table(path, geometry=False)
+
+
+def read_with_geometry(
+    path: str | Path,
+    level: str = "block",
+    vintage: int = DEFAULT_VINTAGE,
+    geoid_col: str = "GEOID20",
+    geometry_dir: str | Path | None = None,
+) -> gpd.GeoDataFrame:
+    """Read a file as a GeoDataFrame, attaching stored geometry if it has none.
+
+    Args:
+        path: Path to a GeoParquet, attribute Parquet or vector file
+        level: Geography level of the GEOIDs (default: "block")
+        vintage: TIGER vintage year (default: 2020)
+        geoid_col: GEOID column or index name (default: "GEOID20")
+        geometry_dir: Optional store directory (default: data/geometry)
+
+    Returns:
+        GeoDataFrame
+    """
+    return attach_geometry(read_table(path), level, vintage, geoid_col, geometry_dir)
+
+
+def write_geometry_store(
+    gdf: gpd.GeoDataFrame,
+    state_fips: str | int,
+    level: str = "block",
+    vintage: int = DEFAULT_VINTAGE,
+    geoid_col: str = "GEOID20",
+    geoid_level: str = "block",
+    geometry_dir: str | Path | None = None,
+    overwrite: bool = False,
+) -> Path:
+    """Write the geometry of one state and level to the store.
+
+    Finer geometry can be dissolved into a coarser level on the way, e.g.
+    blocks into tracts with ``level="tract"``; that union runs once here
+    instead of in every pipeline run.
+
+    Args:
+        gdf: GeoDataFrame with a GEOID column (strings or int64)
+        state_fips: State FIPS code
+        level: Geography level to store (default: "block")
+        vintage: TIGER vintage year (default: 2020)
+        geoid_col: GEOID column of gdf (default: "GEOID20")
+        geoid_level: Geography level of gdf's GEOIDs (default: "block")
+        geometry_dir: Optional store directory (default: data/geometry)
+        overwrite: If True, rewrite an existing store file
+
+    Returns:
+        Path to the GeoParquet file
+
+    Raises:
+        DataError: If gdf's GEOIDs are not unique at their own level
+    """
+    path = get_geometry_path(state_fips, level, vintage, geometry_dir)
+    if path.exists() and not overwrite:
+        logger.info(f"Geometry store already exists: {path}")
+        return path
+
+    store = gpd.GeoDataFrame(
+        {"GEOID": geoid_prefix(gdf[geoid_col], level, from_level=geoid_level).to_numpy()},
+        geometry=gdf.geometry.to_numpy(),
+        crs=gdf.crs,
+    )
+    if store["GEOID"].duplicated().any():
+        if level == geoid_level:
+            raise DataError(f"Geometry for {path.name} has duplicate GEOIDs")
+        logger.info(f"Dissolving {geoid_level} geometry into {level}")
+        store = store.dissolve(by="GEOID").reset_index()
+
+    logger.info(f"Writing {len(store):,} {level} geometries to {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Hilbert-sorted with a bbox covering column, so spatial neighbors share row groups
+    write_parquet(store, path, index=False)
+    return path
+
+
+def read_geometry(
+    state_fips: str | int,
+    level: str = "block",
+    vintage: int = DEFAULT_VINTAGE,
+    geometry_dir: str | Path | None = None,
+) -> gpd.GeoDataFrame:
+    """Read the geometry of one state and level from the store.
+
+    Args:
+        state_fips: State FIPS code
+        level: Geography level (default: "block")
+        vintage: TIGER vintage year (default: 2020)
+        geometry_dir: Optional store directory (default: data/geometry)
+
+    Returns:
+        GeoDataFrame with "GEOID" and geometry columns
+
+    Raises:
+        DataError: If the store file does not exist
+    """
+    path = get_geometry_path(state_fips, level, vintage, geometry_dir)
+    if not path.exists():
+        raise DataError(f"Geometry store not found: {path} (see write_geometry_store)")
+    return gpd.read_parquet(path)
+
+
+def attach_geometry(
+    df: pd.DataFrame,
+    level: str = "block",
+    vintage: int = DEFAULT_VINTAGE,
+    geoid_col: str = "GEOID20",
+    geometry_dir: str | Path | None = None,
+) -> gpd.GeoDataFrame:
+    """Join stored geometry onto an attribute table.
+
+    The states to read are taken from the GEOIDs themselves, so multistate
+    tables work without extra arguments.
+
+    Args:
+        df: DataFrame with GEOIDs in geoid_col (column or index)
+        level: Geography level of the GEOIDs (default: "block")
+        vintage: TIGER vintage year (default: 2020)
+        geoid_col: GEOID column or index name (default: "GEOID20")
+        geometry_dir: Optional store directory (default: data/geometry)
+
+    Returns:
+        GeoDataFrame with df's rows, index and columns plus geometry
+    """
+    if isinstance(df, gpd.GeoDataFrame):
+        return df
+
+    geoids = geoid_to_int(df[geoid_col] if geoid_col in df.columns else df.index.to_series())
+    states = sorted({int(state) for state in geoid_prefix(geoids, "state", from_level=level)})
+    store = pd.concat(
+        [read_geometry(state, level, vintage, geometry_dir) for state in states],
+        ignore_index=True,
+    )
+
+    geometry = store.set_index("GEOID").geometry.reindex(geoids.to_numpy())
+    n_missing = int(geometry.isna().sum())
+    if n_missing:
+        logger.warning(f"{n_missing} of {len(df)} rows have no stored {level} geometry")
+    return gpd.GeoDataFrame(df, geometry=geometry.to_numpy(), crs=store.crs)
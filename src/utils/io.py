@@ -0,0 +1,623 @@
+"""Column-projected reads of pipeline artifacts.
+
+``read_table`` is the single entry point for GeoParquet, attribute Parquet,
+Arrow IPC and OGR vector files (shapefile zips, GeoPackages)::
+
+    blocks = read_table("data/joins/block_dissolve.parquet", columns=["GEOID20", "AC_10"])
+    lands = read_table(lands_path, columns=["osmid", "CALC_AC"], geometry=False)
+    near = read_table(blocks_path, bbox=(-7.8e6, 5.3e6, -7.7e6, 5.4e6))
+    big = read_table(path, filters=[("P1_001N", ">", 100)])
+
+- Parquet reads push column projection and ``filters`` (pyarrow DNF tuples or
+  an expression) down to the row groups; ``bbox`` uses the GeoParquet bbox
+  covering column when the file has one.
+- Arrow IPC files (``.arrow``/``.feather``) are memory-mapped, so intermediate
+  artifacts are paged in on demand instead of being copied into memory.
+- Shapefiles and other vector files are read through pyogrio's Arrow mode.
+
+``write_parquet`` is the matching writer: GeoDataFrames are sorted along a
+Hilbert curve and written as GeoParquet 1.1 with a bbox covering column, in
+small zstd-compressed row groups, so a county-sized bbox or GEOID filter only
+touches the row groups whose statistics overlap it.
+
+Multi-state artifacts can be written as Hive-partitioned datasets by state and
+county FIPS (``write_partitioned``)::
+
+    data/datasets/ejblocks/state=23/county=005/part-0.parquet
+
+``read_table`` on the dataset directory prunes partitions by ``state`` and
+``county`` filters (``county_filters(["23005"])``) before opening any file.
+
+Small results are kept in an in-process LRU keyed by path, modification time
+and read arguments, bounded by total size (``set_cache_size``, 256 MiB by
+default), so repeated reads of lookup tables parse the file once. Cached frames
+are returned as deep copies, so callers may modify them freely. One-shot reads
+of large tables (walk times, statewide blocks) pass ``cache=False``.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import cast
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pyogrio
+from pyarrow import ipc
+from pyproj import CRS
+
+from config.defaults import DEFAULT_PARQUET_COMPRESSION, DEFAULT_ROW_GROUP_SIZE
+from exceptions import DataError, ValidationError
+from utils.schema import geoid_prefix
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 256 * 2**20  # bytes
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+# Hive partition columns of datasets, derived from GEOIDs
+PARTITION_COLUMNS = ("state", "county")
+_PARTITION_WIDTHS = {"state": 2, "county": 3}
+
+_cache: OrderedDict[tuple, tuple[pd.DataFrame, int]] = OrderedDict()
+_cache_size = DEFAULT_CACHE_SIZE
+_cache_bytes = 0
+
+
+def set_cache_size(size: int) -> None:
+    """Set the total bytes of tables kept by ``read_table`` (0 disables caching)."""
+    global _cache_size
+    _cache_size = size
+    _evict()
+
+
+def clear_cache() -> None:
+    """Drop all tables kept by ``read_table``."""
+    global _cache_bytes
+    _cache.clear()
+    _cache_bytes = 0
+
+
+def _store(key: tuple, df: pd.DataFrame) -> bool:
+    """Keep a table in the cache unless it is larger than the whole cache."""
+    global _cache_bytes
+    # Geometry objects count as pointers, which is close enough for a bound
+    nbytes = int(df.memory_usage(index=True).sum())
+    if nbytes > _cache_size:
+        return False
+    _cache[key] = (df, nbytes)
+    _cache_bytes += nbytes
+    _evict()
+    return True
+
+
+def _evict() -> None:
+    """Drop least recently used tables until the cache fits its size."""
+    global _cache_bytes
+    while _cache and _cache_bytes > _cache_size:
+        _, (_, nbytes) = _cache.popitem(last=False)
+        _cache_bytes -= nbytes
+
+
+def _geo_metadata(metadata: dict | None) -> dict | None:
+    """Decode the GeoParquet "geo" metadata of a schema, if any."""
+    if not metadata or b"geo" not in metadata:
+        return None
+    return cast(dict, json.loads(metadata[b"geo"]))
+
+
+def _index_columns(metadata: dict | None) -> list[str]:
+    """Get the stored pandas index columns of a schema."""
+    if not metadata or b"pandas" not in metadata:
+        return []
+    pandas_metadata = json.loads(metadata[b"pandas"])
+    return [col for col in pandas_metadata.get("index_columns", []) if isinstance(col, str)]
+
+
+def _filter_expression(filters: list | pc.Expression | None):
+    """Convert DNF filter tuples to a pyarrow expression."""
+    return None if filters is None else pq.filters_to_expression(filters)
+
+
+def _select_columns(
+    schema: pa.Schema,
+    columns: list[str] | None,
+    geo: dict | None,
+    geometry: bool,
+) -> list[str]:
+    """Get the columns to read: the requested (or all) attributes plus geometry."""
+    geometry_columns = list(geo["columns"]) if geo else []
+    # Bbox covering columns are only used for filtering
+    skip = set(geometry_columns) | set(_index_columns(schema.metadata))
+    for column in geo["columns"].values() if geo else []:
+        skip.update(bounds[0] for bounds in column.get("covering", {}).get("bbox", {}).values())
+    if columns is None:
+        columns = [name for name in schema.names if name not in skip]
+    return list(columns) + (geometry_columns if geometry else [])
+
+
+def _to_frame(
+    table: pa.Table,
+    geometry_columns: dict[str, CRS | None],
+) -> pd.DataFrame | gpd.GeoDataFrame:
+    """Convert an Arrow table with WKB geometry columns to a (Geo)DataFrame."""
+    present = {name: crs for name, crs in geometry_columns.items() if name in table.column_names}
+    df = table.drop_columns(list(present)).to_pandas()
+    if not present:
+        return df
+    for name, crs in present.items():
+        wkb = table[name].to_numpy(zero_copy_only=False)
+        df[name] = gpd.GeoSeries.from_wkb(wkb, index=df.index, crs=crs)
+    return gpd.GeoDataFrame(df, geometry=next(iter(present)))
+
+
+def _geo_crs(column: dict) -> CRS | None:
+    """Get the CRS of a GeoParquet/GeoArrow column (OGC:CRS84 if unset, None if null)."""
+    crs = column.get("crs", "OGC:CRS84")
+    if crs is None:
+        return None
+    return CRS.from_json_dict(crs) if isinstance(crs, dict) else CRS.from_user_input(crs)
+
+
+def _filter_bbox(gdf: gpd.GeoDataFrame, bbox: tuple[float, float, float, float]):
+    """Keep features whose bounding box intersects bbox."""
+    xmin, ymin, xmax, ymax = bbox
+    return gdf.cx[xmin:xmax, ymin:ymax]
+
+
+def _read_parquet(path: Path, columns, bbox, filters, geometry: bool):
+    schema = pq.read_schema(str(path))
+    geo = _geo_metadata(schema.metadata)
+    if geo is None:
+        if bbox is not None:
+            raise ValidationError(f"{path} has no geometry to filter by bbox")
+        return pd.read_parquet(str(path), columns=columns, filters=filters)
+
+    selected = _select_columns(schema, columns, geo, geometry or bbox is not None)
+    if not (geometry or bbox is not None):
+        return pd.read_parquet(str(path), columns=selected, filters=filters)
+
+    primary = geo["primary_column"]
+    has_covering = "covering" in geo["columns"][primary]
+    # geopandas splices bbox into filters and cannot take filters=None with a bbox
+    gdf = gpd.read_parquet(
+        str(path),
+        columns=selected,
+        bbox=bbox if has_covering else None,
+        **({"filters": filters} if filters is not None else {}),
+    )
+    if bbox is not None and not has_covering:
+        gdf = _filter_bbox(gdf, bbox)
+    if not geometry:
+        return pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+    return gdf
+
+
+def _read_arrow_ipc(path: Path, columns, bbox, filters, geometry: bool):
+    # Memory-mapped: buffers point into the page cache instead of being copied
+    with pa.memory_map(str(path)) as source:
+        table = ipc.open_file(source).read_all()
+
+    geo = _geo_metadata(table.schema.metadata)
+    if geo is None and bbox is not None:
+        raise ValidationError(f"{path} has no geometry to filter by bbox")
+    selected = _select_columns(table.schema, columns, geo, geometry or bbox is not None)
+    table = table.select(selected + _index_columns(table.schema.metadata))
+    if filters is not None:
+        table = table.filter(_filter_expression(filters))
+
+    geometry_columns: dict[str, CRS | None] = (
+        {name: _geo_crs(column) for name, column in geo["columns"].items()} if geo else {}
+    )
+    df = _to_frame(table, geometry_columns)
+    if bbox is not None:
+        df = _filter_bbox(df, bbox)
+    if not geometry and isinstance(df, gpd.GeoDataFrame):
+        return pd.DataFrame(df.drop(columns=df.geometry.name))
+    return df
+
+
+def _read_vector(path: Path, columns, bbox, filters, geometry: bool):
+    meta, table = pyogrio.read_arrow(str(path), columns=columns, bbox=bbox, read_geometry=geometry)
+    if filters is not None:
+        table = table.filter(_filter_expression(filters))
+    if not geometry:
+        return table.to_pandas()
+    geometry_name = meta["geometry_name"] or "wkb_geometry"
+    table = table.rename_columns(
+        ["geometry" if name == geometry_name else name for name in table.column_names]
+    )
+    return _to_frame(table, {"geometry": CRS.from_user_input(meta["crs"]) if meta["crs"] else None})
+
+
+def read_table(
+    path: str | Path,
+    columns: list[str] | None = None,
+    bbox: tuple[float, float, float, float] | None = None,
+    filters: list | pc.Expression | None = None,
+    geometry: bool = True,
+    cache: bool = True,
+) -> pd.DataFrame | gpd.GeoDataFrame:
+    """Read a pipeline artifact, projecting columns and pushing filters down.
+
+    Args:
+        path: Path to a Parquet, Arrow IPC (.arrow/.feather) or OGR vector file,
+            or a partitioned dataset directory (see ``read_dataset``)
+        columns: Optional attribute columns to read (default: all); geometry is
+            added when ``geometry`` is True
+        bbox: Optional (xmin, ymin, xmax, ymax) in the file's CRS; keeps
+            features whose bounding box intersects it
+        filters: Optional row filters as pyarrow DNF tuples, e.g.
+            ``[("GEOID20", ">=", 230050000000000)]``, or a pyarrow expression
+        geometry: If False, skip geometry columns and return a DataFrame
+        cache: If True, reuse (and keep) the result in the in-process LRU;
+            pass False for one-shot reads of large tables
+
+    Returns:
+        GeoDataFrame if geometry was read, DataFrame otherwise
+
+    Raises:
+        ValidationError: If bbox is given for a file without geometry
+    """
+    path = Path(path)
+    if path.is_dir():
+        return read_dataset(path, columns, bbox, filters, geometry, cache)
+    stat = path.stat()
+    key = (
+        str(path.resolve()),
+        stat.st_mtime_ns,
+        stat.st_size,
+        tuple(columns) if columns is not None else None,
+        tuple(bbox) if bbox is not None else None,
+        str(_filter_expression(filters)),
+        geometry,
+    )
+    if cache and key in _cache:
+        _cache.move_to_end(key)
+        logger.debug(f"Reusing cached table: {path}")
+        return _cache[key][0].copy(deep=True)
+
+    name = path.name.lower()
+    if name.endswith(".parquet"):
+        df = _read_parquet(path, columns, bbox, filters, geometry)
+    elif name.endswith(ARROW_SUFFIXES):
+        df = _read_arrow_ipc(path, columns, bbox, filters, geometry)
+    else:
+        df = _read_vector(path, columns, bbox, filters, geometry)  # Shapefiles, zips, etc.
+    logger.debug(f"Read {len(df):,} rows x {len(df.columns)} columns from {path}")
+
+    if cache and _store(key, df):
+        return df.copy(deep=True)
+    return df
+
+
+def read_columns(path: str | Path, columns: list[str]) -> pd.DataFrame:
+    """Read only the requested attribute columns from a Parquet, CSV or vector file."""
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(str(path), columns=columns)
+    if str(path).endswith(".csv"):
+        return pd.read_csv(str(path), usecols=columns)
+    return pd.DataFrame(gpd.read_file(str(path), columns=columns, ignore_geometry=True))
+
+
+def hilbert_sort(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """Sort rows along a Hilbert curve so spatial neighbors are stored together.
+
+    Rows with missing or empty geometry are kept, at the end.
+
+    Args:
+        gdf: GeoDataFrame
+
+    Returns:
+        Reordered GeoDataFrame (index preserved)
+    """
+    valid = (~(gdf.geometry.isna() | gdf.geometry.is_empty)).to_numpy()
+    if not valid.any():
+        return gdf
+    distances = np.full(len(gdf), np.iinfo(np.int64).max, dtype=np.int64)
+    distances[valid] = gdf.geometry[valid].hilbert_distance().to_numpy()
+    return gdf.iloc[np.argsort(distances, kind="stable")]
+
+
+def write_parquet(
+    df: pd.DataFrame | gpd.GeoDataFrame,
+    path: str | Path,
+    index: bool | None = None,
+    sort: bool = True,
+    covering: bool = True,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = DEFAULT_PARQUET_COMPRESSION,
+    metadata: dict[bytes, bytes] | None = None,
+) -> None:
+    """Write a (Geo)Parquet artifact laid out for filtered reads.
+
+    Args:
+        df: DataFrame or GeoDataFrame
+        path: Output path
+        index: Whether to store the index (default: pandas/geopandas default)
+        sort: Hilbert-sort GeoDataFrame rows (default: True)
+        covering: Write a GeoParquet 1.1 bbox covering column (default: True)
+        row_group_size: Rows per row group (default: 8192)
+        compression: Parquet compression codec (default: "zstd")
+        metadata: Optional extra schema metadata (e.g. ``UNIQUE_KEY_METADATA``)
+    """
+    options = {"index": index, "compression": compression, "row_group_size": row_group_size}
+    if isinstance(df, gpd.GeoDataFrame):
+        if sort:
+            df = hilbert_sort(df)
+        df.to_parquet(str(path), write_covering_bbox=covering, schema_version="1.1.0", **options)
+    else:
+        df.to_parquet(str(path), **options)
+
+    if metadata:
+        # (Geo)pandas writers take no extra metadata, so rewrite the schema
+        table = pq.read_table(str(path))
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+        pq.write_table(table, str(path), compression=compression, row_group_size=row_group_size)
+
+
+def count_row_groups(
+    path: str | Path,
+    bbox: tuple[float, float, float, float] | None = None,
+) -> tuple[int, int]:
+    """Count the row groups of a GeoParquet file that a bbox read would touch.
+
+    Uses the min/max statistics of the bbox covering column.
+
+    Args:
+        path: Path to a GeoParquet file
+        bbox: Optional (xmin, ymin, xmax, ymax); None counts all row groups
+
+    Returns:
+        Tuple of (row groups touched, total row groups); without a covering
+        column every row group is touched
+    """
+    parquet = pq.ParquetFile(str(path))
+    n_groups = parquet.metadata.num_row_groups
+    geo = _geo_metadata(parquet.schema_arrow.metadata)
+    if bbox is None or geo is None:
+        return n_groups, n_groups
+    covering = geo["columns"][geo["primary_column"]].get("covering", {}).get("bbox")
+    if covering is None:
+        return n_groups, n_groups
+
+    paths = {key: ".".join(value) for key, value in covering.items()}
+    names = [parquet.schema.column(i).path for i in range(parquet.metadata.num_columns)]
+    positions = {key: names.index(value) for key, value in paths.items()}
+    xmin, ymin, xmax, ymax = bbox
+    touched = 0
+    for i in range(n_groups):
+        group = parquet.metadata.row_group(i)
+        stats = {key: group.column(pos).statistics for key, pos in positions.items()}
+        if any(stat is None or not stat.has_min_max for stat in stats.values()) or not (
+            stats["xmin"].min > xmax
+            or stats["xmax"].max < xmin
+            or stats["ymin"].min > ymax
+            or stats["ymax"].max < ymin
+        ):
+            touched += 1
+    return touched, n_groups
+
+
+def write_table(df: pd.DataFrame | gpd.GeoDataFrame, path: str | Path) -> None:
+    """Write a pipeline artifact in the format given by its suffix.
+
+    Arrow IPC output is uncompressed so ``read_table`` can memory-map it.
+
+    Args:
+        df: DataFrame or GeoDataFrame
+        path: Output path (.parquet, .arrow/.feather, or an OGR vector format)
+    """
+    name = str(path).lower()
+    if name.endswith(".parquet"):
+        write_parquet(df, path)
+    elif name.endswith(ARROW_SUFFIXES):
+        if isinstance(df, gpd.GeoDataFrame):
+            df.to_feather(str(path), compression="uncompressed")
+        else:
+            table = pa.Table.from_pandas(df)
+            with ipc.new_file(str(path), table.schema) as writer:
+                writer.write_table(table)
+    else:
+        df.to_file(str(path))  # Fallback for shapefile output
+
+
+def is_dataset(path: str | Path) -> bool:
+    """Check whether a path names a partitioned dataset (a directory, or no suffix)."""
+    path = Path(path)
+    return path.is_dir() or not path.suffix
+
+
+def partition_keys(geoids: pd.Series | pd.Index, level: str = "block") -> pd.DataFrame:
+    """Get the state and county partition values of GEOIDs.
+
+    Args:
+        geoids: GEOIDs (strings or int64) at level
+        level: Geography level of the GEOIDs (default: "block")
+
+    Returns:
+        DataFrame with zero-padded "state" (2 digits) and "county" (3 digits) columns
+    """
+    counties = np.asarray(geoid_prefix(geoids, "county", from_level=level), dtype=np.int64)
+    return pd.DataFrame(
+        {
+            "state": pd.Series(counties // 1000).astype(str).str.zfill(2).to_numpy(),
+            "county": pd.Series(counties % 1000).astype(str).str.zfill(3).to_numpy(),
+        }
+    )
+
+
+def county_filters(counties: Sequence[str | int]) -> list[list[tuple]]:
+    """Build partition filters selecting counties by 5-digit FIPS code.
+
+    Args:
+        counties: County FIPS codes, e.g. ["23005", "33001"]
+
+    Returns:
+        DNF filters for ``read_table`` on a partitioned dataset
+    """
+    codes = [str(county).zfill(5) for county in counties]
+    return [[("state", "==", code[:2]), ("county", "==", code[2:])] for code in codes]
+
+
+def _partition_value(col: str, value) -> str:
+    """Normalize a partition filter value to its zero-padded directory form."""
+    return str(value).zfill(_PARTITION_WIDTHS.get(col, 0))
+
+
+def _matches_partition(partition: dict[str, str], predicate: tuple) -> bool:
+    """Evaluate one (column, op, value) predicate against partition values."""
+    col, op, value = predicate
+    actual = partition[col]
+    if op in ("in", "not in"):
+        found = actual in {_partition_value(col, item) for item in value}
+        return found if op == "in" else not found
+    value = _partition_value(col, value)
+    # Values are zero-padded, so string order is numeric order
+    comparisons = {
+        "==": actual == value,
+        "=": actual == value,
+        "!=": actual != value,
+        "<": actual < value,
+        "<=": actual <= value,
+        ">": actual > value,
+        ">=": actual >= value,
+    }
+    if op not in comparisons:
+        raise ValidationError(f"Unsupported partition filter operator: {op}")
+    return comparisons[op]
+
+
+def list_partition_files(
+    root: str | Path,
+    filters: list | pc.Expression | None = None,
+) -> list[tuple[Path, list | pc.Expression | None]]:
+    """List the files of a Hive-partitioned dataset that can match filters.
+
+    Predicates on partition columns (``state``, ``county``) are evaluated
+    against the directory names, so non-matching partitions are never opened.
+    The remaining predicates of the matching conjunctions are returned per
+    file, to be pushed down into the Parquet read. Expression filters cannot
+    be used for pruning and are passed through unchanged.
+
+    Args:
+        root: Dataset directory (root/state=23/county=005/part-0.parquet)
+        filters: Optional DNF filters (list of tuples, or list of lists of tuples)
+
+    Returns:
+        List of (file, row filters) pairs
+    """
+    root = Path(root)
+    if filters is None or isinstance(filters, pc.Expression):
+        conjunctions = None
+    else:
+        conjunctions = [filters] if filters and isinstance(filters[0], tuple) else filters
+
+    files = []
+    for file in sorted(root.glob("**/*.parquet")):
+        partition = dict(part.split("=", 1) for part in file.relative_to(root).parts[:-1])
+        if conjunctions is None:
+            files.append((file, filters))
+            continue
+        row_filters = [
+            [predicate for predicate in conjunction if predicate[0] not in partition]
+            for conjunction in conjunctions
+            if all(
+                _matches_partition(partition, predicate)
+                for predicate in conjunction
+                if predicate[0] in partition
+            )
+        ]
+        if not row_filters:
+            continue  # Pruned
+        files.append((file, None if any(not preds for preds in row_filters) else row_filters))
+    return files
+
+
+def read_dataset(
+    root: str | Path,
+    columns: list[str] | None = None,
+    bbox: tuple[float, float, float, float] | None = None,
+    filters: list | pc.Expression | None = None,
+    geometry: bool = True,
+    cache: bool = True,
+) -> pd.DataFrame | gpd.GeoDataFrame:
+    """Read a Hive-partitioned dataset with partition pruning.
+
+    Each partition file goes through ``read_table`` (and its LRU), so a
+    county-level rerun reads only its own partitions.
+
+    Args:
+        root: Dataset directory
+        columns, bbox, geometry, cache: See ``read_table``
+        filters: Optional DNF filters; predicates on ``state``/``county`` prune
+            partitions (see ``county_filters``), the rest are pushed down
+
+    Returns:
+        Concatenated GeoDataFrame or DataFrame of the matching partitions
+
+    Raises:
+        DataError: If no partition matches
+    """
+    files = list_partition_files(root, filters)
+    if not files:
+        raise DataError(f"No partitions of {root} match {filters}")
+    frames = [
+        read_table(file, columns, bbox, file_filters, geometry, cache)
+        for file, file_filters in files
+    ]
+    logger.info(f"Read {len(frames)} partitions of {root}")
+    if len(frames) == 1:
+        return frames[0]
+    ignore_index = all(isinstance(frame.index, pd.RangeIndex) for frame in frames)
+    return pd.concat(frames, ignore_index=ignore_index)
+
+
+def write_partitioned(
+    df: pd.DataFrame | gpd.GeoDataFrame,
+    root: str | Path,
+    geoid_col: str = "GEOID20",
+    level: str = "block",
+    keys: pd.DataFrame | None = None,
+    **options,
+) -> list[Path]:
+    """Write a Hive-partitioned dataset by state and county FIPS.
+
+    Only the partitions present in df are replaced, so writing one county's
+    rows leaves the rest of the dataset untouched. Partition values come from
+    the GEOIDs and are not stored as columns.
+
+    Args:
+        df: DataFrame or GeoDataFrame with GEOIDs in geoid_col (column or index)
+        root: Dataset directory
+        geoid_col: GEOID column or index name (default: "GEOID20")
+        level: Geography level of the GEOIDs (default: "block")
+        keys: Optional precomputed ``partition_keys``, one row per row of df
+        **options: Passed to ``write_parquet``
+
+    Returns:
+        Paths of the written partition files
+    """
+    root = Path(root)
+    if keys is None:
+        geoids = df[geoid_col] if geoid_col in df.columns else df.index.to_series()
+        keys = partition_keys(geoids, level)
+
+    written = []
+    groups = keys.groupby(list(PARTITION_COLUMNS), sort=True).indices
+    for (state, county), positions in groups.items():
+        part_dir = root / f"state={state}" / f"county={county}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = part_dir / "part-0.parquet.tmp"
+        write_parquet(df.iloc[positions], tmp_path, **options)
+        for old_path in part_dir.glob("*.parquet"):
+            old_path.unlink()
+        written.append(tmp_path.replace(part_dir / "part-0.parquet"))
+    logger.info(f"Wrote {len(written)} partitions to {root}")
+    return written
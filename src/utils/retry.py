@@ -6,6 +6,7 @@ You can also use tenacity decorators directly if you need more control.
 
 import logging
 
+import requests
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from exceptions import CensusAPIError, NetworkError
@@ -47,3 +48,14 @@ retry_on_rate_limit = retry(
     before_sleep=log_retry,
     after=log_final_failure,
 )
+
+# Single Census API request (e.g. one county); short backoff since a failure
+# only repeats that request
+retry_census_request = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=0.5, max=30.0),
+    retry=retry_if_exception_type((CensusAPIError, requests.ConnectionError, requests.Timeout)),
+    reraise=True,
+    before_sleep=log_retry,
+    after=log_final_failure,
+)
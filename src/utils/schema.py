@@ -0,0 +1,170 @@
+"""Compact column encodings shared by the pipeline artifacts.
+
+Census GEOIDs are fixed-width digit strings, so they are stored as int64
+(8 bytes instead of a ~64-byte Python string per row). OSM node IDs are
+int64 as well, and acreage and demographic measures are float32. Hierarchy
+prefixes (tract, block group, ...) of an integer GEOID are integer divisions.
+
+Shapefiles cannot hold 64-bit integers, so these encodings are only applied
+to Parquet artifacts; ``restore_geoid_strings`` turns them back into
+zero-padded strings for other formats.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# GEOID digits at each Census geography level
+GEOID_LENGTHS = {
+    "state": 2,
+    "county": 5,
+    "tract": 11,
+    "block_group": 12,
+    "block": 15,
+}
+
+# Geography level of the GEOID columns used in the pipeline
+GEOID_COLUMN_LEVELS = {
+    "GEOID20": "block",
+    "GEOID10_blk": "block",
+    "GEOID_grp": "block_group",
+    "GEOID_tract": "tract",
+    "GEOID10": "tract",
+}
+
+# Column prefixes stored as float32
+FLOAT32_PREFIXES = ("AC_", "POPDENSE", "white_per", "hisp_per")
+
+
+def is_id_column(col: str) -> bool:
+    """Check whether a column holds GEOIDs or OSM node IDs (never aggregated)."""
+    return str(col).startswith("GEOID") or "osmid" in str(col).lower()
+
+
+def _to_int64(values: pd.Series | pd.Index) -> pd.Series | pd.Index:
+    """Convert digit strings or numbers to int64 (nullable Int64 if missing)."""
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values.astype(np.int64) if values.dtype != "Int64" else values
+    numbers = pd.to_numeric(values)
+    if numbers.isna().any():
+        return numbers.astype("Int64")
+    return numbers.astype(np.int64)
+
+
+def geoid_to_int(geoids: pd.Series | pd.Index) -> pd.Series | pd.Index:
+    """Encode GEOIDs as int64.
+
+    Args:
+        geoids: GEOID strings (e.g. "230050001001000") or integers
+
+    Returns:
+        int64 values (nullable Int64 if any GEOID is missing)
+
+    Raises:
+        ValidationError: If a GEOID is not all digits
+    """
+    try:
+        return _to_int64(geoids)
+    except (ValueError, TypeError) as e:
+        raise ValidationError(f"GEOIDs must be digit strings or integers: {e}") from e
+
+
+def geoid_to_str(geoids: pd.Series | pd.Index, level: str = "block") -> pd.Series | pd.Index:
+    """Decode int64 GEOIDs back to zero-padded strings.
+
+    Args:
+        geoids: Integer GEOIDs
+        level: Geography level giving the width (default: "block")
+
+    Returns:
+        GEOID strings
+    """
+    return geoids.astype(str).str.zfill(GEOID_LENGTHS[level])
+
+
+def geoid_prefix(
+    geoids: pd.Series | pd.Index,
+    level: str,
+    from_level: str = "block",
+) -> pd.Series | pd.Index:
+    """Get the GEOID of an enclosing geography by integer division.
+
+    Args:
+        geoids: int64 GEOIDs at from_level
+        level: Enclosing geography level (e.g. "tract", "block_group")
+        from_level: Level of the input GEOIDs (default: "block")
+
+    Returns:
+        int64 GEOIDs at level
+    """
+    digits = GEOID_LENGTHS[from_level] - GEOID_LENGTHS[level]
+    if digits < 0:
+        raise ValidationError(f"{level} does not enclose {from_level}")
+    return geoid_to_int(geoids) // 10**digits
+
+
+def osmid_to_int(osmids: pd.Series | pd.Index) -> pd.Series | pd.Index:
+    """Encode OSM node IDs as int64 (nullable Int64 if any is missing)."""
+    return _to_int64(osmids)
+
+
+def normalize_geoids(df: pd.DataFrame) -> pd.DataFrame:
+    """Encode GEOID columns (and a GEOID index) as int64 so joins match.
+
+    Args:
+        df: DataFrame with GEOID columns as strings or integers
+
+    Returns:
+        DataFrame with int64 GEOIDs (modified in place and returned)
+    """
+    for col in df.columns:
+        if str(col).startswith("GEOID"):
+            df[col] = geoid_to_int(df[col])
+    if str(df.index.name).startswith("GEOID"):
+        df.index = geoid_to_int(df.index)
+    return df
+
+
+def restore_geoid_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Decode int64 GEOID columns (and index) to strings, e.g. for shapefiles.
+
+    Args:
+        df: DataFrame with integer GEOID columns
+
+    Returns:
+        Copy of df with zero-padded GEOID strings
+    """
+    df = df.copy()
+    for col in df.columns:
+        if col in GEOID_COLUMN_LEVELS and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = geoid_to_str(df[col], GEOID_COLUMN_LEVELS[col])
+    name = df.index.name
+    if name in GEOID_COLUMN_LEVELS and pd.api.types.is_integer_dtype(df.index):
+        df.index = geoid_to_str(df.index, GEOID_COLUMN_LEVELS[name])
+    return df
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the compact encodings before writing a Parquet artifact.
+
+    GEOID and osmid columns become int64 and float measure columns (AC_*,
+    population density, demographic shares) become float32.
+
+    Args:
+        df: DataFrame or GeoDataFrame
+
+    Returns:
+        Copy of df with compact column types
+    """
+    df = normalize_geoids(df.copy())
+    for col in df.columns:
+        if "osmid" in str(col).lower():
+            df[col] = osmid_to_int(df[col])
+        elif str(col).startswith(FLOAT32_PREFIXES) and pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype(np.float32)
+    return df
@@ -11,6 +11,8 @@ import pandas as pd
 import seaborn as sns
 from matplotlib import font_manager
 
+from utils.geometry import read_with_geometry
+
 logger = logging.getLogger(__name__)
 
 
@@ -312,10 +314,8 @@ def generate_all_figures(
     setup_fonts(font_path)
 
     logger.info("Loading ejblocks data")
-    if str(ejblocks_path).endswith(".parquet"):
-        ejblocks = gpd.read_parquet(str(ejblocks_path))
-    else:
-        ejblocks = gpd.read_file(str(ejblocks_path))  # Fallback for existing shapefiles
+    # Attribute-only ejblocks get their polygons from the geometry store
+    ejblocks = read_with_geometry(ejblocks_path)
 
     # Create boolean columns if they don't exist
     from analysis.statistical import create_boolean_columns
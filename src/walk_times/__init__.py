@@ -1,10 +1,18 @@
 """Walk time calculation module."""
 
 from .calculate import add_time_attributes, calculate_walk_times, load_graph, process_walk_times
+from .incremental import process_graph_update, process_land_update
+from .isochrones import calculate_isochrones, process_isochrones
+from .regional import process_regional_walk_times
 
 __all__ = [
     "load_graph",
     "add_time_attributes",
     "calculate_walk_times",
     "process_walk_times",
+    "calculate_isochrones",
+    "process_isochrones",
+    "process_land_update",
+    "process_graph_update",
+    "process_regional_walk_times",
 ]
@@ -2,16 +2,25 @@
 
 import heapq
 import logging
+from collections.abc import Callable
 from functools import partial
 from multiprocessing import Pool, cpu_count
+from typing import Any
 
 import geopandas as gpd
 import networkx as nx
+import numpy as np
 import pandas as pd
 import rustworkx as rx
 from tqdm import tqdm
 
+from walk_times.categories import (
+    accumulate_category_acres,
+    category_access_frame,
+    prepare_category_acres,
+)
 from walk_times.graph_utils import convert_node_ids_to_rx_indices, nx_to_rustworkx
+from walk_times.scheduler import estimate_worker_footprint, plan_workers, throttled_imap
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +29,7 @@ def bounded_dijkstra(
     graph: rx.PyDiGraph,
     source: int,
     max_distance: float,
+    reverse: bool = False,
 ) -> dict[int, float]:
     """
     Custom Dijkstra algorithm with distance bounding.
@@ -27,10 +37,16 @@ def bounded_dijkstra(
     Stops exploring nodes once distance exceeds max_distance, preventing
     unnecessary computation for nodes beyond our radius of interest.
 
+    With reverse=True the search follows edges backwards, so the returned
+    distances are from each node *to* the source. A single reverse search
+    from a destination (e.g. a conserved land) therefore finds every origin
+    that can reach it within max_distance.
+
     Args:
         graph: rustworkx directed graph with edge weights
         source: Source node index (rustworkx index, not OSM ID)
         max_distance: Maximum distance to explore (in minutes)
+        reverse: If True, traverse incoming edges instead of outgoing edges
 
     Returns:
         Dictionary mapping node indices to distances (only nodes within max_distance)
@@ -56,10 +72,19 @@ def bounded_dijkstra(
 
         visited.add(current_node)
 
-        # Explore neighbors
-        for neighbor in graph.successor_indices(current_node):
+        # Explore neighbors (predecessors when searching backwards)
+        neighbors = (
+            graph.predecessor_indices(current_node)
+            if reverse
+            else graph.successor_indices(current_node)
+        )
+        for neighbor in neighbors:
             # Get edge weight (time in minutes)
-            edge_data = graph.get_edge_data(current_node, neighbor)
+            edge_data = (
+                graph.get_edge_data(neighbor, current_node)
+                if reverse
+                else graph.get_edge_data(current_node, neighbor)
+            )
             if edge_data is None:
                 continue
 
@@ -88,7 +113,7 @@ def _process_single_center_node(
     conserved_land_rx_to_nx: dict[int, int],
     sorted_trip_times: list[int],
     max_trip_time: float,
-) -> list[tuple[int, int, int]]:
+) -> list[tuple[int, int, int, float]]:
     """
     Process a single center node (called in parallel).
 
@@ -105,7 +130,7 @@ def _process_single_center_node(
         max_trip_time: Maximum trip time to explore
 
     Returns:
-        List of (center_node, land_osmid, trip_time) tuples
+        List of (center_node, land_osmid, trip_time, minutes) tuples
     """
     if center_node not in nx_to_rx:
         return []
@@ -125,12 +150,124 @@ def _process_single_center_node(
             distance = distances[land_rx_idx]
             for trip_time in sorted_trip_times:
                 if distance <= trip_time:
-                    results.append((center_node, land_nx_id, trip_time))
+                    results.append((center_node, land_nx_id, trip_time, distance))
                     break
 
     return results
 
 
+def _process_single_center_categories(
+    center_node: int,
+    rx_graph: rx.PyDiGraph,
+    nx_to_rx: dict[int, int],
+    land_nodes: np.ndarray,
+    node_acres: np.ndarray,
+    sorted_trip_times: list[int],
+) -> np.ndarray | None:
+    """
+    Accumulate category acres for a single center node (called in parallel).
+
+    This function is designed to be called by multiprocessing workers.
+    All arguments must be pickleable.
+
+    Returns:
+        Array of shape (n_thresholds, n_categories), or None if the node is not in the graph
+    """
+    if center_node not in nx_to_rx:
+        return None
+
+    try:
+        distances = bounded_dijkstra(rx_graph, nx_to_rx[center_node], max(sorted_trip_times))
+    except Exception as e:
+        logger.warning(f"Error in worker processing node {center_node}: {e}")
+        return None
+
+    return accumulate_category_acres(distances, land_nodes, node_acres, sorted_trip_times)
+
+
+def _reverse_search_single_node(
+    node: int,
+    rx_graph: rx.PyDiGraph,
+    nx_to_rx: dict[int, int],
+    max_trip_time: float,
+) -> tuple[int, np.ndarray, np.ndarray]:
+    """
+    Reverse bounded search from a single node (called in parallel).
+
+    This function is designed to be called by multiprocessing workers.
+    All arguments must be pickleable.
+
+    Returns:
+        Tuple of (node, rx_indices, minutes) for every node that reaches it
+    """
+    if node not in nx_to_rx:
+        return node, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    try:
+        distances = bounded_dijkstra(rx_graph, nx_to_rx[node], max_trip_time, reverse=True)
+    except Exception as e:
+        logger.warning(f"Error in reverse search from node {node}: {e}")
+        return node, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    return (
+        node,
+        np.fromiter(distances.keys(), dtype=np.int64, count=len(distances)),
+        np.fromiter(distances.values(), dtype=np.float64, count=len(distances)),
+    )
+
+
+def reverse_bounded_searches(
+    rx_graph: rx.PyDiGraph,
+    nx_to_rx: dict[int, int],
+    rx_to_nx: dict[int, int],
+    sources: list[int] | np.ndarray,
+    max_trip_time: float,
+    n_jobs: int = 1,
+    progress_bar: bool = True,
+) -> list[tuple[int, np.ndarray, np.ndarray]]:
+    """Run one reverse bounded search per source node.
+
+    Each search finds every node that can reach the source within
+    max_trip_time, e.g. all blocks within walking distance of a land.
+
+    Args:
+        rx_graph: rustworkx graph with edge weights in minutes
+        nx_to_rx: Node ID to index mapping
+        rx_to_nx: Index to node ID mapping
+        sources: Source node OSM IDs
+        max_trip_time: Search radius in minutes
+        n_jobs: Number of parallel workers (1 = serial, -1 = all CPUs)
+        progress_bar: Whether to show progress bar (default: True)
+
+    Returns:
+        List of (source, reached_node_ids, minutes) tuples in source order
+    """
+    rx_to_nx_array = np.array([rx_to_nx[i] for i in range(len(rx_to_nx))], dtype=np.int64)
+    sources = [int(node) for node in sources]
+
+    worker_func = partial(
+        _reverse_search_single_node,
+        rx_graph=rx_graph,
+        nx_to_rx=nx_to_rx,
+        max_trip_time=max_trip_time,
+    )
+
+    if n_jobs == -1:
+        n_jobs = cpu_count()
+
+    if n_jobs == 1 or len(sources) <= 1:
+        iterator = tqdm(sources, desc="Reverse searches") if progress_bar else sources
+        results_list = [worker_func(node) for node in iterator]
+    else:
+        with Pool(processes=n_jobs) as pool:
+            results_list = list(pool.imap(worker_func, sources, chunksize=1))
+
+    return [
+        (source, rx_to_nx_array[rx_indices], minutes)
+        for source, rx_indices, minutes in results_list
+    ]
+
+
 def calculate_walk_times_parallel(
     center_nodes: list[int],
     graph: nx.MultiDiGraph,
@@ -139,27 +276,40 @@ def calculate_walk_times_parallel(
     n_jobs: int | None = None,
     geography_type: str | None = None,
     progress_bar: bool = True,
+    max_memory: int | None = None,
+    category_col: str | None = None,
+    acres_col: str = "CALC_AC",
 ) -> pd.DataFrame:
     """
     Calculate walk times using bounded Dijkstra with parallel processing.
 
+    The number of workers is capped by available memory (see
+    ``walk_times.scheduler``), so ``n_jobs`` is an upper bound. With
+    ``category_col``, each search accumulates reachable acres per land
+    category instead of listing the reached lands (see ``walk_times.categories``).
+
     Args:
         center_nodes: List of center node OSM IDs
         graph: NetworkX graph with time attributes
         conserved_lands: GeoDataFrame with conserved lands
         trip_times: Trip time thresholds in minutes
-        n_jobs: Number of parallel workers (default: CPU count - 1)
+        n_jobs: Maximum number of parallel workers (default: CPU count - 1)
         geography_type: "tracts" or "blocks" for column naming
         progress_bar: Whether to show progress bar
+        max_memory: Optional memory cap in bytes; submissions are throttled when
+            the resident memory of the pool approaches it
+        category_col: Optional conserved lands column to split reachable acres by
+        acres_col: Acres column, used with category_col (default: "CALC_AC")
 
     Returns:
-        DataFrame with walk time results
+        DataFrame with columns [center_node_col, "land_osmid", "trip_time", "minutes"],
+        or with category_col a DataFrame indexed by center_node_col with
+        AC_<cat>_<t> columns
     """
     # Determine number of workers
     if n_jobs is None:
         n_jobs = max(1, cpu_count() - 1)
 
-    logger.info(f"Calculating walk times with {n_jobs} parallel workers")
     logger.info(f"Processing {len(center_nodes)} center nodes")
 
     # Determine column name
@@ -172,54 +322,87 @@ def calculate_walk_times_parallel(
     logger.info("Converting graph to rustworkx format")
     rx_graph, nx_to_rx, rx_to_nx = nx_to_rustworkx(graph, weight_attr="time")
 
-    # Prepare conserved lands mapping
-    conserved_land_nx_ids = conserved_lands["osmid"].astype(int).values
-    conserved_land_rx_indices = convert_node_ids_to_rx_indices(
-        conserved_land_nx_ids.tolist(), nx_to_rx
-    )
-
-    conserved_land_rx_to_nx = {
-        rx_idx: nx_id
-        for nx_id, rx_idx in zip(conserved_land_nx_ids, conserved_land_rx_indices, strict=False)
-        if rx_idx is not None
-    }
-
     sorted_trip_times = sorted(trip_times)
     max_trip_time = max(trip_times)
-
     logger.info(f"Max trip time: {max_trip_time} minutes")
-    logger.info(f"Conserved lands: {len(conserved_land_rx_to_nx)}")
 
-    # Create worker function with fixed arguments
-    worker_func = partial(
-        _process_single_center_node,
-        rx_graph=rx_graph,
-        nx_to_rx=nx_to_rx,
-        rx_to_nx=rx_to_nx,
-        conserved_land_rx_to_nx=conserved_land_rx_to_nx,
-        sorted_trip_times=sorted_trip_times,
-        max_trip_time=max_trip_time,
+    # Workers return reached lands, or category acres with category_col
+    worker_func: Callable[[int], Any]
+    if category_col:
+        land_nodes, node_acres, labels = prepare_category_acres(
+            conserved_lands, nx_to_rx, category_col, acres_col
+        )
+        n_lands = len(land_nodes)
+        worker_func = partial(
+            _process_single_center_categories,
+            rx_graph=rx_graph,
+            nx_to_rx=nx_to_rx,
+            land_nodes=land_nodes,
+            node_acres=node_acres,
+            sorted_trip_times=sorted_trip_times,
+        )
+    else:
+        # Prepare conserved lands mapping
+        conserved_land_nx_ids = conserved_lands["osmid"].astype(int).values
+        conserved_land_rx_indices = convert_node_ids_to_rx_indices(
+            conserved_land_nx_ids.tolist(), nx_to_rx
+        )
+
+        conserved_land_rx_to_nx = {
+            rx_idx: nx_id
+            for nx_id, rx_idx in zip(conserved_land_nx_ids, conserved_land_rx_indices, strict=False)
+            if rx_idx is not None
+        }
+        n_lands = len(conserved_land_rx_to_nx)
+
+        # Create worker function with fixed arguments
+        worker_func = partial(
+            _process_single_center_node,
+            rx_graph=rx_graph,
+            nx_to_rx=nx_to_rx,
+            rx_to_nx=rx_to_nx,
+            conserved_land_rx_to_nx=conserved_land_rx_to_nx,
+            sorted_trip_times=sorted_trip_times,
+            max_trip_time=max_trip_time,
+        )
+    logger.info(f"Conserved lands: {n_lands}")
+
+    # Size the pool to fit in memory
+    plan = plan_workers(
+        estimate_worker_footprint(rx_graph.num_nodes(), rx_graph.num_edges(), n_lands),
+        n_tasks=len(center_nodes),
+        n_jobs=n_jobs,
+        max_memory=max_memory,
+    )
+    logger.info(
+        f"Calculating walk times with {plan.n_workers} parallel workers "
+        f"(~{plan.worker_footprint / 1024**2:.0f} MiB each, batches of {plan.chunksize})"
     )
 
     # Process in parallel
-    logger.info(f"Starting parallel processing with {n_jobs} workers...")
-    with Pool(processes=n_jobs) as pool:
+    with Pool(processes=plan.n_workers) as pool:
+        results_iter = throttled_imap(
+            pool, worker_func, list(center_nodes), chunksize=plan.chunksize, max_memory=max_memory
+        )
         if progress_bar:
-            results_list = list(
-                tqdm(
-                    pool.imap(worker_func, center_nodes, chunksize=10),
-                    total=len(center_nodes),
-                    desc=f"Walk times (×{n_jobs} parallel)",
-                )
+            results_iter = tqdm(
+                results_iter,
+                total=len(center_nodes),
+                desc=f"Walk times (×{plan.n_workers} parallel)",
             )
-        else:
-            results_list = pool.map(worker_func, center_nodes, chunksize=10)
+        results_list = list(results_iter)
+
+    if category_col:
+        return category_access_frame(
+            results_list, list(center_nodes), labels, sorted_trip_times, center_node_col
+        )
 
     # Flatten results
     all_results = [result for batch_results in results_list for result in batch_results]
 
     # Create DataFrame
-    df = pd.DataFrame(all_results, columns=[center_node_col, "land_osmid", "trip_time"])
+    df = pd.DataFrame(all_results, columns=[center_node_col, "land_osmid", "trip_time", "minutes"])
+    df["minutes"] = df["minutes"].astype("float32")
 
     logger.info(f"Calculated {len(df)} walk time records")
     return df
@@ -12,8 +12,14 @@ from tqdm import tqdm
 
 from config.defaults import DEFAULT_CRS, DEFAULT_TRAVEL_SPEED, DEFAULT_TRIP_TIMES
 from config.regions import RegionConfig
-from walk_times.algorithms import bounded_dijkstra, calculate_walk_times_parallel
+from walk_times.algorithms import (
+    _process_single_center_categories,
+    bounded_dijkstra,
+    calculate_walk_times_parallel,
+)
+from walk_times.categories import category_access_frame, prepare_category_acres
 from walk_times.graph_utils import convert_node_ids_to_rx_indices, nx_to_rustworkx
+from walk_times.matrix import save_walk_time_matrix, walk_times_to_matrix
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +113,9 @@ def calculate_walk_times(
     progress_bar: bool = True,
     geography_type: str | None = None,
     n_jobs: int = 1,
+    max_memory: int | None = None,
+    category_col: str | None = None,
+    acres_col: str = "CALC_AC",
 ) -> pd.DataFrame:
     """Calculate walk times from center nodes to conserved lands.
 
@@ -116,6 +125,10 @@ def calculate_walk_times(
     Uses rustworkx for faster graph operations and bounded Dijkstra algorithm
     to limit exploration radius. Supports parallel processing for speedup.
 
+    With ``category_col``, the same searches instead accumulate the acres
+    reachable per land category, so access split by any conserved lands
+    attribute costs one search per center node (see ``walk_times.categories``).
+
     Args:
         center_nodes: List or Series of OSMnx node IDs (center points)
         graph: NetworkX graph with time attributes on edges
@@ -125,11 +138,18 @@ def calculate_walk_times(
         progress_bar: Whether to show progress bar (default: True)
         geography_type: "tracts" or "blocks" to determine column name (default: auto-detect)
         n_jobs: Number of parallel workers. Set to 1 for serial processing,
-                -1 for all CPUs, or specific number (default: 1)
+                -1 for all CPUs, or specific number (default: 1). The worker count is
+                reduced if the workers' graph copies would not fit in memory
+        max_memory: Optional memory cap in bytes for parallel processing
+        category_col: Optional conserved lands column to split reachable acres by
+        acres_col: Acres column, used with category_col (default: "CALC_AC")
 
     Returns:
-        DataFrame with columns: [center_node_col, "land_osmid", "trip_time"]
-        where center_node_col is "tract_osmid" or "block_osmid" depending on geography_type
+        DataFrame with columns: [center_node_col, "land_osmid", "trip_time", "minutes"]
+        where center_node_col is "tract_osmid" or "block_osmid" depending on geography_type,
+        trip_time is the smallest threshold the walk fits into and minutes is the exact
+        walk time. With category_col, a DataFrame indexed by center_node_col with
+        cumulative AC_<cat>_<t> acre columns instead
     """
     # Ensure graph has time attributes
     sample_edge = next(iter(graph.edges(data=True, keys=True)))[3]
@@ -153,6 +173,9 @@ def calculate_walk_times(
             n_jobs=n_jobs,
             geography_type=geography_type,
             progress_bar=progress_bar,
+            max_memory=max_memory,
+            category_col=category_col,
+            acres_col=acres_col,
         )
 
     # Determine column name based on geography type
@@ -170,6 +193,19 @@ def calculate_walk_times(
     logger.info("Converting graph to rustworkx format")
     rx_graph, nx_id_to_rx_idx, rx_idx_to_nx_id = get_rustworkx_graph(graph)
 
+    if category_col:
+        return _calculate_category_access(
+            list(center_nodes),
+            rx_graph,
+            nx_id_to_rx_idx,
+            conserved_lands,
+            category_col,
+            acres_col,
+            sorted(trip_times),
+            center_node_col,
+            progress_bar,
+        )
+
     # Get conserved land node IDs and convert to rustworkx indices
     conserved_land_nx_ids = conserved_lands["osmid"].astype(int).values
     conserved_land_rx_indices = convert_node_ids_to_rx_indices(
@@ -183,8 +219,8 @@ def calculate_walk_times(
         if rx_idx is not None
     }
 
-    # Sort trip times for efficient filtering
-    sorted_trip_times = sorted(trip_times, reverse=True)
+    # Sort trip times so the first match is the smallest threshold
+    sorted_trip_times = sorted(trip_times)
     max_trip_time = max(trip_times)
 
     def get_lands(center_node: int) -> list[list[int]]:
@@ -194,7 +230,7 @@ def calculate_walk_times(
             center_node: OSMnx node ID
 
         Returns:
-            List of [center_node, land_osmid, trip_time] lists
+            List of [center_node, land_osmid, trip_time, minutes] lists
         """
         # Convert center node to rustworkx index
         if center_node not in nx_id_to_rx_idx:
@@ -224,7 +260,7 @@ def calculate_walk_times(
                 # Find the smallest trip time threshold that this distance fits into
                 for trip_time in sorted_trip_times:
                     if distance <= trip_time:
-                        results.append([center_node, land_nx_id, trip_time])
+                        results.append([center_node, land_nx_id, trip_time, distance])
                         break  # Use the smallest trip time threshold
 
         return results
@@ -239,12 +275,47 @@ def calculate_walk_times(
     else:
         records = [land for node in center_nodes for land in get_lands(node)]
 
-    df = pd.DataFrame.from_records(records, columns=[center_node_col, "land_osmid", "trip_time"])
+    df = pd.DataFrame.from_records(
+        records, columns=[center_node_col, "land_osmid", "trip_time", "minutes"]
+    )
+    df["minutes"] = df["minutes"].astype("float32")
 
     logger.info(f"Calculated {len(df)} walk time records")
     return df
 
 
+def _calculate_category_access(
+    center_nodes: list[int],
+    rx_graph: rx.PyDiGraph,
+    nx_id_to_rx_idx: dict[int, int],
+    conserved_lands: pd.DataFrame,
+    category_col: str,
+    acres_col: str,
+    sorted_trip_times: list[int],
+    center_node_col: str,
+    progress_bar: bool,
+) -> pd.DataFrame:
+    """Serial path of ``calculate_walk_times`` with ``category_col``."""
+    land_nodes, node_acres, labels = prepare_category_acres(
+        conserved_lands, nx_id_to_rx_idx, category_col, acres_col
+    )
+    logger.info(
+        f"Calculating access for {len(labels)} land categories from "
+        f"{len(center_nodes)} center nodes"
+    )
+
+    iterator = tqdm(center_nodes, desc="Category access") if progress_bar else center_nodes
+    results_list = [
+        _process_single_center_categories(
+            node, rx_graph, nx_id_to_rx_idx, land_nodes, node_acres, sorted_trip_times
+        )
+        for node in iterator
+    ]
+    return category_access_frame(
+        results_list, center_nodes, labels, sorted_trip_times, center_node_col
+    )
+
+
 def process_walk_times(
     geography_type: str,
     graph_path: str | Path,
@@ -256,10 +327,17 @@ def process_walk_times(
     cache_folder: str | Path | None = None,
     region_config: RegionConfig | None = None,  # noqa: ARG001
     n_jobs: int = 1,
+    matrix_path: str | Path | None = None,
+    max_memory: int | None = None,
+    category_col: str | None = None,
+    category_output_path: str | Path | None = None,
 ) -> pd.DataFrame:
     """Process walk times for tracts or blocks.
 
     Full workflow: loads data, calculates walk times, and saves results.
+    The long table keeps its [center_node_col, "land_osmid", "trip_time"]
+    layout; exact minutes are stored in the optional sparse matrix artifact
+    (see ``walk_times.matrix``).
 
     Args:
         geography_type: "tracts" or "blocks"
@@ -272,6 +350,12 @@ def process_walk_times(
         cache_folder: Optional path to OSMnx cache folder
         region_config: Optional region configuration (currently unused but reserved for future)
         n_jobs: Number of parallel workers (default: 1 for serial, -1 for all CPUs)
+        matrix_path: Optional path to save the sparse walk time matrix (.npz)
+        max_memory: Optional memory cap in bytes for parallel processing
+        category_col: Optional conserved lands column; if given, acres reachable per
+            category are also saved as AC_<cat>_<t> columns
+        category_output_path: Path to save the category access Parquet file
+            (default: output_path with a "_categories.parquet" suffix)
 
     Returns:
         DataFrame with walk time calculations
@@ -314,15 +398,38 @@ def process_walk_times(
         travel_speed=travel_speed,
         geography_type=geography_type,
         n_jobs=n_jobs,
+        max_memory=max_memory,
     )
 
     # Save results
     logger.info(f"Saving results to {output_path}")
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    long_df = df.drop(columns="minutes", errors="ignore")
     if str(output_path).endswith(".parquet"):
-        df.to_parquet(output_path, index=False)
+        long_df.to_parquet(output_path, index=False)
     else:
-        df.to_csv(output_path, index=False)  # Fallback for CSV output
+        long_df.to_csv(output_path, index=False)  # Fallback for CSV output
+
+    if matrix_path:
+        value_col = "minutes" if "minutes" in df.columns else "trip_time"
+        save_walk_time_matrix(walk_times_to_matrix(df, value_col=value_col), matrix_path)
+
+    if category_col:
+        category_df = calculate_walk_times(
+            center_nodes,
+            G,
+            conserved_lands,
+            trip_times=trip_times,
+            travel_speed=travel_speed,
+            geography_type=geography_type,
+            n_jobs=n_jobs,
+            max_memory=max_memory,
+            category_col=category_col,
+        )
+        if category_output_path is None:
+            category_output_path = output_path.with_name(f"{output_path.stem}_categories.parquet")
+        logger.info(f"Saving category access to {category_output_path}")
+        category_df.reset_index().to_parquet(category_output_path, index=False)
 
     return df
@@ -0,0 +1,180 @@
+"""Acres of conserved land reachable per land category from a single search.
+
+Conserved lands can be split by any attribute (public access vs easement,
+fee-owned vs not, ...). Rather than re-running the walk time engine once per
+category, each center node gets one bounded Dijkstra search and the reached
+acres are accumulated into a (trip time × category) table in one vectorized
+pass. Adding categories only widens that table, so the search cost is the same
+as for the plain ``AC_<t>`` columns.
+
+The searches are run by ``calculate_walk_times`` with ``category_col`` set;
+this module holds the encoding and accumulation steps.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def encode_land_categories(
+    conserved_lands: pd.DataFrame,
+    category_col: str,
+    missing_label: str = "UNKNOWN",
+) -> tuple[np.ndarray, list[str]]:
+    """Encode a land attribute as integer category codes.
+
+    Labels are upper-cased and non-alphanumeric characters replaced with "_" so
+    they can be used in column names.
+
+    Args:
+        conserved_lands: DataFrame with the category column
+        category_col: Column holding the land category
+        missing_label: Label for lands with no category (default: "UNKNOWN")
+
+    Returns:
+        Tuple of (codes, labels) where codes[i] indexes labels for land row i
+    """
+    labels = (
+        conserved_lands[category_col]
+        .astype("string")
+        .fillna(missing_label)
+        .str.upper()
+        .str.replace(r"[^0-9A-Z]+", "_", regex=True)
+        .str.strip("_")
+        .replace("", missing_label)
+    )
+    codes, uniques = pd.factorize(labels, sort=True)
+    return codes.astype(np.int64), [str(label) for label in uniques]
+
+
+def build_land_category_acres(
+    land_rx_indices: np.ndarray,
+    land_codes: np.ndarray,
+    land_acres: np.ndarray,
+    n_categories: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sum land acres per (graph node, category).
+
+    Several lands can snap to the same graph node, so acres are pre-summed per
+    node and each search only has to look up the reached land nodes.
+
+    Args:
+        land_rx_indices: rustworkx index of each land row
+        land_codes: Category code of each land row
+        land_acres: Acres of each land row
+        n_categories: Number of categories
+
+    Returns:
+        Tuple of (land_nodes, node_acres) where land_nodes is the sorted array of
+        unique rustworkx indices and node_acres has shape (n_land_nodes, n_categories)
+    """
+    land_nodes, node_pos = np.unique(land_rx_indices, return_inverse=True)
+    node_acres = np.zeros((len(land_nodes), n_categories), dtype=np.float64)
+    np.add.at(node_acres, (node_pos, land_codes), land_acres)
+    return land_nodes, node_acres
+
+
+def accumulate_category_acres(
+    distances: dict[int, float],
+    land_nodes: np.ndarray,
+    node_acres: np.ndarray,
+    sorted_trip_times: list[int],
+) -> np.ndarray:
+    """Accumulate reachable acres per trip time and category from one search.
+
+    Args:
+        distances: Mapping from rustworkx index to travel time in minutes
+        land_nodes: Sorted rustworkx indices of land nodes
+        node_acres: Acres per (land node, category)
+        sorted_trip_times: Trip time thresholds in ascending order
+
+    Returns:
+        Array of shape (n_thresholds, n_categories), cumulative over thresholds
+    """
+    acres = np.zeros((len(sorted_trip_times), node_acres.shape[1]), dtype=np.float64)
+    if len(land_nodes) == 0:
+        return acres
+
+    reached = np.fromiter(distances.keys(), dtype=np.int64, count=len(distances))
+    minutes = np.fromiter(distances.values(), dtype=np.float64, count=len(distances))
+
+    pos = np.minimum(np.searchsorted(land_nodes, reached), len(land_nodes) - 1)
+    hit = land_nodes[pos] == reached
+    bucket = np.searchsorted(np.asarray(sorted_trip_times), minutes[hit], side="left")
+    within = bucket < len(sorted_trip_times)
+
+    np.add.at(acres, bucket[within], node_acres[pos[hit][within]])
+    return np.cumsum(acres, axis=0)
+
+
+def prepare_category_acres(
+    conserved_lands: pd.DataFrame,
+    nx_to_rx: dict[int, int],
+    category_col: str,
+    acres_col: str = "CALC_AC",
+) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """Encode land categories and sum acres per (graph node, category).
+
+    Lands whose node is not in the graph are dropped.
+
+    Args:
+        conserved_lands: DataFrame with "osmid", acres and category columns
+        nx_to_rx: Node ID to rustworkx index mapping
+        category_col: Column holding the land category
+        acres_col: Acres column (default: "CALC_AC")
+
+    Returns:
+        Tuple of (land_nodes, node_acres, labels), see ``build_land_category_acres``
+    """
+    codes, labels = encode_land_categories(conserved_lands, category_col)
+    logger.info(f"Land categories from {category_col}: {labels}")
+
+    land_rx = conserved_lands["osmid"].astype(np.int64).map(nx_to_rx)
+    in_graph = land_rx.notna().to_numpy()
+    land_nodes, node_acres = build_land_category_acres(
+        land_rx[in_graph].to_numpy(dtype=np.int64),
+        codes[in_graph],
+        conserved_lands[acres_col].fillna(0).to_numpy(dtype=np.float64)[in_graph],
+        len(labels),
+    )
+    return land_nodes, node_acres, labels
+
+
+def category_access_frame(
+    results_list: list[np.ndarray | None],
+    center_nodes: list[int],
+    labels: list[str],
+    sorted_trip_times: list[int],
+    center_node_col: str,
+) -> pd.DataFrame:
+    """Assemble per-center category acres into AC_<cat>_<t> columns.
+
+    Args:
+        results_list: Output of ``accumulate_category_acres`` per center node,
+            None for nodes missing from the graph
+        center_nodes: Center node OSM IDs, in the order of results_list
+        labels: Category labels
+        sorted_trip_times: Trip time thresholds in ascending order
+        center_node_col: Name of the center node index
+
+    Returns:
+        DataFrame indexed by center_node_col with AC_<cat>_<t> columns
+    """
+    empty = np.zeros((len(sorted_trip_times), len(labels)))
+    # (n_centers, n_thresholds, n_categories) -> category-major column order
+    stacked = [empty if r is None else r for r in results_list]
+    values = (np.stack(stacked) if stacked else np.zeros((0, *empty.shape))).transpose(0, 2, 1)
+    columns = [f"AC_{label}_{t}" for label in labels for t in sorted_trip_times]
+
+    df = pd.DataFrame(
+        values.reshape(len(center_nodes), -1).astype(np.float32),
+        index=pd.Index(center_nodes, name=center_node_col),
+        columns=columns,
+    )
+    df = df[~df.index.duplicated()]
+
+    logger.info(f"Calculated category access for {len(df)} center nodes")
+    return df
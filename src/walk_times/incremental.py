@@ -0,0 +1,823 @@
+"""Incremental walk time updates when conserved lands or the street network change.
+
+Conserved land updates usually touch a handful of parcels. Instead of
+re-running the walk time engine for every block, the old and new land tables
+are diffed by (osmid, geometry hash) and a reverse bounded Dijkstra search is
+run from each changed land node only. The reverse searches give every center
+node that can reach a changed land, which is exactly the set of rows in the
+walk time matrix, the long walk times table and the AC_* aggregates that need
+patching.
+
+Street network refreshes are handled the same way: two routing caches (see
+``walk_times.routing_cache``) are diffed by edge (u, v, length), reverse
+searches from the changed edges' source nodes find every center whose bounded
+search ball touches a change, and only those centers are recomputed.
+"""
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing import Pool, cpu_count
+from pathlib import Path
+
+import geopandas as gpd
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import rustworkx as rx
+import shapely
+from scipy import sparse
+from tqdm import tqdm
+
+from config.defaults import DEFAULT_TRAVEL_SPEED, DEFAULT_TRIP_TIMES
+from exceptions import ValidationError
+from walk_times.algorithms import _process_single_center_node, reverse_bounded_searches
+from walk_times.calculate import add_time_attributes, get_rustworkx_graph, load_graph
+from walk_times.matrix import (
+    WalkTimeMatrix,
+    load_walk_time_matrix,
+    save_walk_time_matrix,
+)
+from walk_times.routing_cache import RoutingCache, get_routing_cache, load_routing_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LandDiff:
+    """Difference between two conserved lands tables.
+
+    Attributes:
+        added: Land rows present only in the new table
+        removed: Land rows present only in the old table
+    """
+
+    added: pd.DataFrame
+    removed: pd.DataFrame
+
+    @property
+    def changed_nodes(self) -> np.ndarray:
+        """Sorted unique land node IDs with an added or removed parcel."""
+        return np.union1d(
+            self.added["osmid"].astype(np.int64).unique(),
+            self.removed["osmid"].astype(np.int64).unique(),
+        )
+
+
+def geometry_hashes(geometries: gpd.GeoSeries) -> np.ndarray:
+    """Hash geometries so that identical parcels compare equal.
+
+    Geometries are normalized first, so vertex order and ring orientation do
+    not change the hash.
+
+    Args:
+        geometries: GeoSeries of land geometries
+
+    Returns:
+        Array of hex digests aligned with geometries
+    """
+    wkb = shapely.to_wkb(shapely.normalize(np.asarray(geometries.values)))
+    return np.array(
+        [hashlib.blake2b(b, digest_size=16).hexdigest() if b else "" for b in wkb], dtype=object
+    )
+
+
+def diff_conserved_lands(
+    old_lands: gpd.GeoDataFrame,
+    new_lands: gpd.GeoDataFrame,
+) -> LandDiff:
+    """Diff two conserved lands tables by osmid and geometry hash.
+
+    Parcels that appear in both tables with the same node and identical
+    geometry are unchanged. Duplicate parcels are matched one-to-one.
+
+    Args:
+        old_lands: Previous conserved lands with "osmid" and geometry
+        new_lands: Updated conserved lands with "osmid" and geometry
+
+    Returns:
+        LandDiff with the added and removed rows
+    """
+
+    def keyed(lands: gpd.GeoDataFrame) -> pd.DataFrame:
+        keys = pd.DataFrame(
+            {
+                "osmid": lands["osmid"].astype(np.int64).to_numpy(),
+                "geometry_hash": geometry_hashes(lands.geometry),
+            }
+        )
+        keys["occurrence"] = keys.groupby(["osmid", "geometry_hash"]).cumcount()
+        return keys
+
+    old_keys = keyed(old_lands)
+    new_keys = keyed(new_lands)
+    joined = old_keys.reset_index(names="old_row").merge(
+        new_keys.reset_index(names="new_row"),
+        on=["osmid", "geometry_hash", "occurrence"],
+        how="outer",
+        indicator=True,
+    )
+
+    removed_rows = joined.loc[joined["_merge"] == "left_only", "old_row"].astype(int)
+    added_rows = joined.loc[joined["_merge"] == "right_only", "new_row"].astype(int)
+    diff = LandDiff(
+        added=new_lands.iloc[np.sort(added_rows.to_numpy())],
+        removed=old_lands.iloc[np.sort(removed_rows.to_numpy())],
+    )
+
+    logger.info(
+        f"Conserved lands diff: {len(diff.added)} added, {len(diff.removed)} removed, "
+        f"{len(diff.changed_nodes)} changed land nodes"
+    )
+    return diff
+
+
+def reverse_walk_times(
+    graph: nx.MultiDiGraph,
+    land_nodes: list[int] | np.ndarray,
+    center_nodes: np.ndarray,
+    max_trip_time: float,
+    center_node_col: str = "block_osmid",
+    n_jobs: int = 1,
+    progress_bar: bool = True,
+) -> pd.DataFrame:
+    """Find every center node within max_trip_time of each land node.
+
+    Args:
+        graph: NetworkX graph with time attributes
+        land_nodes: Land node OSM IDs to search from
+        center_nodes: Center node OSM IDs to keep
+        max_trip_time: Search radius in minutes
+        center_node_col: Name of the center node column (default: "block_osmid")
+        n_jobs: Number of parallel workers (1 = serial, -1 = all CPUs)
+        progress_bar: Whether to show progress bar (default: True)
+
+    Returns:
+        DataFrame with columns [center_node_col, "land_osmid", "minutes"]
+    """
+    rx_graph, nx_to_rx, rx_to_nx = get_rustworkx_graph(graph)
+    center_nodes = np.asarray(center_nodes, dtype=np.int64)
+    results_list = reverse_bounded_searches(
+        rx_graph, nx_to_rx, rx_to_nx, land_nodes, max_trip_time, n_jobs, progress_bar
+    )
+
+    frames = []
+    for land_node, reached, minutes in results_list:
+        is_center = np.isin(reached, center_nodes)
+        frames.append(
+            pd.DataFrame(
+                {
+                    center_node_col: reached[is_center],
+                    "land_osmid": np.int64(land_node),
+                    "minutes": minutes[is_center].astype(np.float32),
+                }
+            )
+        )
+
+    if not frames:
+        return pd.DataFrame(
+            {
+                center_node_col: np.empty(0, dtype=np.int64),
+                "land_osmid": np.empty(0, dtype=np.int64),
+                "minutes": np.empty(0, dtype=np.float32),
+            }
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def patch_walk_time_matrix(
+    wtm: WalkTimeMatrix,
+    changed_nodes: np.ndarray,
+    land_nodes: np.ndarray,
+    reverse_times: pd.DataFrame,
+) -> WalkTimeMatrix:
+    """Replace the columns of changed land nodes in a walk time matrix.
+
+    Columns of changed nodes that no longer carry any land are dropped; the
+    others are rebuilt from the reverse search results. All other entries are
+    copied unchanged.
+
+    Args:
+        wtm: Existing walk time matrix
+        changed_nodes: Land node IDs with added or removed parcels
+        land_nodes: All land node IDs in the new conserved lands table
+        reverse_times: Output of ``reverse_walk_times`` for changed_nodes
+
+    Returns:
+        Patched WalkTimeMatrix
+    """
+    changed_nodes = np.asarray(changed_nodes, dtype=np.int64)
+    kept_nodes = np.intersect1d(changed_nodes, land_nodes)
+    land_ids = np.union1d(np.setdiff1d(wtm.land_ids, changed_nodes), kept_nodes)
+
+    reverse_times = reverse_times[reverse_times["land_osmid"].isin(kept_nodes)]
+    new_centers = reverse_times[wtm.center_node_col].to_numpy(dtype=np.int64)
+    center_ids = np.union1d(wtm.center_ids, new_centers)
+
+    coo = wtm.matrix.tocoo()
+    keep = ~np.isin(wtm.land_ids[coo.col], changed_nodes)
+    center_index = pd.Index(center_ids)
+    land_index = pd.Index(land_ids)
+
+    rows = np.concatenate(
+        [
+            center_index.get_indexer(wtm.center_ids[coo.row[keep]]),
+            center_index.get_indexer(new_centers),
+        ]
+    )
+    cols = np.concatenate(
+        [
+            land_index.get_indexer(wtm.land_ids[coo.col[keep]]),
+            land_index.get_indexer(reverse_times["land_osmid"].to_numpy(dtype=np.int64)),
+        ]
+    )
+    data = np.concatenate(
+        [coo.data[keep], reverse_times["minutes"].to_numpy(dtype=np.float32)]
+    ).astype(np.float32)
+
+    # COO -> CSR keeps explicit zeros (center and land on the same node)
+    matrix = sparse.coo_matrix((data, (rows, cols)), shape=(len(center_ids), len(land_ids))).tocsr()
+
+    logger.info(
+        f"Patched walk time matrix: {wtm.matrix.nnz:,} -> {matrix.nnz:,} reachable pairs, "
+        f"{len(wtm.land_ids):,} -> {len(land_ids):,} lands"
+    )
+    return WalkTimeMatrix(
+        matrix=matrix,
+        center_ids=center_ids,
+        land_ids=land_ids,
+        center_node_col=wtm.center_node_col,
+    )
+
+
+def patch_walk_times_table(
+    walk_times: pd.DataFrame,
+    changed_nodes: np.ndarray,
+    reverse_times: pd.DataFrame,
+    trip_times: list[int],
+) -> pd.DataFrame:
+    """Replace the rows of changed land nodes in the long walk times table.
+
+    Args:
+        walk_times: Long table with center node, "land_osmid" and "trip_time" columns,
+            plus "minutes" when the table carries exact walk times
+        changed_nodes: Land node IDs with added or removed parcels
+        reverse_times: Output of ``reverse_walk_times`` restricted to nodes that
+            still carry land
+        trip_times: Trip time thresholds in minutes
+
+    Returns:
+        Patched long walk times table
+    """
+    center_node_col = reverse_times.columns[0]
+    kept = walk_times[~walk_times["land_osmid"].astype(np.int64).isin(changed_nodes)]
+
+    thresholds = np.asarray(sorted(trip_times))
+    bucket = np.searchsorted(thresholds, reverse_times["minutes"].to_numpy(), side="left")
+    within = bucket < len(thresholds)
+    added = pd.DataFrame(
+        {
+            center_node_col: reverse_times[center_node_col].to_numpy()[within],
+            "land_osmid": reverse_times["land_osmid"].to_numpy()[within],
+            "trip_time": thresholds[bucket[within]],
+        }
+    )
+    if "minutes" in kept.columns:
+        added["minutes"] = reverse_times["minutes"].to_numpy()[within]
+    dtypes = {col: kept[col].dtype for col in added.columns if col in kept.columns}
+    return pd.concat([kept, added.astype(dtypes)], ignore_index=True)
+
+
+def patch_access_columns(
+    access: pd.DataFrame,
+    reverse_times: pd.DataFrame,
+    acre_delta: pd.Series,
+    trip_times: list[int],
+    node_col: str = "osmid",
+) -> np.ndarray:
+    """Add the acreage change of each changed land node to AC_* columns in place.
+
+    Args:
+        access: DataFrame with a center node column and AC_<t> columns (e.g.
+            the block merge output)
+        reverse_times: Output of ``reverse_walk_times`` for the changed nodes
+        acre_delta: New minus old acres, indexed by land node ID
+        trip_times: Trip time thresholds in minutes
+        node_col: Center node column in access (default: "osmid")
+
+    Returns:
+        Boolean mask of access rows that were touched
+    """
+    center_node_col = reverse_times.columns[0]
+    trip_times = sorted(trip_times)
+    rows, center_ids = pd.factorize(reverse_times[center_node_col].astype(np.int64), sort=True)
+    cols, land_ids = pd.factorize(reverse_times["land_osmid"].astype(np.int64), sort=True)
+    delta_wtm = WalkTimeMatrix(
+        matrix=sparse.csr_matrix(
+            (reverse_times["minutes"].to_numpy(dtype=np.float32), (rows, cols)),
+            shape=(len(center_ids), len(land_ids)),
+        ),
+        center_ids=np.asarray(center_ids),
+        land_ids=np.asarray(land_ids),
+    )
+    delta = delta_wtm.aggregate_by_center(
+        acre_delta.reindex(delta_wtm.land_ids, fill_value=0.0).to_numpy(), trip_times
+    )
+
+    positions = pd.Index(delta_wtm.center_ids).get_indexer(access[node_col].astype(np.int64))
+    touched: np.ndarray = np.asarray(positions >= 0)
+    ac_cols = [f"AC_{t}" for t in trip_times]
+    access.loc[touched, ac_cols] = (
+        access.loc[touched, ac_cols].to_numpy(dtype=np.float64) + delta[positions[touched]]
+    )
+    return touched
+
+
+def _acres_by_node(lands: pd.DataFrame, nodes: np.ndarray, acres_col: str) -> pd.Series:
+    return (
+        lands.groupby(lands["osmid"].astype(np.int64))[acres_col]
+        .sum()
+        .reindex(nodes, fill_value=0.0)
+    )
+
+
+def _read_lands(path: str | Path) -> gpd.GeoDataFrame:
+    if str(path).endswith(".parquet"):
+        return gpd.read_parquet(str(path))
+    return gpd.read_file(str(path))  # Fallback for existing shapefiles
+
+
+def process_land_update(
+    graph_path: str | Path,
+    geography_path: str | Path,
+    old_lands_path: str | Path,
+    new_lands_path: str | Path,
+    matrix_path: str | Path | None = None,
+    walk_times_path: str | Path | None = None,
+    access_path: str | Path | None = None,
+    trip_times: list[int] | None = None,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    cache_folder: str | Path | None = None,
+    acres_col: str = "CALC_AC",
+    n_jobs: int = 1,
+) -> LandDiff:
+    """Patch stored walk time artifacts after a conserved lands update.
+
+    Runs reverse bounded searches from the changed land nodes only, then
+    rewrites each given artifact in place:
+
+    - matrix_path: sparse walk time matrix (.npz) from ``process_walk_times``
+    - walk_times_path: long walk times table (Parquet or CSV)
+    - access_path: Parquet table with "osmid" and AC_<t> columns (e.g. the
+      block merge output from ``merge_walk_times``)
+
+    Args:
+        graph_path: Path to OSMnx GraphML file used for the original run
+        geography_path: Path to tracts or blocks file with OSMnx node IDs
+        old_lands_path: Path to conserved lands used for the original run
+        new_lands_path: Path to updated conserved lands with OSMnx node IDs
+        matrix_path: Optional sparse walk time matrix to patch
+        walk_times_path: Optional long walk times table to patch
+        access_path: Optional AC_* table to patch
+        trip_times: Trip time thresholds (default: AC_* columns in access_path, or
+            [5,10,15,20,30,45,60])
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        cache_folder: Optional path to OSMnx cache folder
+        acres_col: Acres column (default: "CALC_AC")
+        n_jobs: Number of parallel workers (default: 1 for serial, -1 for all CPUs)
+
+    Returns:
+        LandDiff describing the update
+
+    Raises:
+        ValidationError: If no artifact to patch is given
+    """
+    if not (matrix_path or walk_times_path or access_path):
+        raise ValidationError(
+            "At least one of matrix_path, walk_times_path or access_path is required"
+        )
+
+    old_lands = _read_lands(old_lands_path)
+    new_lands = _read_lands(new_lands_path)
+    diff = diff_conserved_lands(old_lands, new_lands)
+    changed_nodes = diff.changed_nodes
+    if len(changed_nodes) == 0:
+        logger.info("No conserved land changes, nothing to update")
+        return diff
+
+    access = None
+    access_is_geo = False
+    if access_path:
+        access_is_geo = b"geo" in (pq.read_schema(str(access_path)).metadata or {})
+        access = (
+            gpd.read_parquet(str(access_path))
+            if access_is_geo
+            else pd.read_parquet(str(access_path))
+        )
+        if trip_times is None:
+            trip_times = sorted(
+                int(m.group(1)) for c in access.columns if (m := re.fullmatch(r"AC_(\d+)", c))
+            )
+    if not trip_times:
+        trip_times = DEFAULT_TRIP_TIMES
+    trip_times = sorted(trip_times)
+
+    logger.info("Loading geography data")
+    if str(geography_path).endswith(".parquet"):
+        geography = pd.read_parquet(str(geography_path), columns=["osmid"])
+    else:
+        geography = gpd.read_file(str(geography_path))
+    center_nodes = pd.unique(geography["osmid"].astype(np.int64))
+
+    walk_times = None
+    if walk_times_path:
+        if str(walk_times_path).endswith(".parquet"):
+            walk_times = pd.read_parquet(str(walk_times_path))
+        else:
+            walk_times = pd.read_csv(str(walk_times_path))
+        if walk_times.index.name in ["tract_osmid", "block_osmid"]:
+            walk_times = walk_times.reset_index()
+
+    # Label reverse search rows like the artifacts being patched
+    wtm = load_walk_time_matrix(matrix_path) if matrix_path else None
+    if wtm is not None:
+        center_node_col = wtm.center_node_col
+    elif walk_times is not None:
+        center_node_col = next(c for c in ["block_osmid", "tract_osmid"] if c in walk_times.columns)
+    else:
+        center_node_col = "block_osmid"
+
+    G = load_graph(graph_path, cache_folder=cache_folder)
+    add_time_attributes(G, travel_speed)
+    reverse_times = reverse_walk_times(
+        G, changed_nodes, center_nodes, max(trip_times), center_node_col, n_jobs=n_jobs
+    )
+
+    touched_centers = reverse_times[center_node_col].nunique()
+    logger.info(
+        f"Touched {touched_centers:,} of {len(center_nodes):,} center nodes "
+        f"({touched_centers / max(len(center_nodes), 1):.2%} of a full run) "
+        f"with {len(changed_nodes)} reverse searches"
+    )
+
+    new_land_nodes = pd.unique(new_lands["osmid"].astype(np.int64))
+    kept_times = reverse_times[reverse_times["land_osmid"].isin(new_land_nodes)]
+
+    if wtm is not None and matrix_path:
+        save_walk_time_matrix(
+            patch_walk_time_matrix(wtm, changed_nodes, new_land_nodes, reverse_times), matrix_path
+        )
+
+    if walk_times is not None and walk_times_path:
+        logger.info(f"Patching walk times table {walk_times_path}")
+        walk_times = patch_walk_times_table(walk_times, changed_nodes, kept_times, trip_times)
+        if str(walk_times_path).endswith(".parquet"):
+            walk_times.to_parquet(walk_times_path, index=False)
+        else:
+            walk_times.to_csv(walk_times_path, index=False)
+
+    if access is not None:
+        acre_delta = _acres_by_node(new_lands, changed_nodes, acres_col) - _acres_by_node(
+            old_lands, changed_nodes, acres_col
+        )
+        touched = patch_access_columns(access, reverse_times, acre_delta, trip_times)
+        logger.info(f"Touched {int(touched.sum()):,} of {len(access):,} blocks in {access_path}")
+        access.to_parquet(str(access_path), index=False)
+
+    return diff
+
+
+@dataclass
+class GraphDiff:
+    """Difference between two street network snapshots.
+
+    Attributes:
+        added: Edges (u, v, length) present only in the new network
+        removed: Edges (u, v, length) present only in the old network
+    """
+
+    added: pd.DataFrame
+    removed: pd.DataFrame
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether the two networks have identical edges."""
+        return bool(self.added.empty and self.removed.empty)
+
+
+def diff_routing_caches(
+    old_cache: RoutingCache,
+    new_cache: RoutingCache,
+    length_tolerance: float = 0.01,
+) -> GraphDiff:
+    """Diff two routing caches by edge (u, v, length).
+
+    Lengths are compared after rounding to length_tolerance meters, so float
+    noise from re-projection does not count as a change. A modified edge
+    appears in both added and removed.
+
+    Args:
+        old_cache: RoutingCache of the previous network
+        new_cache: RoutingCache of the refreshed network
+        length_tolerance: Length resolution in meters (default: 0.01)
+
+    Returns:
+        GraphDiff with the added and removed edges
+    """
+
+    def keyed(cache: RoutingCache) -> pd.DataFrame:
+        edges = cache.edge_table()
+        edges["length_key"] = np.round(edges["length"] / length_tolerance).astype(np.int64)
+        edges["occurrence"] = edges.groupby(["u", "v", "length_key"]).cumcount()
+        return edges
+
+    joined = keyed(old_cache).merge(
+        keyed(new_cache),
+        on=["u", "v", "length_key", "occurrence"],
+        how="outer",
+        suffixes=("_old", "_new"),
+        indicator=True,
+    )
+    removed = joined.loc[joined["_merge"] == "left_only", ["u", "v", "length_old"]]
+    added = joined.loc[joined["_merge"] == "right_only", ["u", "v", "length_new"]]
+    diff = GraphDiff(
+        added=added.rename(columns={"length_new": "length"}).reset_index(drop=True),
+        removed=removed.rename(columns={"length_old": "length"}).reset_index(drop=True),
+    )
+
+    logger.info(
+        f"Street network diff: {len(diff.added):,} edges added, {len(diff.removed):,} removed "
+        f"(of {len(old_cache.edge_u):,} -> {len(new_cache.edge_u):,})"
+    )
+    return diff
+
+
+def affected_center_nodes(
+    old_cache: RoutingCache,
+    new_cache: RoutingCache,
+    diff: GraphDiff,
+    center_nodes: np.ndarray,
+    max_trip_time: float,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    n_jobs: int = 1,
+    progress_bar: bool = True,
+) -> np.ndarray:
+    """Find the center nodes whose bounded search could see a changed edge.
+
+    A forward bounded search from a center relaxes edge (u, v) exactly when u
+    is within max_trip_time of the center. The affected centers are therefore
+    found with reverse searches from the source node of every removed edge (in
+    the old network) and every added edge (in the new network).
+
+    Args:
+        old_cache: RoutingCache of the previous network
+        new_cache: RoutingCache of the refreshed network
+        diff: Output of ``diff_routing_caches``
+        center_nodes: Center node OSM IDs of the geography
+        max_trip_time: Search radius in minutes
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        n_jobs: Number of parallel workers (1 = serial, -1 = all CPUs)
+        progress_bar: Whether to show progress bar (default: True)
+
+    Returns:
+        Sorted array of affected center node IDs
+    """
+    center_nodes = np.asarray(center_nodes, dtype=np.int64)
+    reached = [np.empty(0, dtype=np.int64)]
+
+    for cache, edges in [(old_cache, diff.removed), (new_cache, diff.added)]:
+        sources = pd.unique(edges["u"].astype(np.int64))
+        if len(sources) == 0:
+            continue
+        rx_graph, nx_to_rx, rx_to_nx = cache.to_rustworkx(travel_speed)
+        results = reverse_bounded_searches(
+            rx_graph, nx_to_rx, rx_to_nx, sources, max_trip_time, n_jobs, progress_bar
+        )
+        reached.extend(nodes for _, nodes, _ in results)
+
+    affected = np.asarray(np.intersect1d(np.concatenate(reached), center_nodes))
+    logger.info(
+        f"Affected center nodes: {len(affected):,} of {len(center_nodes):,} "
+        f"({len(affected) / max(len(center_nodes), 1):.2%} of a full run)"
+    )
+    return affected
+
+
+def recompute_center_walk_times(
+    cache: RoutingCache,
+    center_nodes: np.ndarray,
+    conserved_lands: pd.DataFrame,
+    trip_times: list[int],
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    center_node_col: str = "block_osmid",
+    n_jobs: int = 1,
+    progress_bar: bool = True,
+    routing_graph: tuple[rx.PyDiGraph, dict[int, int], dict[int, int]] | None = None,
+) -> pd.DataFrame:
+    """Re-run the walk time engine for a subset of center nodes.
+
+    Args:
+        cache: RoutingCache of the network to route on
+        center_nodes: Center node OSM IDs to recompute
+        conserved_lands: DataFrame with "osmid" column containing node IDs
+        trip_times: Trip time thresholds in minutes
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        center_node_col: Name of the center node column (default: "block_osmid")
+        n_jobs: Number of parallel workers (1 = serial, -1 = all CPUs)
+        progress_bar: Whether to show progress bar (default: True)
+        routing_graph: Optional output of ``cache.to_rustworkx(travel_speed)``, so
+            callers recomputing many batches build the graph only once
+
+    Returns:
+        DataFrame with columns [center_node_col, "land_osmid", "trip_time", "minutes"]
+    """
+    if routing_graph is None:
+        routing_graph = cache.to_rustworkx(travel_speed)
+    rx_graph, nx_to_rx, rx_to_nx = routing_graph
+    land_nodes = pd.unique(conserved_lands["osmid"].astype(np.int64))
+    conserved_land_rx_to_nx = {
+        nx_to_rx[node]: int(node) for node in land_nodes if int(node) in nx_to_rx
+    }
+
+    worker_func = partial(
+        _process_single_center_node,
+        rx_graph=rx_graph,
+        nx_to_rx=nx_to_rx,
+        rx_to_nx=rx_to_nx,
+        conserved_land_rx_to_nx=conserved_land_rx_to_nx,
+        sorted_trip_times=sorted(trip_times),
+        max_trip_time=max(trip_times),
+    )
+    nodes = [int(node) for node in center_nodes]
+
+    if n_jobs == -1:
+        n_jobs = cpu_count()
+
+    if n_jobs == 1:
+        iterator = tqdm(nodes, desc="Recomputing walk times") if progress_bar else nodes
+        results_list = [worker_func(node) for node in iterator]
+    else:
+        with Pool(processes=n_jobs) as pool:
+            results_list = list(pool.imap(worker_func, nodes, chunksize=10))
+
+    df = pd.DataFrame(
+        [record for records in results_list for record in records],
+        columns=[center_node_col, "land_osmid", "trip_time", "minutes"],
+    )
+    df["minutes"] = df["minutes"].astype("float32")
+    return df
+
+
+def patch_center_rows(
+    wtm: WalkTimeMatrix,
+    center_nodes: np.ndarray,
+    walk_times: pd.DataFrame,
+) -> WalkTimeMatrix:
+    """Replace the rows of recomputed center nodes in a walk time matrix.
+
+    Args:
+        wtm: Existing walk time matrix
+        center_nodes: Center node IDs that were recomputed
+        walk_times: Output of ``recompute_center_walk_times`` for center_nodes
+
+    Returns:
+        Patched WalkTimeMatrix
+    """
+    center_nodes = np.asarray(center_nodes, dtype=np.int64)
+    new_centers = walk_times[wtm.center_node_col].to_numpy(dtype=np.int64)
+    new_lands = walk_times["land_osmid"].to_numpy(dtype=np.int64)
+
+    coo = wtm.matrix.tocoo()
+    keep = ~np.isin(wtm.center_ids[coo.row], center_nodes)
+    old_centers = wtm.center_ids[coo.row[keep]]
+    old_lands = wtm.land_ids[coo.col[keep]]
+
+    center_ids = np.union1d(old_centers, new_centers)
+    land_ids = np.union1d(old_lands, new_lands)
+    center_index = pd.Index(center_ids)
+    land_index = pd.Index(land_ids)
+
+    matrix = sparse.coo_matrix(
+        (
+            np.concatenate([coo.data[keep], walk_times["minutes"].to_numpy(dtype=np.float32)]),
+            (
+                center_index.get_indexer(np.concatenate([old_centers, new_centers])),
+                land_index.get_indexer(np.concatenate([old_lands, new_lands])),
+            ),
+        ),
+        shape=(len(center_ids), len(land_ids)),
+    ).tocsr()
+
+    logger.info(
+        f"Patched walk time matrix rows: {wtm.matrix.nnz:,} -> {matrix.nnz:,} reachable pairs"
+    )
+    return WalkTimeMatrix(
+        matrix=matrix, center_ids=center_ids, land_ids=land_ids, center_node_col=wtm.center_node_col
+    )
+
+
+def process_graph_update(
+    old_cache_path: str | Path,
+    new_graph_path: str | Path,
+    geography_path: str | Path,
+    conserved_lands_path: str | Path,
+    matrix_path: str | Path | None = None,
+    walk_times_path: str | Path | None = None,
+    trip_times: list[int] | None = None,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    new_cache_path: str | Path | None = None,
+    cache_folder: str | Path | None = None,
+    n_jobs: int = 1,
+) -> np.ndarray:
+    """Patch stored walk times after the street network is refreshed.
+
+    Compares the routing cache of the previous snapshot with the refreshed
+    GraphML (``update_osmnx_graphs`` keeps the previous cache as
+    ``<name>.prev.routing.npz``), finds the center nodes whose search ball
+    touches a changed edge and recomputes only those.
+
+    Args:
+        old_cache_path: Path to the routing cache of the previous network
+        new_graph_path: Path to the refreshed OSMnx GraphML file
+        geography_path: Path to tracts or blocks file with OSMnx node IDs
+        conserved_lands_path: Path to conserved lands file with OSMnx node IDs
+        matrix_path: Optional sparse walk time matrix to patch
+        walk_times_path: Optional long walk times table to patch
+        trip_times: Trip time thresholds (default: [5,10,15,20,30,45,60])
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        new_cache_path: Path to the routing cache of the new network (default:
+            next to new_graph_path)
+        cache_folder: Optional path to OSMnx cache folder
+        n_jobs: Number of parallel workers (default: 1 for serial, -1 for all CPUs)
+
+    Returns:
+        Sorted array of recomputed center node IDs
+
+    Raises:
+        ValidationError: If no artifact to patch is given
+    """
+    if not (matrix_path or walk_times_path):
+        raise ValidationError("At least one of matrix_path or walk_times_path is required")
+    if trip_times is None:
+        trip_times = DEFAULT_TRIP_TIMES
+
+    old_cache = load_routing_cache(old_cache_path)
+    new_cache = get_routing_cache(new_graph_path, new_cache_path, cache_folder=cache_folder)
+    diff = diff_routing_caches(old_cache, new_cache)
+    if diff.is_empty:
+        logger.info("No street network changes, nothing to update")
+        return np.empty(0, dtype=np.int64)
+
+    logger.info("Loading geography data")
+    if str(geography_path).endswith(".parquet"):
+        geography = pd.read_parquet(str(geography_path), columns=["osmid"])
+    else:
+        geography = gpd.read_file(str(geography_path))
+    center_nodes = pd.unique(geography["osmid"].astype(np.int64))
+
+    logger.info("Loading conserved lands data")
+    if str(conserved_lands_path).endswith(".parquet"):
+        conserved_lands = pd.read_parquet(str(conserved_lands_path), columns=["osmid"])
+    else:
+        conserved_lands = gpd.read_file(str(conserved_lands_path))
+
+    affected = affected_center_nodes(
+        old_cache, new_cache, diff, center_nodes, max(trip_times), travel_speed, n_jobs
+    )
+    wtm = load_walk_time_matrix(matrix_path) if matrix_path else None
+    center_node_col = wtm.center_node_col if wtm is not None else "block_osmid"
+    walk_times = recompute_center_walk_times(
+        new_cache,
+        affected,
+        conserved_lands,
+        trip_times,
+        travel_speed,
+        center_node_col=center_node_col,
+        n_jobs=n_jobs,
+    )
+
+    if wtm is not None and matrix_path:
+        save_walk_time_matrix(patch_center_rows(wtm, affected, walk_times), matrix_path)
+
+    if walk_times_path:
+        logger.info(f"Patching walk times table {walk_times_path}")
+        if str(walk_times_path).endswith(".parquet"):
+            table = pd.read_parquet(str(walk_times_path))
+        else:
+            table = pd.read_csv(str(walk_times_path))
+        if table.index.name in ["tract_osmid", "block_osmid"]:
+            table = table.reset_index()
+        center_node_col = next(c for c in ["block_osmid", "tract_osmid"] if c in table.columns)
+        kept = table[~table[center_node_col].astype(np.int64).isin(affected)]
+        added = walk_times.rename(columns={walk_times.columns[0]: center_node_col})
+        added = added[[col for col in kept.columns if col in added.columns]]
+        table = pd.concat([kept, added.astype(kept[added.columns].dtypes)], ignore_index=True)
+        if str(walk_times_path).endswith(".parquet"):
+            table.to_parquet(walk_times_path, index=False)
+        else:
+            table.to_csv(walk_times_path, index=False)
+
+    return affected
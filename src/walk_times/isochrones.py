@@ -0,0 +1,308 @@
+"""Isochrone (walkshed) polygons for conserved lands.
+
+Builds, for every conserved land and trip time threshold, the area from which
+the land can be reached on foot. Each land needs a single reverse bounded
+Dijkstra search; the polygons for all thresholds are then cut from the same
+distance array using vectorized shapely 2 operations over the reached edges.
+"""
+
+import logging
+from functools import partial
+from multiprocessing import Pool, cpu_count
+from pathlib import Path
+
+import geopandas as gpd
+import networkx as nx
+import numpy as np
+import pandas as pd
+import rustworkx as rx
+import shapely
+from tqdm import tqdm
+
+from config.defaults import DEFAULT_TRAVEL_SPEED, DEFAULT_TRIP_TIMES
+from utils.io import write_parquet
+from walk_times.algorithms import bounded_dijkstra
+from walk_times.calculate import add_time_attributes, get_rustworkx_graph, load_graph
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EDGE_BUFFER = 25.0  # meters (in projected CRS units)
+DEFAULT_NODE_BUFFER = 0.0
+
+
+def get_edge_arrays(
+    nx_graph: nx.MultiDiGraph,
+    nx_id_to_rx_idx: dict[int, int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Extract node coordinates and edge geometries as flat arrays.
+
+    Edges without a "geometry" attribute are represented by a straight line
+    between their endpoints, matching the behaviour of the original
+    ``make_iso_polys`` notebook helper.
+
+    Args:
+        nx_graph: Projected NetworkX graph with "x"/"y" node attributes
+        nx_id_to_rx_idx: Mapping from NetworkX node ID to rustworkx index
+
+    Returns:
+        Tuple of (node_xy, edge_u, edge_v, edge_lines) where node_xy is an
+        (n_nodes, 2) array indexed by rustworkx index, edge_u/edge_v are
+        rustworkx indices and edge_lines is an array of LineStrings
+    """
+    node_xy = np.empty((nx_graph.number_of_nodes(), 2), dtype=np.float64)
+    for nx_id, data in nx_graph.nodes(data=True):
+        node_xy[nx_id_to_rx_idx[nx_id]] = (data["x"], data["y"])
+
+    n_edges = nx_graph.number_of_edges()
+    edge_u = np.empty(n_edges, dtype=np.int64)
+    edge_v = np.empty(n_edges, dtype=np.int64)
+    custom_geoms = {}
+    for i, (u, v, data) in enumerate(nx_graph.edges(data=True)):
+        edge_u[i] = nx_id_to_rx_idx[u]
+        edge_v[i] = nx_id_to_rx_idx[v]
+        if data.get("geometry") is not None:
+            custom_geoms[i] = data["geometry"]
+
+    # Build straight segments for all edges at once, then overlay real geometries
+    edge_lines = shapely.linestrings(np.stack([node_xy[edge_u], node_xy[edge_v]], axis=1))
+    if custom_geoms:
+        edge_lines[list(custom_geoms.keys())] = list(custom_geoms.values())
+
+    return node_xy, edge_u, edge_v, edge_lines
+
+
+def build_isochrone_polygons(
+    distances: dict[int, float],
+    trip_times: list[int],
+    node_xy: np.ndarray,
+    edge_u: np.ndarray,
+    edge_v: np.ndarray,
+    edge_lines: np.ndarray,
+    edge_buff: float = DEFAULT_EDGE_BUFFER,
+    node_buff: float = DEFAULT_NODE_BUFFER,
+) -> list[tuple[int, shapely.Geometry]]:
+    """Build one isochrone polygon per trip time from a single distance map.
+
+    An edge belongs to the isochrone for threshold t when both endpoints are
+    within t minutes (the same rule as ``nx.ego_graph``). Reached edges are
+    buffered once for the largest threshold and each smaller threshold is a
+    union over a subset of those buffers.
+
+    Args:
+        distances: Mapping from rustworkx index to travel time in minutes
+        trip_times: Trip time thresholds in minutes
+        node_xy: Node coordinates indexed by rustworkx index
+        edge_u: Edge source indices
+        edge_v: Edge target indices
+        edge_lines: Edge LineStrings aligned with edge_u/edge_v
+        edge_buff: Buffer distance applied to edges (default: 25)
+        node_buff: Buffer distance applied to reached nodes (default: 0, disabled)
+
+    Returns:
+        List of (trip_time, polygon) tuples; thresholds that reach nothing are omitted
+    """
+    dist = np.full(len(node_xy), np.inf)
+    dist[np.fromiter(distances.keys(), dtype=np.int64, count=len(distances))] = np.fromiter(
+        distances.values(), dtype=np.float64, count=len(distances)
+    )
+
+    # Time at which each edge enters the isochrone
+    edge_time = np.maximum(dist[edge_u], dist[edge_v])
+    reached = edge_time <= max(trip_times)
+    reached_time = edge_time[reached]
+    buffered = shapely.buffer(edge_lines[reached], edge_buff)
+
+    if node_buff > 0:
+        node_mask = dist <= max(trip_times)
+        node_time = dist[node_mask]
+        node_polys = shapely.buffer(shapely.points(node_xy[node_mask]), node_buff)
+    else:
+        node_time = np.empty(0)
+        node_polys = np.empty(0, dtype=object)
+
+    polygons = []
+    for trip_time in sorted(trip_times):
+        parts = np.concatenate(
+            [buffered[reached_time <= trip_time], node_polys[node_time <= trip_time]]
+        )
+        if len(parts) == 0:
+            continue
+        polygons.append((trip_time, shapely.union_all(parts)))
+
+    return polygons
+
+
+def _process_single_land(
+    land_node: int,
+    rx_graph: rx.PyDiGraph,
+    nx_to_rx: dict[int, int],
+    node_xy: np.ndarray,
+    edge_u: np.ndarray,
+    edge_v: np.ndarray,
+    edge_lines: np.ndarray,
+    trip_times: list[int],
+    edge_buff: float,
+    node_buff: float,
+) -> list[tuple[int, int, shapely.Geometry]]:
+    """
+    Build isochrones for a single land node (called in parallel).
+
+    This function is designed to be called by multiprocessing workers.
+    All arguments must be pickleable.
+
+    Returns:
+        List of (land_osmid, trip_time, polygon) tuples
+    """
+    if land_node not in nx_to_rx:
+        return []
+
+    try:
+        distances = bounded_dijkstra(rx_graph, nx_to_rx[land_node], max(trip_times), reverse=True)
+    except Exception as e:
+        logger.warning(f"Error in reverse search from land node {land_node}: {e}")
+        return []
+
+    polygons = build_isochrone_polygons(
+        distances, trip_times, node_xy, edge_u, edge_v, edge_lines, edge_buff, node_buff
+    )
+    return [(land_node, trip_time, poly) for trip_time, poly in polygons]
+
+
+def calculate_isochrones(
+    graph: nx.MultiDiGraph,
+    conserved_lands: gpd.GeoDataFrame | pd.DataFrame,
+    trip_times: list[int] = DEFAULT_TRIP_TIMES,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    edge_buff: float = DEFAULT_EDGE_BUFFER,
+    node_buff: float = DEFAULT_NODE_BUFFER,
+    n_jobs: int = 1,
+    progress_bar: bool = True,
+) -> gpd.GeoDataFrame:
+    """Calculate walkshed polygons for every conserved land and trip time.
+
+    Args:
+        graph: Projected NetworkX graph (time attributes are added if missing)
+        conserved_lands: DataFrame with "osmid" column containing node IDs
+        trip_times: Trip time thresholds in minutes (default: [5,10,15,20,30,45,60])
+        travel_speed: Travel speed in km/hour, used if graph lacks time attributes
+        edge_buff: Buffer distance applied to reached edges (default: 25)
+        node_buff: Buffer distance applied to reached nodes (default: 0)
+        n_jobs: Number of parallel workers (1 = serial, -1 = all CPUs)
+        progress_bar: Whether to show progress bar (default: True)
+
+    Returns:
+        GeoDataFrame with columns ["land_osmid", "trip_time", "geometry"] in the graph CRS
+    """
+    sample_edge = next(iter(graph.edges(data=True, keys=True)))[3]
+    if "time" not in sample_edge:
+        logger.info("Graph missing time attributes, adding them")
+        add_time_attributes(graph, travel_speed)
+
+    rx_graph, nx_to_rx, _ = get_rustworkx_graph(graph)
+    node_xy, edge_u, edge_v, edge_lines = get_edge_arrays(graph, nx_to_rx)
+
+    land_nodes = pd.unique(conserved_lands["osmid"].astype(np.int64)).tolist()
+    trip_times = sorted(trip_times)
+    logger.info(f"Building isochrones for {len(land_nodes)} land nodes at {trip_times} minutes")
+
+    worker_func = partial(
+        _process_single_land,
+        rx_graph=rx_graph,
+        nx_to_rx=nx_to_rx,
+        node_xy=node_xy,
+        edge_u=edge_u,
+        edge_v=edge_v,
+        edge_lines=edge_lines,
+        trip_times=trip_times,
+        edge_buff=edge_buff,
+        node_buff=node_buff,
+    )
+
+    if n_jobs == -1:
+        n_jobs = cpu_count()
+
+    if n_jobs == 1:
+        iterator = tqdm(land_nodes, desc="Isochrones") if progress_bar else land_nodes
+        results_list = [worker_func(node) for node in iterator]
+    else:
+        logger.info(f"Starting parallel processing with {n_jobs} workers...")
+        with Pool(processes=n_jobs) as pool:
+            results_iter = pool.imap(worker_func, land_nodes, chunksize=10)
+            if progress_bar:
+                results_iter = tqdm(
+                    results_iter, total=len(land_nodes), desc=f"Isochrones (×{n_jobs} parallel)"
+                )
+            results_list = list(results_iter)
+
+    records = [record for land_results in results_list for record in land_results]
+    gdf = gpd.GeoDataFrame(
+        pd.DataFrame.from_records(records, columns=["land_osmid", "trip_time", "geometry"]),
+        geometry="geometry",
+        crs=graph.graph.get("crs"),
+    )
+
+    # Largest walksheds first so smaller ones are drawn on top in tiled maps
+    gdf = gdf.sort_values(["trip_time", "land_osmid"], ascending=[False, True], ignore_index=True)
+
+    logger.info(f"Built {len(gdf)} isochrone polygons")
+    return gdf
+
+
+def process_isochrones(
+    graph_path: str | Path,
+    conserved_lands_path: str | Path,
+    output_path: str | Path,
+    trip_times: list[int] | None = None,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    cache_folder: str | Path | None = None,
+    edge_buff: float = DEFAULT_EDGE_BUFFER,
+    node_buff: float = DEFAULT_NODE_BUFFER,
+    n_jobs: int = 1,
+) -> gpd.GeoDataFrame:
+    """Build isochrones for all conserved lands and save them as GeoParquet.
+
+    The output has one row per (land_osmid, trip_time) and can be passed
+    directly to ``convert_to_pmtiles.py``.
+
+    Args:
+        graph_path: Path to OSMnx GraphML file
+        conserved_lands_path: Path to conserved lands file with OSMnx node IDs
+        output_path: Path to save output GeoParquet file
+        trip_times: List of trip time thresholds in minutes (default: [5,10,15,20,30,45,60])
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        cache_folder: Optional path to OSMnx cache folder
+        edge_buff: Buffer distance applied to reached edges (default: 25)
+        node_buff: Buffer distance applied to reached nodes (default: 0)
+        n_jobs: Number of parallel workers (default: 1 for serial, -1 for all CPUs)
+
+    Returns:
+        GeoDataFrame with isochrone polygons
+    """
+    if trip_times is None:
+        trip_times = DEFAULT_TRIP_TIMES
+
+    logger.info("Loading conserved lands data")
+    if str(conserved_lands_path).endswith(".parquet"):
+        conserved_lands = pd.read_parquet(str(conserved_lands_path), columns=["osmid"])
+    else:
+        conserved_lands = gpd.read_file(str(conserved_lands_path))
+
+    G = load_graph(graph_path, cache_folder=cache_folder)
+    add_time_attributes(G, travel_speed)
+
+    gdf = calculate_isochrones(
+        G,
+        conserved_lands,
+        trip_times=trip_times,
+        travel_speed=travel_speed,
+        edge_buff=edge_buff,
+        node_buff=node_buff,
+        n_jobs=n_jobs,
+    )
+
+    logger.info(f"Saving isochrones to {output_path}")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_parquet(gdf, output_path, index=False)
+
+    return gdf
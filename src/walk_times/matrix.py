@@ -0,0 +1,238 @@
+"""Sparse origin-destination matrix artifact for walk times.
+
+The long walk times table repeats two 64-bit OSM IDs for every reachable
+(center, land) pair. This module stores the same information as a compressed
+scipy CSR matrix of exact walk minutes, with the center and land node IDs in
+small Parquet sidecar files:
+
+    walk_times_block_matrix.npz            CSR matrix (centers × lands), float32 minutes
+    walk_times_block_matrix_centers.parquet  center node IDs in row order
+    walk_times_block_matrix_lands.parquet    land node IDs in column order
+
+Only stored entries are reachable. A stored value of 0.0 is meaningful (the
+center and land snap to the same node), so callers must never call
+``eliminate_zeros`` on the matrix.
+"""
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WalkTimeMatrix:
+    """Sparse center×land walk time matrix with its node ID index.
+
+    Attributes:
+        matrix: CSR matrix of walk minutes; matrix[i, j] is the time from
+            center_ids[i] to land_ids[j]
+        center_ids: Center node OSM IDs in row order
+        land_ids: Land node OSM IDs in column order
+        center_node_col: Name of the center node column ("block_osmid" or "tract_osmid")
+    """
+
+    matrix: sparse.csr_matrix
+    center_ids: np.ndarray
+    land_ids: np.ndarray
+    center_node_col: str = "block_osmid"
+
+    def within(self, trip_time: float) -> sparse.csr_matrix:
+        """Get a 0/1 matrix of pairs reachable within trip_time minutes.
+
+        The result shares index arrays with the stored matrix, so it is cheap
+        to build for every threshold.
+
+        Args:
+            trip_time: Threshold in minutes
+
+        Returns:
+            CSR matrix with 1.0 for pairs within the threshold
+        """
+        return sparse.csr_matrix(
+            (
+                (self.matrix.data <= trip_time).astype(np.float64),
+                self.matrix.indices,
+                self.matrix.indptr,
+            ),
+            shape=self.matrix.shape,
+        )
+
+    def aggregate_by_center(self, land_values: np.ndarray, trip_times: list[int]) -> np.ndarray:
+        """Sum a per-land value over the lands reachable from each center.
+
+        Args:
+            land_values: Values aligned with land_ids (e.g. acres)
+            trip_times: Trip time thresholds in minutes
+
+        Returns:
+            Array of shape (n_centers, n_thresholds), cumulative over thresholds
+        """
+        land_values = np.asarray(land_values, dtype=np.float64)
+        return np.column_stack([self.within(t) @ land_values for t in sorted(trip_times)])
+
+    def aggregate_by_land(self, center_values: np.ndarray, trip_times: list[int]) -> np.ndarray:
+        """Sum a per-center value over the centers that reach each land.
+
+        Args:
+            center_values: Values aligned with center_ids, shape (n_centers,) or
+                (n_centers, k) (e.g. population)
+            trip_times: Trip time thresholds in minutes
+
+        Returns:
+            Array of shape (n_lands, n_thresholds) for 1-D input, or
+            (n_lands, k, n_thresholds) for 2-D input
+        """
+        center_values = np.asarray(center_values, dtype=np.float64)
+        return np.stack([self.within(t).T @ center_values for t in sorted(trip_times)], axis=-1)
+
+    def to_long(self, trip_times: list[int] | None = None) -> pd.DataFrame:
+        """Expand the matrix back into the long walk times table.
+
+        Args:
+            trip_times: Optional thresholds; if given, a "trip_time" column with
+                the smallest threshold that each pair fits into is added and
+                pairs beyond the largest threshold are dropped
+
+        Returns:
+            DataFrame with columns [center_node_col, "land_osmid", "minutes"(, "trip_time")]
+        """
+        coo = self.matrix.tocoo()
+        df = pd.DataFrame(
+            {
+                self.center_node_col: self.center_ids[coo.row],
+                "land_osmid": self.land_ids[coo.col],
+                "minutes": coo.data,
+            }
+        )
+        if trip_times is not None:
+            thresholds = np.asarray(sorted(trip_times))
+            bucket = np.searchsorted(thresholds, df["minutes"].to_numpy(), side="left")
+            df = df[bucket < len(thresholds)].copy()
+            df["trip_time"] = thresholds[bucket[bucket < len(thresholds)]]
+        return df
+
+
+def walk_times_to_matrix(
+    walk_times: pd.DataFrame,
+    value_col: str = "minutes",
+    center_node_col: str | None = None,
+) -> WalkTimeMatrix:
+    """Build a WalkTimeMatrix from the long walk times table.
+
+    Args:
+        walk_times: DataFrame with center node, "land_osmid" and value columns
+        value_col: Column holding the matrix values (default: "minutes"; use
+            "trip_time" for tables written before exact minutes were recorded)
+        center_node_col: Name of the center node column (default: auto-detect
+            "block_osmid" or "tract_osmid")
+
+    Returns:
+        WalkTimeMatrix; duplicate pairs keep their smallest value
+    """
+    if center_node_col is None:
+        center_node_col = next(
+            (col for col in ["block_osmid", "tract_osmid"] if col in walk_times.columns), None
+        )
+        if center_node_col is None:
+            raise ValidationError(
+                "Walk times must contain either 'block_osmid' or 'tract_osmid'. "
+                f"Columns: {list(walk_times.columns)}"
+            )
+
+    # Keep the shortest value per pair; CSR construction would sum duplicates
+    pairs = walk_times[[center_node_col, "land_osmid", value_col]].dropna()
+    pairs = pairs.sort_values(value_col).drop_duplicates([center_node_col, "land_osmid"])
+
+    rows, center_ids = pd.factorize(pairs[center_node_col].astype(np.int64), sort=True)
+    cols, land_ids = pd.factorize(pairs["land_osmid"].astype(np.int64), sort=True)
+
+    matrix = sparse.csr_matrix(
+        (pairs[value_col].to_numpy(dtype=np.float32), (rows, cols)),
+        shape=(len(center_ids), len(land_ids)),
+    )
+
+    logger.info(
+        f"Built walk time matrix: {matrix.shape[0]:,} centers × {matrix.shape[1]:,} lands, "
+        f"{matrix.nnz:,} reachable pairs"
+    )
+    return WalkTimeMatrix(
+        matrix=matrix,
+        center_ids=np.asarray(center_ids),
+        land_ids=np.asarray(land_ids),
+        center_node_col=center_node_col,
+    )
+
+
+def get_sidecar_paths(matrix_path: str | Path) -> tuple[Path, Path]:
+    """Get the center and land index sidecar paths for a matrix file.
+
+    Args:
+        matrix_path: Path to the .npz matrix file
+
+    Returns:
+        Tuple of (centers_path, lands_path)
+    """
+    matrix_path = Path(matrix_path)
+    stem = matrix_path.name.removesuffix(".npz")
+    return (
+        matrix_path.with_name(f"{stem}_centers.parquet"),
+        matrix_path.with_name(f"{stem}_lands.parquet"),
+    )
+
+
+def save_walk_time_matrix(wtm: WalkTimeMatrix, matrix_path: str | Path) -> None:
+    """Save a WalkTimeMatrix as compressed .npz plus Parquet index sidecars.
+
+    Args:
+        wtm: WalkTimeMatrix to save
+        matrix_path: Path to the .npz matrix file
+    """
+    matrix_path = Path(matrix_path)
+    matrix_path.parent.mkdir(parents=True, exist_ok=True)
+    centers_path, lands_path = get_sidecar_paths(matrix_path)
+
+    logger.info(f"Saving walk time matrix to {matrix_path}")
+    sparse.save_npz(matrix_path, wtm.matrix, compressed=True)
+    pd.DataFrame({wtm.center_node_col: wtm.center_ids}).to_parquet(centers_path, index=False)
+    pd.DataFrame({"land_osmid": wtm.land_ids}).to_parquet(lands_path, index=False)
+
+
+def load_walk_time_matrix(matrix_path: str | Path) -> WalkTimeMatrix:
+    """Load a WalkTimeMatrix saved with ``save_walk_time_matrix``.
+
+    Args:
+        matrix_path: Path to the .npz matrix file
+
+    Returns:
+        WalkTimeMatrix
+
+    Raises:
+        ValidationError: If the sidecars do not match the matrix shape
+    """
+    centers_path, lands_path = get_sidecar_paths(matrix_path)
+
+    logger.info(f"Loading walk time matrix from {matrix_path}")
+    matrix = sparse.load_npz(matrix_path).tocsr()
+    centers = pd.read_parquet(centers_path)
+    lands = pd.read_parquet(lands_path)
+
+    if matrix.shape != (len(centers), len(lands)):
+        raise ValidationError(
+            f"Walk time matrix shape {matrix.shape} does not match sidecars "
+            f"({len(centers)} centers, {len(lands)} lands)"
+        )
+
+    return WalkTimeMatrix(
+        matrix=matrix,
+        center_ids=centers.iloc[:, 0].to_numpy(dtype=np.int64),
+        land_ids=lands["land_osmid"].to_numpy(dtype=np.int64),
+        center_node_col=centers.columns[0],
+    )
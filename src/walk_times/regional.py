@@ -0,0 +1,406 @@
+"""Walk times across state lines.
+
+Each state's walk network and conserved lands are prepared separately, so a
+block near the New Hampshire border routed on ``maine_walk.graphml`` never
+sees New Hampshire lands. This module routes a multi-state region in one of
+two modes:
+
+- ``"merged"``: the per-state routing caches are merged into one regional
+  network and every center is searched on it.
+- ``"partitioned"``: each state is a partition holding its own centers plus a
+  halo of the regional network within the maximum walk distance of them.
+  Partitions run in parallel and are small enough to route independently.
+
+Both modes give the same walk times, since no node outside the halo can be
+reached within the maximum trip time. Results are deduplicated into a single
+regional long table and sparse matrix.
+"""
+
+import logging
+from functools import partial
+from multiprocessing import Pool, cpu_count
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from pyproj import CRS
+from scipy.spatial import cKDTree
+from tqdm import tqdm
+
+from config.defaults import DEFAULT_CRS, DEFAULT_TRAVEL_SPEED, DEFAULT_TRIP_TIMES
+from config.regions import RegionConfig
+from exceptions import DataError, ValidationError
+from utils.io import write_parquet
+from walk_times.incremental import recompute_center_walk_times
+from walk_times.matrix import save_walk_time_matrix, walk_times_to_matrix
+from walk_times.routing_cache import (
+    RoutingCache,
+    get_routing_cache,
+    get_routing_cache_path,
+    merge_routing_caches,
+)
+from walk_times.scheduler import estimate_worker_footprint, plan_workers
+
+logger = logging.getLogger(__name__)
+
+REGIONAL_MODES = ("merged", "partitioned")
+
+# Earth radius used by Web Mercator (EPSG:3857)
+_MERCATOR_RADIUS = 6378137.0
+
+
+def get_max_walk_distance(
+    trip_times: list[int] = DEFAULT_TRIP_TIMES,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+) -> float:
+    """Get the farthest distance walkable within the longest trip time.
+
+    Args:
+        trip_times: Trip time thresholds in minutes (default: [5,10,15,20,30,45,60])
+        travel_speed: Travel speed in km/hour (default: 4.5)
+
+    Returns:
+        Distance in meters
+    """
+    return max(trip_times) * travel_speed * 1000 / 60
+
+
+def _crs_distance_scale(node_xy: np.ndarray, crs: str | None) -> float:
+    """Get the factor converting ground meters to CRS units over an area.
+
+    Edge lengths are great-circle meters, but Web Mercator stretches distances
+    by sec(latitude) = cosh(y / R). Using the largest stretch keeps the halo a
+    superset of what is reachable.
+    """
+    if crs is None or len(node_xy) == 0 or CRS.from_user_input(crs).to_epsg() != 3857:
+        return 1.0
+    return float(np.cosh(np.abs(node_xy[:, 1]).max() / _MERCATOR_RADIUS))
+
+
+def partition_routing_cache(
+    cache: RoutingCache,
+    center_nodes: np.ndarray,
+    halo_distance: float,
+) -> RoutingCache:
+    """Cut the part of a regional network reachable from a set of centers.
+
+    Keeps every node within ``halo_distance`` straight-line ground distance of
+    a center. Network distance is never shorter than straight-line distance,
+    so searches bounded by that distance give the same result on the partition
+    as on the full network.
+
+    Args:
+        cache: Regional RoutingCache
+        center_nodes: Center node OSM IDs of the partition
+        halo_distance: Maximum walk distance in meters
+
+    Returns:
+        RoutingCache of the partition
+    """
+    positions = pd.Index(cache.node_ids).get_indexer(np.asarray(center_nodes, dtype=np.int64))
+    positions = positions[positions >= 0]
+    if len(positions) == 0:
+        return cache.subset(np.zeros(len(cache.node_ids), dtype=bool))
+
+    radius = halo_distance * _crs_distance_scale(cache.node_xy, cache.crs)
+    distances, _ = cKDTree(cache.node_xy[positions]).query(
+        cache.node_xy, distance_upper_bound=radius
+    )
+    return cache.subset(np.isfinite(distances))
+
+
+def deduplicate_walk_times(
+    walk_times: pd.DataFrame,
+    center_node_col: str = "block_osmid",
+) -> pd.DataFrame:
+    """Keep one row per (center, land) pair with the shortest walk time.
+
+    Blocks in different states can snap to the same border node, so the same
+    pair can come out of more than one partition.
+
+    Args:
+        walk_times: DataFrame with [center_node_col, "land_osmid", "trip_time", "minutes"]
+        center_node_col: Name of the center node column (default: "block_osmid")
+
+    Returns:
+        Deduplicated DataFrame
+    """
+    return (
+        walk_times.sort_values("minutes", kind="stable")
+        .drop_duplicates([center_node_col, "land_osmid"])
+        .sort_values([center_node_col, "land_osmid"])
+        .reset_index(drop=True)
+    )
+
+
+def _process_partition(
+    partition: tuple[str, RoutingCache, np.ndarray],
+    conserved_lands: pd.DataFrame,
+    trip_times: list[int],
+    travel_speed: float,
+    center_node_col: str,
+) -> pd.DataFrame:
+    """
+    Calculate walk times for a single partition (called in parallel).
+
+    This function is designed to be called by multiprocessing workers.
+    All arguments must be pickleable.
+
+    Returns:
+        DataFrame with [center_node_col, "land_osmid", "trip_time", "minutes"]
+    """
+    name, cache, center_nodes = partition
+    logger.info(
+        f"Partition {name}: {len(center_nodes)} centers, {len(cache.node_ids)} nodes with halo"
+    )
+    return recompute_center_walk_times(
+        cache,
+        center_nodes,
+        conserved_lands,
+        trip_times,
+        travel_speed=travel_speed,
+        center_node_col=center_node_col,
+        n_jobs=1,
+        progress_bar=False,
+    )
+
+
+def calculate_regional_walk_times(
+    cache: RoutingCache,
+    partitions: dict[str, np.ndarray],
+    conserved_lands: pd.DataFrame,
+    trip_times: list[int] = DEFAULT_TRIP_TIMES,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    mode: str = "partitioned",
+    center_node_col: str = "block_osmid",
+    n_jobs: int = 1,
+    progress_bar: bool = True,
+    max_memory: int | None = None,
+) -> pd.DataFrame:
+    """Calculate walk times for a multi-state region.
+
+    Args:
+        cache: Regional RoutingCache (see ``merge_routing_caches``)
+        partitions: Mapping from partition name (e.g. state) to center node OSM IDs
+        conserved_lands: DataFrame with "osmid" column for lands of all states
+        trip_times: Trip time thresholds in minutes (default: [5,10,15,20,30,45,60])
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        mode: "partitioned" (per-partition halo graphs) or "merged" (one search graph)
+        center_node_col: Name of the center node column (default: "block_osmid")
+        n_jobs: Number of parallel workers (1 = serial, -1 = all CPUs); partitions
+            run in parallel in "partitioned" mode and centers in "merged" mode
+        progress_bar: Whether to show progress bar (default: True)
+        max_memory: Optional memory cap in bytes; fewer partitions run at once
+            if their graphs would not fit
+
+    Returns:
+        Deduplicated DataFrame with [center_node_col, "land_osmid", "trip_time", "minutes"]
+
+    Raises:
+        ValidationError: If mode is not recognized
+    """
+    if mode not in REGIONAL_MODES:
+        raise ValidationError(f"Unknown regional mode {mode!r}, expected one of {REGIONAL_MODES}")
+
+    if n_jobs == -1:
+        n_jobs = cpu_count()
+
+    if mode == "merged":
+        center_nodes = pd.unique(np.concatenate(list(partitions.values())).astype(np.int64))
+        logger.info(f"Routing {len(center_nodes)} centers on merged regional network")
+        df = recompute_center_walk_times(
+            cache,
+            center_nodes,
+            conserved_lands,
+            trip_times,
+            travel_speed=travel_speed,
+            center_node_col=center_node_col,
+            n_jobs=n_jobs,
+            progress_bar=progress_bar,
+        )
+        return deduplicate_walk_times(df, center_node_col)
+
+    halo_distance = get_max_walk_distance(trip_times, travel_speed)
+    logger.info(f"Cutting {len(partitions)} partitions with a {halo_distance:.0f} m halo")
+    partition_list = [
+        (name, partition_routing_cache(cache, centers, halo_distance), centers)
+        for name, centers in partitions.items()
+    ]
+
+    worker_func = partial(
+        _process_partition,
+        conserved_lands=conserved_lands[["osmid"]],
+        trip_times=trip_times,
+        travel_speed=travel_speed,
+        center_node_col=center_node_col,
+    )
+
+    n_lands = conserved_lands["osmid"].nunique()
+    n_workers = plan_workers(
+        max(
+            estimate_worker_footprint(len(part.node_ids), len(part.edge_u), n_lands)
+            for _, part, _ in partition_list
+        ),
+        n_tasks=len(partition_list),
+        n_jobs=n_jobs,
+        max_memory=max_memory,
+    ).n_workers
+    if n_workers <= 1:
+        iterator = tqdm(partition_list, desc="Partitions") if progress_bar else partition_list
+        results_list = [worker_func(partition) for partition in iterator]
+    else:
+        logger.info(f"Starting parallel processing with {n_workers} workers...")
+        with Pool(processes=n_workers) as pool:
+            results_iter = pool.imap(worker_func, partition_list)
+            if progress_bar:
+                results_iter = tqdm(
+                    results_iter,
+                    total=len(partition_list),
+                    desc=f"Partitions (×{n_workers} parallel)",
+                )
+            results_list = list(results_iter)
+
+    df = pd.concat(results_list, ignore_index=True)
+    return deduplicate_walk_times(df, center_node_col)
+
+
+def _read_osmids(path: str | Path) -> pd.DataFrame:
+    """Read the "osmid" column of a geography file."""
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(str(path), columns=["osmid"])
+    return gpd.read_file(str(path))[["osmid"]]  # Fallback for existing shapefiles
+
+
+def _read_lands(path: str | Path, acres_col: str) -> gpd.GeoDataFrame:
+    """Read the columns of a conserved lands file shared by all states."""
+    if str(path).endswith(".parquet"):
+        lands = gpd.read_parquet(str(path))
+    else:
+        lands = gpd.read_file(str(path))  # Fallback for existing shapefiles
+    if acres_col not in lands.columns:
+        logger.warning(f"{path} has no {acres_col} column, acres will be missing")
+        lands[acres_col] = np.nan
+    if lands.crs is not None:
+        lands = lands.to_crs(DEFAULT_CRS)
+    return lands[["osmid", acres_col, "geometry"]]
+
+
+def process_regional_walk_times(
+    region_configs: list[RegionConfig],
+    output_path: str | Path,
+    matrix_path: str | Path | None = None,
+    geography_type: str = "blocks",
+    trip_times: list[int] | None = None,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    mode: str = "partitioned",
+    lands_output_path: str | Path | None = None,
+    acres_col: str = "CALC_AC",
+    cache_folder: str | Path | None = None,
+    n_jobs: int = 1,
+    max_memory: int | None = None,
+) -> pd.DataFrame:
+    """Process walk times for a multi-state region into one artifact.
+
+    Graph, geography and conserved lands paths come from each state's
+    RegionConfig. States without a conserved lands file still contribute
+    their network and centers.
+
+    Args:
+        region_configs: RegionConfigs of the states in the region
+        output_path: Path to save the regional long table (Parquet or CSV)
+        matrix_path: Optional path to save the regional sparse matrix (.npz)
+        geography_type: "tracts" or "blocks"
+        trip_times: List of trip time thresholds in minutes (default: [5,10,15,20,30,45,60])
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        mode: "partitioned" or "merged" (see ``calculate_regional_walk_times``)
+        lands_output_path: Optional path to save the combined conserved lands of
+            all states as GeoParquet, for merging the regional walk times
+        acres_col: Acres column kept in the combined conserved lands (default: "CALC_AC")
+        cache_folder: Optional path to OSMnx cache folder
+        n_jobs: Number of parallel workers (default: 1 for serial, -1 for all CPUs)
+        max_memory: Optional memory cap in bytes for parallel processing
+
+    Returns:
+        DataFrame with walk time calculations
+
+    Raises:
+        DataError: If a state's graph or geography file is missing, or no
+            state has conserved lands
+    """
+    if trip_times is None:
+        trip_times = DEFAULT_TRIP_TIMES
+
+    center_node_col = "tract_osmid" if geography_type == "tracts" else "block_osmid"
+    caches = []
+    partitions = {}
+    lands = []
+    for config in region_configs:
+        graph_path = config.get_graph_path()
+        geography_path = (
+            config.get_tracts_path(with_nodes=True)
+            if geography_type == "tracts"
+            else config.get_blocks_path(with_nodes=True)
+        )
+        lands_path = config.get_conserved_lands_path(with_nodes=True)
+        logger.info(f"Loading {config.state_name}: {graph_path}, {geography_path}")
+
+        if not geography_path.exists():
+            raise DataError(
+                f"Missing {geography_type} file for {config.state_name}: {geography_path}"
+            )
+        if not graph_path.exists() and not get_routing_cache_path(graph_path).exists():
+            raise DataError(f"Missing graph file for {config.state_name}: {graph_path}")
+
+        caches.append(get_routing_cache(graph_path, cache_folder=cache_folder))
+        partitions[config.state_name] = pd.unique(
+            _read_osmids(geography_path)["osmid"].astype(np.int64)
+        )
+        if lands_path.exists():
+            lands.append(_read_lands(lands_path, acres_col))
+        else:
+            logger.warning(f"No conserved lands for {config.state_name} at {lands_path}")
+
+    if not lands:
+        raise DataError("No conserved lands found for any state in the region")
+
+    lands = pd.concat(lands, ignore_index=True)
+    if lands_output_path:
+        logger.info(f"Saving regional conserved lands to {lands_output_path}")
+        Path(lands_output_path).parent.mkdir(parents=True, exist_ok=True)
+        write_parquet(lands, lands_output_path, index=False)
+
+    cache = merge_routing_caches(caches)
+    logger.info(
+        f"Regional network for {len(region_configs)} states: {len(cache.node_ids)} nodes, "
+        f"{len(cache.edge_u)} edges"
+    )
+
+    df = calculate_regional_walk_times(
+        cache,
+        partitions,
+        lands,
+        trip_times=trip_times,
+        travel_speed=travel_speed,
+        mode=mode,
+        center_node_col=center_node_col,
+        n_jobs=n_jobs,
+        max_memory=max_memory,
+    )
+
+    logger.info(f"Saving regional walk times to {output_path}")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    long_df = df.drop(columns="minutes")
+    if str(output_path).endswith(".parquet"):
+        long_df.to_parquet(output_path, index=False)
+    else:
+        long_df.to_csv(output_path, index=False)  # Fallback for CSV output
+
+    if matrix_path:
+        save_walk_time_matrix(
+            walk_times_to_matrix(df, value_col="minutes", center_node_col=center_node_col),
+            matrix_path,
+        )
+
+    return df
@@ -0,0 +1,284 @@
+"""Compact routing cache for walk network graphs.
+
+Parsing a statewide GraphML file with OSMnx takes minutes and holds every
+OSM tag in memory, while routing only needs node IDs, coordinates and edge
+lengths. A routing cache stores exactly those as flat NumPy arrays in a
+single compressed .npz file that loads in well under a second and converts
+straight to a rustworkx graph.
+"""
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import rustworkx as rx
+
+from config.defaults import DEFAULT_CRS, DEFAULT_TRAVEL_SPEED
+from exceptions import DataError
+from walk_times.calculate import load_graph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RoutingCache:
+    """Flat-array representation of a projected walk network.
+
+    Attributes:
+        node_ids: OSM node IDs
+        node_xy: Node coordinates in the graph CRS, shape (n_nodes, 2)
+        edge_u: Edge source node IDs
+        edge_v: Edge target node IDs
+        edge_length: Edge lengths in meters
+        crs: Coordinate reference system of node_xy
+    """
+
+    node_ids: np.ndarray
+    node_xy: np.ndarray
+    edge_u: np.ndarray
+    edge_v: np.ndarray
+    edge_length: np.ndarray
+    crs: str | None = None
+
+    def edge_table(self) -> pd.DataFrame:
+        """Get the edges as a DataFrame with columns ["u", "v", "length"]."""
+        return pd.DataFrame({"u": self.edge_u, "v": self.edge_v, "length": self.edge_length})
+
+    def to_rustworkx(
+        self,
+        travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    ) -> tuple[rx.PyDiGraph, dict[int, int], dict[int, int]]:
+        """Build a rustworkx graph weighted by walk time in minutes.
+
+        Parallel edges are collapsed to the shortest one, since only the
+        shortest can lie on a shortest path.
+
+        Args:
+            travel_speed: Travel speed in km/hour (default: 4.5)
+
+        Returns:
+            Tuple of (rustworkx_graph, nx_id_to_rx_idx, rx_idx_to_nx_id), matching
+            ``graph_utils.nx_to_rustworkx``
+        """
+        meters_per_minute = travel_speed * 1000 / 60
+        node_index = pd.Index(self.node_ids)
+        edges = (
+            pd.DataFrame(
+                {
+                    "u": node_index.get_indexer(self.edge_u),
+                    "v": node_index.get_indexer(self.edge_v),
+                    "time": self.edge_length / meters_per_minute,
+                }
+            )
+            .groupby(["u", "v"], as_index=False, sort=False)["time"]
+            .min()
+        )
+
+        rx_graph = rx.PyDiGraph()
+        rx_graph.add_nodes_from([None] * len(self.node_ids))
+        rx_graph.add_edges_from(
+            list(zip(edges["u"].tolist(), edges["v"].tolist(), edges["time"].tolist(), strict=True))
+        )
+
+        nx_id_to_rx_idx = {int(node): i for i, node in enumerate(self.node_ids)}
+        rx_idx_to_nx_id = {i: int(node) for i, node in enumerate(self.node_ids)}
+        logger.info(
+            f"Built rustworkx graph from routing cache: {rx_graph.num_nodes()} nodes, "
+            f"{rx_graph.num_edges()} edges"
+        )
+        return rx_graph, nx_id_to_rx_idx, rx_idx_to_nx_id
+
+    def subset(self, node_mask: np.ndarray) -> "RoutingCache":
+        """Get the subgraph induced by a boolean node mask.
+
+        Args:
+            node_mask: Boolean array aligned with node_ids
+
+        Returns:
+            RoutingCache with the selected nodes and the edges between them
+        """
+        kept = self.node_ids[node_mask]
+        edge_mask = np.isin(self.edge_u, kept) & np.isin(self.edge_v, kept)
+        return RoutingCache(
+            node_ids=kept,
+            node_xy=self.node_xy[node_mask],
+            edge_u=self.edge_u[edge_mask],
+            edge_v=self.edge_v[edge_mask],
+            edge_length=self.edge_length[edge_mask],
+            crs=self.crs,
+        )
+
+
+def build_routing_cache(nx_graph: nx.MultiDiGraph) -> RoutingCache:
+    """Extract a RoutingCache from a projected OSMnx graph.
+
+    Args:
+        nx_graph: Projected NetworkX graph with "x"/"y" node attributes and
+            "length" edge attributes
+
+    Returns:
+        RoutingCache
+    """
+    node_ids = np.fromiter(nx_graph.nodes(), dtype=np.int64, count=nx_graph.number_of_nodes())
+    node_xy = np.array(
+        [(data["x"], data["y"]) for _, data in nx_graph.nodes(data=True)], dtype=np.float64
+    ).reshape(-1, 2)
+
+    n_edges = nx_graph.number_of_edges()
+    edge_u = np.empty(n_edges, dtype=np.int64)
+    edge_v = np.empty(n_edges, dtype=np.int64)
+    edge_length = np.empty(n_edges, dtype=np.float64)
+    for i, (u, v, length) in enumerate(nx_graph.edges(data="length", default=np.nan)):
+        edge_u[i], edge_v[i], edge_length[i] = u, v, length
+
+    missing = np.isnan(edge_length).sum()
+    if missing:
+        logger.warning(f"{missing} edges missing 'length' attribute")
+
+    return RoutingCache(
+        node_ids=node_ids,
+        node_xy=node_xy,
+        edge_u=edge_u,
+        edge_v=edge_v,
+        edge_length=edge_length,
+        crs=str(nx_graph.graph["crs"]) if nx_graph.graph.get("crs") else None,
+    )
+
+
+def merge_routing_caches(caches: list[RoutingCache]) -> RoutingCache:
+    """Merge routing caches of adjacent areas into one network.
+
+    OSM node IDs are global, so nodes shared by two extracts (e.g. on a road
+    crossing a state line) join the networks. Duplicate nodes and edges are
+    kept once.
+
+    Args:
+        caches: RoutingCaches in the same CRS
+
+    Returns:
+        Merged RoutingCache
+
+    Raises:
+        DataError: If the caches are empty or use different CRSs
+    """
+    if not caches:
+        raise DataError("No routing caches to merge")
+    crs_values = {cache.crs for cache in caches}
+    if len(crs_values) > 1:
+        raise DataError(f"Cannot merge routing caches with different CRSs: {crs_values}")
+
+    node_ids = np.concatenate([cache.node_ids for cache in caches])
+    node_ids, first = np.unique(node_ids, return_index=True)
+    node_xy = np.concatenate([cache.node_xy for cache in caches])[first]
+
+    edges = pd.concat([cache.edge_table() for cache in caches], ignore_index=True)
+    edges = edges.drop_duplicates()
+
+    return RoutingCache(
+        node_ids=node_ids,
+        node_xy=node_xy,
+        edge_u=edges["u"].to_numpy(dtype=np.int64),
+        edge_v=edges["v"].to_numpy(dtype=np.int64),
+        edge_length=edges["length"].to_numpy(dtype=np.float64),
+        crs=crs_values.pop(),
+    )
+
+
+def save_routing_cache(cache: RoutingCache, cache_path: str | Path) -> None:
+    """Save a RoutingCache as a compressed .npz file.
+
+    Args:
+        cache: RoutingCache to save
+        cache_path: Path to the .npz file
+    """
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Saving routing cache to {cache_path}")
+    np.savez_compressed(
+        cache_path,
+        node_ids=cache.node_ids,
+        node_xy=cache.node_xy,
+        edge_u=cache.edge_u,
+        edge_v=cache.edge_v,
+        edge_length=cache.edge_length,
+        crs=np.array(cache.crs or ""),
+    )
+
+
+def load_routing_cache(cache_path: str | Path) -> RoutingCache:
+    """Load a RoutingCache saved with ``save_routing_cache``.
+
+    Args:
+        cache_path: Path to the .npz file
+
+    Returns:
+        RoutingCache
+
+    Raises:
+        DataError: If the file is missing arrays
+    """
+    logger.info(f"Loading routing cache from {cache_path}")
+    with np.load(cache_path) as data:
+        try:
+            return RoutingCache(
+                node_ids=data["node_ids"],
+                node_xy=data["node_xy"],
+                edge_u=data["edge_u"],
+                edge_v=data["edge_v"],
+                edge_length=data["edge_length"],
+                crs=str(data["crs"]) or None,
+            )
+        except KeyError as e:
+            raise DataError(f"Invalid routing cache {cache_path}: missing {e}") from e
+
+
+def get_routing_cache_path(graph_path: str | Path, previous: bool = False) -> Path:
+    """Get the default routing cache path next to a GraphML file.
+
+    Args:
+        graph_path: Path to OSMnx GraphML file
+        previous: If True, get the path of the cache kept from the previous
+            snapshot when the graph is refreshed
+
+    Returns:
+        Path like data/graphs/maine_walk.routing.npz (or maine_walk.prev.routing.npz)
+    """
+    graph_path = Path(graph_path)
+    suffix = ".prev.routing.npz" if previous else ".routing.npz"
+    return graph_path.with_name(f"{graph_path.name.removesuffix('.graphml')}{suffix}")
+
+
+def get_routing_cache(
+    graph_path: str | Path,
+    cache_path: str | Path | None = None,
+    cache_folder: str | Path | None = None,
+    crs: str = DEFAULT_CRS,
+) -> RoutingCache:
+    """Load the routing cache for a graph, building it if missing or stale.
+
+    The cache is rebuilt when it is older than the GraphML file, so refreshing
+    the graph with ``update_osmnx_graphs`` invalidates it automatically.
+
+    Args:
+        graph_path: Path to OSMnx GraphML file
+        cache_path: Path to the .npz cache (default: next to graph_path)
+        cache_folder: Optional path to OSMnx cache folder
+        crs: Coordinate reference system to project to (default: EPSG:3857)
+
+    Returns:
+        RoutingCache
+    """
+    cache_path = Path(cache_path) if cache_path else get_routing_cache_path(graph_path)
+    graph_path = Path(graph_path)
+
+    if cache_path.exists() and (
+        not graph_path.exists() or cache_path.stat().st_mtime >= graph_path.stat().st_mtime
+    ):
+        return load_routing_cache(cache_path)
+
+    cache = build_routing_cache(load_graph(graph_path, cache_folder=cache_folder, crs=crs))
+    save_routing_cache(cache, cache_path)
+    return cache
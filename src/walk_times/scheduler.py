@@ -0,0 +1,293 @@
+"""Memory-aware worker planning for parallel walk time calculation.
+
+Every worker receives its own copy of the rustworkx graph and node mappings,
+so ``n_jobs=-1`` on a large state can need more memory than the machine (or
+container) has. This module estimates the per-worker footprint from the size
+of the routing cache, reads the memory actually available (honoring cgroup
+limits), and picks a worker count and batch size that fit. While the pool runs,
+submissions are throttled whenever the resident memory of the parent and its
+workers approaches the budget.
+"""
+
+import logging
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing import active_children, cpu_count
+from multiprocessing.pool import AsyncResult, Pool
+from pathlib import Path
+from typing import Any
+
+from exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Approximate in-memory cost of the worker-side graph objects. rustworkx
+# stores a Python float per edge, and the nx <-> rx mappings are dicts of
+# Python ints, which dominate the footprint. Calibrated against the RSS growth
+# of unpickling a worker payload (graph, both mappings, land mapping): on
+# grid networks (4 directed edges per node) the estimate is ~95% of measured,
+# on sparser road-like networks (2-3 per node) it overestimates by ~20-40%.
+# tests/test_walk_times.py::TestScheduler::test_worker_footprint_matches_rss
+# re-checks it.
+_BYTES_PER_NODE = 400
+_BYTES_PER_EDGE = 100
+_BYTES_PER_LAND = 120
+_WORKER_BASE_BYTES = 50 * 1024**2
+
+# Fraction of the budget that may be planned for, leaving headroom for results
+_BUDGET_FRACTION = 0.8
+# Resident memory fraction of max_memory at which submissions pause
+_HIGH_WATER_FRACTION = 0.9
+
+_MAX_CHUNKSIZE = 100
+_UNLIMITED_CGROUP = 2**60
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+@dataclass
+class WorkerPlan:
+    """Worker count and batch size chosen for a parallel run.
+
+    Attributes:
+        n_workers: Number of worker processes
+        chunksize: Center nodes per task submitted to a worker
+        worker_footprint: Estimated bytes per worker
+        budget: Memory budget in bytes, or None if unknown
+    """
+
+    n_workers: int
+    chunksize: int
+    worker_footprint: int
+    budget: int | None = None
+
+
+def parse_memory_size(size: str | int | None) -> int | None:
+    """Parse a memory size like "8G", "512M" or "1.5GB" into bytes.
+
+    Args:
+        size: Size string with an optional K/M/G/T suffix, or a byte count
+
+    Returns:
+        Size in bytes, or None if size is None
+
+    Raises:
+        ValidationError: If the size cannot be parsed
+    """
+    if size is None or isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", size.upper())
+    if not match:
+        raise ValidationError(f"Invalid memory size: {size!r} (expected e.g. '8G' or '512M')")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def _read_int(path: Path) -> int | None:
+    """Read an integer from a /proc or /sys file, or None if unavailable."""
+    try:
+        value = path.read_text().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def _cgroup_headroom(cgroup_root: Path) -> int | None:
+    """Get the memory left under the cgroup limit (v2 or v1), if any."""
+    for limit_file, usage_file in (
+        ("memory.max", "memory.current"),
+        ("memory/memory.limit_in_bytes", "memory/memory.usage_in_bytes"),
+    ):
+        limit = _read_int(cgroup_root / limit_file)
+        if limit is not None and limit < _UNLIMITED_CGROUP:
+            usage = _read_int(cgroup_root / usage_file) or 0
+            return max(limit - usage, 0)
+    return None
+
+
+def get_available_memory(
+    meminfo_path: str | Path = "/proc/meminfo",
+    cgroup_root: str | Path = "/sys/fs/cgroup",
+) -> int | None:
+    """Get the memory available to new processes, honoring cgroup limits.
+
+    Inside a container, /proc/meminfo reports the host's memory, so the
+    cgroup limit minus current usage is taken into account as well.
+
+    Args:
+        meminfo_path: Path to meminfo (default: "/proc/meminfo")
+        cgroup_root: Path to the cgroup filesystem (default: "/sys/fs/cgroup")
+
+    Returns:
+        Available bytes, or None if it cannot be determined (e.g. not Linux)
+    """
+    available = []
+    try:
+        for line in Path(meminfo_path).read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                available.append(int(line.split()[1]) * 1024)
+                break
+    except OSError:
+        pass
+
+    headroom = _cgroup_headroom(Path(cgroup_root))
+    if headroom is not None:
+        available.append(headroom)
+
+    return min(available) if available else None
+
+
+def get_rss(pids: Iterable[int] | None = None) -> int:
+    """Get the total resident memory of this process and its children.
+
+    Args:
+        pids: Process IDs to sum (default: this process and its active children)
+
+    Returns:
+        Resident bytes, or 0 if /proc is unavailable
+    """
+    if pids is None:
+        pids = [
+            os.getpid(),
+            *(child.pid for child in active_children() if child.pid is not None),
+        ]
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for pid in pids:
+        try:
+            total += int(Path(f"/proc/{pid}/statm").read_text().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def estimate_worker_footprint(n_nodes: int, n_edges: int, n_lands: int = 0) -> int:
+    """Estimate the memory one walk time worker needs for a network.
+
+    The counts are those of the routing cache (``len(cache.node_ids)``,
+    ``len(cache.edge_u)``) or of the rustworkx graph built from it.
+
+    Args:
+        n_nodes: Number of graph nodes
+        n_edges: Number of graph edges
+        n_lands: Number of conserved land nodes passed to each worker
+
+    Returns:
+        Estimated bytes per worker
+    """
+    return (
+        _WORKER_BASE_BYTES
+        + n_nodes * _BYTES_PER_NODE
+        + n_edges * _BYTES_PER_EDGE
+        + n_lands * _BYTES_PER_LAND
+    )
+
+
+def plan_workers(
+    worker_footprint: int,
+    n_tasks: int,
+    n_jobs: int = -1,
+    max_memory: int | None = None,
+    available_memory: int | None = None,
+) -> WorkerPlan:
+    """Pick a worker count and batch size that fit in memory.
+
+    Args:
+        worker_footprint: Estimated bytes per worker (see ``estimate_worker_footprint``)
+        n_tasks: Number of center nodes to process
+        n_jobs: Maximum number of workers (-1 = all CPUs)
+        max_memory: Optional memory cap in bytes
+        available_memory: Available bytes (default: read with ``get_available_memory``)
+
+    Returns:
+        WorkerPlan
+    """
+    if n_jobs == -1:
+        n_jobs = cpu_count()
+    if available_memory is None:
+        available_memory = get_available_memory()
+
+    limits = [m for m in (max_memory, available_memory) if m is not None]
+    budget = min(limits) if limits else None
+
+    n_workers = max(1, min(n_jobs, n_tasks))
+    if budget is not None:
+        fit = int(budget * _BUDGET_FRACTION // max(worker_footprint, 1))
+        if fit < n_workers:
+            logger.warning(
+                f"Memory budget {budget / 1024**3:.1f} GiB fits {fit} workers of "
+                f"~{worker_footprint / 1024**2:.0f} MiB; reducing from {n_workers}"
+            )
+        n_workers = max(1, min(n_workers, fit))
+
+    # Several batches per worker keep the load balanced and results flowing back
+    chunksize = max(1, min(_MAX_CHUNKSIZE, n_tasks // (n_workers * 4)))
+
+    return WorkerPlan(
+        n_workers=n_workers,
+        chunksize=chunksize,
+        worker_footprint=worker_footprint,
+        budget=budget,
+    )
+
+
+def _run_chunk(func: Callable, chunk: list) -> list:
+    """Apply func to every item of a chunk (called in parallel)."""
+    return [func(item) for item in chunk]
+
+
+def throttled_imap(
+    pool: Pool,
+    func: Callable,
+    items: list,
+    chunksize: int = 1,
+    max_memory: int | None = None,
+    max_pending: int | None = None,
+    poll_interval: float = 0.5,
+) -> Iterator[Any]:
+    """Ordered ``pool.imap`` that holds back submissions under memory pressure.
+
+    At most ``max_pending`` chunks are queued at once. When the resident memory
+    of this process and its workers exceeds 90% of ``max_memory``, no new
+    chunk is submitted until the oldest one finishes.
+
+    Args:
+        pool: multiprocessing Pool
+        func: Function applied to each item (must be pickleable)
+        items: Items to process
+        chunksize: Items per submitted chunk (default: 1)
+        max_memory: Optional memory cap in bytes
+        max_pending: Maximum queued chunks (default: 2 per worker)
+        poll_interval: Seconds to wait for a chunk while throttled (default: 0.5)
+
+    Yields:
+        func(item) for each item, in order
+    """
+    if max_pending is None:
+        max_pending = 2 * max(getattr(pool, "_processes", 1), 1)
+    high_water = max_memory * _HIGH_WATER_FRACTION if max_memory else None
+
+    chunk_func = partial(_run_chunk, func)
+    pending: deque[AsyncResult] = deque()
+    n_throttled = 0
+    for start in range(0, len(items), chunksize):
+        throttled = False
+        while pending and (
+            len(pending) >= max_pending or (high_water is not None and get_rss() > high_water)
+        ):
+            throttled = throttled or len(pending) < max_pending
+            pending[0].wait(poll_interval)
+            if pending[0].ready():
+                yield from pending.popleft().get()
+        n_throttled += throttled
+        pending.append(pool.apply_async(chunk_func, (items[start : start + chunksize],)))
+
+    while pending:
+        yield from pending.popleft().get()
+
+    if n_throttled:
+        logger.info(f"Held back {n_throttled} submissions with memory near the cap")
@@ -0,0 +1,344 @@
+"""Local HTTP service for on-demand walk time lookups.
+
+Loads the routing cache once and answers batched "which conserved lands can I
+walk to from these points?" queries without reloading the graph::
+
+    cd src
+    python -m walk_times.serve \\
+        --graph ../data/graphs/maine_walk.graphml \\
+        --conserved-lands ../data/conserved_lands/Maine_Conserved_Lands_with_nodes.shp.zip
+
+    curl -s localhost:8765/query -d '{"points": [[-70.25, 43.66]], "trip_time": 15}'
+
+Endpoints:
+    POST /query   {"points": [[lon, lat], ...], "trip_time": 10}
+    GET  /stats   request count, latency, throughput and cache hit rate
+    GET  /health
+
+Points are snapped to the nearest graph node with a KD-tree. Search results
+per node are kept in an LRU cache, so repeated or nearby points cost a lookup.
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from pyproj import CRS, Transformer
+from scipy.spatial import cKDTree
+
+from config.defaults import DEFAULT_TRAVEL_SPEED, DEFAULT_TRIP_TIMES
+from exceptions import ValidationError
+from walk_times.algorithms import bounded_dijkstra
+from walk_times.routing_cache import RoutingCache, get_routing_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_LRU_SIZE = 4096
+
+
+class WalkTimeService:
+    """In-memory walk time lookups from arbitrary points.
+
+    Args:
+        cache: RoutingCache of the walk network
+        conserved_lands: DataFrame with "osmid" and acres columns
+        max_trip_time: Longest trip time that can be queried, in minutes
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        acres_col: Acres column (default: "CALC_AC")
+        lru_size: Number of node search results to keep (default: 4096)
+    """
+
+    def __init__(
+        self,
+        cache: RoutingCache,
+        conserved_lands: pd.DataFrame,
+        max_trip_time: float = max(DEFAULT_TRIP_TIMES),
+        travel_speed: float = DEFAULT_TRAVEL_SPEED,
+        acres_col: str = "CALC_AC",
+        lru_size: int = DEFAULT_LRU_SIZE,
+    ):
+        self.max_trip_time = max_trip_time
+        self.node_ids = cache.node_ids
+        self.is_mercator = (
+            cache.crs is not None and CRS.from_user_input(cache.crs).to_epsg() == 3857
+        )
+        self.rx_graph, self.nx_to_rx, _ = cache.to_rustworkx(travel_speed)
+        self.tree = cKDTree(cache.node_xy)
+        self.transformer = (
+            Transformer.from_crs("EPSG:4326", cache.crs, always_xy=True) if cache.crs else None
+        )
+
+        node_acres = (
+            conserved_lands.assign(osmid=conserved_lands["osmid"].astype(np.int64))
+            .groupby("osmid")[acres_col]
+            .sum()
+        )
+        node_acres = node_acres[node_acres.index.isin(self.nx_to_rx)]
+        self.land_acres = dict(zip(node_acres.index.tolist(), node_acres.tolist(), strict=True))
+        self.land_rx = {self.nx_to_rx[node]: node for node in self.land_acres}
+
+        self.lru_size = lru_size
+        self._lru: OrderedDict[int, list[tuple[int, float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "points": 0, "seconds": 0.0, "hits": 0, "misses": 0}
+        self.started = time.time()
+        logger.info(
+            f"Walk time service ready: {len(self.node_ids)} nodes, "
+            f"{len(self.land_acres)} conserved land nodes"
+        )
+
+    def snap(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Snap lon/lat points to their nearest graph nodes.
+
+        Args:
+            points: Array of shape (n, 2) with lon, lat in EPSG:4326
+
+        Returns:
+            Tuple of (node_ids, snap_distances) with distances in meters
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self.transformer is not None:
+            # Lists rather than arrays: pyproj mishandles length-1 arrays as scalars
+            xy = np.column_stack(
+                self.transformer.transform(points[:, 0].tolist(), points[:, 1].tolist())
+            )
+        else:
+            xy = points
+        distances, positions = self.tree.query(xy)
+        if self.is_mercator:
+            # Web Mercator stretches distances by sec(latitude)
+            distances = distances * np.cos(np.radians(points[:, 1]))
+        return self.node_ids[positions], distances
+
+    def reachable_lands(self, node: int) -> list[tuple[int, float]]:
+        """Get conserved land nodes reachable from a node within max_trip_time.
+
+        Args:
+            node: Graph node OSM ID
+
+        Returns:
+            List of (land node ID, minutes) sorted by minutes
+        """
+        with self._lock:
+            if node in self._lru:
+                self._lru.move_to_end(node)
+                self.stats["hits"] += 1
+                return self._lru[node]
+            self.stats["misses"] += 1
+
+        distances = bounded_dijkstra(self.rx_graph, self.nx_to_rx[node], self.max_trip_time)
+        lands = sorted(
+            (
+                (self.land_rx[idx], minutes)
+                for idx, minutes in distances.items()
+                if idx in self.land_rx
+            ),
+            key=lambda land: land[1],
+        )
+
+        with self._lock:
+            self._lru[node] = lands
+            if len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+        return lands
+
+    def query(self, points: Sequence[Sequence[float]], trip_time: float | None = None) -> dict:
+        """Answer a batch of point queries.
+
+        Args:
+            points: List of [lon, lat] pairs
+            trip_time: Trip time in minutes (default: max_trip_time)
+
+        Returns:
+            Dict with one result per point and the request latency
+
+        Raises:
+            ValidationError: If trip_time exceeds max_trip_time or points are malformed
+                or not finite
+        """
+        start = time.perf_counter()
+        trip_time = self.max_trip_time if trip_time is None else float(trip_time)
+        if trip_time > self.max_trip_time:
+            raise ValidationError(
+                f"trip_time {trip_time} exceeds the service maximum of {self.max_trip_time}"
+            )
+        coords = np.asarray(points, dtype=np.float64)
+        if coords.ndim != 2 or coords.shape[1] != 2:
+            raise ValidationError("points must be a list of [lon, lat] pairs")
+        if not np.isfinite(coords).all():
+            raise ValidationError("points must have finite coordinates")
+
+        nodes, snap_distances = self.snap(coords)
+        results = []
+        for (lon, lat), node, snap_distance in zip(
+            coords.tolist(), nodes.tolist(), snap_distances.tolist(), strict=True
+        ):
+            lands = [
+                {"osmid": land, "minutes": round(minutes, 2), "acres": self.land_acres[land]}
+                for land, minutes in self.reachable_lands(node)
+                if minutes <= trip_time
+            ]
+            results.append(
+                {
+                    "point": [lon, lat],
+                    "node": node,
+                    "snap_distance_m": round(snap_distance, 1),
+                    "acres": sum(land["acres"] for land in lands),
+                    "lands": lands,
+                }
+            )
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["points"] += len(results)
+            self.stats["seconds"] += latency
+        logger.info(
+            f"Answered {len(results)} points in {latency * 1000:.1f} ms "
+            f"({len(results) / max(latency, 1e-9):.0f} points/s)"
+        )
+        return {"trip_time": trip_time, "latency_ms": latency * 1000, "results": results}
+
+    def get_stats(self) -> dict:
+        """Get request, latency, throughput and cache statistics."""
+        with self._lock:
+            stats = dict(self.stats)
+            cached = len(self._lru)
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "requests": stats["requests"],
+            "points": stats["points"],
+            "mean_latency_ms": (
+                stats["seconds"] / stats["requests"] * 1000 if stats["requests"] else 0.0
+            ),
+            "points_per_second": stats["points"] / stats["seconds"] if stats["seconds"] else 0.0,
+            "cache_hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            "cached_nodes": cached,
+            "uptime_s": time.time() - self.started,
+        }
+
+
+def make_handler(service: WalkTimeService) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler class bound to a service.
+
+    Args:
+        service: WalkTimeService answering the queries
+
+    Returns:
+        BaseHTTPRequestHandler subclass
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body: dict) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):  # noqa: N802
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send_json(200, service.get_stats())
+            else:
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):  # noqa: N802
+            if self.path != "/query":
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                self._send_json(200, service.query(body["points"], body.get("trip_time")))
+            except (ValidationError, KeyError, TypeError, ValueError) as e:
+                self._send_json(400, {"error": str(e)})
+
+        def log_message(self, format, *args):  # noqa: A002
+            logger.debug(format % args)
+
+    return Handler
+
+
+def create_server(
+    service: WalkTimeService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+) -> ThreadingHTTPServer:
+    """Create an HTTP server for a service (call ``serve_forever`` to run it).
+
+    Args:
+        service: WalkTimeService answering the queries
+        host: Interface to bind (default: "127.0.0.1")
+        port: Port to bind, 0 for any free port (default: 8765)
+
+    Returns:
+        ThreadingHTTPServer
+    """
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def _read_lands(path: str | Path, acres_col: str) -> pd.DataFrame:
+    """Read node IDs and acres of a conserved lands file."""
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(str(path), columns=["osmid", acres_col])
+    return gpd.read_file(str(path))  # Fallback for existing shapefiles
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Serve walk time lookups over HTTP")
+    parser.add_argument("--graph", required=True, help="Path to OSMnx GraphML file")
+    parser.add_argument("--routing-cache", help="Path to routing cache (default: next to graph)")
+    parser.add_argument(
+        "--conserved-lands", required=True, help="Path to conserved lands file with node IDs"
+    )
+    parser.add_argument("--acres-col", default="CALC_AC", help="Acres column (default: CALC_AC)")
+    parser.add_argument(
+        "--max-trip-time",
+        type=float,
+        default=max(DEFAULT_TRIP_TIMES),
+        help="Longest trip time that can be queried, in minutes",
+    )
+    parser.add_argument("--travel-speed", type=float, default=DEFAULT_TRAVEL_SPEED, help="km/h")
+    parser.add_argument(
+        "--lru-size", type=int, default=DEFAULT_LRU_SIZE, help="Cached node searches"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to bind")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    service = WalkTimeService(
+        get_routing_cache(args.graph, cache_path=args.routing_cache),
+        _read_lands(args.conserved_lands, args.acres_col),
+        max_trip_time=args.max_trip_time,
+        travel_speed=args.travel_speed,
+        acres_col=args.acres_col,
+        lru_size=args.lru_size,
+    )
+    server = create_server(service, args.host, args.port)
+    logger.info(f"Serving walk time lookups on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""File-based work queue for spreading walk times across machines.
+
+A queue is a directory on a filesystem shared by all workers (e.g. NFS). No
+scheduler service is needed: every state change is an atomic rename, so only
+one worker can win any transition.
+
+Layout::
+
+    <queue>/
+        job.json                  trip times, travel speed, column names
+        routing.npz               routing cache of the network (see routing_cache)
+        lands.parquet             conserved land node IDs
+        pending/shard-00000.npy   center node IDs not yet claimed
+        leases/shard-00000@<worker>.npy   claimed shards; mtime is the heartbeat
+        done/shard-00000.npy      finished shards
+        parts/shard-00000.parquet walk times of each finished shard
+
+A worker claims a shard by renaming it from pending/ into leases/, touches the
+lease while it works, writes its part file to a temporary name and renames it
+into place, then moves the lease to done/. Leases not touched within the
+timeout are renamed back to pending/, so shards of a crashed worker are picked
+up again. A shard finished twice writes the same part file twice, which is
+harmless.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import re
+import socket
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+import numpy as np
+import pandas as pd
+
+from config.defaults import DEFAULT_TRAVEL_SPEED, DEFAULT_TRIP_TIMES
+from exceptions import DataError
+from walk_times.routing_cache import RoutingCache, save_routing_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_SIZE = 1000
+DEFAULT_LEASE_TIMEOUT = 1800  # seconds
+
+
+@dataclass
+class Shard:
+    """A claimed shard of center nodes.
+
+    Attributes:
+        name: Shard name (e.g. "shard-00000")
+        lease_path: Path of the lease file held by the worker
+        center_nodes: Center node OSM IDs
+    """
+
+    name: str
+    lease_path: Path
+    center_nodes: np.ndarray
+
+
+def default_worker_id() -> str:
+    """Get a worker ID unique across machines ("<hostname>-<pid>")."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """Shared-directory work queue of center node shards.
+
+    Args:
+        root: Queue directory
+        lease_timeout: Seconds after which an untouched lease is requeued
+    """
+
+    def __init__(self, root: str | Path, lease_timeout: float = DEFAULT_LEASE_TIMEOUT):
+        self.root = Path(root)
+        self.lease_timeout = lease_timeout
+        self.pending_dir = self.root / "pending"
+        self.leases_dir = self.root / "leases"
+        self.done_dir = self.root / "done"
+        self.parts_dir = self.root / "parts"
+
+    @classmethod
+    def create(
+        cls,
+        root: str | Path,
+        center_nodes: np.ndarray,
+        job: dict,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+    ) -> "WorkQueue":
+        """Create a queue and split center nodes into pending shards.
+
+        Args:
+            root: Queue directory (must not already hold a queue)
+            center_nodes: Center node OSM IDs
+            job: JSON-serializable job parameters shared by all workers
+            shard_size: Center nodes per shard (default: 1000)
+            lease_timeout: Seconds after which an untouched lease is requeued
+
+        Returns:
+            WorkQueue
+
+        Raises:
+            DataError: If root already holds a queue
+        """
+        queue = cls(root, lease_timeout=lease_timeout)
+        if queue.job_path.exists():
+            raise DataError(f"Work queue already exists at {queue.root}")
+
+        for directory in (queue.pending_dir, queue.leases_dir, queue.done_dir, queue.parts_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        center_nodes = np.asarray(center_nodes, dtype=np.int64)
+        starts = range(0, len(center_nodes), shard_size)
+        for i, start in enumerate(starts):
+            np.save(
+                queue.pending_dir / f"shard-{i:05d}.npy", center_nodes[start : start + shard_size]
+            )
+        n_shards = len(starts)
+
+        _write_atomic(queue.job_path, json.dumps({**job, "n_shards": n_shards}, indent=2))
+        logger.info(f"Created work queue at {queue.root}: {n_shards} shards of {shard_size}")
+        return queue
+
+    @property
+    def job_path(self) -> Path:
+        """Path of the job parameters file."""
+        return self.root / "job.json"
+
+    @property
+    def job(self) -> dict:
+        """Job parameters shared by all workers."""
+        return cast(dict, json.loads(self.job_path.read_text()))
+
+    def requeue_expired(self) -> int:
+        """Move leases older than the timeout back to pending.
+
+        Returns:
+            Number of shards requeued
+        """
+        now = time.time()
+        requeued = 0
+        for lease in self.leases_dir.glob("*.npy"):
+            name = lease.name.split("@", 1)[0]
+            try:
+                if now - lease.stat().st_mtime <= self.lease_timeout:
+                    continue
+                os.rename(lease, self.pending_dir / f"{name}.npy")
+            except FileNotFoundError:
+                continue  # Completed or requeued by another worker meanwhile
+            logger.warning(f"Lease {lease.name} expired, requeued {name}")
+            requeued += 1
+        return requeued
+
+    def claim(self, worker_id: str) -> Shard | None:
+        """Claim a pending shard.
+
+        Args:
+            worker_id: ID of the claiming worker (stored in the lease name)
+
+        Returns:
+            Shard, or None if no shard is pending
+        """
+        worker_id = re.sub(r"[^0-9A-Za-z_.-]", "_", worker_id)
+        self.requeue_expired()
+        for path in sorted(self.pending_dir.glob("*.npy")):
+            lease_path = self.leases_dir / f"{path.stem}@{worker_id}.npy"
+            try:
+                # Touch first: the rename keeps the mtime, and a stale mtime in
+                # leases/ would let another worker requeue the fresh lease
+                os.utime(path)
+                os.rename(path, lease_path)
+                center_nodes = np.load(lease_path)
+            except FileNotFoundError:
+                continue  # Claimed (or the lease requeued) by another worker first
+            return Shard(name=path.stem, lease_path=lease_path, center_nodes=center_nodes)
+        return None
+
+    def renew(self, shard: Shard) -> bool:
+        """Refresh the heartbeat of a lease.
+
+        Args:
+            shard: Claimed shard
+
+        Returns:
+            False if the lease was lost (expired and requeued)
+        """
+        try:
+            os.utime(shard.lease_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, shard: Shard, walk_times: pd.DataFrame) -> None:
+        """Write a shard's part file and mark it done.
+
+        Args:
+            shard: Claimed shard
+            walk_times: Walk times computed for the shard
+        """
+        part_path = self.parts_dir / f"{shard.name}.parquet"
+        tmp_path = part_path.with_name(f".{shard.lease_path.stem}.parquet.tmp")
+        walk_times.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, part_path)
+
+        try:
+            os.rename(shard.lease_path, self.done_dir / f"{shard.name}.npy")
+        except FileNotFoundError:
+            # Lease expired and was requeued; the part file is still valid
+            logger.warning(f"Lease on {shard.name} was lost before completion")
+            # If another worker reclaimed it meanwhile, it rewrites the same part
+            with contextlib.suppress(FileNotFoundError):
+                os.rename(
+                    self.pending_dir / f"{shard.name}.npy", self.done_dir / f"{shard.name}.npy"
+                )
+
+    def status(self) -> dict[str, int]:
+        """Count shards by state.
+
+        Returns:
+            Dict with "pending", "leased", "done" and "total" counts
+        """
+        return {
+            "pending": len(list(self.pending_dir.glob("*.npy"))),
+            "leased": len(list(self.leases_dir.glob("*.npy"))),
+            "done": len(list(self.done_dir.glob("*.npy"))),
+            "total": self.job["n_shards"],
+        }
+
+    def is_finished(self) -> bool:
+        """Check whether every shard has a part file."""
+        return len(list(self.parts_dir.glob("*.parquet"))) == int(self.job["n_shards"])
+
+    def collect(self) -> pd.DataFrame:
+        """Concatenate all part files.
+
+        Returns:
+            DataFrame of all shards' walk times
+
+        Raises:
+            DataError: If shards are still unfinished
+        """
+        if not self.is_finished():
+            raise DataError(f"Work queue {self.root} is unfinished: {self.status()}")
+        parts = sorted(self.parts_dir.glob("*.parquet"))
+        return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write a text file under a temporary name and rename it into place."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+
+def create_walk_time_queue(
+    queue_dir: str | Path,
+    cache: RoutingCache,
+    center_nodes: np.ndarray,
+    conserved_lands: pd.DataFrame,
+    trip_times: list[int] = DEFAULT_TRIP_TIMES,
+    travel_speed: float = DEFAULT_TRAVEL_SPEED,
+    center_node_col: str = "block_osmid",
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+) -> WorkQueue:
+    """Create a walk time work queue with everything workers need to run.
+
+    The routing cache and land node IDs are copied into the queue directory so
+    workers on other machines only need access to the shared directory.
+
+    Args:
+        queue_dir: Queue directory on a filesystem shared by all workers
+        cache: RoutingCache of the network
+        center_nodes: Center node OSM IDs
+        conserved_lands: DataFrame with "osmid" column containing node IDs
+        trip_times: Trip time thresholds in minutes (default: [5,10,15,20,30,45,60])
+        travel_speed: Travel speed in km/hour (default: 4.5)
+        center_node_col: Name of the center node column (default: "block_osmid")
+        shard_size: Center nodes per shard (default: 1000)
+        lease_timeout: Seconds after which an untouched lease is requeued
+
+    Returns:
+        WorkQueue
+    """
+    queue_dir = Path(queue_dir)
+    queue_dir.mkdir(parents=True, exist_ok=True)
+    save_routing_cache(cache, queue_dir / "routing.npz")
+    pd.DataFrame({"osmid": pd.unique(conserved_lands["osmid"].astype(np.int64))}).to_parquet(
+        queue_dir / "lands.parquet", index=False
+    )
+    job = {
+        "trip_times": [int(t) for t in trip_times],
+        "travel_speed": float(travel_speed),
+        "center_node_col": center_node_col,
+        "lease_timeout": float(lease_timeout),
+    }
+    return WorkQueue.create(
+        queue_dir,
+        pd.unique(np.asarray(center_nodes, dtype=np.int64)),
+        job,
+        shard_size=shard_size,
+        lease_timeout=lease_timeout,
+    )
@@ -0,0 +1,267 @@
+"""Walk time worker for the file-based work queue.
+
+Start one or more workers on any machine that can see the queue directory::
+
+    python -m walk_times.worker init ../data/queues/maine \\
+        --graph ../data/graphs/maine_walk.graphml \\
+        --geography ../data/blocks/tl_2020_23_tabblock20_with_nodes.shp.zip \\
+        --conserved-lands ../data/conserved_lands/Maine_Conserved_Lands_with_nodes.shp.zip
+    python -m walk_times.worker work ../data/queues/maine            # on each machine
+    python -m walk_times.worker work ../data/queues/maine --local 8  # or 8 local processes
+    python -m walk_times.worker collect ../data/queues/maine \\
+        --output ../data/walk_times/walk_times_block_df.parquet
+
+Local processes run exactly the same claim/compute/complete loop as remote
+workers, so a single-machine run exercises the distributed code path.
+"""
+
+import argparse
+import json
+import logging
+import time
+from multiprocessing import Process
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from config.defaults import DEFAULT_TRAVEL_SPEED, DEFAULT_TRIP_TIMES
+from walk_times.incremental import recompute_center_walk_times
+from walk_times.matrix import save_walk_time_matrix, walk_times_to_matrix
+from walk_times.regional import deduplicate_walk_times
+from walk_times.routing_cache import get_routing_cache, load_routing_cache
+from walk_times.work_queue import (
+    DEFAULT_LEASE_TIMEOUT,
+    DEFAULT_SHARD_SIZE,
+    WorkQueue,
+    create_walk_time_queue,
+    default_worker_id,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 5.0  # seconds
+# Center nodes computed between lease renewals
+_RENEW_BATCH_SIZE = 100
+
+
+def run_worker(
+    queue_dir: str | Path,
+    worker_id: str | None = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    wait: bool = True,
+) -> int:
+    """Claim and compute shards until the queue is finished.
+
+    Args:
+        queue_dir: Queue directory
+        worker_id: Worker ID (default: "<hostname>-<pid>")
+        poll_interval: Seconds to wait before checking for requeued shards when
+            none are pending but some are still leased (default: 5)
+        wait: If False, exit as soon as no shard is pending instead of waiting
+            for other workers' leases to finish or expire
+
+    Returns:
+        Number of shards completed by this worker
+    """
+    worker_id = worker_id or default_worker_id()
+    queue = WorkQueue(queue_dir)
+    job = queue.job
+    queue.lease_timeout = job["lease_timeout"]
+
+    cache = load_routing_cache(queue.root / "routing.npz")
+    # Built once per worker and reused by every batch of every shard
+    routing_graph = cache.to_rustworkx(job["travel_speed"])
+    lands = pd.read_parquet(queue.root / "lands.parquet")
+    logger.info(f"Worker {worker_id} started on {queue.root}")
+
+    completed = 0
+    while not queue.is_finished():
+        shard = queue.claim(worker_id)
+        if shard is None:
+            if not wait:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(
+            f"Worker {worker_id} computing {shard.name} ({len(shard.center_nodes)} centers)"
+        )
+        parts = []
+        for start in range(0, len(shard.center_nodes), _RENEW_BATCH_SIZE):
+            parts.append(
+                recompute_center_walk_times(
+                    cache,
+                    shard.center_nodes[start : start + _RENEW_BATCH_SIZE],
+                    lands,
+                    job["trip_times"],
+                    travel_speed=job["travel_speed"],
+                    center_node_col=job["center_node_col"],
+                    progress_bar=False,
+                    routing_graph=routing_graph,
+                )
+            )
+            if not queue.renew(shard):
+                logger.warning(f"Worker {worker_id} lost lease on {shard.name}, finishing anyway")
+
+        queue.complete(shard, pd.concat(parts, ignore_index=True))
+        completed += 1
+
+    logger.info(f"Worker {worker_id} finished after {completed} shards")
+    return completed
+
+
+def run_local_workers(
+    queue_dir: str | Path,
+    n_workers: int,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> None:
+    """Run several workers as local processes and wait for them.
+
+    Args:
+        queue_dir: Queue directory
+        n_workers: Number of worker processes
+        poll_interval: Seconds between checks for requeued shards (default: 5)
+    """
+    processes = [
+        Process(
+            target=run_worker,
+            args=(queue_dir,),
+            kwargs={"worker_id": f"{default_worker_id()}-{i}", "poll_interval": poll_interval},
+        )
+        for i in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def collect_walk_times(
+    queue_dir: str | Path,
+    output_path: str | Path,
+    matrix_path: str | Path | None = None,
+) -> pd.DataFrame:
+    """Merge a finished queue's part files into the walk times artifacts.
+
+    Args:
+        queue_dir: Queue directory
+        output_path: Path to save the long table (Parquet or CSV)
+        matrix_path: Optional path to save the sparse walk time matrix (.npz)
+
+    Returns:
+        DataFrame with [center_node_col, "land_osmid", "trip_time", "minutes"]
+
+    Raises:
+        DataError: If shards are still unfinished
+    """
+    queue = WorkQueue(queue_dir)
+    center_node_col = queue.job["center_node_col"]
+    df = deduplicate_walk_times(queue.collect(), center_node_col)
+
+    logger.info(f"Saving {len(df)} walk time records to {output_path}")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    long_df = df.drop(columns="minutes")
+    if str(output_path).endswith(".parquet"):
+        long_df.to_parquet(output_path, index=False)
+    else:
+        long_df.to_csv(output_path, index=False)  # Fallback for CSV output
+
+    if matrix_path:
+        save_walk_time_matrix(
+            walk_times_to_matrix(df, value_col="minutes", center_node_col=center_node_col),
+            matrix_path,
+        )
+    return df
+
+
+def _read_osmids(path: str | Path) -> np.ndarray:
+    """Read the "osmid" column of a geography or conserved lands file."""
+    if str(path).endswith(".parquet"):
+        df = pd.read_parquet(str(path), columns=["osmid"])
+    else:
+        df = gpd.read_file(str(path))  # Fallback for existing shapefiles
+    return np.asarray(df["osmid"], dtype=np.int64)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Walk time work queue worker")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init", help="Create a work queue")
+    init_parser.add_argument("queue_dir", help="Queue directory on a shared filesystem")
+    init_parser.add_argument("--graph", required=True, help="Path to OSMnx GraphML file")
+    init_parser.add_argument(
+        "--geography", required=True, help="Path to blocks or tracts file with node IDs"
+    )
+    init_parser.add_argument(
+        "--conserved-lands", required=True, help="Path to conserved lands file with node IDs"
+    )
+    init_parser.add_argument(
+        "--geography-type", choices=["blocks", "tracts"], default="blocks", help="Center type"
+    )
+    init_parser.add_argument(
+        "--trip-times", type=int, nargs="+", default=DEFAULT_TRIP_TIMES, help="Minutes"
+    )
+    init_parser.add_argument(
+        "--travel-speed", type=float, default=DEFAULT_TRAVEL_SPEED, help="km/hour"
+    )
+    init_parser.add_argument(
+        "--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Center nodes per shard"
+    )
+    init_parser.add_argument(
+        "--lease-timeout",
+        type=float,
+        default=DEFAULT_LEASE_TIMEOUT,
+        help="Seconds before an untouched lease is requeued",
+    )
+
+    work_parser = subparsers.add_parser("work", help="Claim and compute shards")
+    work_parser.add_argument("queue_dir", help="Queue directory")
+    work_parser.add_argument("--worker-id", help="Worker ID (default: <hostname>-<pid>)")
+    work_parser.add_argument(
+        "--local", type=int, default=1, help="Number of worker processes on this machine"
+    )
+    work_parser.add_argument(
+        "--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, help="Seconds"
+    )
+
+    status_parser = subparsers.add_parser("status", help="Show shard counts")
+    status_parser.add_argument("queue_dir", help="Queue directory")
+
+    collect_parser = subparsers.add_parser("collect", help="Merge part files")
+    collect_parser.add_argument("queue_dir", help="Queue directory")
+    collect_parser.add_argument("--output", required=True, help="Long table output path")
+    collect_parser.add_argument("--matrix", help="Optional sparse matrix output path (.npz)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.command == "init":
+        create_walk_time_queue(
+            args.queue_dir,
+            get_routing_cache(args.graph),
+            _read_osmids(args.geography),
+            pd.DataFrame({"osmid": _read_osmids(args.conserved_lands)}),
+            trip_times=args.trip_times,
+            travel_speed=args.travel_speed,
+            center_node_col="tract_osmid" if args.geography_type == "tracts" else "block_osmid",
+            shard_size=args.shard_size,
+            lease_timeout=args.lease_timeout,
+        )
+    elif args.command == "work":
+        if args.local > 1:
+            run_local_workers(args.queue_dir, args.local, poll_interval=args.poll_interval)
+        else:
+            run_worker(args.queue_dir, worker_id=args.worker_id, poll_interval=args.poll_interval)
+    elif args.command == "status":
+        print(json.dumps(WorkQueue(args.queue_dir).status()))
+    elif args.command == "collect":
+        collect_walk_times(args.queue_dir, args.output, matrix_path=args.matrix)
+
+
+if __name__ == "__main__":
+    main()
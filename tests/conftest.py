@@ -1,14 +1,18 @@
 """Pytest configuration and shared fixtures."""
 
+import json
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from unittest.mock import Mock
+from urllib.parse import parse_qs, urlparse
 
 import geopandas as gpd
 import networkx as nx
 import pandas as pd
 import pytest
-from shapely.geometry import Point
+from shapely.geometry import Point, box
 
 # Add src directory to path for imports
 src_path = Path(__file__).parent.parent / "src"
@@ -165,34 +169,113 @@ def sample_relationship_file():
     return pd.DataFrame(data)
 
 
+@pytest.fixture
+def store_blocks():
+    """Four unit-square blocks in two tracts of two states."""
+    return gpd.GeoDataFrame(
+        {
+            "GEOID20": [
+                "230010001001000",
+                "230010001001001",
+                "230010002001000",
+                "330010001001000",
+            ],
+            "osmid": [1, 2, 3, 4],
+        },
+        geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1), box(5, 5, 6, 6), box(9, 9, 10, 10)],
+        crs="EPSG:3857",
+    )
+
+
 @pytest.fixture
 def temp_dir(tmp_path):
     """Create a temporary directory for test files."""
     return tmp_path
 
 
+class _CensusAPIHandler(BaseHTTPRequestHandler):
+    """Stand-in Census API: county lists and block data for a few counties."""
+
+    def do_GET(self):  # noqa: N802
+        server = self.server
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        with server.lock:
+            server.requests.append(query)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            county = query["in"].split("county:")[-1] if "county:" in query["in"] else None
+            if county is not None and server.failures.get(county, 0) > 0:
+                server.failures[county] -= 1
+                self._send(503, "Service Unavailable")
+                return
+
+            fields = query["get"].split(",")
+            if query["for"] == "county:*":
+                rows = [["NAME", "state", "county"]] + [
+                    [f"County {c}", "23", c] for c in sorted(server.blocks)
+                ]
+            else:
+                rows = [[*fields, "state", "county", "tract", "block"]] + [
+                    [
+                        *(
+                            f"1000000US{geoid}" if field == "GEO_ID" else str(values[field])
+                            for field in fields
+                        ),
+                        geoid[:2],
+                        geoid[2:5],
+                        geoid[5:11],
+                        geoid[11:],
+                    ]
+                    for geoid, values in server.blocks[county].items()
+                ]
+            self._send(200, json.dumps(rows))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
 @pytest.fixture
-def mock_census_api():
-    """Mock Census API."""
-    mock_census = Mock()
-    # Use get method instead of state_county_block (which doesn't exist)
-    mock_census.pl.get.return_value = [
-        {
-            "GEO_ID": "1000000US230010001001",
-            "P1_001N": 100,
-            "P1_003N": 80,
-            "P2_001N": 100,
-            "P2_002N": 5,
+def census_api_server():
+    """Local stand-in for the Census API with two Maine counties.
+
+    The server records each request's query parameters in ``requests`` and
+    the peak number of concurrent requests in ``max_in_flight``; setting
+    ``failures[county] = n`` answers that county's next n requests with 503.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CensusAPIHandler)
+    server.blocks = {
+        "001": {
+            "230010001001000": {"P1_001N": 100, "P1_003N": 80, "P2_001N": 100, "P2_002N": 5},
+            "230010001001001": {"P1_001N": 200, "P1_003N": 150, "P2_001N": 200, "P2_002N": 10},
         },
-        {
-            "GEO_ID": "1000000US230010001002",
-            "P1_001N": 200,
-            "P1_003N": 150,
-            "P2_001N": 200,
-            "P2_002N": 10,
+        "005": {
+            "230050002001000": {"P1_001N": 50, "P1_003N": 40, "P2_001N": 50, "P2_002N": 2},
         },
-    ]
-    return mock_census
+    }
+    server.requests = []
+    server.failures = {}
+    server.delay = 0.0
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.url = f"http://127.0.0.1:{server.server_port}/data"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
 
 
 @pytest.fixture
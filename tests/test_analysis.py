@@ -1,13 +1,42 @@
 """Tests for analysis module."""
 
-import pandas as pd
+from dataclasses import replace
+from unittest.mock import patch
 
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from shapely.geometry import Point
+
+from analysis.accessibility import (
+    calculate_accessibility,
+    gaussian_decay,
+    power_decay,
+    process_accessibility,
+    step_decay,
+)
+from analysis.catchment import (
+    build_reachability_matrix,
+    calculate_land_catchments,
+    population_by_node,
+    process_land_catchments,
+)
+from analysis.site_selection import (
+    evaluate_candidates,
+    newly_covered_values,
+    select_sites,
+    snap_candidates,
+)
 from analysis.statistical import (
     analyze_access_disparity,
     calculate_population_metrics,
     create_boolean_columns,
     run_manova,
 )
+from walk_times.algorithms import reverse_bounded_searches
+from walk_times.matrix import WalkTimeMatrix, walk_times_to_matrix
+from walk_times.routing_cache import build_routing_cache
 
 
 class TestCreateBooleanColumns:
@@ -218,3 +247,293 @@ class TestCalculatePopulationMetrics:
 
         assert isinstance(result, pd.DataFrame)
         assert "TC_bool" in result.columns or "TC_bool" in result.index.names
+
+
+class TestCatchment:
+    """Tests for land catchment metrics."""
+
+    def test_build_reachability_matrix(self, sample_walk_times_df):
+        """Test sparse matrix matches the long walk times table."""
+        matrix, center_ids, land_ids = build_reachability_matrix(sample_walk_times_df)
+
+        assert matrix.shape == (2, 2)
+        assert matrix.nnz == 4
+        assert list(center_ids) == [1, 2]
+        assert list(land_ids) == [3, 4]
+        assert matrix[1, 1] == 20
+
+    def test_build_reachability_matrix_duplicates(self):
+        """Test duplicate pairs keep the shortest trip time."""
+        df = pd.DataFrame({"block_osmid": [1, 1], "land_osmid": [3, 3], "trip_time": [10, 5]})
+
+        matrix, _, _ = build_reachability_matrix(df)
+
+        assert matrix[0, 0] == 5
+
+    def test_population_by_node(self, sample_blocks_gdf, sample_census_data):
+        """Test population is summed onto shared nodes."""
+        blocks = sample_blocks_gdf.copy()
+        blocks["osmid"] = [1, 1, 2]
+        ejblocks = sample_census_data.assign(TC=[1, 0, 0]).set_index("GEOID20")
+
+        pop, dac_pop = population_by_node([1, 2], blocks, ejblocks, disadvantage_col="TC")
+
+        assert list(pop) == [300, 150]
+        assert list(dac_pop) == [100, 0]
+
+    def test_population_by_node_without_disadvantage(self, sample_blocks_gdf, sample_census_data):
+        """Test population is summed when ejblocks has no disadvantage column."""
+        blocks = sample_blocks_gdf.copy()
+        blocks["osmid"] = [1, 1, 2]
+
+        pop, dac_pop = population_by_node([1, 2], blocks, sample_census_data)
+
+        assert list(pop) == [300, 150]
+        assert list(dac_pop) == [0, 0]
+
+    def test_calculate_land_catchments(self, sample_walk_times_df):
+        """Test population served per land and threshold."""
+        matrix, _, land_ids = build_reachability_matrix(sample_walk_times_df)
+
+        result = calculate_land_catchments(
+            matrix, land_ids, [100.0, 200.0], [100.0, 0.0], trip_times=[5, 15]
+        )
+
+        # Land 3: block 1 at 5 min, block 2 at 15 min
+        assert result.loc[3, "POP_5"] == 100
+        assert result.loc[3, "POP_15"] == 300
+        assert result.loc[3, "DAC_15"] == 100
+        assert abs(result.loc[3, "DAC_PER_15"] - 1 / 3) < 1e-9
+        # Land 4 is only reached at 10 and 20 minutes
+        assert result.loc[4, "POP_5"] == 0
+        assert result.loc[4, "DAC_PER_5"] == 0
+
+    def test_process_land_catchments(
+        self,
+        sample_walk_times_df,
+        sample_blocks_gdf,
+        sample_census_data,
+        sample_conserved_lands_gdf,
+        temp_dir,
+    ):
+        """Test catchment table and layer are written."""
+        walk_times_path = temp_dir / "walk_times.parquet"
+        blocks_path = temp_dir / "blocks.parquet"
+        ejblocks_path = temp_dir / "ejblocks.parquet"
+        lands_path = temp_dir / "lands.parquet"
+        sample_walk_times_df.to_parquet(walk_times_path)
+        sample_blocks_gdf.to_parquet(blocks_path)
+        sample_census_data.assign(TC=[1, 0, 0]).to_parquet(ejblocks_path)
+        sample_conserved_lands_gdf.to_parquet(lands_path)
+
+        output_path = temp_dir / "catchments.parquet"
+        layer_path = temp_dir / "catchments_layer.parquet"
+
+        result = process_land_catchments(
+            walk_times_path,
+            blocks_path,
+            ejblocks_path,
+            output_path,
+            conserved_lands_path=lands_path,
+            layer_path=layer_path,
+        )
+
+        assert output_path.exists()
+        assert "POP_20" in result.columns
+        layer = gpd.read_parquet(layer_path)
+        assert len(layer) == len(sample_conserved_lands_gdf)
+        assert isinstance(layer.geometry.iloc[0], Point)
+        assert "DAC_PER_5" in layer.columns
+
+
+class TestAccessibility:
+    """Tests for 2SFCA and gravity accessibility scores."""
+
+    def test_decay_functions(self):
+        """Test decay weights at the origin and catchment edge."""
+        minutes = np.array([0.0, 10.0, 30.0, 40.0])
+
+        assert list(step_decay(30)(minutes)) == [1, 1, 1, 0]
+        gauss = gaussian_decay(30)(minutes)
+        assert gauss[0] == 1
+        assert 0 < gauss[1] < 1
+        assert abs(gauss[2]) < 1e-12
+        assert gauss[3] == 0
+        # Minutes are floored at 1 so zero-minute pairs stay finite
+        assert power_decay(1.0)(minutes)[0] == 1
+
+    def test_calculate_accessibility(self, sample_walk_times_df):
+        """Test 2SFCA and gravity scores against hand-computed values."""
+        wtm = walk_times_to_matrix(sample_walk_times_df, value_col="trip_time")
+
+        result = calculate_accessibility(
+            wtm,
+            population=[100.0, 200.0],
+            supply=[10.0, 20.0],
+            decay_functions={"STEP_10": step_decay(10), "STEP_30": step_decay(30)},
+        )
+
+        # Within 10 minutes only block 1 reaches lands 3 and 4
+        assert abs(result.loc[1, "SFCA_STEP_10"] - (10 / 100 + 20 / 100)) < 1e-9
+        assert result.loc[2, "SFCA_STEP_10"] == 0
+        assert result.loc[1, "GRAV_STEP_10"] == 30
+        # Within 30 minutes both blocks share both lands
+        assert abs(result.loc[2, "SFCA_STEP_30"] - 30 / 300) < 1e-9
+        assert result.loc[2, "GRAV_STEP_30"] == 30
+
+    def test_process_accessibility(
+        self,
+        sample_walk_times_df,
+        sample_blocks_gdf,
+        sample_census_data,
+        sample_conserved_lands_gdf,
+        temp_dir,
+    ):
+        """Test per-block scores are written, with unreached blocks scored 0."""
+        walk_times_path = temp_dir / "walk_times.parquet"
+        blocks_path = temp_dir / "blocks.parquet"
+        ejblocks_path = temp_dir / "ejblocks.parquet"
+        lands_path = temp_dir / "lands.parquet"
+        sample_walk_times_df.to_parquet(walk_times_path)
+        sample_blocks_gdf.to_parquet(blocks_path)
+        sample_census_data.to_parquet(ejblocks_path)
+        sample_conserved_lands_gdf.to_parquet(lands_path)
+        output_path = temp_dir / "accessibility.parquet"
+
+        result = process_accessibility(
+            walk_times_path, blocks_path, ejblocks_path, lands_path, output_path
+        )
+
+        assert output_path.exists()
+        assert len(result) == len(sample_blocks_gdf)
+        scores = result.set_index("GEOID20")
+        assert scores.loc["230010001001", "GRAV_STEP_10"] > 0
+        assert scores.loc["230010001003", "SFCA_GAUSS_30"] == 0
+
+
+class TestSiteSelection:
+    """Tests for candidate site selection."""
+
+    @staticmethod
+    def _evaluations():
+        # Candidate 0 covers centers 10 and 20, candidate 1 covers 20 and 30
+        # (30 at 0 minutes: same node), candidate 2 covers 30 and reaches 10 at 15 minutes
+        rows, cols = [0, 1, 1, 2, 2, 0], [0, 0, 1, 1, 2, 2]
+        minutes = [5.0, 8.0, 2.0, 0.0, 1.0, 15.0]
+        return WalkTimeMatrix(
+            matrix=sparse.csr_matrix((minutes, (rows, cols)), shape=(3, 3)),
+            center_ids=np.array([10, 20, 30]),
+            land_ids=np.arange(3),
+        )
+
+    def test_snap_candidates(self, sample_graph):
+        """Test candidates snap to the node nearest their centroid."""
+        cache = build_routing_cache(sample_graph)
+        candidates = gpd.GeoDataFrame(geometry=[Point(190, 5).buffer(10), Point(95, 90).buffer(5)])
+
+        assert list(snap_candidates(candidates, cache)) == [3, 4]
+
+    def test_select_sites(self):
+        """Test greedy picks maximize newly covered weight."""
+        result = select_sites(self._evaluations(), [2.0, 5.0, 1.0], n_sites=2, trip_time=10)
+
+        assert list(result["candidate"]) == [0, 1]
+        assert list(result["gain"]) == [7.0, 1.0]
+        assert result["cumulative_gain"].iloc[-1] == 8.0
+
+    def test_lazy_matches_plain_greedy(self):
+        """Test lazy greedy returns the same picks as plain greedy."""
+        rng = np.random.default_rng(0)
+        matrix = sparse.random(200, 40, density=0.05, format="csr", random_state=1) * 10
+        evaluations = WalkTimeMatrix(
+            matrix=matrix, center_ids=np.arange(200), land_ids=np.arange(40)
+        )
+        weights = rng.integers(0, 100, size=200)
+
+        lazy = select_sites(evaluations, weights, n_sites=10, trip_time=5)
+        plain = select_sites(evaluations, weights, n_sites=10, trip_time=5, lazy=False)
+
+        assert list(lazy["gain"]) == list(plain["gain"])
+
+    def test_already_covered(self):
+        """Test centers with existing access add no gain."""
+        evaluations = self._evaluations()
+
+        result = select_sites(
+            evaluations, [2.0, 5.0, 1.0], n_sites=1, already_covered=[True, True, False]
+        )
+        values = newly_covered_values(
+            evaluations, result["candidate"].to_numpy(), np.array([[2.0], [5.0], [1.0]])
+        )
+
+        assert result["gain"].iloc[0] == 1.0
+        assert values.shape == (1, 1)
+
+    def test_evaluate_candidates_cached(self, sample_graph, temp_dir):
+        """Test re-evaluating the same candidates runs no new searches."""
+        cache = build_routing_cache(sample_graph)
+        centers = np.array([1, 2, 3])
+
+        first = evaluate_candidates(
+            np.array([3, 4, 3]),
+            cache,
+            centers,
+            max_trip_time=5,
+            progress_bar=False,
+            cache_dir=temp_dir,
+        )
+        with patch("analysis.site_selection.reverse_bounded_searches") as mock_search:
+            second = evaluate_candidates(
+                np.array([3, 4, 3]), cache, centers, max_trip_time=5, cache_dir=temp_dir
+            )
+
+        mock_search.assert_not_called()
+        assert first.matrix.shape == (3, 3)
+        assert np.allclose(first.matrix.toarray(), second.matrix.toarray())
+        # Node 1 reaches node 3 via node 2; duplicate candidates share a column
+        assert first.matrix[0, 0] > 0
+        assert first.matrix[0, 0] == first.matrix[0, 2]
+        assert list(first.center_ids) == [1, 2, 3]
+
+    def test_evaluate_candidates_reuses_larger_radius(self, sample_graph, temp_dir):
+        """Test a smaller radius is sliced from a cached evaluation at a larger one."""
+        cache = build_routing_cache(sample_graph)
+        centers = np.array([1, 2, 3])
+        candidates = np.array([3])
+
+        wide = evaluate_candidates(
+            candidates, cache, centers, max_trip_time=5, progress_bar=False, cache_dir=temp_dir
+        )
+        with patch("analysis.site_selection.reverse_bounded_searches") as mock_search:
+            narrow = evaluate_candidates(
+                candidates, cache, centers, max_trip_time=2, cache_dir=temp_dir
+            )
+
+        mock_search.assert_not_called()
+        # Node 1 is 200 m (about 2.7 minutes) from node 3
+        assert wide.matrix[0, 0] > 2
+        assert narrow.matrix[0, 0] == 0 and narrow.matrix.nnz == wide.matrix.nnz - 1
+
+    def test_evaluate_candidates_network_change(self, sample_graph, temp_dir):
+        """Test changed edge lengths with the same network size run new searches."""
+        cache = build_routing_cache(sample_graph)
+        centers = np.array([1, 2, 3])
+        evaluate_candidates(
+            np.array([3]), cache, centers, max_trip_time=5, progress_bar=False, cache_dir=temp_dir
+        )
+
+        longer = replace(cache, edge_length=cache.edge_length * 2)
+        with patch(
+            "analysis.site_selection.reverse_bounded_searches",
+            wraps=reverse_bounded_searches,
+        ) as mock_search:
+            evaluate_candidates(
+                np.array([3]),
+                longer,
+                centers,
+                max_trip_time=5,
+                progress_bar=False,
+                cache_dir=temp_dir,
+            )
+
+        mock_search.assert_called_once()
@@ -0,0 +1,49 @@
+"""Tests for command-line scripts."""
+
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import box
+
+from merging.census_store import get_state_dir
+from migrate_to_geoparquet import benchmark_reads, convert_shapefile_to_geoparquet
+from prefetch_census import main as prefetch_census_main
+from utils.geometry import has_geometry
+from utils.io import count_row_groups
+
+
+class TestMigrateToGeoParquet:
+    """Tests for the shapefile to GeoParquet migration script."""
+
+    def test_convert_and_benchmark(self, temp_dir):
+        """Test converted files are laid out for bbox reads and benchmarked."""
+        rng = np.random.default_rng(0)
+        cells = rng.permutation([(x, y) for x in range(10) for y in range(10)])
+        grid = gpd.GeoDataFrame(
+            {"cell": [f"{x}_{y}" for x, y in cells]},
+            geometry=[box(x, y, x + 1, y + 1) for x, y in cells],
+            crs="EPSG:3857",
+        )
+        input_path = temp_dir / "grid.shp.zip"
+        output_path = temp_dir / "grid.parquet"
+        grid.to_file(input_path, driver="ESRI Shapefile")
+
+        assert convert_shapefile_to_geoparquet(input_path, output_path, row_group_size=10)
+        assert has_geometry(output_path)
+
+        bbox = (0.2, 0.2, 1.8, 1.8)
+        results = benchmark_reads(input_path, output_path, bbox=bbox, repeats=1)
+        assert results["row_groups_touched"] == count_row_groups(output_path, bbox)[0]
+        assert results["output_bbox_s"] > 0
+
+
+class TestPrefetchCensus:
+    """Tests for the Census prefetch script."""
+
+    def test_prefetch_cli(self, census_api_server, temp_dir):
+        """Test the prefetch CLI fills the store for the requested states."""
+        args = ["--fields", "P1_001N", "--cache-dir", str(temp_dir)]
+        args += ["--base-url", census_api_server.url, "--api-key", "test_key"]
+
+        assert prefetch_census_main(["--states", "Maine", *args]) == 0
+        assert (get_state_dir("23", cache_dir=temp_dir) / "P1_001N.parquet").exists()
+        assert prefetch_census_main(["--states", "Ohio", *args]) == 1
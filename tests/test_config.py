@@ -111,6 +111,21 @@ class TestRegionConfig:
         assert region_config_maine.state_fips in str(path)
         assert region_config_maine.state_abbrev.lower() in str(path)
 
+    def test_get_graph_path(self):
+        """Test graph path matches update_osmnx_graphs naming."""
+        assert RegionConfig("23", "ME", "Maine").get_graph_path().name == "maine_walk.graphml"
+        path = RegionConfig("33", "NH", "New Hampshire").get_graph_path()
+        assert path.name == "new_hampshire_walk.graphml"
+        assert path.parent.name == "graphs"
+
+    def test_get_conserved_lands_path(self, region_config_maine):
+        """Test conserved lands path."""
+        path = region_config_maine.get_conserved_lands_path()
+
+        assert path.name == "Maine_Conserved_Lands_with_nodes.shp.zip"
+        assert path.parent.name == "conserved_lands"
+        assert "_with_nodes" not in str(region_config_maine.get_conserved_lands_path(False))
+
 
 class TestGetRegionConfig:
     """Tests for get_region_config function."""
@@ -1,17 +1,59 @@
 """Tests for merging module."""
 
-from unittest.mock import MagicMock, patch
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from shapely.geometry import box
 
+from exceptions import ConfigurationError, DataError
+from merging import duckdb_engine
 from merging.analysis import (
     calculate_demographics,
     create_ejblocks,
+    crosswalk_cejst,
     fetch_census_data,
     process_cejst_data,
 )
-from merging.blocks import create_trip_time_columns, dissolve_blocks, merge_walk_times
+from merging.blocks import (
+    aggregate_walk_times,
+    attach_block_geometry,
+    create_trip_time_columns,
+    dissolve_blocks,
+    dissolve_by_key,
+    load_walk_times_table,
+    merge_walk_times,
+    read_unique_key,
+    save_dissolved_blocks,
+    write_walk_times_partitioned,
+)
+from merging.census_api import fetch_block_data
+from merging.census_store import get_state_dir, load_block_data
+from merging.relationships import (
+    get_block_relationships_path,
+    load_block_relationships,
+    read_block_relationships,
+)
+from utils.geometry import (
+    attach_geometry,
+    has_geometry,
+    read_attributes,
+    write_geometry_store,
+)
+from utils.io import (
+    county_filters,
+    read_table,
+    write_parquet,
+    write_partitioned,
+)
+from utils.schema import (
+    apply_schema,
+)
+from walk_times.matrix import save_walk_time_matrix, walk_times_to_matrix
 
 
 class TestBlocks:
@@ -55,6 +97,29 @@ class TestBlocks:
         assert len(ac_5_values) > 0
         assert all(result.loc[result["AC_5"].notna(), "trip_time"] == 5)
 
+    def test_create_trip_time_columns_cumulative(self, sample_merged_blocks_gdf):
+        """Test trip time columns are cumulative float32 and share the geometry."""
+        n_rows = len(sample_merged_blocks_gdf)
+        sample_merged_blocks_gdf["trip_time"] = [5, 10, 15, 20, 5][:n_rows]
+        sample_merged_blocks_gdf["CALC_AC"] = [10.5, 25.3, 15.0, 20.0, 12.0][:n_rows]
+
+        result = create_trip_time_columns(sample_merged_blocks_gdf, [10, 5, 15])
+
+        assert [col for col in result.columns if col.startswith("AC_")] == [
+            "AC_5",
+            "AC_10",
+            "AC_15",
+        ]
+        assert all(result[col].dtype == "float32" for col in ["AC_5", "AC_10", "AC_15"])
+        first = result.iloc[0]
+        assert first["AC_5"] == first["AC_15"] == np.float32(10.5)
+        second = result.iloc[1]
+        assert second["AC_5"] == 0.0 and second["AC_10"] == np.float32(25.3)
+        assert np.shares_memory(
+            np.asarray(result.geometry.values), np.asarray(sample_merged_blocks_gdf.geometry.values)
+        )
+        assert "AC_5" not in sample_merged_blocks_gdf.columns
+
     def test_dissolve_blocks(self, sample_merged_blocks_gdf):
         """Test dissolving blocks."""
         # Get the actual number of rows
@@ -81,20 +146,58 @@ class TestBlocks:
         assert isinstance(result, gpd.GeoDataFrame)
         assert len(result) <= len(sample_merged_blocks_gdf)
 
-    @patch("merging.blocks.gpd.read_parquet")
-    @patch("merging.blocks.pd.read_parquet")
+    def test_save_dissolved_blocks_records_unique_key(self, sample_blocks_gdf, temp_dir):
+        """Test the unique key is recorded in the Parquet metadata."""
+        output_path = temp_dir / "block_dissolve.parquet"
+        save_dissolved_blocks(sample_blocks_gdf, output_path)
+
+        assert read_unique_key(output_path) == "GEOID20"
+        assert gpd.read_parquet(output_path).geometry.equals(sample_blocks_gdf.geometry)
+        assert read_unique_key(temp_dir / "missing.parquet") is None
+
+        duplicated = pd.concat([sample_blocks_gdf, sample_blocks_gdf.iloc[:1]])
+        with pytest.raises(DataError):
+            save_dissolved_blocks(duplicated, temp_dir / "duplicated.parquet")
+
+    def test_dissolve_by_key_unique(self, sample_blocks_gdf):
+        """Test unique keys skip the dissolve but match its sum semantics."""
+        blocks = sample_blocks_gdf.assign(POP=[1.0, np.nan, 3.0])
+
+        result = dissolve_by_key(blocks)
+        expected = blocks.dissolve(by="GEOID20", aggfunc="sum")
+
+        assert result.index.tolist() == expected.index.tolist()
+        assert result["POP"].tolist() == expected["POP"].tolist() == [1.0, 0.0, 3.0]
+        assert result.geometry.equals(expected.geometry)
+
+    def test_dissolve_by_key_duplicates(self, sample_blocks_gdf):
+        """Test duplicated keys are summed and their geometries unioned."""
+        blocks = sample_blocks_gdf.copy()
+        blocks["GEOID20"] = ["230010001001", "230010001001", "230010001003"]
+
+        result = dissolve_by_key(blocks)
+        expected = blocks.dissolve(by="GEOID20", aggfunc="sum")
+
+        assert result["ALAND20"].tolist() == expected["ALAND20"].tolist() == [3000000, 1500000]
+        assert result.geometry.geom_equals(expected.geometry).all()
+        assert result.crs == blocks.crs
+
+    @patch("merging.blocks.read_table")
     def test_merge_walk_times_parquet(
         self,
-        mock_pd_read,
-        mock_gpd_read,
+        mock_read_table,
         sample_blocks_gdf,
         sample_conserved_lands_gdf,
         sample_walk_times_df,
         temp_dir,
     ):
         """Test merging walk times with parquet files."""
-        mock_gpd_read.side_effect = [sample_blocks_gdf, sample_conserved_lands_gdf]
-        mock_pd_read.return_value = sample_walk_times_df
+        tables = {
+            "blocks.parquet": sample_blocks_gdf,
+            "lands.parquet": pd.DataFrame(sample_conserved_lands_gdf[["osmid", "CALC_AC"]]),
+            "walk_times.parquet": sample_walk_times_df,
+        }
+        mock_read_table.side_effect = lambda path, **kwargs: tables[str(path)]
 
         output_path = temp_dir / "merged.parquet"
 
@@ -108,19 +211,70 @@ class TestBlocks:
         assert isinstance(result, gpd.GeoDataFrame)
         assert output_path.exists()
 
-    @patch("merging.blocks.gpd.read_file")
+    @patch("merging.blocks.read_table")
+    def test_merge_walk_times_matrix(
+        self,
+        mock_read_table,
+        sample_blocks_gdf,
+        sample_conserved_lands_gdf,
+        sample_walk_times_df,
+        temp_dir,
+    ):
+        """Test merging walk times from the sparse matrix artifact."""
+        tables = {
+            "blocks.parquet": sample_blocks_gdf,
+            "lands.parquet": pd.DataFrame(sample_conserved_lands_gdf[["osmid", "CALC_AC"]]),
+        }
+        mock_read_table.side_effect = lambda path, **kwargs: tables[str(path)]
+        matrix_path = temp_dir / "walk_times_matrix.npz"
+        save_walk_time_matrix(
+            walk_times_to_matrix(sample_walk_times_df, value_col="trip_time"), matrix_path
+        )
+
+        result = merge_walk_times(
+            blocks_path="blocks.parquet",
+            walk_times_path=matrix_path,
+            conserved_lands_path="lands.parquet",
+            trip_times=[5, 10, 15, 20],
+        )
+
+        assert isinstance(result, gpd.GeoDataFrame)
+        assert len(result) == len(sample_blocks_gdf)
+        result = result.set_index("osmid")
+        # Block node 1 reaches land 3 (10.5 ac) at 5 min and land 4 (25.3 ac) at 10 min
+        assert result.loc[1, "AC_5"] == 10.5
+        assert abs(result.loc[1, "AC_10"] - 35.8) < 1e-9
+        # Block node 3 has no reachable lands
+        assert result.loc[3, "AC_20"] == 0
+
+    def test_aggregate_walk_times(self, sample_blocks_gdf, sample_walk_times_df):
+        """Test acres are summed per block and threshold without geometry."""
+        land_acres = pd.Series([10.5, 25.3], index=pd.Index([3, 4], name="osmid"))
+
+        ac = aggregate_walk_times(sample_walk_times_df, land_acres, trip_times=[10, 20])
+
+        assert ac.index.name == "block_osmid"
+        assert ac.loc[1].tolist() == [35.8, 35.8]
+        assert ac.loc[2].tolist() == [0.0, 35.8]  # 15 min falls in the 20 min bucket
+
+        merge = attach_block_geometry(sample_blocks_gdf, ac)
+        assert len(merge) == len(sample_blocks_gdf)
+        assert merge.geometry.equals(sample_blocks_gdf.geometry)
+        assert merge.set_index("osmid").loc[3, "AC_20"] == 0.0
+
+    @patch("merging.blocks.read_table")
     @patch("merging.blocks.pd.read_csv")
     def test_merge_walk_times_csv(
         self,
         mock_pd_read,
-        mock_gpd_read,
+        mock_read_table,
         sample_blocks_gdf,
         sample_conserved_lands_gdf,
         sample_walk_times_df,
         temp_dir,
     ):
         """Test merging walk times with CSV/shapefile files."""
-        mock_gpd_read.side_effect = [sample_blocks_gdf, sample_conserved_lands_gdf]
+        mock_read_table.side_effect = [sample_blocks_gdf, sample_conserved_lands_gdf]
         mock_pd_read.return_value = sample_walk_times_df
 
         output_path = temp_dir / "merged.shp"
@@ -134,30 +288,66 @@ class TestBlocks:
 
         assert isinstance(result, gpd.GeoDataFrame)
 
+    def test_merge_walk_times_attribute_only(
+        self, store_blocks, sample_conserved_lands_gdf, sample_walk_times_df, temp_dir
+    ):
+        """Test the merge can skip polygons and get them back from the store."""
+        blocks_path = temp_dir / "blocks.parquet"
+        lands_path = temp_dir / "lands.parquet"
+        walk_times_path = temp_dir / "walk_times.parquet"
+        output_path = temp_dir / "merged.parquet"
+        store_blocks.iloc[:3].to_parquet(blocks_path)
+        sample_conserved_lands_gdf.to_parquet(lands_path)
+        sample_walk_times_df.to_parquet(walk_times_path)
+        write_geometry_store(store_blocks.iloc[:3], "23", geometry_dir=temp_dir)
+
+        result = merge_walk_times(
+            blocks_path, walk_times_path, lands_path, output_path, with_geometry=False
+        )
+        expected = merge_walk_times(blocks_path, walk_times_path, lands_path)
 
-class TestAnalysis:
-    """Tests for analysis merging functions."""
+        assert not isinstance(result, gpd.GeoDataFrame)
+        assert not has_geometry(output_path)
+        assert has_geometry(blocks_path)
+        assert "geometry" not in read_attributes(blocks_path).columns
+        pd.testing.assert_frame_equal(result, pd.DataFrame(expected.drop(columns="geometry")))
 
-    @patch("merging.analysis.Census")
-    def test_fetch_census_data(self, mock_census_class, mock_census_api):
-        """Test fetching census data."""
-        mock_census_instance = MagicMock()
-        # Use get method instead of state_county_block (which doesn't exist)
-        mock_census_instance.pl.get.return_value = [
+        dissolved = dissolve_by_key(dissolve_blocks(result))
+        attached = attach_geometry(dissolved, geometry_dir=temp_dir)
+        assert attached.geometry.equals(store_blocks.geometry.iloc[:3].set_axis(attached.index))
+
+    def test_walk_times_partitioned_by_block_county(self, temp_dir):
+        """Test walk times follow their center node's counties and dedupe on read."""
+        walk_times = pd.DataFrame(
             {
-                "GEO_ID": "1000000US230010001001",
-                "P1_001N": 100,
-                "P1_003N": 80,
-                "P2_001N": 100,
-                "P2_002N": 5,
+                "block_osmid": [1, 3, 3],
+                "land_osmid": [10, 10, 11],
+                "trip_time": [5.0, 7.0, 9.0],
             }
-        ]
-        mock_census_class.return_value = mock_census_instance
+        )
+        # Node 3 serves blocks in counties 23001 and 23005
+        blocks = pd.DataFrame(
+            {"GEOID20": [230010001001000, 230010001001001, 230050002001000], "osmid": [1, 3, 3]}
+        )
+        root = temp_dir / "walk_times"
+        write_walk_times_partitioned(walk_times, blocks, root)
+
+        county = load_walk_times_table(root, filters=county_filters(["23001"]))
+        assert sorted(county["block_osmid"]) == [1, 3, 3]
+        assert len(load_walk_times_table(root)) == 3
+
+
+class TestAnalysis:
+    """Tests for analysis merging functions."""
 
+    def test_fetch_census_data(self, census_api_server, temp_dir):
+        """Test fetching census data."""
         result = fetch_census_data(
             api_key="test_key",
             state_fips="23",
             fields=["P1_001N", "P1_003N"],
+            cache_dir=temp_dir,
+            base_url=census_api_server.url,
         )
 
         assert isinstance(result, pd.DataFrame)
@@ -188,10 +378,10 @@ class TestAnalysis:
 
     @patch("merging.analysis.gpd.read_parquet")
     @patch("merging.analysis.gpd.read_file")
-    @patch("merging.analysis.pd.read_csv")
+    @patch("merging.analysis.load_block_relationships")
     def test_process_cejst_data(
         self,
-        mock_csv_read,
+        mock_load_relationships,
         mock_gpd_read_file,
         mock_gpd_read_parquet,
         sample_cejst_data,
@@ -203,7 +393,9 @@ class TestAnalysis:
         mock_gpd_read_parquet.return_value = sample_cejst_data
         # Mock file reading (fallback)
         mock_gpd_read_file.return_value = sample_cejst_data
-        mock_csv_read.return_value = sample_relationship_file
+        relationship_path = temp_dir / "relationship.txt"
+        sample_relationship_file.to_csv(relationship_path, sep="|", index=False)
+        mock_load_relationships.return_value = read_block_relationships(relationship_path)
 
         output_path = temp_dir / "cejst_block.parquet"
 
@@ -219,14 +411,90 @@ class TestAnalysis:
         # GEOID20 should be in the index (from groupby)
         assert result.index.name == "GEOID20" or "GEOID20" in result.columns
 
+    def test_crosswalk_cejst_matches_weighted_average(self):
+        """Test the vectorized crosswalk matches a per-block weighted average."""
+        rng = np.random.default_rng(0)
+        n_rows = 200
+        relationships = pd.DataFrame(
+            {
+                "GEOID10": rng.choice(["23001000100", "23001000200", "23001000300"], n_rows),
+                "GEOID20": rng.choice([f"2300100010010{i:02d}" for i in range(40)], n_rows),
+                "AREALAND_INT": rng.uniform(0, 100, n_rows),
+                "AREAWATER_INT": rng.uniform(0, 10, n_rows),
+                "AREALAND_2020": 500.0,
+                "AREAWATER_2020": 50.0,
+            }
+        )
+        cejst = pd.DataFrame(
+            {
+                "GEOID10": ["23001000100", "23001000200", "23001000300"],
+                "TC": [1, 0, 1],
+                "CC": [0, 0, 1],
+                "EXTRA": [3, 7, 2],
+            }
+        )
+
+        result = crosswalk_cejst(relationships, cejst, ["TC", "CC", "EXTRA"])
+
+        cejst20 = relationships.merge(cejst, on="GEOID10")
+        cejst20["WEIGHT"] = (cejst20["AREALAND_INT"] + cejst20["AREAWATER_INT"]) / 550.0
+        for geoid, group in cejst20.groupby("GEOID20"):
+            for col in ["TC", "CC", "EXTRA"]:
+                expected = int(np.ceil(np.average(group[col], weights=group["WEIGHT"])))
+                assert result.loc[int(geoid), col] == expected
+        assert result.index.name == "GEOID20"
+        assert result.index.dtype == np.int64
+
+    @patch("merging.analysis.crosswalk_cejst", wraps=crosswalk_cejst)
+    def test_process_cejst_data_cache(
+        self, mock_crosswalk, sample_cejst_data, sample_relationship_file, temp_dir
+    ):
+        """Test block-level CEJST data is cached by input file contents."""
+        cejst_path = temp_dir / "cejst.parquet"
+        relationship_path = temp_dir / "relationship.txt"
+        sample_cejst_data.to_parquet(cejst_path)
+        sample_relationship_file.to_csv(relationship_path, sep="|", index=False)
+        cache_dir = temp_dir / "cache"
+
+        first = process_cejst_data(cejst_path, relationship_path, cache_dir=cache_dir)
+        second = process_cejst_data(cejst_path, relationship_path, cache_dir=cache_dir)
+
+        assert mock_crosswalk.call_count == 1
+        pd.testing.assert_frame_equal(first, second)
+        assert first.loc[230010001000001, "TC"] == 1
+
+        sample_relationship_file.iloc[:1].to_csv(relationship_path, sep="|", index=False)
+        process_cejst_data(cejst_path, relationship_path, cache_dir=cache_dir)
+        assert mock_crosswalk.call_count == 2
+        assert list((temp_dir / "relationships").glob("*.parquet"))
+
+    def test_load_block_relationships(self, sample_relationship_file, temp_dir):
+        """Test the relationship file is parsed with GEOIDs and cached as Parquet."""
+        relationship_path = temp_dir / "tab2010_tab2020_st23_me.txt"
+        sample_relationship_file.to_csv(relationship_path, sep="|", index=False)
+        cache_dir = temp_dir / "cache"
+
+        relationships = load_block_relationships(relationship_path, cache_dir=cache_dir)
+
+        assert relationships["GEOID10"].tolist() == [23001000100, 23001000100]
+        assert relationships["GEOID10_blk"].tolist() == [230010001000001, 230010001000002]
+        assert relationships["GEOID20"].tolist() == [230010001000001, 230010001000002]
+        assert relationships["GEOID20"].dtype == np.int64
+        assert relationships["AREALAND_INT"].dtype == np.float64
+        assert "BLOCK_PART_FLAG_O" not in relationships.columns
+        assert len(list(cache_dir.glob("tab2010_tab2020_st23_me_*.parquet"))) == 1
+
+        with patch("merging.relationships.read_block_relationships") as mock_read:
+            cached = load_block_relationships(relationship_path, cache_dir=cache_dir)
+        mock_read.assert_not_called()
+        pd.testing.assert_frame_equal(cached, relationships)
+
     @patch("merging.analysis.fetch_census_data")
     @patch("merging.analysis.process_cejst_data")
-    @patch("merging.analysis.gpd.read_parquet")
-    @patch("merging.analysis.gpd.read_file")
+    @patch("merging.analysis.read_table")
     def test_create_ejblocks(
         self,
-        mock_gpd_read_file,
-        mock_gpd_read_parquet,
+        mock_read_table,
         mock_process_cejst,
         mock_fetch_census,
         sample_merged_blocks_gdf,
@@ -254,8 +522,7 @@ class TestAnalysis:
         test_blocks["ALAND20"] = test_blocks["ALAND20"].fillna(1000000)
 
         # Setup mocks
-        mock_gpd_read_parquet.return_value = test_blocks
-        mock_gpd_read_file.return_value = test_blocks
+        mock_read_table.return_value = test_blocks
 
         # Ensure census data has matching GEOID20 values
         # First, get the unique GEOID20 values from blocks
@@ -295,3 +562,260 @@ class TestAnalysis:
 
         assert isinstance(result, gpd.GeoDataFrame)
         assert output_path.exists()
+
+    def test_create_ejblocks_county_rerun_matches_full_run(self, temp_dir):
+        """Test a county rerun rewrites the same rows as a full run, flags included."""
+        geoids = [230010001001000 + i for i in range(4)] + [230050001001000 + i for i in range(4)]
+        blocks_path = temp_dir / "blocks"
+        write_partitioned(
+            pd.DataFrame({"GEOID20": geoids, "ALAND20": 1000.0, "osmid": range(8)}), blocks_path
+        )
+        # County 23005 is much less white and more Hispanic than county 23001
+        census = pd.DataFrame(
+            {
+                "GEOID20": [str(geoid) for geoid in geoids],
+                "P1_001N": [10] * 8,
+                "P1_003N": [9, 8, 7, 6, 5, 4, 3, 2],
+                "P2_001N": [10] * 8,
+                "P2_002N": [0, 1, 0, 1, 3, 5, 4, 6],
+            }
+        )
+        cejst_block = pd.DataFrame({"TC": [1] * 8}, index=pd.Index(geoids, name="GEOID20"))
+        output_path = temp_dir / "ejblocks"
+        kwargs = {
+            "output_path": output_path,
+            "state_fips": "23",
+            "cejst_path": "cejst.shp",
+            "relationship_file_path": "relationship.txt",
+        }
+
+        with (
+            patch("merging.analysis.fetch_census_data", return_value=census),
+            patch("merging.analysis.process_cejst_data", return_value=cejst_block),
+        ):
+            full = create_ejblocks(blocks_path, **kwargs)
+            written = read_table(output_path, cache=False)
+            rerun = create_ejblocks(blocks_path, counties=["23005"], **kwargs)
+
+        # Per-county cutoffs would flag half of county 23005 as above the median
+        assert not rerun["white_50"].any()
+        assert rerun["hisp_75"].sum() == 2
+        pd.testing.assert_frame_equal(rerun, full.loc[rerun.index])
+        pd.testing.assert_frame_equal(read_table(output_path, cache=False), written)
+
+
+class TestDuckDBEngine:
+    """Tests for the out-of-core DuckDB engine of create_ejblocks."""
+
+    @pytest.fixture(autouse=True)
+    def _require_duckdb(self):
+        pytest.importorskip("duckdb")
+
+    @pytest.fixture
+    def blocks(self):
+        """Attribute-only blocks with a duplicate GEOID, empty land and no census row."""
+        return pd.DataFrame(
+            {
+                "GEOID20": [230010001001000, 230010001001001, 230010001001001, 230010001001002],
+                "osmid": [1, 2, 3, 4],
+                "ALAND20": [1000.0, 0.0, 500.0, 2000.0],
+                "AC_10": np.array([1.5, 2.0, 0.5, np.nan], dtype=np.float32),
+                "NAME": ["a", None, "b", "c"],
+            }
+        )
+
+    @pytest.fixture
+    def census(self):
+        return pd.DataFrame(
+            {
+                "GEO_ID": ["1000000US230010001001000", "1000000US230010001001001"],
+                "GEOID20": ["230010001001000", "230010001001001"],
+                "P1_001N": [10, 0],
+                "P1_003N": [8, 0],
+                "P2_001N": [10, 0],
+                "P2_002N": [1, 0],
+            }
+        )
+
+    def _create(self, engine, blocks_path, census, output_path):
+        cejst_block = pd.DataFrame(
+            {"TC": pd.array([1, pd.NA], dtype="Int64"), "CC": pd.array([0, 1], dtype="Int64")},
+            index=pd.Index([230010001001000, 230010001001001], name="GEOID20"),
+        )
+        with (
+            patch("merging.analysis.fetch_census_data", return_value=census),
+            patch("merging.analysis.process_cejst_data", return_value=cejst_block),
+        ):
+            return create_ejblocks(
+                blocks_path=blocks_path,
+                cejst_path="cejst.shp",
+                relationship_file_path="relationship.txt",
+                output_path=output_path,
+                state_fips="23",
+                engine=engine,
+            )
+
+    def test_create_ejblocks_matches_pandas(self, blocks, census, temp_dir):
+        """Test the DuckDB engine writes the same ejblocks as the pandas engine."""
+        blocks_path = temp_dir / "blocks.parquet"
+        write_parquet(apply_schema(blocks), blocks_path)
+
+        expected = self._create("pandas", blocks_path, census, temp_dir / "pandas.parquet")
+        result = self._create("duckdb", blocks_path, census, temp_dir / "duckdb.parquet")
+
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        assert pq.read_table(temp_dir / "duckdb.parquet").equals(
+            pq.read_table(temp_dir / "pandas.parquet")
+        )
+
+    def test_create_ejblocks_partitioned_counties(self, blocks, census, temp_dir):
+        """Test the DuckDB engine reads only the requested county partitions."""
+        other = blocks.iloc[[0]].assign(GEOID20=230050001001000)
+        root = temp_dir / "blocks"
+        write_partitioned(apply_schema(pd.concat([blocks, other], ignore_index=True)), root)
+
+        result = duckdb_engine.merge_ejblocks(
+            root, census, pd.DataFrame({"TC": [1]}, index=[230010001001000]), counties=["23001"]
+        )
+
+        assert result.index.tolist() == [230010001001000, 230010001001001, 230010001001002]
+        assert result.loc[230010001001001, "ALAND20"] == 500.0
+        assert result.loc[230010001001001, "NAME"] == "b"
+        assert result["TC"].isna().sum() == 2
+
+    def test_crosswalk_matches_pandas(self, sample_cejst_data, sample_relationship_file, temp_dir):
+        """Test the DuckDB CEJST crosswalk matches the pandas one."""
+        relationship_path = temp_dir / "relationship.txt"
+        sample_relationship_file.to_csv(relationship_path, sep="|", index=False)
+        cache_dir = temp_dir / "relationships"
+
+        expected = crosswalk_cejst(
+            load_block_relationships(relationship_path, cache_dir=cache_dir), sample_cejst_data
+        )
+        result = duckdb_engine.crosswalk_cejst(
+            get_block_relationships_path(relationship_path, cache_dir=cache_dir),
+            sample_cejst_data,
+            ["TC", "CC"],
+        )
+
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+    def test_rejects_unknown_engine_and_inline_geometry(self, blocks, census, temp_dir):
+        """Test engine names are validated and geometry blocks are refused."""
+        with pytest.raises(ConfigurationError):
+            duckdb_engine.check_engine("spark")
+
+        blocks_path = temp_dir / "blocks.parquet"
+        gpd.GeoDataFrame(blocks, geometry=[box(0, 0, 1, 1)] * 4, crs="EPSG:3857").to_parquet(
+            blocks_path
+        )
+        with pytest.raises(ConfigurationError, match="attribute-only"):
+            self._create("duckdb", blocks_path, census, temp_dir / "ejblocks.parquet")
+
+
+class TestCensusAPI:
+    """Tests for the per-county Census API client against a local server."""
+
+    def _fetch(self, server, temp_dir, fields, **kwargs):
+        kwargs.setdefault("api_key", "test_key")
+        return fetch_block_data("23", fields, cache_dir=temp_dir, base_url=server.url, **kwargs)
+
+    def test_fetches_counties_concurrently(self, census_api_server, temp_dir):
+        """Test one request per county, at most max_workers at a time."""
+        census_api_server.delay = 0.05
+        result = self._fetch(census_api_server, temp_dir, ["P1_001N", "P1_003N"], max_workers=2)
+
+        assert result.columns.tolist() == ["GEO_ID", "P1_001N", "P1_003N", "GEOID20"]
+        assert result["GEOID20"].tolist() == [
+            "230010001001000",
+            "230010001001001",
+            "230050002001000",
+        ]
+        assert result["P1_001N"].tolist() == [100.0, 200.0, 50.0]
+        block_requests = [r for r in census_api_server.requests if r["for"] == "block:*"]
+        assert sorted(r["in"] for r in block_requests) == [
+            "state:23 county:001",
+            "state:23 county:005",
+        ]
+        assert all(r["key"] == "test_key" for r in block_requests)
+        assert census_api_server.max_in_flight <= 2
+
+    def test_added_field_fetches_only_that_field(self, census_api_server, temp_dir):
+        """Test each county and field is cached separately."""
+        self._fetch(census_api_server, temp_dir, ["P1_001N"])
+        census_api_server.requests.clear()
+
+        result = self._fetch(census_api_server, temp_dir, ["P1_001N", "P2_002N"])
+
+        assert [r["get"] for r in census_api_server.requests] == ["GEO_ID,P2_002N"] * 2
+        assert result["P2_002N"].tolist() == [5.0, 10.0, 2.0]
+
+        census_api_server.requests.clear()
+        cached = self._fetch(census_api_server, temp_dir, ["P2_002N"], api_key=None)
+        assert census_api_server.requests == []
+        assert cached["P2_002N"].tolist() == [5.0, 10.0, 2.0]
+
+    def test_retries_failed_county_only(self, census_api_server, temp_dir):
+        """Test a transient failure repeats only that county's request."""
+        census_api_server.failures["005"] = 1
+
+        result = self._fetch(census_api_server, temp_dir, ["P1_001N"])
+
+        assert len(result) == 3
+        counties = [r["in"] for r in census_api_server.requests if r["for"] == "block:*"]
+        assert counties.count("state:23 county:005") == 2
+        assert counties.count("state:23 county:001") == 1
+
+    def test_requires_api_key_without_cache(self, census_api_server, temp_dir):
+        """Test missing cache entries need an API key."""
+        with pytest.raises(ConfigurationError, match="No API key"):
+            self._fetch(census_api_server, temp_dir, ["P1_001N"], api_key=None)
+        assert census_api_server.requests == []
+
+
+class TestCensusStore:
+    """Tests for the field-granular Census cache store."""
+
+    def _load(self, server, temp_dir, fields, **kwargs):
+        kwargs.setdefault("api_key", "test_key")
+        return load_block_data("23", fields, cache_dir=temp_dir, base_url=server.url, **kwargs)
+
+    def test_subset_from_cached_fields(self, census_api_server, temp_dir):
+        """Test any cached field subset loads without requests or an API key."""
+        self._load(census_api_server, temp_dir, ["P1_001N", "P1_003N", "P2_001N", "P2_002N"])
+        census_api_server.requests.clear()
+
+        result = self._load(census_api_server, temp_dir, ["P1_001N"], api_key=None)
+
+        assert census_api_server.requests == []
+        assert result.columns.tolist() == ["GEO_ID", "P1_001N", "GEOID20"]
+        assert result["P1_001N"].tolist() == [100.0, 200.0, 50.0]
+        state_dir = get_state_dir("23", cache_dir=temp_dir)
+        assert state_dir == temp_dir / "2020" / "dec_pl" / "23"
+        assert (state_dir / "P1_001N.parquet").exists()
+        assert list((temp_dir / "counties").rglob("*.parquet")) == []
+
+    def test_adds_only_missing_field(self, census_api_server, temp_dir):
+        """Test a new field is fetched alone and aligned to the stored blocks."""
+        self._load(census_api_server, temp_dir, ["P1_001N"])
+        census_api_server.requests.clear()
+
+        result = self._load(census_api_server, temp_dir, ["P2_002N", "P1_001N"])
+
+        block_requests = [r for r in census_api_server.requests if r["for"] == "block:*"]
+        assert [r["get"] for r in block_requests] == ["GEO_ID,P2_002N"] * 2
+        assert result.set_index("GEOID20")[["P2_002N", "P1_001N"]].loc[
+            "230050002001000"
+        ].tolist() == [2.0, 50.0]
+
+    def test_parallel_runs_share_store(self, census_api_server, temp_dir):
+        """Test concurrent loads of a state fetch each county once."""
+        census_api_server.delay = 0.05
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(
+                pool.map(lambda _: self._load(census_api_server, temp_dir, ["P1_001N"]), range(2))
+            )
+
+        block_requests = [r for r in census_api_server.requests if r["for"] == "block:*"]
+        assert len(block_requests) == 2
+        pd.testing.assert_frame_equal(results[0], results[1])
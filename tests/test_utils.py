@@ -0,0 +1,293 @@
+"""Tests for utils module."""
+
+from unittest.mock import patch
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from shapely.geometry import box
+
+from exceptions import DataError, ValidationError
+from utils.geometry import (
+    attach_geometry,
+    get_geometry_path,
+    has_geometry,
+    read_geometry,
+    write_geometry_store,
+)
+from utils.io import (
+    DEFAULT_CACHE_SIZE,
+    clear_cache,
+    count_row_groups,
+    county_filters,
+    list_partition_files,
+    read_columns,
+    read_table,
+    set_cache_size,
+    write_parquet,
+    write_partitioned,
+    write_table,
+)
+from utils.schema import (
+    apply_schema,
+    geoid_prefix,
+    geoid_to_int,
+    geoid_to_str,
+    restore_geoid_strings,
+)
+
+
+class TestSchema:
+    """Tests for compact GEOID/osmid encodings."""
+
+    def test_geoid_prefix(self):
+        """Test hierarchy prefixes are integer divisions of block GEOIDs."""
+        geoids = geoid_to_int(pd.Series(["230050001001000", "010010201001003"]))
+
+        assert geoids.dtype == np.int64
+        assert geoid_prefix(geoids, "block_group").tolist() == [230050001001, 10010201001]
+        assert geoid_prefix(geoids, "tract").tolist() == [23005000100, 1001020100]
+        assert geoid_to_str(geoid_prefix(geoids, "county"), "county").tolist() == [
+            "23005",
+            "01001",
+        ]
+        with pytest.raises(ValidationError):
+            geoid_to_int(pd.Series(["23005000100100A"]))
+
+    def test_apply_schema(self, sample_blocks_gdf):
+        """Test artifacts get int64 IDs and float32 measures, reversibly for GEOIDs."""
+        blocks = sample_blocks_gdf.assign(
+            GEOID20=["010010001001000", "230010001002000", "230010001003000"],
+            block_osmid=["1", "2", "3"],
+            AC_10=[1.5, 0.0, 2.25],
+        )
+
+        result = apply_schema(blocks)
+
+        assert result["GEOID20"].dtype == np.int64
+        assert result["block_osmid"].dtype == np.int64
+        assert result["AC_10"].dtype == np.float32
+        assert blocks["GEOID20"].dtype == object  # Input is left untouched
+        assert restore_geoid_strings(result)["GEOID20"].tolist() == blocks["GEOID20"].tolist()
+
+
+class TestGeometryStore:
+    """Tests for the GEOID-keyed geometry sidecar store."""
+
+    def test_attach_geometry_round_trip(self, store_blocks, temp_dir):
+        """Test stored geometry is joined back by GEOID across states."""
+        for state in ["23", "33"]:
+            in_state = store_blocks[store_blocks["GEOID20"].str.startswith(state)]
+            write_geometry_store(in_state, state, geometry_dir=temp_dir)
+
+        path = get_geometry_path("23", geometry_dir=temp_dir)
+        assert path.name == "block_2020_23.parquet"
+        assert pq.read_schema(path).names == ["GEOID", "geometry", "bbox"]
+
+        attributes = pd.DataFrame(
+            {"POP": [4.0, 3.0, 2.0]},
+            index=pd.Index(geoid_to_int(store_blocks["GEOID20"].iloc[[3, 2, 0]]), name="GEOID20"),
+        )
+        result = attach_geometry(attributes, geometry_dir=temp_dir)
+
+        assert isinstance(result, gpd.GeoDataFrame)
+        assert result.crs == store_blocks.crs
+        assert result["POP"].tolist() == [4.0, 3.0, 2.0]
+        assert result.geometry.equals(store_blocks.geometry.iloc[[3, 2, 0]].set_axis(result.index))
+
+        with pytest.raises(DataError):
+            attach_geometry(pd.DataFrame({"GEOID20": [500010001001000]}), geometry_dir=temp_dir)
+
+    def test_write_geometry_store_dissolves_coarser_level(self, store_blocks, temp_dir):
+        """Test blocks are unioned into tracts when storing tract geometry."""
+        maine = store_blocks.iloc[:3]
+        write_geometry_store(maine, "23", level="tract", geometry_dir=temp_dir)
+
+        tracts = read_geometry("23", level="tract", geometry_dir=temp_dir)
+
+        assert sorted(tracts["GEOID"].tolist()) == [23001000100, 23001000200]
+        area = tracts.set_index("GEOID").area
+        assert area[23001000100] == pytest.approx(2.0)
+
+        with pytest.raises(DataError):
+            write_geometry_store(
+                pd.concat([maine, maine.iloc[:1]]), "23", geometry_dir=temp_dir, overwrite=True
+            )
+
+
+class TestTableIO:
+    """Tests for the column-projected artifact reader."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        clear_cache()
+        yield
+        set_cache_size(DEFAULT_CACHE_SIZE)
+        clear_cache()
+
+    @pytest.fixture
+    def blocks(self):
+        """Three unit-square blocks indexed by GEOID20."""
+        return gpd.GeoDataFrame(
+            {"ALAND20": [1.0, 2.0, 3.0], "osmid": [1, 2, 3]},
+            geometry=[box(0, 0, 1, 1), box(5, 0, 6, 1), box(10, 0, 11, 1)],
+            index=pd.Index([230010001001000, 230010001001001, 230010001001002], name="GEOID20"),
+            crs="EPSG:3857",
+        )
+
+    def test_read_parquet_projection_filters_and_cache(self, blocks, temp_dir):
+        """Test Parquet reads project columns, push filters and reuse results."""
+        path = temp_dir / "blocks.parquet"
+        blocks.to_parquet(path)
+
+        with patch("utils.io.gpd.read_parquet", wraps=gpd.read_parquet) as mock_read:
+            first = read_table(path, columns=["ALAND20"], filters=[("osmid", ">", 1)])
+            second = read_table(path, columns=["ALAND20"], filters=[("osmid", ">", 1)])
+
+        assert mock_read.call_count == 1
+        assert isinstance(first, gpd.GeoDataFrame)
+        assert list(first.columns) == ["ALAND20", "geometry"]
+        assert first.index.tolist() == [230010001001001, 230010001001002]
+        second.iloc[0, 0] = 99.0  # Cached copies are independent, even for in-place edits
+        assert read_table(path, columns=["ALAND20"], filters=[("osmid", ">", 1)])[
+            "ALAND20"
+        ].tolist() == [2.0, 3.0]
+
+        # Tables larger than the cache, and reads with cache=False, are not kept
+        set_cache_size(1024)
+        with patch("utils.io.gpd.read_parquet", wraps=gpd.read_parquet) as mock_read:
+            read_table(path, cache=False)
+            read_table(path, cache=False)
+            big = pd.concat([blocks] * 100)
+            big.to_parquet(temp_dir / "big.parquet")
+            read_table(temp_dir / "big.parquet")
+            read_table(temp_dir / "big.parquet")
+        assert mock_read.call_count == 4
+
+        attributes = read_table(path, geometry=False)
+        assert not isinstance(attributes, gpd.GeoDataFrame)
+        assert list(attributes.columns) == ["ALAND20", "osmid"]
+        assert read_table(path, bbox=(4, 0, 7, 1)).index.tolist() == [230010001001001]
+
+    def test_read_arrow_ipc(self, blocks, temp_dir):
+        """Test Arrow IPC artifacts round trip through a memory map."""
+        path = temp_dir / "blocks.arrow"
+        write_table(blocks, path)
+
+        result = read_table(path)
+        assert result.crs == blocks.crs
+        pd.testing.assert_frame_equal(pd.DataFrame(result), pd.DataFrame(blocks))
+
+        near = read_table(path, columns=["osmid"], bbox=(4, 0, 12, 1), filters=[("osmid", "<", 3)])
+        assert near["osmid"].tolist() == [2]
+
+        attributes = blocks.drop(columns="geometry").pipe(pd.DataFrame)
+        write_table(attributes, temp_dir / "attributes.arrow")
+        assert not has_geometry(temp_dir / "attributes.arrow")
+        pd.testing.assert_frame_equal(read_table(temp_dir / "attributes.arrow"), attributes)
+
+    def test_read_shapefile_zip(self, blocks, temp_dir):
+        """Test zipped shapefiles are read through pyogrio's Arrow mode."""
+        path = temp_dir / "blocks.shp.zip"
+        blocks.reset_index().astype({"GEOID20": str}).to_file(path, driver="ESRI Shapefile")
+
+        result = read_table(path, columns=["GEOID20"], bbox=(0, 0, 6, 1))
+        assert isinstance(result, gpd.GeoDataFrame)
+        assert result.crs == blocks.crs
+        assert result["GEOID20"].tolist() == ["230010001001000", "230010001001001"]
+
+        filtered = read_table(path, filters=[("osmid", "==", 3)], geometry=False)
+        assert filtered["GEOID20"].tolist() == ["230010001001002"]
+
+    def test_write_parquet_spatial_layout(self, temp_dir):
+        """Test Hilbert-sorted, bbox-covered output lets a bbox read skip row groups."""
+        rng = np.random.default_rng(0)
+        cells = rng.permutation([(x, y) for x in range(10) for y in range(10)])
+        grid = gpd.GeoDataFrame(
+            {"cell": [f"{x}_{y}" for x, y in cells]},
+            geometry=[box(x, y, x + 1, y + 1) for x, y in cells],
+            crs="EPSG:3857",
+        )
+
+        unsorted = temp_dir / "unsorted.parquet"
+        sorted_path = temp_dir / "grid.parquet"
+        write_parquet(grid, unsorted, sort=False, row_group_size=10)
+        write_parquet(grid, sorted_path, row_group_size=10)
+
+        bbox = (0.2, 0.2, 1.8, 1.8)
+        touched, total = count_row_groups(sorted_path, bbox)
+        assert total == 10
+        assert touched < count_row_groups(unsorted, bbox)[0]
+        assert pq.ParquetFile(sorted_path).metadata.row_group(0).column(0).compression == "ZSTD"
+        assert sorted(read_table(sorted_path, bbox=bbox)["cell"]) == ["0_0", "0_1", "1_0", "1_1"]
+        assert len(read_table(sorted_path)) == len(grid)
+
+    def test_read_columns(self, blocks, temp_dir):
+        """Test attribute columns are read without geometry from each format."""
+        blocks = blocks.reset_index()
+        blocks.to_parquet(temp_dir / "blocks.parquet")
+        blocks.drop(columns="geometry").to_csv(temp_dir / "blocks.csv", index=False)
+        blocks.to_file(temp_dir / "blocks.gpkg")
+
+        for name in ["blocks.parquet", "blocks.csv", "blocks.gpkg"]:
+            df = read_columns(temp_dir / name, ["GEOID20", "osmid"])
+            assert not isinstance(df, gpd.GeoDataFrame)
+            assert list(df.columns) == ["GEOID20", "osmid"]
+            assert list(df["osmid"]) == [1, 2, 3]
+
+
+class TestPartitionedDatasets:
+    """Tests for state/county partitioned artifact datasets."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        clear_cache()
+        yield
+        set_cache_size(DEFAULT_CACHE_SIZE)
+        clear_cache()
+
+    @pytest.fixture
+    def blocks(self):
+        """Blocks in two Maine counties and one New Hampshire county."""
+        return pd.DataFrame(
+            {
+                "GEOID20": [230010001001000, 230010001001001, 230050002001000, 330010001001000],
+                "osmid": [1, 2, 3, 4],
+                "ALAND20": [1.0, 2.0, 3.0, 4.0],
+            }
+        )
+
+    def test_write_and_prune_by_county(self, blocks, temp_dir):
+        """Test county filters read only the matching partitions."""
+        root = temp_dir / "blocks"
+        paths = write_partitioned(blocks, root, index=False)
+
+        assert sorted(p.relative_to(root).as_posix() for p in paths) == [
+            "state=23/county=001/part-0.parquet",
+            "state=23/county=005/part-0.parquet",
+            "state=33/county=001/part-0.parquet",
+        ]
+        assert len(list_partition_files(root, county_filters(["23005"]))) == 1
+
+        subset = read_table(root, filters=county_filters(["23005", "33001"]))
+        assert sorted(subset["GEOID20"]) == [230050002001000, 330010001001000]
+        assert "state" not in subset.columns
+        assert len(read_table(root)) == 4
+        with pytest.raises(DataError):
+            read_table(root, filters=county_filters(["25001"]))
+
+    def test_rewrite_county_leaves_others(self, blocks, temp_dir):
+        """Test rewriting one county replaces only its partition."""
+        root = temp_dir / "blocks"
+        write_partitioned(blocks, root, index=False)
+        other = root / "state=23" / "county=001" / "part-0.parquet"
+        mtime = other.stat().st_mtime_ns
+
+        updated = blocks[blocks["GEOID20"] == 230050002001000].assign(ALAND20=9.0)
+        write_partitioned(updated, root, index=False)
+
+        assert other.stat().st_mtime_ns == mtime
+        assert read_table(root, filters=county_filters(["23005"]))["ALAND20"].tolist() == [9.0]
+        assert len(read_table(root)) == 4
@@ -1,9 +1,26 @@
 """Tests for walk_times module."""
 
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from multiprocessing import Pool
+from pathlib import Path
 from unittest.mock import patch
 
+import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pytest
+from pyproj import Transformer
+from shapely.geometry import Point
 
+from exceptions import ValidationError
+from walk_times.algorithms import bounded_dijkstra
 from walk_times.calculate import (
     add_time_attributes,
     calculate_walk_times,
@@ -11,12 +28,52 @@ from walk_times.calculate import (
     load_graph,
     process_walk_times,
 )
+from walk_times.categories import encode_land_categories
 from walk_times.graph_utils import (
     convert_node_ids_to_rx_indices,
     convert_rx_indices_to_node_ids,
     get_node_mapping,
     nx_to_rustworkx,
 )
+from walk_times.incremental import (
+    affected_center_nodes,
+    diff_conserved_lands,
+    diff_routing_caches,
+    patch_center_rows,
+    patch_walk_time_matrix,
+    process_land_update,
+    recompute_center_walk_times,
+    reverse_walk_times,
+)
+from walk_times.isochrones import build_isochrone_polygons, calculate_isochrones, get_edge_arrays
+from walk_times.matrix import (
+    get_sidecar_paths,
+    load_walk_time_matrix,
+    save_walk_time_matrix,
+    walk_times_to_matrix,
+)
+from walk_times.regional import (
+    calculate_regional_walk_times,
+    deduplicate_walk_times,
+    partition_routing_cache,
+)
+from walk_times.routing_cache import (
+    RoutingCache,
+    build_routing_cache,
+    get_routing_cache,
+    load_routing_cache,
+    merge_routing_caches,
+    save_routing_cache,
+)
+from walk_times.scheduler import (
+    get_available_memory,
+    parse_memory_size,
+    plan_workers,
+    throttled_imap,
+)
+from walk_times.serve import WalkTimeService, create_server
+from walk_times.work_queue import WorkQueue, create_walk_time_queue
+from walk_times.worker import collect_walk_times, run_local_workers, run_worker
 
 
 class TestGraphUtils:
@@ -180,6 +237,24 @@ class TestCalculate:
         assert "trip_time" in df.columns
         assert len(df) > 0
 
+    def test_calculate_walk_times_smallest_threshold(
+        self, sample_graph, sample_conserved_lands_gdf
+    ):
+        """Test each pair is assigned the smallest threshold and exact minutes."""
+        df = calculate_walk_times(
+            [1],
+            sample_graph,
+            sample_conserved_lands_gdf,
+            trip_times=[1, 2, 5],
+            progress_bar=False,
+            geography_type="blocks",
+        ).set_index("land_osmid")
+
+        # Node 1 -> 3 takes 2.0 minutes, node 1 -> 4 takes 2.4 minutes
+        assert df.loc[3, "trip_time"] == 2
+        assert df.loc[4, "trip_time"] == 5
+        assert abs(df.loc[4, "minutes"] - 2.4) < 1e-6
+
     def test_calculate_walk_times_tracts(self, sample_graph, sample_conserved_lands_gdf):
         """Test calculating walk times for tracts."""
         from walk_times.calculate import add_time_attributes
@@ -275,3 +350,840 @@ class TestCalculate:
         mock_calc.assert_called_once()
         assert output_path.exists()
         assert isinstance(result, pd.DataFrame)
+
+    @patch("walk_times.calculate.gpd.read_parquet")
+    @patch("walk_times.calculate.load_graph")
+    @patch("walk_times.calculate.add_time_attributes")
+    @patch("walk_times.calculate.calculate_walk_times")
+    def test_process_walk_times_matrix(
+        self,
+        mock_calc,
+        mock_add_time,
+        mock_load,
+        mock_gpd_read_parquet,
+        sample_graph,
+        sample_blocks_gdf,
+        sample_walk_times_df,
+        temp_dir,
+    ):
+        """Test the sparse matrix artifact is written alongside the long table."""
+        mock_load.return_value = sample_graph
+        mock_calc.return_value = sample_walk_times_df.assign(minutes=[4.5, 9.0, 12.0, 19.5])
+        mock_gpd_read_parquet.return_value = sample_blocks_gdf
+
+        output_path = temp_dir / "walk_times.parquet"
+        matrix_path = temp_dir / "walk_times_matrix.npz"
+
+        process_walk_times(
+            geography_type="blocks",
+            graph_path="dummy.graphml",
+            geography_path="dummy.parquet",
+            conserved_lands_path="dummy.parquet",
+            output_path=output_path,
+            matrix_path=matrix_path,
+        )
+
+        assert "minutes" not in pd.read_parquet(output_path).columns
+        wtm = load_walk_time_matrix(matrix_path)
+        assert wtm.matrix[1, 1] == 19.5
+
+
+class TestAlgorithms:
+    """Tests for algorithms module."""
+
+    def test_bounded_dijkstra(self, sample_rustworkx_graph):
+        """Test forward bounded Dijkstra distances."""
+        rx_graph, nx_id_to_rx_idx, _ = sample_rustworkx_graph
+
+        distances = bounded_dijkstra(rx_graph, nx_id_to_rx_idx[1], max_distance=5.0)
+
+        assert distances[nx_id_to_rx_idx[1]] == 0.0
+        assert distances[nx_id_to_rx_idx[3]] == 2.0
+        assert abs(distances[nx_id_to_rx_idx[4]] - 2.4) < 1e-9
+
+    def test_bounded_dijkstra_reverse(self, sample_rustworkx_graph):
+        """Test reverse search returns distances towards the source."""
+        rx_graph, nx_id_to_rx_idx, _ = sample_rustworkx_graph
+
+        distances = bounded_dijkstra(rx_graph, nx_id_to_rx_idx[3], max_distance=5.0, reverse=True)
+
+        assert distances[nx_id_to_rx_idx[2]] == 1.0
+        assert distances[nx_id_to_rx_idx[1]] == 2.0
+        assert abs(distances[nx_id_to_rx_idx[4]] - 1.4) < 1e-9
+
+    def test_bounded_dijkstra_reverse_limit(self, sample_rustworkx_graph):
+        """Test reverse search respects max_distance."""
+        rx_graph, nx_id_to_rx_idx, _ = sample_rustworkx_graph
+
+        distances = bounded_dijkstra(rx_graph, nx_id_to_rx_idx[3], max_distance=1.0, reverse=True)
+
+        assert nx_id_to_rx_idx[1] not in distances
+        assert nx_id_to_rx_idx[2] in distances
+
+
+class TestIsochrones:
+    """Tests for isochrones module."""
+
+    def test_calculate_isochrones(self, sample_graph, sample_conserved_lands_gdf):
+        """Test isochrone polygons are built per land and threshold."""
+        sample_graph.graph["crs"] = "EPSG:3857"
+
+        gdf = calculate_isochrones(
+            sample_graph,
+            sample_conserved_lands_gdf,
+            trip_times=[1, 2],
+            progress_bar=False,
+        )
+
+        assert isinstance(gdf, gpd.GeoDataFrame)
+        assert set(gdf.columns) == {"land_osmid", "trip_time", "geometry"}
+        assert gdf.crs == "EPSG:3857"
+        # Node 3 is reachable from 2 and 4 within 2 minutes; node 4 only from 2
+        assert set(gdf.loc[gdf["land_osmid"] == 3, "trip_time"]) == {1, 2}
+        assert not gdf.geometry.is_empty.any()
+
+    def test_isochrones_nested(self, sample_graph, sample_conserved_lands_gdf):
+        """Test larger thresholds contain smaller ones."""
+        sample_graph.graph["crs"] = "EPSG:3857"
+
+        gdf = calculate_isochrones(
+            sample_graph,
+            sample_conserved_lands_gdf,
+            trip_times=[1, 2],
+            progress_bar=False,
+        )
+        land = gdf[gdf["land_osmid"] == 3].set_index("trip_time").geometry
+
+        assert land[2].area > land[1].area
+        assert land[2].buffer(1e-6).contains(land[1])
+
+    def test_build_isochrone_polygons_node_buffer(self, sample_graph, sample_rustworkx_graph):
+        """Test node buffers produce a polygon even when no edge is reached."""
+        _, nx_id_to_rx_idx, _ = sample_rustworkx_graph
+        node_xy, edge_u, edge_v, edge_lines = get_edge_arrays(sample_graph, nx_id_to_rx_idx)
+
+        polygons = build_isochrone_polygons(
+            {nx_id_to_rx_idx[1]: 0.0},
+            [5],
+            node_xy,
+            edge_u,
+            edge_v,
+            edge_lines,
+            node_buff=10.0,
+        )
+
+        assert len(polygons) == 1
+        assert polygons[0][0] == 5
+        assert abs(polygons[0][1].area - 314) < 5
+
+
+class TestMatrix:
+    """Tests for the sparse walk time matrix artifact."""
+
+    def test_walk_times_to_matrix(self, sample_walk_times_df):
+        """Test matrix index and values."""
+        wtm = walk_times_to_matrix(sample_walk_times_df, value_col="trip_time")
+
+        assert wtm.matrix.shape == (2, 2)
+        assert list(wtm.center_ids) == [1, 2]
+        assert list(wtm.land_ids) == [3, 4]
+        assert wtm.center_node_col == "block_osmid"
+        assert wtm.matrix[0, 1] == 10
+
+    def test_save_load_roundtrip(self, sample_walk_times_df, temp_dir):
+        """Test saving and loading keeps matrix, index and explicit zeros."""
+        df = sample_walk_times_df.assign(minutes=[0.0, 7.5, 12.0, 18.0])
+        wtm = walk_times_to_matrix(df)
+        matrix_path = temp_dir / "matrix.npz"
+
+        save_walk_time_matrix(wtm, matrix_path)
+        loaded = load_walk_time_matrix(matrix_path)
+
+        centers_path, lands_path = get_sidecar_paths(matrix_path)
+        assert centers_path.exists()
+        assert lands_path.exists()
+        assert loaded.matrix.nnz == 4
+        assert (loaded.matrix != wtm.matrix).nnz == 0
+        assert list(loaded.land_ids) == [3, 4]
+        # A zero-minute walk is reachable and survives the round trip
+        assert loaded.within(5)[0, 0] == 1.0
+
+    def test_aggregate_by_center(self, sample_walk_times_df):
+        """Test cumulative per-center sums over reachable lands."""
+        wtm = walk_times_to_matrix(sample_walk_times_df, value_col="trip_time")
+
+        result = wtm.aggregate_by_center([10.0, 20.0], [5, 10, 20])
+
+        assert result.shape == (2, 3)
+        assert list(result[0]) == [10.0, 30.0, 30.0]
+        assert list(result[1]) == [0.0, 0.0, 30.0]
+
+    def test_to_long(self, sample_walk_times_df):
+        """Test expanding exact minutes back into trip time buckets."""
+        df = sample_walk_times_df.assign(minutes=[4.0, 7.5, 12.0, 61.0])
+        wtm = walk_times_to_matrix(df)
+
+        long_df = wtm.to_long(trip_times=[5, 10, 15, 60])
+
+        assert len(long_df) == 3
+        assert sorted(long_df["trip_time"]) == [5, 10, 15]
+
+
+class TestCategories:
+    """Tests for per-category access from a single search."""
+
+    def test_encode_land_categories(self):
+        """Test labels are column-safe and missing values get their own category."""
+        lands = pd.DataFrame({"ACCESS": ["Public access", None, "easement", "Public access"]})
+
+        codes, labels = encode_land_categories(lands, "ACCESS")
+
+        assert labels == ["EASEMENT", "PUBLIC_ACCESS", "UNKNOWN"]
+        assert list(codes) == [1, 2, 0, 1]
+
+    @staticmethod
+    def _lands():
+        return pd.DataFrame(
+            {
+                "osmid": [3, 4, 3],
+                "CALC_AC": [10.5, 25.3, 1.0],
+                "ACCESS": ["public", "easement", None],
+            }
+        )
+
+    def test_calculate_walk_times_categories(self, sample_graph):
+        """Test acres are split by category and accumulated over thresholds."""
+        result = calculate_walk_times(
+            [1, 3, 99],
+            sample_graph,
+            self._lands(),
+            trip_times=[2, 5],
+            geography_type="blocks",
+            progress_bar=False,
+            category_col="ACCESS",
+        )
+
+        assert result.index.name == "block_osmid"
+        assert list(result.columns) == [
+            "AC_EASEMENT_2",
+            "AC_EASEMENT_5",
+            "AC_PUBLIC_2",
+            "AC_PUBLIC_5",
+            "AC_UNKNOWN_2",
+            "AC_UNKNOWN_5",
+        ]
+        # Node 1 reaches node 3 in 2.0 minutes and node 4 in 2.4 minutes
+        assert np.isclose(result.loc[1, "AC_PUBLIC_2"], 10.5)
+        assert result.loc[1, "AC_EASEMENT_2"] == 0
+        assert np.isclose(result.loc[1, "AC_EASEMENT_5"], 25.3)
+        assert np.isclose(result.loc[1, "AC_UNKNOWN_2"], 1.0)
+        # Node 3 has no outgoing edges and only reaches its own lands
+        assert result.loc[3, "AC_EASEMENT_5"] == 0
+        assert np.isclose(result.loc[3, "AC_PUBLIC_2"], 10.5)
+        # Nodes missing from the graph get zeros
+        assert (result.loc[99] == 0).all()
+
+    def test_categories_parallel_matches_serial(self, sample_graph):
+        """Test the parallel runner accumulates the same category acres."""
+        kwargs = {
+            "trip_times": [2, 5],
+            "geography_type": "blocks",
+            "progress_bar": False,
+            "category_col": "ACCESS",
+        }
+        serial = calculate_walk_times([1, 2, 3, 4], sample_graph, self._lands(), **kwargs)
+        parallel = calculate_walk_times(
+            [1, 2, 3, 4], sample_graph, self._lands(), n_jobs=2, max_memory=1, **kwargs
+        )
+
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    def test_process_walk_times_categories(self, sample_graph, temp_dir):
+        """Test category access is saved next to the walk times table."""
+        pd.DataFrame({"osmid": [1, 2]}).to_parquet(temp_dir / "blocks.parquet")
+        self._lands().to_parquet(temp_dir / "lands.parquet")
+
+        with (
+            patch("walk_times.calculate.gpd.read_parquet", side_effect=pd.read_parquet),
+            patch("walk_times.calculate.load_graph", return_value=sample_graph),
+        ):
+            process_walk_times(
+                geography_type="blocks",
+                graph_path="dummy.graphml",
+                geography_path=temp_dir / "blocks.parquet",
+                conserved_lands_path=temp_dir / "lands.parquet",
+                output_path=temp_dir / "walk_times.parquet",
+                trip_times=[5],
+                category_col="ACCESS",
+            )
+
+        result = pd.read_parquet(temp_dir / "walk_times_categories.parquet")
+        assert list(result.columns) == [
+            "block_osmid",
+            "AC_EASEMENT_5",
+            "AC_PUBLIC_5",
+            "AC_UNKNOWN_5",
+        ]
+        assert list(result["block_osmid"]) == [1, 2]
+
+
+class TestIncremental:
+    """Tests for incremental updates after conserved lands change."""
+
+    @staticmethod
+    def _lands(rows):
+        osmids, acres, points = zip(*rows, strict=True)
+        return gpd.GeoDataFrame(
+            {"osmid": list(osmids), "CALC_AC": list(acres)},
+            geometry=[Point(*xy) for xy in points],
+            crs="EPSG:3857",
+        )
+
+    def test_diff_conserved_lands(self):
+        """Test parcels are matched by node and geometry."""
+        old = self._lands([(3, 10.5, (200, 0)), (4, 25.3, (100, 100))])
+        new = self._lands([(3, 10.5, (200, 0)), (2, 5.0, (100, 0)), (3, 1.0, (210, 0))])
+
+        diff = diff_conserved_lands(old, new)
+
+        assert sorted(diff.added["osmid"]) == [2, 3]
+        assert list(diff.removed["osmid"]) == [4]
+        assert list(diff.changed_nodes) == [2, 3, 4]
+
+    def test_patch_matches_full_run(self, sample_graph):
+        """Test a patched matrix equals a full recomputation."""
+        old = self._lands([(3, 10.5, (200, 0)), (4, 25.3, (100, 100))])
+        new = self._lands([(3, 10.5, (200, 0)), (2, 5.0, (100, 0))])
+        centers = [1, 2, 3, 4]
+        full_old = walk_times_to_matrix(
+            calculate_walk_times(
+                centers,
+                sample_graph,
+                old,
+                trip_times=[5],
+                geography_type="blocks",
+                progress_bar=False,
+            )
+        )
+        full_new = walk_times_to_matrix(
+            calculate_walk_times(
+                centers,
+                sample_graph,
+                new,
+                trip_times=[5],
+                geography_type="blocks",
+                progress_bar=False,
+            )
+        )
+
+        diff = diff_conserved_lands(old, new)
+        reverse_times = reverse_walk_times(
+            sample_graph, diff.changed_nodes, np.array(centers), 5, progress_bar=False
+        )
+        patched = patch_walk_time_matrix(
+            full_old, diff.changed_nodes, np.array([2, 3]), reverse_times
+        )
+
+        assert list(patched.land_ids) == list(full_new.land_ids)
+        assert list(patched.center_ids) == list(full_new.center_ids)
+        assert np.allclose(patched.matrix.toarray(), full_new.matrix.toarray())
+        # Node 2 is itself a land node: the zero walk time must be kept
+        assert patched.matrix.nnz == full_new.matrix.nnz
+
+    def test_process_land_update(self, sample_graph, temp_dir):
+        """Test AC columns are patched in place for touched blocks only."""
+        old = self._lands([(3, 10.5, (200, 0)), (4, 25.3, (100, 100))])
+        new = self._lands([(3, 10.5, (200, 0)), (2, 5.0, (100, 0))])
+        old.to_parquet(temp_dir / "old.parquet")
+        new.to_parquet(temp_dir / "new.parquet")
+        pd.DataFrame({"osmid": [1, 2, 3]}).to_parquet(temp_dir / "blocks.parquet")
+        access = pd.DataFrame({"osmid": ["1", "2", "3"], "AC_5": [35.8, 35.8, 10.5]})
+        access.to_parquet(temp_dir / "access.parquet")
+
+        with patch("walk_times.incremental.load_graph", return_value=sample_graph):
+            diff = process_land_update(
+                "graph.graphml",
+                temp_dir / "blocks.parquet",
+                temp_dir / "old.parquet",
+                temp_dir / "new.parquet",
+                access_path=temp_dir / "access.parquet",
+            )
+
+        assert list(diff.changed_nodes) == [2, 4]
+        result = pd.read_parquet(temp_dir / "access.parquet")
+        assert np.allclose(result["AC_5"], [15.5, 15.5, 10.5])
+
+    def test_process_land_update_tract_table(self, sample_graph, temp_dir):
+        """Test a tract walk times table is patched under its own center column."""
+        old = self._lands([(3, 10.5, (200, 0)), (4, 25.3, (100, 100))])
+        new = self._lands([(3, 10.5, (200, 0)), (2, 5.0, (100, 0))])
+        old.to_parquet(temp_dir / "old.parquet")
+        new.to_parquet(temp_dir / "new.parquet")
+        pd.DataFrame({"osmid": [1, 2, 3]}).to_parquet(temp_dir / "tracts.parquet")
+        # process_land_update retimes the graph at the default speed
+        add_time_attributes(sample_graph, 4.5)
+
+        def full_run(lands):
+            return calculate_walk_times(
+                [1, 2, 3],
+                sample_graph,
+                lands,
+                trip_times=[5],
+                geography_type="tracts",
+                progress_bar=False,
+            )
+
+        full_run(old).to_parquet(temp_dir / "walk_times.parquet", index=False)
+        with patch("walk_times.incremental.load_graph", return_value=sample_graph):
+            process_land_update(
+                "graph.graphml",
+                temp_dir / "tracts.parquet",
+                temp_dir / "old.parquet",
+                temp_dir / "new.parquet",
+                walk_times_path=temp_dir / "walk_times.parquet",
+                trip_times=[5],
+            )
+
+        result = pd.read_parquet(temp_dir / "walk_times.parquet")
+        expected = full_run(new)
+        assert list(result.columns) == list(expected.columns)
+        assert result["tract_osmid"].notna().all()
+        key = list(expected.columns)
+        pd.testing.assert_frame_equal(
+            result.sort_values(key).reset_index(drop=True),
+            expected.sort_values(key).reset_index(drop=True),
+            check_dtype=False,
+        )
+
+
+class TestRoutingCache:
+    """Tests for the compact routing cache."""
+
+    def test_roundtrip(self, sample_graph, temp_dir):
+        """Test saving and loading preserves all arrays."""
+        sample_graph.graph["crs"] = "EPSG:3857"
+        cache = build_routing_cache(sample_graph)
+        save_routing_cache(cache, temp_dir / "graph.routing.npz")
+
+        loaded = load_routing_cache(temp_dir / "graph.routing.npz")
+
+        assert list(loaded.node_ids) == [1, 2, 3, 4]
+        assert loaded.node_xy.shape == (4, 2)
+        assert list(loaded.edge_length) == [100.0, 100.0, 141.4, 141.4]
+        assert loaded.crs == "EPSG:3857"
+
+    def test_to_rustworkx(self, sample_graph):
+        """Test walk times match the length-based edge weights."""
+        sample_graph.add_edge(1, 2, length=500.0)  # Parallel edge, longer than the first
+        cache = build_routing_cache(sample_graph)
+
+        rx_graph, nx_to_rx, rx_to_nx = cache.to_rustworkx(travel_speed=6.0)  # 100 m/min
+        distances = bounded_dijkstra(rx_graph, nx_to_rx[1], max_distance=10)
+
+        assert rx_graph.num_edges() == 4
+        assert abs(distances[nx_to_rx[3]] - 2.0) < 1e-9
+        assert rx_to_nx[nx_to_rx[4]] == 4
+
+    def test_get_routing_cache_uses_existing(self, sample_graph, temp_dir):
+        """Test an existing cache is loaded without parsing the graph."""
+        cache_path = temp_dir / "graph.routing.npz"
+        save_routing_cache(build_routing_cache(sample_graph), cache_path)
+
+        with patch("walk_times.routing_cache.load_graph") as mock_load:
+            cache = get_routing_cache(temp_dir / "graph.graphml", cache_path)
+
+        mock_load.assert_not_called()
+        assert len(cache.edge_u) == 4
+
+
+class TestGraphUpdate:
+    """Tests for incremental updates after the street network changes."""
+
+    @staticmethod
+    def _caches(sample_graph):
+        old_cache = build_routing_cache(sample_graph)
+        sample_graph[2][3][0]["length"] = 900.0  # Road 2 -> 3 detoured
+        new_cache = build_routing_cache(sample_graph)
+        return old_cache, new_cache
+
+    def test_diff_routing_caches(self, sample_graph):
+        """Test a changed length shows up as one removed and one added edge."""
+        old_cache, new_cache = self._caches(sample_graph)
+
+        diff = diff_routing_caches(old_cache, new_cache)
+
+        assert diff.removed[["u", "v", "length"]].values.tolist() == [[2, 3, 100.0]]
+        assert diff.added[["u", "v", "length"]].values.tolist() == [[2, 3, 900.0]]
+        assert diff_routing_caches(old_cache, old_cache).is_empty
+
+    def test_patch_matches_full_run(self, sample_graph, sample_conserved_lands_gdf):
+        """Test recomputing only affected centers matches a full recomputation."""
+        old_cache, new_cache = self._caches(sample_graph)
+        centers = np.array([1, 2, 3, 4])
+        diff = diff_routing_caches(old_cache, new_cache)
+
+        affected = affected_center_nodes(
+            old_cache, new_cache, diff, centers, max_trip_time=5, progress_bar=False
+        )
+        # Nodes 1 and 2 can reach node 2 within 5 minutes; 3 and 4 cannot
+        assert list(affected) == [1, 2]
+
+        old_full = recompute_center_walk_times(
+            old_cache, centers, sample_conserved_lands_gdf, [5], progress_bar=False
+        )
+        new_full = recompute_center_walk_times(
+            new_cache, centers, sample_conserved_lands_gdf, [5], progress_bar=False
+        )
+        partial_times = recompute_center_walk_times(
+            new_cache, affected, sample_conserved_lands_gdf, [5], progress_bar=False
+        )
+        patched = patch_center_rows(walk_times_to_matrix(old_full), affected, partial_times)
+        expected = walk_times_to_matrix(new_full)
+
+        assert list(patched.center_ids) == list(expected.center_ids)
+        assert list(patched.land_ids) == list(expected.land_ids)
+        assert np.allclose(patched.matrix.toarray(), expected.matrix.toarray())
+
+
+class TestRegional:
+    """Tests for multi-state regional walk times."""
+
+    @staticmethod
+    def _region(sample_graph):
+        """Two 'states' sharing border node 3, with land 5 across the line."""
+        state_a = build_routing_cache(sample_graph)
+        state_b = RoutingCache(
+            node_ids=np.array([3, 5, 6]),
+            node_xy=np.array([[200.0, 0.0], [300.0, 0.0], [5000.0, 0.0]]),
+            edge_u=np.array([3, 5, 5, 6]),
+            edge_v=np.array([5, 3, 6, 5]),
+            edge_length=np.array([100.0, 100.0, 4700.0, 4700.0]),
+        )
+        return merge_routing_caches([state_a, state_b])
+
+    def test_merge_routing_caches(self, sample_graph):
+        """Test shared nodes are kept once and the networks connect."""
+        cache = self._region(sample_graph)
+
+        assert list(cache.node_ids) == [1, 2, 3, 4, 5, 6]
+        assert len(cache.edge_u) == 8
+        rx_graph, nx_to_rx, _ = cache.to_rustworkx(travel_speed=6.0)
+        distances = bounded_dijkstra(rx_graph, nx_to_rx[1], max_distance=10)
+        assert abs(distances[nx_to_rx[5]] - 3.0) < 1e-9
+
+    def test_partition_halo(self, sample_graph):
+        """Test the halo keeps nodes within walking distance only."""
+        cache = self._region(sample_graph)
+
+        partition = partition_routing_cache(cache, np.array([1, 2]), halo_distance=500)
+
+        assert list(partition.node_ids) == [1, 2, 3, 4, 5]
+        assert not np.isin(6, partition.edge_v).any()
+
+    def test_partitioned_matches_merged(self, sample_graph):
+        """Test partitioned runs give the same table as the merged network."""
+        cache = self._region(sample_graph)
+        partitions = {"A": np.array([1, 2, 3]), "B": np.array([3, 5])}
+        lands = pd.DataFrame({"osmid": [4, 5]})
+
+        results = {
+            mode: calculate_regional_walk_times(
+                cache, partitions, lands, [5], travel_speed=6.0, mode=mode, progress_bar=False
+            )
+            for mode in ("merged", "partitioned")
+        }
+
+        pd.testing.assert_frame_equal(results["merged"], results["partitioned"])
+        df = results["partitioned"]
+        # Center 1 sees the land across the state line; center 3 is counted once
+        assert ((df["block_osmid"] == 1) & (df["land_osmid"] == 5)).any()
+        assert not df.duplicated(["block_osmid", "land_osmid"]).any()
+
+    def test_deduplicate_keeps_shortest(self):
+        """Test duplicate pairs keep the shortest walk time."""
+        df = pd.DataFrame(
+            {
+                "block_osmid": [1, 1, 2],
+                "land_osmid": [5, 5, 5],
+                "trip_time": [10, 5, 5],
+                "minutes": [7.0, 4.0, 2.0],
+            }
+        )
+
+        result = deduplicate_walk_times(df)
+
+        assert result["minutes"].tolist() == [4.0, 2.0]
+
+
+class TestScheduler:
+    """Tests for memory-aware worker planning."""
+
+    def test_parse_memory_size(self):
+        """Test human-readable sizes are converted to bytes."""
+        assert parse_memory_size("8G") == 8 * 1024**3
+        assert parse_memory_size("512mb") == 512 * 1024**2
+        assert parse_memory_size(1000) == 1000
+        assert parse_memory_size(None) is None
+        with pytest.raises(ValidationError):
+            parse_memory_size("lots")
+
+    def test_available_memory_honors_cgroup(self, temp_dir):
+        """Test the cgroup v2 headroom caps host MemAvailable."""
+        meminfo = temp_dir / "meminfo"
+        meminfo.write_text("MemTotal: 16000000 kB\nMemAvailable: 8000000 kB\n")
+        cgroup = temp_dir / "cgroup"
+        cgroup.mkdir()
+
+        (cgroup / "memory.max").write_text("max\n")
+        assert get_available_memory(meminfo, cgroup) == 8000000 * 1024
+
+        (cgroup / "memory.max").write_text(f"{2 * 1024**3}\n")
+        (cgroup / "memory.current").write_text(f"{1024**3}\n")
+        assert get_available_memory(meminfo, cgroup) == 1024**3
+
+    def test_plan_workers_fits_budget(self):
+        """Test the worker count shrinks to fit the memory budget."""
+        plan = plan_workers(1024**3, n_tasks=10000, n_jobs=8, available_memory=4 * 1024**3)
+        assert plan.n_workers == 3  # 80% of 4 GiB fits three 1 GiB workers
+        assert plan.chunksize == 100
+
+        capped = plan_workers(1024**3, n_tasks=10000, n_jobs=8, max_memory=2 * 1024**3)
+        assert capped.n_workers == 1
+        assert plan_workers(1024**3, n_tasks=2, n_jobs=8, available_memory=None).n_workers <= 2
+
+    @pytest.mark.skipif(not Path("/proc/self/statm").exists(), reason="needs /proc")
+    def test_worker_footprint_matches_rss(self):
+        """Test the footprint constants against the RSS of an unpickled worker payload."""
+        # A fresh interpreter, so freed memory from other tests is not reused
+        script = """
+import os, pickle
+import networkx as nx
+from walk_times.graph_utils import nx_to_rustworkx
+from walk_times.scheduler import _WORKER_BASE_BYTES, estimate_worker_footprint, get_rss
+
+grid = nx.grid_2d_graph(100, 100).to_directed()
+ids = {node: 10**9 + i for i, node in enumerate(grid.nodes)}
+graph = nx.MultiDiGraph()
+graph.add_edges_from((ids[u], ids[v], {"time": 1.0}) for u, v in grid.edges)
+rx_graph, nx_to_rx, rx_to_nx = nx_to_rustworkx(graph, weight_attr="time")
+lands = {i: rx_to_nx[i] for i in range(0, len(rx_to_nx), 10)}
+payload = pickle.dumps((rx_graph, nx_to_rx, rx_to_nx, lands))
+del rx_graph, nx_to_rx, rx_to_nx
+
+before = get_rss([os.getpid()])
+worker_objects = pickle.loads(payload)
+measured = get_rss([os.getpid()]) - before
+n_nodes, n_edges = graph.number_of_nodes(), graph.number_of_edges()
+estimate = estimate_worker_footprint(n_nodes, n_edges, len(lands)) - _WORKER_BASE_BYTES
+print(measured, estimate)
+"""
+        src = Path(__file__).resolve().parent.parent / "src"
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": str(src)},
+        ).stdout
+        measured, estimate = map(int, output.split())
+
+        assert 0.75 < estimate / measured < 1.5
+
+    def test_throttled_imap_preserves_order(self):
+        """Test results come back in order even when throttled."""
+        items = list(range(-50, 0))
+        with Pool(processes=2) as pool:
+            results = list(throttled_imap(pool, abs, items, chunksize=7, max_memory=1))
+
+        assert results == [abs(i) for i in items]
+
+    def test_parallel_matches_serial(self, sample_graph, sample_conserved_lands_gdf):
+        """Test the memory-planned parallel runner matches the serial one."""
+        kwargs = {"trip_times": [5, 10], "geography_type": "blocks", "progress_bar": False}
+        serial = calculate_walk_times(
+            [1, 2, 3, 4], sample_graph, sample_conserved_lands_gdf, **kwargs
+        )
+        parallel = calculate_walk_times(
+            [1, 2, 3, 4], sample_graph, sample_conserved_lands_gdf, n_jobs=2, max_memory=1, **kwargs
+        )
+
+        pd.testing.assert_frame_equal(serial, parallel)
+
+
+class TestWorkQueue:
+    """Tests for the file-based walk time work queue."""
+
+    def test_claims_are_exclusive(self, temp_dir):
+        """Test each shard is claimed once and expired leases are requeued."""
+        queue = WorkQueue.create(temp_dir / "queue", np.arange(5), {}, shard_size=2)
+
+        first = queue.claim("a")
+        second = queue.claim("b")
+
+        assert queue.status() == {"pending": 1, "leased": 2, "done": 0, "total": 3}
+        assert first.name != second.name
+        assert list(first.center_nodes) == [0, 1]
+
+        stale = time.time() - 2 * queue.lease_timeout
+        os.utime(first.lease_path, (stale, stale))
+        assert queue.requeue_expired() == 1
+        assert not queue.renew(first)
+        assert queue.claim("c").name == first.name
+
+    def test_claim_survives_concurrent_requeue(self, temp_dir):
+        """Test a requeue scan right after a claim's rename does not steal the lease."""
+        queue = WorkQueue.create(temp_dir / "queue", np.arange(4), {}, shard_size=2)
+        stale = time.time() - 2 * queue.lease_timeout
+        for path in queue.pending_dir.glob("*.npy"):
+            os.utime(path, (stale, stale))
+
+        other = WorkQueue(temp_dir / "queue")
+        rename = os.rename
+
+        def rename_then_requeue(src, dst):
+            rename(src, dst)
+            if Path(dst).parent == queue.leases_dir:
+                # Another worker scans for expired leases between rename and load
+                with patch("walk_times.work_queue.os.rename", rename):
+                    other.requeue_expired()
+
+        with patch("walk_times.work_queue.os.rename", side_effect=rename_then_requeue):
+            shard = queue.claim("a")
+
+        assert shard.lease_path.exists()
+        assert list(shard.center_nodes) == [0, 1]
+        assert queue.status() == {"pending": 1, "leased": 1, "done": 0, "total": 2}
+
+    def test_local_workers_match_direct_run(
+        self, sample_graph, sample_conserved_lands_gdf, temp_dir
+    ):
+        """Test a multi-process queue run gives the same table as one process."""
+        cache = build_routing_cache(sample_graph)
+        centers = np.array([1, 2, 3, 4])
+        create_walk_time_queue(
+            temp_dir / "queue", cache, centers, sample_conserved_lands_gdf, [5, 10], shard_size=1
+        )
+
+        run_local_workers(temp_dir / "queue", n_workers=2, poll_interval=0.1)
+        result = collect_walk_times(temp_dir / "queue", temp_dir / "walk_times.parquet")
+
+        expected = recompute_center_walk_times(
+            cache, centers, sample_conserved_lands_gdf, [5, 10], progress_bar=False
+        )
+        pd.testing.assert_frame_equal(result, deduplicate_walk_times(expected))
+        assert WorkQueue(temp_dir / "queue").status()["done"] == 4
+        assert run_worker(temp_dir / "queue", wait=False) == 0
+
+    def test_worker_builds_graph_once(self, sample_graph, sample_conserved_lands_gdf, temp_dir):
+        """Test a worker builds the routing graph once for all of its shards."""
+        cache = build_routing_cache(sample_graph)
+        create_walk_time_queue(
+            temp_dir / "queue",
+            cache,
+            np.array([1, 2, 3, 4]),
+            sample_conserved_lands_gdf,
+            [5],
+            shard_size=1,
+        )
+
+        with patch.object(
+            RoutingCache, "to_rustworkx", autospec=True, side_effect=RoutingCache.to_rustworkx
+        ) as mock_build:
+            assert run_worker(temp_dir / "queue", wait=False) == 4
+
+        assert mock_build.call_count == 1
+
+
+class TestServe:
+    """Tests for the local walk time query service."""
+
+    @staticmethod
+    def _service(sample_graph, sample_conserved_lands_gdf):
+        sample_graph.graph["crs"] = "EPSG:3857"
+        return WalkTimeService(
+            build_routing_cache(sample_graph),
+            sample_conserved_lands_gdf,
+            max_trip_time=10,
+            travel_speed=6.0,  # 100 m/min
+        )
+
+    @staticmethod
+    def _lonlat(x, y):
+        lon, lat = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True).transform(
+            [x], [y]
+        )
+        return [lon[0], lat[0]]
+
+    def test_query_snaps_and_caches(self, sample_graph, sample_conserved_lands_gdf):
+        """Test points snap to the nearest node and repeated nodes hit the LRU cache."""
+        service = self._service(sample_graph, sample_conserved_lands_gdf)
+
+        response = service.query([self._lonlat(5, 5), self._lonlat(-3, 0)], trip_time=2.5)
+
+        first = response["results"][0]
+        assert first["node"] == 1
+        assert first["snap_distance_m"] < 10
+        assert [(land["osmid"], land["minutes"]) for land in first["lands"]] == [
+            (3, 2.0),
+            (4, 2.41),
+        ]
+        assert abs(first["acres"] - 35.8) < 1e-9
+        assert service.query([self._lonlat(5, 5)], trip_time=2.2)["results"][0]["acres"] == 10.5
+
+        stats = service.get_stats()
+        assert stats["requests"] == 2 and stats["points"] == 3
+        assert abs(stats["cache_hit_rate"] - 2 / 3) < 1e-9
+
+    def test_trip_time_limit(self, sample_graph, sample_conserved_lands_gdf):
+        """Test queries beyond the searched radius are rejected."""
+        service = self._service(sample_graph, sample_conserved_lands_gdf)
+
+        with pytest.raises(ValidationError):
+            service.query([self._lonlat(0, 0)], trip_time=30)
+
+    def test_non_finite_points(self, sample_graph, sample_conserved_lands_gdf):
+        """Test NaN and infinite coordinates are rejected with a 400."""
+        service = self._service(sample_graph, sample_conserved_lands_gdf)
+
+        with pytest.raises(ValidationError):
+            service.query([self._lonlat(0, 0), [float("nan"), 0.0]])
+
+        server = create_server(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{server.server_port}/query",
+                data=json.dumps({"points": [[float("inf"), 0.0]]}).encode(),
+            )
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(request)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert excinfo.value.code == 400
+        assert "finite" in json.load(excinfo.value)["error"]
+
+    def test_http_roundtrip(self, sample_graph, sample_conserved_lands_gdf):
+        """Test the HTTP endpoint answers batched queries."""
+        server = create_server(self._service(sample_graph, sample_conserved_lands_gdf), port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_port}"
+        try:
+            request = urllib.request.Request(
+                f"{url}/query",
+                data=json.dumps({"points": [self._lonlat(200, 0)], "trip_time": 5}).encode(),
+            )
+            with urllib.request.urlopen(request) as response:
+                body = json.load(response)
+            with urllib.request.urlopen(f"{url}/stats") as response:
+                stats = json.load(response)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert body["results"][0]["node"] == 3
+        assert [land["osmid"] for land in body["results"][0]["lands"]] == [3]
+        assert stats["requests"] == 1